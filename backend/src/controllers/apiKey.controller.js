@@ -170,7 +170,7 @@ export const revokeApiKey = async (req, res) => {
   }
 };
 
-const enforceRateLimit = (key) => {
+const enforceRateLimit = (key, amount = 1) => {
   const now = Date.now();
   const windowStart = key.windowStartedAt ? key.windowStartedAt.getTime() : 0;
 
@@ -179,18 +179,20 @@ const enforceRateLimit = (key) => {
     key.requestsInWindow = 0;
   }
 
-  if (key.requestsInWindow >= key.rateLimitPerMinute) {
+  if (key.requestsInWindow + amount > key.rateLimitPerMinute) {
     return false;
   }
 
-  key.requestsInWindow += 1;
+  key.requestsInWindow += amount;
   return true;
 };
 
 export const verifyApiKey = async (req, res) => {
   try {
-    const { apiKey, pipelineName, botId } = req.body ?? {};
+    const { apiKey, pipelineName, botId, requests } = req.body ?? {};
     const identifier = pipelineName || botId;
+    // Batch chat calls verify once for all of their questions
+    const requestCount = Math.max(1, Number.parseInt(requests, 10) || 1);
 
     if (!apiKey || !identifier) {
       return res.status(400).json({ message: "apiKey and pipelineName are required" });
@@ -198,7 +200,7 @@ export const verifyApiKey = async (req, res) => {
 
     const botIdentifier = String(identifier).trim();
     const keyHash = hashApiKey(apiKey);
-    const key = await ApiKey.findOne({ keyHash }).populate({ path: "botId", select: "name dataset embedding llm" });
+    const key = await ApiKey.findOne({ keyHash }).populate({ path: "botId", select: "name dataset embedding llm updatedAt" });
 
     if (!key || key.status !== "active") {
       return res.status(401).json({ message: "Invalid API key" });
@@ -230,13 +232,27 @@ export const verifyApiKey = async (req, res) => {
       return res.status(401).json({ message: "API key has expired" });
     }
 
-    if (!enforceRateLimit(key)) {
+    // Refuse before any answer is generated rather than when usage is tracked afterwards
+    const owner = await User.findById(key.userId);
+    if (!owner) {
+      return res.status(404).json({ message: "User not found" });
+    }
+    try {
+      ensureRequestCapacity(owner, requestCount);
+    } catch (capacityError) {
+      if (capacityError.statusCode === 402) {
+        return res.status(402).json({ message: capacityError.message });
+      }
+      throw capacityError;
+    }
+
+    if (!enforceRateLimit(key, requestCount)) {
       await key.save();
       return res.status(429).json({ message: "API key rate limit exceeded" });
     }
 
     key.lastUsedAt = new Date();
-    key.usageCount += 1;
+    key.usageCount += requestCount;
     await key.save();
 
     const pipelinePayload = key.botId?.toObject ? key.botId.toObject() : key.botId;
@@ -257,6 +273,8 @@ export const verifyApiKey = async (req, res) => {
         dataset: pipelinePayload?.dataset,
         embedding: pipelinePayload?.embedding,
         llm: pipelinePayload?.llm,
+        // Lets the Python service version cached answers (ETag)
+        updatedAt: pipelinePayload?.updatedAt,
       },
       // Legacy support
       bot: {
@@ -279,8 +297,10 @@ export const verifyApiKey = async (req, res) => {
  */
 export const trackApiKeyUsage = async (req, res) => {
   try {
-    const { apiKey, pipelineName, pipelineId, botId, tokens } = req.body ?? {};
+    const { apiKey, pipelineName, pipelineId, botId, tokens, requests } = req.body ?? {};
     const identifier = pipelineName || pipelineId || botId;
+    // Batch chat calls report every answered question in one tracking call
+    const requestCount = Math.max(1, Number.parseInt(requests, 10) || 1);
 
     if (!apiKey || !identifier) {
       return res.status(400).json({ message: "apiKey and pipelineName are required" });
@@ -301,12 +321,12 @@ export const trackApiKeyUsage = async (req, res) => {
 
     // Track usage
     try {
-      await consumeRequests(user, 1, {
+      await consumeRequests(user, requestCount, {
         source: 'sdk',
         botId: identifier,
         tokens: tokens || 0
       });
-      console.log('Usage tracked for SDK request:', { userId: user._id, botId: identifier });
+      console.log('Usage tracked for SDK request:', { userId: user._id, botId: identifier, requests: requestCount });
     } catch (usageError) {
       if (usageError.statusCode === 402) {
         return res.status(402).json({
@@ -15,6 +15,8 @@ const normalizeDataset = (dataset, index) => {
   const chunkSize = Number.parseInt(dataset?.chunk_size, 10);
   const chunkOverlap = Number.parseInt(dataset?.chunk_overlap, 10);
   const chunks = Array.isArray(dataset?.chunks) ? dataset.chunks : [];
+  // Chunks staged by the Python service (uploaded with stage=true) are referenced by handle.
+  const handle = sanitizeString(dataset?.handle);
 
   const normalizedChunks = chunks
     .map((chunk, chunkIndex) => ({
@@ -35,20 +37,23 @@ const normalizeDataset = (dataset, index) => {
     return { error: `${label}: chunk_overlap must be zero or greater` };
   }
 
-  if (normalizedChunks.length === 0) {
+  if (normalizedChunks.length === 0 && !handle) {
     return { error: `${label}: contains no valid chunks to embed` };
   }
 
-  return {
-    dataset: {
-      id,
-      label,
-      dataset_type: datasetType,
-      chunk_size: chunkSize,
-      chunk_overlap: chunkOverlap,
-      chunks: normalizedChunks,
-    },
+  const normalized = {
+    id,
+    label,
+    dataset_type: datasetType,
+    chunk_size: chunkSize,
+    chunk_overlap: chunkOverlap,
+    chunks: normalizedChunks,
   };
+  if (normalizedChunks.length === 0) {
+    normalized.handle = handle;
+  }
+
+  return { dataset: normalized };
 };
 
 const buildPineconeConfig = (pineconeConfig = {}) => {
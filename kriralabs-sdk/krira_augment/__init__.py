@@ -1,10 +1,30 @@
 """Public exports for the Krira Augment SDK."""
 
+from __future__ import annotations
+
+from typing import Any
+
+from .cache import DiskCache, MemoryCache, ResponseCache
 from .client import ChatResponse, KriraAugment, KriraAugmentClient, KriraPipeline
 
 __all__ = [
     "KriraAugment",
     "KriraPipeline",
     "KriraAugmentClient",
+    "AsyncKriraAugment",
+    "AsyncKriraPipeline",
     "ChatResponse",
+    "ResponseCache",
+    "MemoryCache",
+    "DiskCache",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    # The async client needs the optional httpx dependency, so it is only
+    # imported when it is actually used.
+    if name in {"AsyncKriraAugment", "AsyncKriraPipeline"}:
+        from . import async_client
+
+        return getattr(async_client, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,261 @@
+"""Asyncio client for the Krira Augment public API.
+
+Requires the ``async`` extra (``pip install "krira-augment-sdk[async]"``),
+which installs ``httpx`` with HTTP/2 support.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from importlib.util import find_spec
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Union
+
+try:
+    import httpx
+except ImportError as exc:  # pragma: no cover - optional dependency
+    raise ImportError(
+        "AsyncKriraAugment requires httpx. Install it with `pip install \"krira-augment-sdk[async]\"`."
+    ) from exc
+
+from .client import (
+    DEFAULT_BASE_URL,
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_RETRIES,
+    DEFAULT_TIMEOUT,
+    USER_AGENT,
+    ChatResponse,
+    _batch_payload,
+    _batch_results,
+    _cache_lookup,
+    _chat_payload,
+    _chat_response,
+    _chunks,
+    _error_message,
+    _raise_for_status,
+    _revalidation_headers,
+    _stream_event,
+    _validate_options,
+)
+from .cache import ResponseCache
+from .exceptions import KriraAugmentError, ServerError, TransportError
+
+# Requests allowed in flight at once per client; further calls wait their turn.
+DEFAULT_MAX_CONCURRENCY = 64
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 20
+
+
+class AsyncKriraAugment:
+    """Async counterpart of :class:`~krira_augment.client.KriraAugment`.
+
+    A single pooled ``httpx.AsyncClient`` is reused for every call (HTTP/2 when
+    the ``h2`` package is installed, keep-alive HTTP/1.1 otherwise), and a
+    semaphore caps the requests in flight so thousands of ``ask`` coroutines
+    can be gathered from one event loop. It returns the same
+    :class:`ChatResponse` and raises the same exceptions as the sync client.
+    """
+
+    def __init__(
+        self,
+        *,
+        api_key: str,
+        pipeline_name: str,
+        base_url: str | None = None,
+        timeout: float = DEFAULT_TIMEOUT,
+        retries: int = DEFAULT_RETRIES,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+        http2: bool = True,
+        client: Optional[httpx.AsyncClient] = None,
+        cache: Optional[ResponseCache] = None,
+    ) -> None:
+        _validate_options(api_key, pipeline_name, timeout)
+        if max_concurrency <= 0:
+            raise ValueError("max_concurrency must be greater than zero")
+
+        self.api_key = api_key.strip()
+        self.pipeline_name = pipeline_name.strip()
+        self.base_url = (base_url or DEFAULT_BASE_URL).rstrip("/")
+        self.timeout = timeout
+        self.retries = max(0, retries)
+        self.cache = cache
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._owns_client = client is None
+        self._client = client or httpx.AsyncClient(
+            http2=http2 and find_spec("h2") is not None,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+            ),
+            timeout=timeout,
+        )
+        self._headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+            "User-Agent": USER_AGENT,
+        }
+
+    async def ask(
+        self,
+        question: str,
+        *,
+        conversation_id: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+    ) -> ChatResponse:
+        """Send a user question to the pipeline and return the model answer."""
+
+        payload = _chat_payload(self.pipeline_name, question, conversation_id, metadata)
+        key, entry = _cache_lookup(self.cache, self.pipeline_name, payload)
+        if entry is not None and entry.fresh:
+            return _chat_response(entry.data, self.pipeline_name, from_cache=True)
+
+        response = await self._post("/chat", payload, timeout or self.timeout, headers=_revalidation_headers(entry))
+        if response.status_code == 304 and key and entry is not None:
+            entry = self.cache.set(key, entry.data, response.headers.get("ETag") or entry.etag)
+            return _chat_response(entry.data, self.pipeline_name, from_cache=True)
+
+        data = self._parse_response(response)
+        result = _chat_response(data, self.pipeline_name)
+        if key:
+            self.cache.set(key, data, response.headers.get("ETag"))
+        return result
+
+    def stream(
+        self,
+        question: str,
+        *,
+        conversation_id: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[str]:
+        """Iterate over the answer in pieces as the model generates it (``async for``)."""
+
+        payload = _chat_payload(self.pipeline_name, question, conversation_id, metadata)
+        return self._stream(payload, timeout or self.timeout)
+
+    async def ask_many(
+        self,
+        questions: Sequence[str],
+        *,
+        chunk_size: int = DEFAULT_BATCH_SIZE,
+        timeout: Optional[float] = None,
+    ) -> List[Union[ChatResponse, KriraAugmentError]]:
+        """Answer several questions through the batch endpoint.
+
+        Chunks of ``chunk_size`` questions are sent concurrently, subject to
+        ``max_concurrency``. Results follow the input order, as with
+        :meth:`KriraAugment.ask_many`.
+        """
+
+        async def send(chunk: List[str]) -> List[Union[ChatResponse, KriraAugmentError]]:
+            response = await self._post("/chat/batch", _batch_payload(self.pipeline_name, chunk), timeout or self.timeout)
+            return _batch_results(self._parse_response(response), self.pipeline_name, len(chunk))
+
+        chunks = _chunks(questions, chunk_size)
+        outcomes: List[Union[ChatResponse, KriraAugmentError]] = []
+        for chunk_outcomes in await asyncio.gather(*(send(chunk) for chunk in chunks)):
+            outcomes.extend(chunk_outcomes)
+        return outcomes
+
+    async def aclose(self) -> None:
+        """Close the underlying connection pool if this client created it."""
+
+        if self._owns_client:
+            await self._client.aclose()
+
+    async def __aenter__(self) -> "AsyncKriraAugment":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    # ---------------------------------------------------------------------
+    # Internal helpers
+    # ---------------------------------------------------------------------
+    async def _stream(self, payload: Dict[str, Any], timeout: float) -> AsyncIterator[str]:
+        key, entry = _cache_lookup(self.cache, self.pipeline_name, payload)
+        if entry is not None and entry.fresh:
+            yield entry.data["answer"]
+            return
+
+        response = await self._post(
+            "/chat/stream",
+            payload,
+            timeout,
+            headers=_revalidation_headers(entry),
+            stream=True,
+        )
+        try:
+            if response.status_code == 304 and key and entry is not None:
+                self.cache.set(key, entry.data, response.headers.get("ETag") or entry.etag)
+                yield entry.data["answer"]
+                return
+
+            if response.status_code >= 400:
+                await response.aread()
+            _raise_for_status(response.status_code, lambda: _error_message(response.json, response.text))
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                event = _stream_event(line)
+                if event.get("type") == "delta":
+                    yield str(event.get("text") or "")
+                elif event.get("type") == "done":
+                    if key:
+                        data = {name: value for name, value in event.items() if name != "type"}
+                        self.cache.set(key, data, response.headers.get("ETag"))
+                    return
+        finally:
+            await response.aclose()
+        raise TransportError("The answer stream ended before it was complete")
+
+    async def _post(
+        self,
+        path: str,
+        payload: Dict[str, Any],
+        timeout: float,
+        *,
+        headers: Optional[Dict[str, str]] = None,
+        stream: bool = False,
+    ) -> httpx.Response:
+        """POST with automatic retry on timeout (handles Render cold starts)."""
+        url = f"{self.base_url}{path}"
+        request_headers = {**self._headers, **headers} if headers else self._headers
+        last_error: Optional[Exception] = None
+
+        for attempt in range(self.retries + 1):
+            try:
+                # The slot is released while backing off so waiting calls can proceed.
+                async with self._semaphore:
+                    request = self._client.build_request(
+                        "POST", url, json=payload, headers=request_headers, timeout=timeout
+                    )
+                    return await self._client.send(request, stream=stream)
+            except httpx.TimeoutException as exc:
+                last_error = exc
+                if attempt < self.retries:
+                    # Exponential backoff: 2s, 4s, 8s...
+                    await asyncio.sleep(2 ** (attempt + 1))
+                    continue
+            except httpx.TransportError as exc:
+                raise TransportError("Unable to reach Krira Augment API") from exc
+
+        # All retries exhausted
+        raise TransportError(
+            f"Request to Krira Augment timed out after {self.retries + 1} attempts. "
+            "The server may be waking up from cold start - please try again."
+        ) from last_error
+
+    def _parse_response(self, response: httpx.Response) -> Dict[str, Any]:
+        _raise_for_status(response.status_code, lambda: _error_message(response.json, response.text))
+
+        try:
+            return response.json()
+        except ValueError as exc:  # pragma: no cover - defensive
+            raise ServerError("Received a non-JSON response from Krira Augment") from exc
+
+
+# Alternate export names mirroring the sync client.
+AsyncKriraPipeline = AsyncKriraAugment
@@ -0,0 +1,169 @@
+"""Opt-in local caches for chat answers.
+
+Pass a cache to :class:`~krira_augment.client.KriraAugment` (or the async
+client) to reuse answers to repeated questions. Entries are keyed by pipeline
+and normalized question. While an entry is within its TTL it is returned
+without contacting the API. Once stale, it is revalidated with the server's
+``ETag``; a ``304 Not Modified`` reply renews it without generating the answer
+again.
+"""
+
+from __future__ import annotations
+
+import abc
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+DEFAULT_CACHE_TTL = 300.0
+DEFAULT_MAX_ENTRIES = 1024
+
+
+@dataclass(slots=True)
+class CacheEntry:
+    """A cached ``/chat`` payload together with its validator."""
+
+    data: Dict[str, Any]
+    etag: Optional[str]
+    expires_at: float
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+
+def cache_key(pipeline_name: str, question: str) -> str:
+    """Return the cache key for ``question``; case and whitespace are ignored."""
+
+    normalized = " ".join(question.split()).casefold()
+    return hashlib.sha256(f"{pipeline_name.strip().casefold()}\x1f{normalized}".encode("utf-8")).hexdigest()
+
+
+class ResponseCache(abc.ABC):
+    """Base class for answer caches; subclasses store entries by key.
+
+    A custom cache implements :meth:`get`, :meth:`delete`, :meth:`clear` and
+    :meth:`_write`; :meth:`set` stamps the expiry and calls :meth:`_write`.
+    """
+
+    def __init__(self, *, ttl: float = DEFAULT_CACHE_TTL) -> None:
+        if ttl < 0:
+            raise ValueError("ttl must not be negative")
+        self.ttl = ttl
+
+    @abc.abstractmethod
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Return the entry for ``key``, even when stale, or ``None``."""
+
+    def set(self, key: str, data: Dict[str, Any], etag: Optional[str] = None) -> CacheEntry:
+        """Store ``data`` under ``key`` for ``ttl`` seconds and return the entry."""
+
+        entry = CacheEntry(data=data, etag=etag, expires_at=time.time() + self.ttl)
+        self._write(key, entry)
+        return entry
+
+    @abc.abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove the entry for ``key`` if there is one."""
+
+    @abc.abstractmethod
+    def clear(self) -> None:
+        """Remove every entry."""
+
+    @abc.abstractmethod
+    def _write(self, key: str, entry: CacheEntry) -> None:
+        """Persist ``entry`` under ``key``, replacing any previous one."""
+
+
+class MemoryCache(ResponseCache):
+    """Thread-safe in-process LRU cache holding up to ``max_entries`` answers."""
+
+    def __init__(self, *, ttl: float = DEFAULT_CACHE_TTL, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        super().__init__(ttl=ttl)
+        if max_entries <= 0:
+            raise ValueError("max_entries must be greater than zero")
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _write(self, key: str, entry: CacheEntry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class DiskCache(ResponseCache):
+    """Cache stored as one JSON file per answer, shared across processes.
+
+    Files are replaced atomically, so concurrent writers never leave a torn
+    entry; unreadable files are treated as misses.
+    """
+
+    def __init__(self, directory: Union[str, Path], *, ttl: float = DEFAULT_CACHE_TTL) -> None:
+        super().__init__(ttl=ttl)
+        self.directory = Path(directory).expanduser()
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        try:
+            stored = json.loads(self._path(key).read_text(encoding="utf-8"))
+            return CacheEntry(data=stored["data"], etag=stored.get("etag"), expires_at=float(stored["expires_at"]))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def delete(self, key: str) -> None:
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    def clear(self) -> None:
+        for path in self.directory.glob("*.json"):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _write(self, key: str, entry: CacheEntry) -> None:
+        payload = json.dumps({"data": entry.data, "etag": entry.etag, "expires_at": entry.expires_at})
+        descriptor, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "w", encoding="utf-8") as handle:
+                handle.write(payload)
+            os.replace(temporary, self._path(key))
+        except BaseException:
+            try:
+                os.unlink(temporary)
+            except FileNotFoundError:
+                pass
+            raise
@@ -2,15 +2,17 @@
 
 from __future__ import annotations
 
+import json
 import time
 from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
 
 import requests
 from requests import Response
 from requests.exceptions import ConnectionError as RequestsConnectionError
 from requests.exceptions import Timeout as RequestsTimeout
 
+from .cache import CacheEntry, ResponseCache, cache_key
 from .exceptions import (
     AuthenticationError,
     KriraAugmentError,
@@ -21,12 +23,14 @@ from .exceptions import (
 )
 
 DEFAULT_BASE_URL = "https://krira-augment-python-backend.onrender.com/v1"
-USER_AGENT = "krira-augment-sdk/1.0.3"
+USER_AGENT = "krira-augment-sdk/1.1.0"
 
 # Default timeout increased to 60s to account for Render cold starts
 DEFAULT_TIMEOUT = 60.0
 # Number of retries for timeout errors
 DEFAULT_RETRIES = 2
+# Questions sent per /chat/batch request; matches the server's default limit.
+DEFAULT_BATCH_SIZE = 50
 
 
 @dataclass(slots=True)
@@ -37,6 +41,150 @@ class ChatResponse:
     pipeline_name: str
     conversation_id: Optional[str]
     raw: Dict[str, Any]
+    from_cache: bool = False
+
+
+def _validate_options(api_key: str, pipeline_name: str, timeout: float) -> None:
+    if not api_key or not api_key.strip():
+        raise ValueError("api_key is required")
+    if not pipeline_name or not pipeline_name.strip():
+        raise ValueError("pipeline_name is required")
+    if timeout <= 0:
+        raise ValueError("timeout must be greater than zero")
+
+
+def _chat_payload(
+    pipeline_name: str,
+    question: str,
+    conversation_id: Optional[str],
+    metadata: Optional[Dict[str, Any]],
+) -> Dict[str, Any]:
+    if not question or not question.strip():
+        raise ValueError("question must be a non-empty string")
+
+    payload: Dict[str, Any] = {
+        "pipeline_name": pipeline_name,
+        "query": question.strip(),
+    }
+    if conversation_id:
+        payload["conversation_id"] = conversation_id
+    if metadata:
+        payload["metadata"] = metadata
+    return payload
+
+
+def _raise_for_status(status_code: int, error_message: Callable[[], str]) -> None:
+    """Map an HTTP status to the SDK exception hierarchy; shared by the sync and async clients."""
+
+    if status_code == 401:
+        raise AuthenticationError("API key is invalid or has been revoked")
+    if status_code == 403:
+        raise PermissionDeniedError("API key lacks permission to access this pipeline")
+    if status_code == 429:
+        raise RateLimitError("API rate limit exceeded. Slow down your requests.")
+    if 400 <= status_code < 500:
+        raise KriraAugmentError(error_message() or "Invalid request")
+    if status_code >= 500:
+        raise ServerError("Krira Augment service is temporarily unavailable")
+
+
+def _error_message(payload: Callable[[], Any], text: str) -> str:
+    try:
+        data = payload()
+        if isinstance(data, dict):
+            return str(data.get("message") or data.get("detail") or "")
+        return str(data)
+    except ValueError:
+        return text.strip()
+
+
+def _chat_response(data: Dict[str, Any], pipeline_name: str, *, from_cache: bool = False) -> ChatResponse:
+    answer = data.get("answer")
+    if not isinstance(answer, str) or not answer:
+        raise ServerError("Chat response payload is missing the 'answer' field")
+
+    return ChatResponse(
+        answer=answer,
+        pipeline_name=data.get("pipeline_name", pipeline_name),
+        conversation_id=data.get("conversation_id"),
+        raw=data,
+        from_cache=from_cache,
+    )
+
+
+def _cache_lookup(
+    cache: Optional[ResponseCache],
+    pipeline_name: str,
+    payload: Dict[str, Any],
+) -> Tuple[Optional[str], Optional[CacheEntry]]:
+    """Return the cache key and current entry for a chat payload.
+
+    Conversation turns and requests with metadata depend on more than the
+    question, so they are never cached.
+    """
+
+    if cache is None or "conversation_id" in payload or "metadata" in payload:
+        return None, None
+    key = cache_key(pipeline_name, payload["query"])
+    return key, cache.get(key)
+
+
+def _revalidation_headers(entry: Optional[CacheEntry]) -> Optional[Dict[str, str]]:
+    if entry is None or not entry.etag:
+        return None
+    return {"If-None-Match": entry.etag}
+
+
+def _stream_event(line: Union[str, bytes]) -> Dict[str, Any]:
+    """Decode one NDJSON line from ``/chat/stream``, raising on error events."""
+
+    try:
+        event = json.loads(line)
+    except ValueError as exc:
+        raise ServerError("Received a malformed stream event from Krira Augment") from exc
+    if event.get("type") == "error":
+        message = str(event.get("message") or "")
+        _raise_for_status(int(event.get("status_code") or 500), lambda: message)
+        raise ServerError(message or "Streaming failed")
+    return event
+
+
+def _chunks(questions: Sequence[str], chunk_size: int) -> List[List[str]]:
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be greater than zero")
+    for question in questions:
+        if not isinstance(question, str) or not question.strip():
+            raise ValueError("every question must be a non-empty string")
+    items = list(questions)
+    return [items[start:start + chunk_size] for start in range(0, len(items), chunk_size)]
+
+
+def _batch_payload(pipeline_name: str, questions: Sequence[str]) -> Dict[str, Any]:
+    return {
+        "pipeline_name": pipeline_name,
+        "queries": [{"query": question.strip()} for question in questions],
+    }
+
+
+def _batch_results(
+    data: Dict[str, Any],
+    pipeline_name: str,
+    count: int,
+) -> List[Union[ChatResponse, KriraAugmentError]]:
+    """Turn a /chat/batch payload into one response or exception per question."""
+
+    results = data.get("results")
+    if not isinstance(results, list) or len(results) != count:
+        raise ServerError("Batch response payload does not match the submitted questions")
+
+    outcomes: List[Union[ChatResponse, KriraAugmentError]] = []
+    for item in sorted(results, key=lambda result: result.get("index", 0)):
+        if item.get("error"):
+            error_type = ServerError if int(item.get("status_code") or 500) >= 500 else KriraAugmentError
+            outcomes.append(error_type(str(item["error"])))
+            continue
+        outcomes.append(_chat_response(item, data.get("pipeline_name", pipeline_name)))
+    return outcomes
 
 
 class KriraAugment:
@@ -51,19 +199,16 @@ class KriraAugment:
         timeout: float = DEFAULT_TIMEOUT,
         retries: int = DEFAULT_RETRIES,
         session: Optional[requests.Session] = None,
+        cache: Optional[ResponseCache] = None,
     ) -> None:
-        if not api_key or not api_key.strip():
-            raise ValueError("api_key is required")
-        if not pipeline_name or not pipeline_name.strip():
-            raise ValueError("pipeline_name is required")
-        if timeout <= 0:
-            raise ValueError("timeout must be greater than zero")
+        _validate_options(api_key, pipeline_name, timeout)
 
         self.api_key = api_key.strip()
         self.pipeline_name = pipeline_name.strip()
         self.base_url = (base_url or DEFAULT_BASE_URL).rstrip("/")
         self.timeout = timeout
         self.retries = max(0, retries)
+        self.cache = cache
         self._session = session or requests.Session()
         self._session.headers.update({
             "Authorization": f"Bearer {self.api_key}",
@@ -79,32 +224,65 @@ class KriraAugment:
         metadata: Optional[Dict[str, Any]] = None,
         timeout: Optional[float] = None,
     ) -> ChatResponse:
-        """Send a user question to the pipeline and return the model answer."""
+        """Send a user question to the pipeline and return the model answer.
 
-        if not question or not question.strip():
-            raise ValueError("question must be a non-empty string")
+        With a ``cache`` configured, fresh answers are returned locally and
+        stale ones are revalidated with the server before being reused.
+        """
 
-        payload: Dict[str, Any] = {
-            "pipeline_name": self.pipeline_name,
-            "query": question.strip(),
-        }
-        if conversation_id:
-            payload["conversation_id"] = conversation_id
-        if metadata:
-            payload["metadata"] = metadata
+        payload = _chat_payload(self.pipeline_name, question, conversation_id, metadata)
+        key, entry = _cache_lookup(self.cache, self.pipeline_name, payload)
+        if entry is not None and entry.fresh:
+            return _chat_response(entry.data, self.pipeline_name, from_cache=True)
+
+        response = self._post("/chat", payload, timeout or self.timeout, headers=_revalidation_headers(entry))
+        if response.status_code == 304 and key and entry is not None:
+            entry = self.cache.set(key, entry.data, response.headers.get("ETag") or entry.etag)
+            return _chat_response(entry.data, self.pipeline_name, from_cache=True)
 
-        response = self._post("/chat", payload, timeout or self.timeout)
         data = self._parse_response(response)
-        answer = data.get("answer")
-        if not isinstance(answer, str) or not answer:
-            raise ServerError("Chat response payload is missing the 'answer' field")
-
-        return ChatResponse(
-            answer=answer,
-            pipeline_name=data.get("pipeline_name", self.pipeline_name),
-            conversation_id=data.get("conversation_id"),
-            raw=data,
-        )
+        result = _chat_response(data, self.pipeline_name)
+        if key:
+            self.cache.set(key, data, response.headers.get("ETag"))
+        return result
+
+    def stream(
+        self,
+        question: str,
+        *,
+        conversation_id: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+    ) -> Iterator[str]:
+        """Yield the answer in pieces as the model generates it.
+
+        Uses the ``/chat/stream`` endpoint and shares the ``cache`` with
+        :meth:`ask`; a cached answer is yielded as a single piece.
+        """
+
+        payload = _chat_payload(self.pipeline_name, question, conversation_id, metadata)
+        return self._stream(payload, timeout or self.timeout)
+
+    def ask_many(
+        self,
+        questions: Sequence[str],
+        *,
+        chunk_size: int = DEFAULT_BATCH_SIZE,
+        timeout: Optional[float] = None,
+    ) -> List[Union[ChatResponse, KriraAugmentError]]:
+        """Answer several questions through the batch endpoint.
+
+        Questions are sent ``chunk_size`` at a time. The result list follows the
+        input order and holds a :class:`ChatResponse` for each answered question
+        or the exception describing why that question failed. Errors affecting
+        a whole request (authentication, rate limits, transport) are raised.
+        """
+
+        outcomes: List[Union[ChatResponse, KriraAugmentError]] = []
+        for chunk in _chunks(questions, chunk_size):
+            response = self._post("/chat/batch", _batch_payload(self.pipeline_name, chunk), timeout or self.timeout)
+            outcomes.extend(_batch_results(self._parse_response(response), self.pipeline_name, len(chunk)))
+        return outcomes
 
     def close(self) -> None:
         """Close the underlying HTTP session."""
@@ -114,14 +292,55 @@ class KriraAugment:
     # ---------------------------------------------------------------------
     # Internal helpers
     # ---------------------------------------------------------------------
-    def _post(self, path: str, payload: Dict[str, Any], timeout: float) -> Response:
+    def _stream(self, payload: Dict[str, Any], timeout: float) -> Iterator[str]:
+        key, entry = _cache_lookup(self.cache, self.pipeline_name, payload)
+        if entry is not None and entry.fresh:
+            yield entry.data["answer"]
+            return
+
+        response = self._post(
+            "/chat/stream",
+            payload,
+            timeout,
+            headers=_revalidation_headers(entry),
+            stream=True,
+        )
+        with response:
+            if response.status_code == 304 and key and entry is not None:
+                self.cache.set(key, entry.data, response.headers.get("ETag") or entry.etag)
+                yield entry.data["answer"]
+                return
+
+            _raise_for_status(response.status_code, lambda: self._extract_error_message(response))
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                event = _stream_event(line)
+                if event.get("type") == "delta":
+                    yield str(event.get("text") or "")
+                elif event.get("type") == "done":
+                    if key:
+                        data = {name: value for name, value in event.items() if name != "type"}
+                        self.cache.set(key, data, response.headers.get("ETag"))
+                    return
+        raise TransportError("The answer stream ended before it was complete")
+
+    def _post(
+        self,
+        path: str,
+        payload: Dict[str, Any],
+        timeout: float,
+        *,
+        headers: Optional[Dict[str, str]] = None,
+        stream: bool = False,
+    ) -> Response:
         """POST with automatic retry on timeout (handles Render cold starts)."""
         url = f"{self.base_url}{path}"
         last_error: Optional[Exception] = None
         
         for attempt in range(self.retries + 1):
             try:
-                return self._session.post(url, json=payload, timeout=timeout)
+                return self._session.post(url, json=payload, timeout=timeout, headers=headers, stream=stream)
             except RequestsTimeout as exc:
                 last_error = exc
                 if attempt < self.retries:
@@ -139,16 +358,7 @@ class KriraAugment:
         ) from last_error
 
     def _parse_response(self, response: Response) -> Dict[str, Any]:
-        if response.status_code == 401:
-            raise AuthenticationError("API key is invalid or has been revoked")
-        if response.status_code == 403:
-            raise PermissionDeniedError("API key lacks permission to access this pipeline")
-        if response.status_code == 429:
-            raise RateLimitError("API rate limit exceeded. Slow down your requests.")
-        if 400 <= response.status_code < 500:
-            raise KriraAugmentError(self._extract_error_message(response) or "Invalid request")
-        if response.status_code >= 500:
-            raise ServerError("Krira Augment service is temporarily unavailable")
+        _raise_for_status(response.status_code, lambda: self._extract_error_message(response))
 
         try:
             return response.json()
@@ -157,13 +367,7 @@ class KriraAugment:
 
     @staticmethod
     def _extract_error_message(response: Response) -> str:
-        try:
-            payload = response.json()
-            if isinstance(payload, dict):
-                return str(payload.get("message") or payload.get("detail") or "")
-            return str(payload)
-        except ValueError:
-            return response.text.strip()
+        return _error_message(response.json, response.text)
 
 
 # Alternate export names for convenience.
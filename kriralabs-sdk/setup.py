@@ -15,7 +15,7 @@ LONG_DESCRIPTION = (
 
 setup(
     name="krira-augment-sdk",
-    version="1.0.3",
+    version="1.1.0",
     description="Official Python SDK for building integrations with Krira Augment RAG pipelines",
     long_description=LONG_DESCRIPTION,
     long_description_content_type="text/markdown",
@@ -29,6 +29,9 @@ setup(
         "requests>=2.31.0,<3.0.0",
         "typing-extensions>=4.0; python_version<'3.11'",
     ],
+    extras_require={
+        "async": ["httpx[http2]>=0.27,<1.0"],
+    },
     classifiers=[
         "Development Status :: 4 - Beta",
         "Intended Audience :: Developers",
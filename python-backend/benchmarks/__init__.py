@@ -0,0 +1 @@
+"""Performance benchmarks for the Krira AI Python backend."""
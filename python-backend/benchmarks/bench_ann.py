@@ -0,0 +1,121 @@
+"""Compare IVF search against exact search on a local collection.
+
+Run from ``python-backend``::
+
+    python -m benchmarks.bench_ann --rows 200000 --dimension 384 --nprobe 4 8 16 32
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+from src.services.local_store import LocalRecord, LocalVectorCollection
+from src.services.quantization import recall_at_k
+
+from .bench_quantization import _synthetic_corpus
+
+
+def _timed_search(collection: LocalVectorCollection, probes: np.ndarray, k: int, **options: Any) -> Dict[str, Any]:
+    latencies: List[float] = []
+    found: List[List[int]] = []
+    for probe in probes:
+        started = time.perf_counter()
+        matches = collection.search(probe, k, **options)
+        latencies.append(time.perf_counter() - started)
+        found.append(collection.row_ids(matches))
+    millis = np.asarray(latencies) * 1000
+    return {
+        "found": found,
+        "p50_ms": round(float(np.percentile(millis, 50)), 3),
+        "p95_ms": round(float(np.percentile(millis, 95)), 3),
+        "queries_per_second": round(len(probes) / float(np.sum(latencies)), 1),
+    }
+
+
+def run(
+    rows: int,
+    dimension: int,
+    queries: int,
+    k: int,
+    quantization: str,
+    nprobes: Sequence[int],
+    seed: int,
+) -> List[Dict[str, Any]]:
+    corpus = _synthetic_corpus(rows, dimension, clusters=max(8, rows // 500), seed=seed)
+    rng = np.random.default_rng(seed + 1)
+    probes = corpus[rng.integers(0, rows, size=queries)] + 0.1 * rng.normal(size=(queries, dimension)).astype(np.float32)
+    records = [LocalRecord(id=str(index), dataset_id=f"ds-{index % 4}", text="") for index in range(rows)]
+
+    report: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as workspace:
+        collection = LocalVectorCollection(
+            Path(workspace) / "bench",
+            dimension,
+            quantization,  # type: ignore[arg-type]
+            ann_min_rows=rows + 1,
+        )
+        collection.add(corpus, records)
+        exact_ids = [collection.exact_search(probe, k) for probe in probes]
+
+        flat = _timed_search(collection, probes, k, approximate=False)
+        report.append(
+            {
+                "search": "flat",
+                "nprobe": "-",
+                "build_seconds": 0.0,
+                **{key: value for key, value in flat.items() if key != "found"},
+                f"recall@{k}": round(recall_at_k(exact_ids, flat["found"], k), 4),
+            }
+        )
+
+        started = time.perf_counter()
+        collection.build_index()
+        build_seconds = round(time.perf_counter() - started, 3)
+        lists = collection.stats()["ann_lists"]
+
+        for nprobe in nprobes:
+            approximate = _timed_search(collection, probes, k, nprobe=nprobe)
+            report.append(
+                {
+                    "search": f"ivf{lists}",
+                    "nprobe": nprobe,
+                    "build_seconds": build_seconds,
+                    **{key: value for key, value in approximate.items() if key != "found"},
+                    f"recall@{k}": round(recall_at_k(exact_ids, approximate["found"], k), 4),
+                }
+            )
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--quantization", choices=("none", "int8", "binary"), default="int8")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16, 32])
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="Emit the report as JSON")
+    args = parser.parse_args()
+
+    report = run(args.rows, args.dimension, args.queries, args.k, args.quantization, args.nprobe, args.seed)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    columns = list(report[0].keys())
+    print(" | ".join(columns))
+    for row in report:
+        print(" | ".join(str(row[column]) for column in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,442 @@
+"""End-to-end endpoint benchmarks against local FastRouter/Pinecone stand-ins.
+
+Starts :mod:`benchmarks.fakes` in-process, launches the backend with uvicorn
+in a subprocess pointed at the fakes, then drives ``/uploaddataset``,
+``/embed``, ``/v1/chat``, ``/v1/chat/batch`` and ``/api/llm/evaluate``. Reports throughput,
+p50/p95/p99 latency and the backend's peak RSS per scenario, and compares
+them with a stored baseline.
+
+Run from ``python-backend``::
+
+    python -m benchmarks.bench_endpoints --vector-store local --chat-requests 200 --concurrency 16
+    python -m benchmarks.bench_endpoints --save-baseline     # record benchmarks/baseline.json
+    python -m benchmarks.bench_endpoints --fail-on-regression
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+import numpy as np
+
+from .fakes import FakeUpstreamConfig, FakeUpstreamServer, free_port
+from .fixtures import chat_questions, dataset_fixtures, sample_test_csv
+
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+BENCH_API_KEY = "krira-bench-key"
+BENCH_PIPELINE = "bench-pipeline"
+BENCH_MODEL = "openai/gpt-4o-mini"
+BENCH_EMBEDDING_MODEL = "openai-small"
+
+# Metrics compared against the baseline and whether a larger value is worse.
+COMPARED_METRICS = {"p50_ms": True, "p95_ms": True, "p99_ms": True, "throughput_rps": False, "peak_rss_mb": True}
+
+
+# ----------------------------------------------------------------------
+# Backend process
+# ----------------------------------------------------------------------
+
+
+def _backend_env(upstream_url: str, workspace: Path) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.update(
+        {
+            "FASTROUTER_API_KEY": "bench",
+            "FASTROUTER_BASE_URL": f"{upstream_url}/api/v1",
+            "FASTROUTER_EMBEDDINGS_BASE_URL": f"{upstream_url}/v1",
+            "API_VERIFICATION_URL": f"{upstream_url}/api/keys/verify",
+            "SERVICE_API_SECRET": "bench-secret",
+            "PINECONE_CONTROLLER_HOST": upstream_url,
+            "LLM_MAX_TOKENS": env.get("LLM_MAX_TOKENS", "512"),
+            "UPLOADS_DIRECTORY": str(workspace / "uploads"),
+            "CHROMA_DIRECTORY": str(workspace / "chroma"),
+            "LOCAL_VECTOR_DIRECTORY": str(workspace / "local"),
+            "CHUNK_STAGING_DIRECTORY": str(workspace / "staging"),
+            "DATASET_REGISTRY_PATH": str(workspace / "datasets.sqlite3"),
+            "SHARED_CACHE_PATH": str(workspace / "shared_cache.sqlite3"),
+        }
+    )
+    return env
+
+
+def _peak_rss_mb(pid: int) -> Optional[float]:
+    """Return the high-water resident set size of ``pid`` (Linux only)."""
+
+    try:
+        status = Path(f"/proc/{pid}/status").read_text()
+    except OSError:
+        return None
+    for line in status.splitlines():
+        if line.startswith("VmHWM:"):
+            return round(int(line.split()[1]) / 1024, 1)
+    return None
+
+
+class BackendProcess:
+    """Run the FastAPI app under uvicorn for the lifetime of a ``with`` block."""
+
+    def __init__(self, env: Dict[str, str], port: Optional[int] = None) -> None:
+        self.port = port or free_port()
+        self._env = env
+        self._process: Optional[subprocess.Popen[bytes]] = None
+        self.startup_seconds: Optional[float] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    @property
+    def pid(self) -> int:
+        assert self._process is not None
+        return self._process.pid
+
+    def __enter__(self) -> "BackendProcess":
+        command = [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "src.main:app",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(self.port),
+            "--log-level",
+            "warning",
+            "--no-access-log",
+        ]
+        started = time.perf_counter()
+        self._process = subprocess.Popen(command, cwd=BACKEND_ROOT, env=self._env)
+        deadline = time.monotonic() + 120
+        while time.monotonic() < deadline:
+            if self._process.poll() is not None:
+                raise RuntimeError(f"Backend exited during startup with code {self._process.returncode}")
+            try:
+                if httpx.get(f"{self.url}/health", timeout=1.0).status_code == 200:
+                    self.startup_seconds = time.perf_counter() - started
+                    return self
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.02)
+        self.__exit__()
+        raise RuntimeError("Backend did not become healthy within 120s")
+
+    def __exit__(self, *exc_info: Any) -> None:
+        if self._process is None or self._process.poll() is not None:
+            return
+        self._process.terminate()
+        try:
+            self._process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+
+
+# ----------------------------------------------------------------------
+# Measurement
+# ----------------------------------------------------------------------
+
+
+async def _measure(
+    name: str,
+    call: Callable[[int], Awaitable[httpx.Response]],
+    *,
+    requests: int,
+    concurrency: int,
+    backend_pid: int,
+) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def one(index: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await call(index)
+            except httpx.HTTPError as exc:
+                errors[type(exc).__name__] = errors.get(type(exc).__name__, 0) + 1
+                return
+            if response.status_code >= 400:
+                errors[str(response.status_code)] = errors.get(str(response.status_code), 0) + 1
+                return
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(requests)))
+    wall = time.perf_counter() - started
+
+    millis = np.asarray(latencies) * 1000 if latencies else np.zeros(1)
+    return {
+        "scenario": name,
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": sum(errors.values()),
+        "throughput_rps": round(len(latencies) / wall, 2) if wall else 0.0,
+        "p50_ms": round(float(np.percentile(millis, 50)), 1),
+        "p95_ms": round(float(np.percentile(millis, 95)), 1),
+        "p99_ms": round(float(np.percentile(millis, 99)), 1),
+        "peak_rss_mb": _peak_rss_mb(backend_pid),
+        "error_detail": errors,
+    }
+
+
+def _encode(payload: bytes) -> str:
+    return base64.b64encode(payload).decode("ascii")
+
+
+async def _run_scenarios(args: argparse.Namespace, backend: BackendProcess, upstream: FakeUpstreamConfig) -> List[Dict[str, Any]]:
+    report: List[Dict[str, Any]] = []
+    limits = httpx.Limits(max_connections=max(args.concurrency, 4) * 2)
+    async with httpx.AsyncClient(base_url=backend.url, timeout=300.0, limits=limits) as client:
+        chunks: List[Dict[str, Any]] = []
+        for name, dataset_type, payload in dataset_fixtures(args.csv_rows, args.pdf_pages):
+            body = {
+                "dataset_type": dataset_type,
+                "chunk_size": args.chunk_size,
+                "chunk_overlap": args.chunk_overlap,
+                "file_content": _encode(payload),
+            }
+
+            async def upload(_: int, body: Dict[str, Any] = body) -> httpx.Response:
+                return await client.post("/uploaddataset", json=body)
+
+            report.append(
+                await _measure(
+                    f"upload:{name}",
+                    upload,
+                    requests=args.upload_iterations,
+                    concurrency=1,
+                    backend_pid=backend.pid,
+                )
+            )
+            if name == "large_csv":
+                response = await client.post("/uploaddataset", json=body)
+                response.raise_for_status()
+                chunks = response.json()["chunks"][: args.embed_chunks]
+
+        if not chunks:
+            raise RuntimeError("The large CSV fixture produced no chunks to embed")
+
+        dataset_id = "bench-dataset"
+        pinecone = {"api_key": "bench", "index_name": upstream.index_name} if args.vector_store == "pinecone" else None
+        embed_body: Dict[str, Any] = {
+            "embedding_model": BENCH_EMBEDDING_MODEL,
+            "vector_store": args.vector_store,
+            "datasets": [
+                {
+                    "id": dataset_id,
+                    "label": "Benchmark corpus",
+                    "dataset_type": "csv",
+                    "chunk_size": args.chunk_size,
+                    "chunk_overlap": args.chunk_overlap,
+                    "chunks": chunks,
+                }
+            ],
+            "pinecone": pinecone,
+            # Every iteration measures a full embedding run, not the unchanged-dataset shortcut.
+            "reembed": True,
+        }
+
+        async def embed(_: int) -> httpx.Response:
+            return await client.post("/embed", json=embed_body)
+
+        report.append(
+            await _measure(
+                f"embed:{args.vector_store}",
+                embed,
+                requests=args.embed_iterations,
+                concurrency=1,
+                backend_pid=backend.pid,
+            )
+        )
+
+        upstream.pipeline.update(
+            {
+                "llm": {
+                    "provider": "openai",
+                    "model": BENCH_MODEL,
+                    "systemPrompt": "You are a helpful support assistant.",
+                    "topK": args.top_k,
+                    "semanticCache": args.semantic_cache,
+                },
+                "embedding": {
+                    "model": BENCH_EMBEDDING_MODEL,
+                    "vectorStore": args.vector_store,
+                    "datasetIds": [dataset_id],
+                    "pineconeConfig": {"apiKey": "bench", "indexName": upstream.index_name} if pinecone else None,
+                },
+            }
+        )
+        questions = chat_questions(args.chat_requests)
+        headers = {"Authorization": f"Bearer {BENCH_API_KEY}"}
+
+        async def chat(index: int) -> httpx.Response:
+            return await client.post(
+                "/v1/chat",
+                json={"pipeline_name": BENCH_PIPELINE, "query": questions[index]},
+                headers=headers,
+            )
+
+        report.append(
+            await _measure(
+                "chat",
+                chat,
+                requests=args.chat_requests,
+                concurrency=args.concurrency,
+                backend_pid=backend.pid,
+            )
+        )
+
+        batches = [questions[start:start + args.batch_size] for start in range(0, len(questions), args.batch_size)]
+
+        async def chat_batch(index: int) -> httpx.Response:
+            return await client.post(
+                "/v1/chat/batch",
+                json={"pipeline_name": BENCH_PIPELINE, "queries": [{"query": query} for query in batches[index]]},
+                headers=headers,
+            )
+
+        report.append(
+            await _measure(
+                "chat:batch",
+                chat_batch,
+                requests=len(batches),
+                concurrency=max(1, args.concurrency // args.batch_size),
+                backend_pid=backend.pid,
+            )
+        )
+
+        evaluate_body = {
+            "provider": "openai",
+            "modelId": BENCH_MODEL,
+            "systemPrompt": "You are a helpful support assistant.",
+            "embeddingModel": BENCH_EMBEDDING_MODEL,
+            "vectorStore": args.vector_store,
+            "datasetIds": [dataset_id],
+            "topK": args.top_k,
+            "csvContent": _encode(sample_test_csv()),
+            "originalFilename": "sample_test.csv",
+            "pinecone": pinecone,
+        }
+
+        async def evaluate(_: int) -> httpx.Response:
+            return await client.post("/api/llm/evaluate", json=evaluate_body)
+
+        report.append(
+            await _measure(
+                "evaluate",
+                evaluate,
+                requests=args.evaluate_iterations,
+                concurrency=1,
+                backend_pid=backend.pid,
+            )
+        )
+    return report
+
+
+# ----------------------------------------------------------------------
+# Baseline comparison
+# ----------------------------------------------------------------------
+
+
+def compare_to_baseline(report: List[Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], tolerance: float) -> List[str]:
+    """Annotate ``report`` rows with deltas and return the regressions found."""
+
+    regressions: List[str] = []
+    for row in report:
+        previous = baseline.get(row["scenario"])
+        if not previous:
+            continue
+        for metric, larger_is_worse in COMPARED_METRICS.items():
+            before, after = previous.get(metric), row.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            row[f"{metric}_delta"] = f"{change:+.0%}"
+            if (change > tolerance) if larger_is_worse else (change < -tolerance):
+                regressions.append(f"{row['scenario']} {metric}: {before} -> {after} ({change:+.0%})")
+    return regressions
+
+
+def _baseline_from(report: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    return {row["scenario"]: {metric: row[metric] for metric in COMPARED_METRICS} for row in report}
+
+
+def run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    upstream = FakeUpstreamConfig(
+        latency_ms=args.latency_ms,
+        tokens_per_second=args.tokens_per_second,
+        answer_tokens=args.answer_tokens,
+        embedding_latency_ms=args.embedding_latency_ms,
+    )
+    with tempfile.TemporaryDirectory(prefix="krira-bench-") as workspace, FakeUpstreamServer(upstream) as fakes:
+        root = Path(workspace)
+        (root / "uploads").mkdir()
+        with BackendProcess(_backend_env(fakes.url, root)) as backend:
+            return asyncio.run(_run_scenarios(args, backend, upstream))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vector-store", choices=("local", "chroma", "pinecone"), default="local")
+    parser.add_argument("--latency-ms", type=float, default=150.0, help="Fake LLM time to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=80.0, help="Fake LLM generation rate")
+    parser.add_argument("--answer-tokens", type=int, default=60)
+    parser.add_argument("--embedding-latency-ms", type=float, default=25.0)
+    parser.add_argument("--csv-rows", type=int, default=20_000)
+    parser.add_argument("--pdf-pages", type=int, default=40)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=200)
+    parser.add_argument("--upload-iterations", type=int, default=5)
+    parser.add_argument("--embed-chunks", type=int, default=2000)
+    parser.add_argument("--embed-iterations", type=int, default=3)
+    parser.add_argument("--chat-requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--batch-size", type=int, default=20, help="Questions per /v1/chat/batch request")
+    parser.add_argument("--evaluate-iterations", type=int, default=3)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--semantic-cache", action="store_true", help="Leave the semantic answer cache enabled")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Overwrite the baseline with this run")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--json", action="store_true", help="Emit the report as JSON")
+    args = parser.parse_args()
+
+    report = run(args)
+
+    regressions: List[str] = []
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(_baseline_from(report), indent=2) + "\n")
+    elif args.baseline.exists():
+        regressions = compare_to_baseline(report, json.loads(args.baseline.read_text()), args.tolerance)
+
+    if args.json:
+        print(json.dumps({"report": report, "regressions": regressions}, indent=2))
+    else:
+        columns = [column for column in report[0] if column != "error_detail"]
+        columns += sorted({column for row in report for column in row if column.endswith("_delta")} - set(columns))
+        print(" | ".join(columns))
+        for row in report:
+            print(" | ".join(str(row.get(column, "-")) for column in columns))
+        for line in regressions:
+            print(f"REGRESSION {line}")
+
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
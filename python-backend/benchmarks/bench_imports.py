@@ -0,0 +1,107 @@
+"""Track cold-start cost: module import time and time to the first health check.
+
+``python -X importtime`` is run on ``src.main`` to find the slowest imports,
+then the backend is started under uvicorn to time its first ``/health``
+response, optionally with ``WARMUP_IMPORTS`` set.
+
+Run from ``python-backend``::
+
+    python -m benchmarks.bench_imports --runs 5 --top 15
+    python -m benchmarks.bench_imports --warmup all
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from statistics import median
+from typing import Any, Dict, List
+
+from .bench_endpoints import BACKEND_ROOT, BackendProcess, _backend_env
+
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def import_profile(env: Dict[str, str], module: str = "src.main") -> Dict[str, Any]:
+    """Import ``module`` in a fresh interpreter with ``-X importtime`` and parse the report."""
+
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative: Dict[str, int] = {}
+    total_us = 0
+    for line in completed.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        inclusive, indent, name = int(match.group(2)), len(match.group(3)), match.group(4)
+        cumulative[name] = inclusive
+        if indent == 1:  # top-level import of the ``-c`` statement
+            total_us += inclusive
+    return {"total_ms": total_us / 1000, "cumulative_us": cumulative}
+
+
+def run(runs: int, top: int, warmup: str) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory(prefix="krira-imports-") as workspace:
+        root = Path(workspace)
+        (root / "uploads").mkdir()
+        env = _backend_env("http://127.0.0.1:9", root)
+        env["WARMUP_IMPORTS"] = warmup
+
+        profiles = [import_profile(env) for _ in range(runs)]
+        startups: List[float] = []
+        for _ in range(runs):
+            with BackendProcess(env) as backend:
+                startups.append(backend.startup_seconds or 0.0)
+
+    slowest = sorted(profiles[-1]["cumulative_us"].items(), key=lambda item: item[1], reverse=True)
+    heavy = {
+        name: round(profiles[-1]["cumulative_us"].get(name, 0) / 1000, 1)
+        for name in ("chromadb", "pinecone", "langchain_openai", "openai", "bs4", "pdfplumber", "onnxruntime")
+    }
+    return {
+        "runs": runs,
+        "warmup_imports": warmup or "-",
+        "import_ms_median": round(median(profile["total_ms"] for profile in profiles), 1),
+        "first_health_ms_median": round(median(startups) * 1000, 1),
+        "first_health_ms_max": round(max(startups) * 1000, 1),
+        "eager_heavy_imports_ms": {name: value for name, value in heavy.items() if value},
+        "slowest_imports_ms": [(name, round(value / 1000, 1)) for name, value in slowest[:top]],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest imports to list")
+    parser.add_argument("--warmup", default=os.environ.get("WARMUP_IMPORTS", ""), help="WARMUP_IMPORTS for the backend")
+    parser.add_argument("--json", action="store_true", help="Emit the report as JSON")
+    args = parser.parse_args()
+
+    report = run(args.runs, args.top, args.warmup)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    for key in ("runs", "warmup_imports", "import_ms_median", "first_health_ms_median", "first_health_ms_max"):
+        print(f"{key}: {report[key]}")
+    print(f"eager heavy imports (ms): {report['eager_heavy_imports_ms'] or 'none'}")
+    print("slowest imports (cumulative ms):")
+    for name, value in report["slowest_imports_ms"]:
+        print(f"  {value:>9} | {name}")
+
+
+if __name__ == "__main__":
+    main()
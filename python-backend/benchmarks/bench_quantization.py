@@ -0,0 +1,101 @@
+"""Measure memory, scan speed and recall@k of quantized local vector storage.
+
+Run from ``python-backend``::
+
+    python -m benchmarks.bench_quantization --rows 100000 --dimension 1536
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+from src.services.local_store import LocalRecord, LocalVectorCollection
+from src.services.quantization import recall_at_k
+
+
+def _synthetic_corpus(rows: int, dimension: int, clusters: int, seed: int) -> np.ndarray:
+    """Clustered unit vectors, closer to real embedding distributions than pure noise."""
+
+    rng = np.random.default_rng(seed)
+    centroids = rng.normal(size=(clusters, dimension)).astype(np.float32)
+    assignments = rng.integers(0, clusters, size=rows)
+    corpus = centroids[assignments] + 0.35 * rng.normal(size=(rows, dimension)).astype(np.float32)
+    return corpus / np.linalg.norm(corpus, axis=1, keepdims=True)
+
+
+def run(rows: int, dimension: int, queries: int, k: int, rescore_multiplier: int, seed: int) -> List[Dict[str, Any]]:
+    corpus = _synthetic_corpus(rows, dimension, clusters=max(8, rows // 500), seed=seed)
+    rng = np.random.default_rng(seed + 1)
+    probes = corpus[rng.integers(0, rows, size=queries)] + 0.1 * rng.normal(size=(queries, dimension)).astype(np.float32)
+    records = [LocalRecord(id=str(index), dataset_id=f"ds-{index % 4}", text="") for index in range(rows)]
+
+    report: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as workspace:
+        exact_ids: List[List[int]] = []
+        for mode in ("none", "int8", "binary"):
+            # Keep the IVF index out of the picture: this measures the flat scan of each representation.
+            collection = LocalVectorCollection(
+                Path(workspace) / mode, dimension, mode, ann_min_rows=rows + 1  # type: ignore[arg-type]
+            )
+            started = time.perf_counter()
+            collection.add(corpus, records)
+            build_seconds = time.perf_counter() - started
+
+            if mode == "none":
+                exact_ids = [collection.exact_search(probe, k) for probe in probes]
+
+            found: List[List[int]] = []
+            started = time.perf_counter()
+            for probe in probes:
+                matches = collection.search(probe, k, rescore_multiplier=rescore_multiplier)
+                found.append(collection.row_ids(matches))
+            elapsed = time.perf_counter() - started
+
+            stats = collection.stats()
+            report.append(
+                {
+                    "mode": mode,
+                    "rows": rows,
+                    "dimension": dimension,
+                    "scan_bytes": stats["coarse_bytes"],
+                    "compression": stats["compression"],
+                    "build_seconds": round(build_seconds, 3),
+                    "queries_per_second": round(queries / elapsed, 1) if elapsed else 0.0,
+                    "mean_latency_ms": round(elapsed / queries * 1000, 3),
+                    f"recall@{k}": round(recall_at_k(exact_ids, found, k), 4),
+                }
+            )
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--dimension", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--rescore-multiplier", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="Emit the report as JSON")
+    args = parser.parse_args()
+
+    report = run(args.rows, args.dimension, args.queries, args.k, args.rescore_multiplier, args.seed)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    columns = list(report[0].keys())
+    print(" | ".join(columns))
+    for row in report:
+        print(" | ".join(str(row[column]) for column in columns))
+
+
+if __name__ == "__main__":
+    main()
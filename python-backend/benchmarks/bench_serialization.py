@@ -0,0 +1,190 @@
+"""Measure how long large responses take to serialize, before and after ``FastJSONResponse``.
+
+Each payload is served by two throwaway FastAPI apps through the ASGI
+interface: one returns it the way the routes used to (a ``response_model``
+re-validated and rendered by the standard ``JSONResponse``, or a plain dict
+walked by ``jsonable_encoder``), the other the way they do now. Both bodies
+are checked to decode to the same document.
+
+Run from ``python-backend``::
+
+    python -m benchmarks.bench_serialization --chunks 50000 --evaluation-rows 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Any, Callable, Dict, List
+
+import httpx
+from fastapi import FastAPI
+
+from src.api.routes.public_api import BatchChatResponse, BatchChatResult
+from src.api.wire_format import JSON, FastJSONResponse, encode_document
+from src.schemas import DatasetChunksResponse
+
+_SENTENCE = "Retrieval augmented generation grounds answers in the chunks returned by the vector store. "
+
+
+def _text(index: int, length: int) -> str:
+    return f"[{index}] " + (_SENTENCE * (length // len(_SENTENCE) + 1))[:length]
+
+
+def _upload_document(chunks: int, chunk_length: int) -> Dict[str, Any]:
+    return {
+        "dataset_type": "csv",
+        "chunk_size": chunk_length,
+        "chunk_overlap": 50,
+        "total_chunks": chunks,
+        "chunks": [{"order": index, "text": _text(index, chunk_length)} for index in range(chunks)],
+        "content_hash": "0" * 64,
+        "duplicate_of": [],
+        "handle": None,
+    }
+
+
+def _evaluation_result(rows: int, snippets: int, snippet_length: int) -> Dict[str, Any]:
+    return {
+        "metrics": {"accuracy": 81.5, "evaluationScore": 77.0, "faithfulness": 90.2},
+        "rows": [
+            {
+                "questionNumber": index + 1,
+                "question": f"What does step {index} do?",
+                "expectedAnswer": _text(index, 200),
+                "modelAnswer": _text(index, 300),
+                "verdict": "correct" if index % 3 else "incorrect",
+                "llmScore": 82.5,
+                "semanticScore": 0.91,
+                "faithfulness": 88.0,
+                "answerRelevancy": 79.0,
+                "contentPrecision": None,
+                "contextRecall": 64.0,
+                "contextSnippets": [_text(position, snippet_length) for position in range(snippets)],
+                "notes": None,
+            }
+            for index in range(rows)
+        ],
+        "justifications": {"accuracy": "Average accuracy 81.5% across examples."},
+        "source": {"csv": "eval.csv", "filename": "eval.csv", "total": rows, "provider": "openai", "model": "m"},
+    }
+
+
+def _batch_response(results: int, snippets: int, snippet_length: int) -> BatchChatResponse:
+    return BatchChatResponse(
+        pipeline_name="pipeline-demo",
+        results=[
+            BatchChatResult(
+                index=index,
+                answer=_text(index, 400),
+                context_snippets=[_text(position, snippet_length) for position in range(snippets)],
+                latency_ms=120,
+            )
+            for index in range(results)
+        ],
+        succeeded=results,
+        failed=0,
+        latency_ms=900,
+        timings={"total_ms": 900.0},
+    )
+
+
+def _apps(upload: Dict[str, Any], evaluation: Dict[str, Any], batch: BatchChatResponse) -> Dict[str, FastAPI]:
+    before = FastAPI()
+
+    @before.get("/upload", response_model=DatasetChunksResponse)
+    async def upload_before() -> DatasetChunksResponse:
+        return DatasetChunksResponse(**upload)
+
+    @before.get("/evaluate")
+    async def evaluate_before() -> dict:
+        return evaluation
+
+    @before.get("/batch", response_model=BatchChatResponse)
+    async def batch_before() -> BatchChatResponse:
+        return batch
+
+    after = FastAPI(default_response_class=FastJSONResponse)
+
+    @after.get("/upload", response_model=DatasetChunksResponse)
+    async def upload_after() -> Any:
+        return encode_document(upload, JSON, list_field="chunks")
+
+    @after.get("/evaluate")
+    async def evaluate_after() -> Any:
+        return FastJSONResponse(evaluation)
+
+    @after.get("/batch", response_model=BatchChatResponse)
+    async def batch_after() -> Any:
+        return FastJSONResponse(batch)
+
+    return {"before": before, "after": after}
+
+
+async def _time(app: FastAPI, path: str, iterations: int) -> Dict[str, Any]:
+    timings: List[float] = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for _ in range(iterations):
+            started = time.perf_counter()
+            response = await client.get(path)
+            timings.append(time.perf_counter() - started)
+            response.raise_for_status()
+    return {"median_ms": statistics.median(timings) * 1000, "body": response.content}
+
+
+async def run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    payloads: Dict[str, Callable[[], Any]] = {
+        "upload": lambda: _upload_document(args.chunks, args.chunk_length),
+        "evaluate": lambda: _evaluation_result(args.evaluation_rows, args.snippets, args.snippet_length),
+        "batch": lambda: _batch_response(args.batch_results, args.snippets, args.snippet_length),
+    }
+    built = {name: build() for name, build in payloads.items()}
+    apps = _apps(built["upload"], built["evaluate"], built["batch"])
+
+    report: List[Dict[str, Any]] = []
+    for name in payloads:
+        before = await _time(apps["before"], f"/{name}", args.iterations)
+        after = await _time(apps["after"], f"/{name}", args.iterations)
+        if json.loads(before["body"]) != json.loads(after["body"]):
+            raise AssertionError(f"{name}: serialized documents differ")
+        report.append(
+            {
+                "payload": name,
+                "bytes_before": len(before["body"]),
+                "bytes_after": len(after["body"]),
+                "before_ms": round(before["median_ms"], 1),
+                "after_ms": round(after["median_ms"], 1),
+                "speedup": round(before["median_ms"] / after["median_ms"], 2) if after["median_ms"] else 0.0,
+            }
+        )
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=50_000)
+    parser.add_argument("--chunk-length", type=int, default=500)
+    parser.add_argument("--evaluation-rows", type=int, default=500)
+    parser.add_argument("--batch-results", type=int, default=100)
+    parser.add_argument("--snippets", type=int, default=20)
+    parser.add_argument("--snippet-length", type=int, default=400)
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="Emit the report as JSON")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    columns = list(report[0].keys())
+    print(" | ".join(columns))
+    for row in report:
+        print(" | ".join(str(row[column]) for column in columns))
+
+
+if __name__ == "__main__":
+    main()
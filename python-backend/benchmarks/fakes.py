@@ -0,0 +1,412 @@
+"""Local stand-ins for FastRouter, Pinecone and the Node.js key verifier.
+
+A single FastAPI app serves every upstream the backend talks to so endpoint
+benchmarks run offline with controllable latency:
+
+* ``/api/v1/chat/completions`` and ``/v1/embeddings`` mimic the
+  OpenAI-compatible FastRouter API.
+* ``/indexes`` plus the data-plane routes (``/vectors/upsert``, ``/query``,
+  ...) mimic a serverless Pinecone index kept in memory.
+* ``/api/keys/verify`` and ``/api/keys/track-usage`` mimic the Node.js backend.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import json
+import re
+import socket
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+OPENAI_DIMENSIONS = {"text-embedding-3-small": 1536, "text-embedding-3-large": 3072}
+_WORD = re.compile(r"[a-z0-9]+")
+_FILLER = (
+    "The context states that the plan includes the documented limits and the setting lives under the "
+    "workspace security tab where it can be regenerated after confirming the dialog"
+).split()
+
+
+@dataclass(slots=True)
+class FakeUpstreamConfig:
+    """Knobs shared by every fake upstream."""
+
+    latency_ms: float = 150.0
+    tokens_per_second: float = 80.0
+    answer_tokens: int = 60
+    embedding_latency_ms: float = 25.0
+    pinecone_latency_ms: float = 5.0
+    index_name: str = "bench-index"
+    index_dimension: int = 1536
+    pipeline: Dict[str, Any] = field(default_factory=dict)
+    # Requests the API key's owner may still make; ``None`` is unlimited.
+    request_capacity: Optional[int] = None
+
+
+def embed_text(text: str, dimension: int) -> np.ndarray:
+    """Return a deterministic unit vector built from hashed word features.
+
+    Texts sharing words land close together, so retrieval over the fake
+    embeddings behaves roughly like retrieval over real ones.
+    """
+
+    vector = np.zeros(dimension, dtype=np.float32)
+    for word in _WORD.findall(text.lower()):
+        digest = hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest()
+        slot = int.from_bytes(digest[:4], "little") % dimension
+        vector[slot] += 1.0 if digest[4] & 1 else -1.0
+    norm = float(np.linalg.norm(vector))
+    if norm == 0.0:
+        vector[0] = 1.0
+        return vector
+    return vector / norm
+
+
+# ----------------------------------------------------------------------
+# Pinecone
+# ----------------------------------------------------------------------
+
+
+class _FakeNamespace:
+    def __init__(self, dimension: int) -> None:
+        self.dimension = dimension
+        self.ids: List[str] = []
+        self.positions: Dict[str, int] = {}
+        self.metadata: List[Dict[str, Any]] = []
+        self.vectors = np.empty((0, dimension), dtype=np.float32)
+
+    def upsert(self, records: List[Dict[str, Any]]) -> None:
+        fresh: List[np.ndarray] = []
+        for record in records:
+            values = np.asarray(record["values"], dtype=np.float32)
+            position = self.positions.get(record["id"])
+            if position is not None:
+                self.vectors[position] = values
+                self.metadata[position] = record.get("metadata") or {}
+                continue
+            self.positions[record["id"]] = len(self.ids) + len(fresh)
+            self.ids.append(record["id"])
+            self.metadata.append(record.get("metadata") or {})
+            fresh.append(values)
+        if fresh:
+            self.vectors = np.vstack([self.vectors, np.stack(fresh)])
+
+    def delete(self, keep: np.ndarray) -> None:
+        self.ids = [identifier for identifier, kept in zip(self.ids, keep) if kept]
+        self.metadata = [entry for entry, kept in zip(self.metadata, keep) if kept]
+        self.vectors = self.vectors[keep]
+        self.positions = {identifier: position for position, identifier in enumerate(self.ids)}
+
+
+def _matches_filter(metadata: Dict[str, Any], filters: Optional[Dict[str, Any]]) -> bool:
+    for key, condition in (filters or {}).items():
+        value = metadata.get(key)
+        if isinstance(condition, dict):
+            if "$eq" in condition and value != condition["$eq"]:
+                return False
+            if "$in" in condition and value not in condition["$in"]:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+class FakePinecone:
+    """In-memory serverless index speaking enough of the Pinecone REST API."""
+
+    def __init__(self, config: FakeUpstreamConfig) -> None:
+        self._config = config
+        self._namespaces: Dict[str, _FakeNamespace] = {}
+        self._lock = threading.Lock()
+        self.host = ""
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "name": self._config.index_name,
+            "dimension": self._config.index_dimension,
+            "metric": "cosine",
+            "host": self.host,
+            "spec": {"serverless": {"cloud": "aws", "region": "us-east-1"}},
+            "status": {"ready": True, "state": "Ready"},
+            "deletion_protection": "disabled",
+            "vector_type": "dense",
+        }
+
+    def _namespace(self, name: Optional[str]) -> _FakeNamespace:
+        key = name or ""
+        namespace = self._namespaces.get(key)
+        if namespace is None:
+            namespace = self._namespaces[key] = _FakeNamespace(self._config.index_dimension)
+        return namespace
+
+    def upsert(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        records = body.get("vectors") or []
+        with self._lock:
+            self._namespace(body.get("namespace")).upsert(records)
+        return {"upsertedCount": len(records)}
+
+    def query(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        query = np.asarray(body.get("vector") or [], dtype=np.float32)
+        top_k = int(body.get("topK") or 10)
+        with self._lock:
+            namespace = self._namespace(body.get("namespace"))
+            candidates = [
+                position
+                for position, metadata in enumerate(namespace.metadata)
+                if _matches_filter(metadata, body.get("filter"))
+            ]
+            if not candidates or not len(query):
+                return {"matches": [], "namespace": body.get("namespace") or ""}
+            rows = np.asarray(candidates)
+            scores = namespace.vectors[rows] @ query
+            order = np.argsort(-scores)[:top_k]
+            matches = []
+            for position in order:
+                row = int(rows[position])
+                match: Dict[str, Any] = {"id": namespace.ids[row], "score": float(scores[position])}
+                if body.get("includeMetadata"):
+                    match["metadata"] = namespace.metadata[row]
+                if body.get("includeValues"):
+                    match["values"] = namespace.vectors[row].tolist()
+                matches.append(match)
+        return {"matches": matches, "namespace": body.get("namespace") or "", "usage": {"readUnits": 1}}
+
+    def delete(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            namespace = self._namespace(body.get("namespace"))
+            if body.get("deleteAll"):
+                self._namespaces.pop(body.get("namespace") or "", None)
+                return {}
+            doomed = set(body.get("ids") or [])
+            keep = np.asarray(
+                [
+                    identifier not in doomed and not (body.get("filter") and _matches_filter(metadata, body["filter"]))
+                    for identifier, metadata in zip(namespace.ids, namespace.metadata)
+                ],
+                dtype=bool,
+            )
+            namespace.delete(keep)
+        return {}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = {name: {"vectorCount": len(namespace.ids)} for name, namespace in self._namespaces.items()}
+        return {
+            "namespaces": counts,
+            "dimension": self._config.index_dimension,
+            "indexFullness": 0.0,
+            "totalVectorCount": sum(entry["vectorCount"] for entry in counts.values()),
+        }
+
+
+# ----------------------------------------------------------------------
+# Application
+# ----------------------------------------------------------------------
+
+
+def _answer_text(messages: List[Dict[str, Any]], tokens: int) -> str:
+    system = str(messages[0].get("content", "")) if messages else ""
+    if system.startswith("You are an advanced evaluation system"):
+        return json.dumps(
+            {
+                "verdict": "correct",
+                "accuracy": 90,
+                "evaluation_score": 88,
+                "semantic_accuracy": 91,
+                "faithfulness": 95,
+                "answer_relevancy": 89,
+                "content_precision": 87,
+                "context_recall": 85,
+                "reasoning": "Benchmark stub verdict.",
+            }
+        )
+    return " ".join(_FILLER[index % len(_FILLER)] for index in range(tokens))
+
+
+def create_fake_app(config: FakeUpstreamConfig) -> FastAPI:
+    """Build the FastAPI app that serves every fake upstream."""
+
+    app = FastAPI(title="Krira benchmark upstreams")
+    pinecone = FakePinecone(config)
+    app.state.pinecone = pinecone
+    app.state.calls = {"chat": 0, "embeddings": 0, "verify": 0}
+
+    @app.post("/api/v1/chat/completions")
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request) -> Any:
+        body = await request.json()
+        app.state.calls["chat"] += 1
+        messages = body.get("messages") or []
+        tokens = min(config.answer_tokens, int(body.get("max_tokens") or config.answer_tokens))
+        text = _answer_text(messages, tokens)
+        words = text.split(" ")
+        per_token = 1.0 / config.tokens_per_second if config.tokens_per_second > 0 else 0.0
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        prompt_tokens = sum(len(str(message.get("content", "")).split()) for message in messages)
+
+        await asyncio.sleep(config.latency_ms / 1000)
+        if body.get("stream"):
+
+            async def events() -> Any:
+                for index, word in enumerate(words):
+                    await asyncio.sleep(per_token)
+                    delta = {"content": word if index == 0 else f" {word}"}
+                    chunk = {
+                        "id": completion_id,
+                        "object": "chat.completion.chunk",
+                        "created": int(time.time()),
+                        "model": body.get("model"),
+                        "choices": [{"index": 0, "delta": delta, "finish_reason": None}],
+                    }
+                    yield f"data: {json.dumps(chunk)}\n\n"
+                final = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": body.get("model"),
+                    "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                }
+                yield f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n"
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        await asyncio.sleep(per_token * len(words))
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": len(words),
+                "total_tokens": prompt_tokens + len(words),
+            },
+        }
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request) -> Any:
+        body = await request.json()
+        app.state.calls["embeddings"] += 1
+        inputs = body.get("input") or []
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        dimension = int(body.get("dimensions") or OPENAI_DIMENSIONS.get(body.get("model"), 1536))
+        await asyncio.sleep(config.embedding_latency_ms / 1000)
+
+        data = []
+        for index, text in enumerate(inputs):
+            vector = embed_text(str(text), dimension)
+            if body.get("encoding_format") == "base64":
+                encoded: Any = base64.b64encode(vector.astype("<f4").tobytes()).decode("ascii")
+            else:
+                encoded = vector.tolist()
+            data.append({"object": "embedding", "index": index, "embedding": encoded})
+        tokens = sum(len(str(text).split()) for text in inputs)
+        return {
+            "object": "list",
+            "data": data,
+            "model": body.get("model"),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
+
+    @app.post("/api/keys/verify")
+    async def verify(request: Request) -> Any:
+        app.state.calls["verify"] += 1
+        await asyncio.sleep(0.005)
+        if not request.headers.get("x-service-key"):
+            return JSONResponse({"message": "Missing service key"}, status_code=401)
+        requests = int((await request.json()).get("requests") or 1)
+        if config.request_capacity is not None and requests > config.request_capacity:
+            return JSONResponse({"message": "Monthly request limit reached"}, status_code=402)
+        return {"valid": True, "pipeline": config.pipeline}
+
+    @app.post("/api/keys/track-usage")
+    async def track_usage(request: Request) -> Any:
+        requests = int((await request.json()).get("requests") or 1)
+        if config.request_capacity is not None:
+            if requests > config.request_capacity:
+                return JSONResponse({"message": "Monthly request limit reached"}, status_code=402)
+            config.request_capacity -= requests
+        return {"tracked": True}
+
+    @app.get("/indexes")
+    async def list_indexes() -> Any:
+        return {"indexes": [pinecone.describe()]}
+
+    @app.get("/indexes/{name}")
+    async def describe_index(name: str) -> Any:
+        if name != config.index_name:
+            return JSONResponse({"error": {"code": "NOT_FOUND", "message": name}, "status": 404}, status_code=404)
+        return pinecone.describe()
+
+    @app.post("/vectors/upsert")
+    async def upsert(request: Request) -> Any:
+        await asyncio.sleep(config.pinecone_latency_ms / 1000)
+        return pinecone.upsert(await request.json())
+
+    @app.post("/query")
+    async def query(request: Request) -> Any:
+        await asyncio.sleep(config.pinecone_latency_ms / 1000)
+        return pinecone.query(await request.json())
+
+    @app.post("/vectors/delete")
+    async def delete(request: Request) -> Any:
+        return pinecone.delete(await request.json())
+
+    @app.post("/describe_index_stats")
+    async def describe_index_stats() -> Any:
+        return pinecone.stats()
+
+    return app
+
+
+def free_port(host: str = "127.0.0.1") -> int:
+    """Return a TCP port that is free at the time of the call."""
+
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as probe:
+        probe.bind((host, 0))
+        return int(probe.getsockname()[1])
+
+
+class FakeUpstreamServer:
+    """Run :func:`create_fake_app` on a background thread for the lifetime of a ``with`` block."""
+
+    def __init__(self, config: FakeUpstreamConfig, host: str = "127.0.0.1", port: Optional[int] = None) -> None:
+        self.config = config
+        self.host = host
+        self.port = port or free_port(host)
+        self.app = create_fake_app(config)
+        self.app.state.pinecone.host = self.url
+        self._server = uvicorn.Server(
+            uvicorn.Config(self.app, host=host, port=self.port, log_level="warning", access_log=False)
+        )
+        self._thread = threading.Thread(target=self._server.run, name="fake-upstreams", daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def __enter__(self) -> "FakeUpstreamServer":
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self._server.started:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise RuntimeError("Fake upstream server failed to start")
+            time.sleep(0.02)
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
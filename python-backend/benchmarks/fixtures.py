@@ -0,0 +1,139 @@
+"""Dataset fixtures for the endpoint benchmarks."""
+
+from __future__ import annotations
+
+import csv
+import io
+import random
+from pathlib import Path
+from typing import List, Tuple
+
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+SAMPLE_TEST_CSV = REPO_ROOT / "backend" / "assets" / "sample_test.csv"
+
+_TOPICS = (
+    "billing",
+    "workspace",
+    "api keys",
+    "pipelines",
+    "evaluation",
+    "datasets",
+    "embeddings",
+    "vector stores",
+    "usage limits",
+    "security",
+)
+_VERBS = ("configure", "reset", "export", "upgrade", "connect", "rotate", "review", "delete")
+_OBJECTS = ("plan", "chatbot", "data source", "index", "namespace", "report", "webhook", "model")
+
+
+def _sentence(rng: random.Random) -> str:
+    return (
+        f"To {rng.choice(_VERBS)} the {rng.choice(_OBJECTS)} for {rng.choice(_TOPICS)}, open the "
+        f"{rng.choice(_TOPICS)} settings and follow step {rng.randint(1, 9)} of the guide."
+    )
+
+
+def sample_test_csv() -> bytes:
+    """Return the labeled evaluation CSV shipped with the Node.js backend."""
+
+    return SAMPLE_TEST_CSV.read_bytes()
+
+
+def synthetic_csv(rows: int, *, seed: int = 7) -> bytes:
+    """Return a support-ticket style CSV with ``rows`` data rows."""
+
+    rng = random.Random(seed)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["id", "topic", "question", "answer"])
+    for index in range(rows):
+        topic = rng.choice(_TOPICS)
+        writer.writerow(
+            [
+                index,
+                topic,
+                f"How do I {rng.choice(_VERBS)} the {rng.choice(_OBJECTS)} for {topic}?",
+                " ".join(_sentence(rng) for _ in range(rng.randint(1, 3))),
+            ]
+        )
+    return buffer.getvalue().encode("utf-8")
+
+
+def _escape_pdf_text(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def synthetic_pdf(pages: int, *, lines_per_page: int = 45, seed: int = 7) -> bytes:
+    """Return a text-only PDF with ``pages`` pages of generated prose.
+
+    The file is written by hand (one Helvetica font, one content stream per
+    page) so the benchmarks need no PDF authoring dependency.
+    """
+
+    rng = random.Random(seed)
+    objects: List[bytes] = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    catalog_id = add(b"")  # filled in once the page tree exists
+    pages_id = add(b"")
+    font_id = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    page_ids: List[int] = []
+    for _ in range(pages):
+        lines = [_escape_pdf_text(_sentence(rng)) for _ in range(lines_per_page)]
+        text = "\n".join(f"({line}) '" for line in lines)
+        stream = f"BT /F1 9 Tf 11 TL 40 800 Td\n{text}\nET".encode("latin-1")
+        content_id = add(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        page_ids.append(
+            add(
+                b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 595 842] "
+                b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>" % (pages_id, font_id, content_id)
+            )
+        )
+
+    kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+    objects[pages_id - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+    objects[catalog_id - 1] = b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id
+
+    output = io.BytesIO()
+    output.write(b"%PDF-1.4\n")
+    offsets: List[int] = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(output.tell())
+        output.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+    xref_offset = output.tell()
+    output.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        output.write(b"%010d 00000 n \n" % offset)
+    output.write(b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog_id, xref_offset))
+    return output.getvalue()
+
+
+def chat_questions(count: int, *, seed: int = 11) -> List[str]:
+    """Return ``count`` distinct questions phrased like the synthetic corpus."""
+
+    rng = random.Random(seed)
+    questions: List[str] = []
+    seen = set()
+    while len(questions) < count:
+        question = f"How do I {rng.choice(_VERBS)} the {rng.choice(_OBJECTS)} for {rng.choice(_TOPICS)}?"
+        if question in seen and len(seen) < len(_VERBS) * len(_OBJECTS) * len(_TOPICS):
+            continue
+        seen.add(question)
+        questions.append(question)
+    return questions
+
+
+def dataset_fixtures(csv_rows: int, pdf_pages: int) -> List[Tuple[str, str, bytes]]:
+    """Return ``(name, dataset_type, payload)`` for every upload fixture."""
+
+    return [
+        ("sample_csv", "csv", sample_test_csv()),
+        ("large_csv", "csv", synthetic_csv(csv_rows)),
+        ("pdf", "pdf", synthetic_pdf(pdf_pages)),
+    ]
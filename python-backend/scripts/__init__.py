@@ -0,0 +1 @@
+"""Operational commands for the Krira AI Python backend."""
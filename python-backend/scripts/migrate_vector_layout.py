@@ -0,0 +1,51 @@
+"""Copy vectors from the shared layout into one partition per dataset.
+
+Run from ``python-backend`` before switching to ``VECTOR_LAYOUT=partitioned``::
+
+    python -m scripts.migrate_vector_layout chroma
+    python -m scripts.migrate_vector_layout local --delete-source
+    python -m scripts.migrate_vector_layout pinecone --api-key KEY --index-name INDEX [--namespace NS]
+
+Re-running is safe: partitions are upserted, never appended twice.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+
+from src.schemas.embedding import PineconeConfig
+from src.services.vectorstores import VectorStoreService
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("vector_store", choices=("chroma", "pinecone", "local"))
+    parser.add_argument("--api-key", help="Pinecone API key")
+    parser.add_argument("--index-name", help="Pinecone index to migrate")
+    parser.add_argument("--namespace", default=None, help="Shared Pinecone namespace to read from")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument(
+        "--delete-source",
+        action="store_true",
+        help="Remove migrated vectors from the shared collection or namespace",
+    )
+    args = parser.parse_args()
+
+    pinecone = None
+    if args.vector_store == "pinecone":
+        if not args.api_key or not args.index_name:
+            parser.error("--api-key and --index-name are required for Pinecone")
+        pinecone = PineconeConfig(api_key=args.api_key, index_name=args.index_name, namespace=args.namespace)
+
+    copied = VectorStoreService().migrate_to_partitions(
+        args.vector_store,
+        pinecone=pinecone,
+        delete_source=args.delete_source,
+        batch_size=args.batch_size,
+    )
+    print(json.dumps({"datasets": len(copied), "vectors": sum(copied.values()), "per_dataset": copied}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Start the API with one uvicorn worker per available core.
+
+Used by the ``Procfile``; run from ``python-backend``::
+
+    python -m scripts.serve
+    python -m scripts.serve --workers 4 --port 8000
+    python -m scripts.serve --dry-run
+
+The worker count comes from ``--workers``, else ``WEB_CONCURRENCY``, else the
+CPUs this process may run on, capped so that every worker gets
+``WORKER_MEMORY_MB`` (default 512) of the container's memory limit. With more
+than one worker, ``SHARED_CACHE_BACKEND`` defaults to ``sqlite`` so that
+embeddings, retrievals and conversations cached by one worker are reused by
+the others instead of being computed again in each of them.
+
+The ``local`` and ``chroma`` vector stores keep their state in process memory
+and write their files without cross-process locking, so while either is
+enabled by ``VECTOR_STORES`` (read through the app settings, so ``.env``
+counts; both are enabled by default) a single worker is started
+whatever the requested count. Set ``VECTOR_STORES=pinecone`` to scale out.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Optional
+
+import uvicorn
+
+from src.config import get_settings
+from src.services.vectorstores import enabled_vector_stores
+
+DEFAULT_PORT = 10000
+DEFAULT_WORKER_MEMORY_MB = 512
+# Stores whose state lives in one process; several workers would each serve a stale copy.
+PROCESS_LOCAL_VECTOR_STORES = ("chroma", "local")
+_CGROUP_MEMORY_LIMITS = (
+    Path("/sys/fs/cgroup/memory.max"),
+    Path("/sys/fs/cgroup/memory/memory.limit_in_bytes"),
+)
+
+
+def available_cpus() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # pragma: no cover - not available on macOS
+        return os.cpu_count() or 1
+
+
+def memory_limit_bytes() -> Optional[int]:
+    """Return the container memory limit, else the host's physical memory."""
+
+    for path in _CGROUP_MEMORY_LIMITS:
+        try:
+            raw = path.read_text().strip()
+        except OSError:
+            continue
+        # cgroup v1 reports "no limit" as a huge sentinel value.
+        if raw.isdigit() and int(raw) < 1 << 60:
+            return int(raw)
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):  # pragma: no cover - non-POSIX
+        return None
+
+
+def process_local_stores() -> list[str]:
+    enabled = enabled_vector_stores(get_settings().vector_stores)
+    return [store for store in PROCESS_LOCAL_VECTOR_STORES if store in enabled]
+
+
+def default_workers() -> int:
+    if os.getenv("WEB_CONCURRENCY"):
+        return max(1, int(os.environ["WEB_CONCURRENCY"]))
+    workers = available_cpus()
+    memory = memory_limit_bytes()
+    if memory:
+        worker_memory = int(os.getenv("WORKER_MEMORY_MB") or DEFAULT_WORKER_MEMORY_MB) * 1024 * 1024
+        workers = min(workers, memory // worker_memory)
+    return max(1, workers)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT") or DEFAULT_PORT))
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: sized to the machine)")
+    parser.add_argument("--timeout-keep-alive", type=int, default=120)
+    parser.add_argument("--dry-run", action="store_true", help="Print the resolved settings and exit")
+    args = parser.parse_args()
+
+    workers = max(1, args.workers or default_workers())
+    single_worker_stores = process_local_stores()
+    if workers > 1 and single_worker_stores:
+        print(
+            f"Starting 1 worker instead of {workers}: VECTOR_STORES enables {', '.join(single_worker_stores)}, "
+            "which cannot be shared between processes",
+            file=sys.stderr,
+        )
+        workers = 1
+    settings = get_settings()
+    shared_cache_backend = settings.shared_cache_backend
+    if workers > 1 and "shared_cache_backend" not in settings.model_fields_set:
+        # Per-process caches would be duplicated (and disagree) across workers.
+        shared_cache_backend = "sqlite"
+        os.environ["SHARED_CACHE_BACKEND"] = shared_cache_backend
+
+    if args.dry_run:
+        print(
+            json.dumps(
+                {
+                    "host": args.host,
+                    "port": args.port,
+                    "workers": workers,
+                    "process_local_vector_stores": single_worker_stores,
+                    "shared_cache_backend": shared_cache_backend,
+                },
+                indent=2,
+            )
+        )
+        return
+
+    uvicorn.run(
+        "src.main:app",
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        timeout_keep_alive=args.timeout_keep_alive,
+    )
+
+
+if __name__ == "__main__":
+    main()
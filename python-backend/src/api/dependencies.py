@@ -5,7 +5,18 @@ from __future__ import annotations
 from functools import lru_cache
 
 from ..config import get_settings
-from ..services import DatasetLoader, EmbeddingModelService, LLMService, VectorStoreService
+from ..services import (
+    ChunkStaging,
+    ConversationStore,
+    DatasetLoader,
+    DatasetRegistry,
+    EmbeddingModelService,
+    LLMService,
+    SemanticAnswerCache,
+    SharedCache,
+    VectorStoreService,
+    create_shared_cache,
+)
 
 
 @lru_cache(maxsize=1)
@@ -16,6 +27,21 @@ def get_dataset_loader() -> DatasetLoader:
     return DatasetLoader(uploads_dir=settings.uploads_directory)
 
 
+@lru_cache(maxsize=1)
+def get_chunk_staging() -> ChunkStaging:
+    """Provide the on-disk chunk staging area."""
+
+    settings = get_settings()
+    return ChunkStaging(settings.chunk_staging_directory, ttl_seconds=settings.chunk_staging_ttl_seconds)
+
+
+@lru_cache(maxsize=1)
+def get_dataset_registry() -> DatasetRegistry:
+    """Provide the persistent dataset registry singleton."""
+
+    return DatasetRegistry(get_settings().dataset_registry_path)
+
+
 @lru_cache(maxsize=1)
 def get_embedding_service() -> EmbeddingModelService:
     """Provide an embedding model service singleton."""
@@ -30,8 +56,58 @@ def get_vector_store_service() -> VectorStoreService:
     return VectorStoreService()
 
 
+@lru_cache(maxsize=1)
+def get_answer_cache() -> SemanticAnswerCache:
+    """Provide the semantic answer cache singleton."""
+
+    settings = get_settings()
+    return SemanticAnswerCache(
+        threshold=settings.semantic_cache_threshold,
+        ttl_seconds=settings.semantic_cache_ttl_seconds,
+        max_entries_per_pipeline=settings.semantic_cache_max_entries,
+        max_pipelines=settings.semantic_cache_max_pipelines,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_shared_cache() -> SharedCache:
+    """Provide the cache shared by every worker process."""
+
+    settings = get_settings()
+    return create_shared_cache(
+        settings.shared_cache_backend,
+        path=settings.shared_cache_path,
+        redis_url=settings.redis_url,
+        max_entries=settings.shared_cache_max_entries,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_conversation_store() -> ConversationStore:
+    """Provide the conversation memory singleton."""
+
+    settings = get_settings()
+    # Per-process memory only works when every turn reaches the same worker.
+    shared_cache = get_shared_cache() if settings.shared_cache_backend != "memory" else None
+    return ConversationStore(
+        max_conversations=settings.conversation_max_active,
+        ttl_seconds=settings.conversation_ttl_seconds,
+        sqlite_path=settings.conversation_sqlite_path,
+        shared_cache=shared_cache,
+    )
+
+
 @lru_cache(maxsize=1)
 def get_llm_service() -> LLMService:
     """Provide an LLM service singleton."""
 
-    return LLMService(get_embedding_service(), get_vector_store_service())
+    settings = get_settings()
+    answer_cache = get_answer_cache() if settings.semantic_cache_enabled else None
+    conversation_store = get_conversation_store() if settings.conversation_memory_enabled else None
+    return LLMService(
+        get_embedding_service(),
+        get_vector_store_service(),
+        answer_cache=answer_cache,
+        conversation_store=conversation_store,
+        shared_cache=get_shared_cache(),
+    )
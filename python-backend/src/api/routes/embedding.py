@@ -2,12 +2,37 @@
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
+import asyncio
+from typing import Dict, List
 
+from fastapi import APIRouter, Depends, Request
+
+from ...config import get_settings
 from ...schemas import EmbeddingError, EmbeddingRequest, EmbeddingResponse, EmbeddedDatasetSummary
-from ...services import EmbeddingModelService, EmbeddingServiceError, VectorStoreService, VectorStoreServiceError
+from ...services import (
+    ChunkStaging,
+    ChunkStagingError,
+    DatasetRegistry,
+    EmbeddingModelService,
+    EmbeddingServiceError,
+    SemanticAnswerCache,
+    SharedCache,
+    VectorStoreService,
+    VectorStoreServiceError,
+    content_hash,
+)
+from ...services.chunk_dedup import DedupResult, deduplicate_chunks
+from ...services.shared_cache import bump_dataset_generations
 from ...utils import get_logger
-from ..dependencies import get_embedding_service, get_vector_store_service
+from ..dependencies import (
+    get_answer_cache,
+    get_chunk_staging,
+    get_dataset_registry,
+    get_embedding_service,
+    get_shared_cache,
+    get_vector_store_service,
+)
+from ..wire_format import body_openapi, parse_body
 
 
 logger = get_logger(__name__)
@@ -15,18 +40,47 @@ logger = get_logger(__name__)
 router = APIRouter(tags=["embedding"])
 
 
-@router.post("/embed", response_model=EmbeddingResponse)
+async def _embedding_request(request: Request) -> EmbeddingRequest:
+    # JSON, MessagePack, or NDJSON with one dataset per line after the request fields.
+    return await parse_body(request, EmbeddingRequest, list_field="datasets")
+
+
+@router.post(
+    "/embed",
+    response_model=EmbeddingResponse,
+    openapi_extra=body_openapi(EmbeddingRequest, list_field="datasets"),
+)
 async def embed_datasets(
-    payload: EmbeddingRequest,
+    payload: EmbeddingRequest = Depends(_embedding_request),
     embedding_service: EmbeddingModelService = Depends(get_embedding_service),
     vector_store_service: VectorStoreService = Depends(get_vector_store_service),
+    answer_cache: SemanticAnswerCache = Depends(get_answer_cache),
+    shared_cache: SharedCache = Depends(get_shared_cache),
+    registry: DatasetRegistry = Depends(get_dataset_registry),
+    staging: ChunkStaging = Depends(get_chunk_staging),
 ) -> EmbeddingResponse:
-    """Generate embeddings for the supplied datasets and persist them into the vector store."""
+    """Generate embeddings for the supplied datasets and persist them into the vector store.
 
+    A dataset may carry the ``handle`` of chunks staged by ``/uploaddataset``
+    instead of the chunks themselves; they are then read from local disk.
+    """
+
+    settings = get_settings()
     results: list[EmbeddedDatasetSummary] = []
     errors: list[EmbeddingError] = []
+    # Vectors computed earlier in this request by chunk text, so text shared by datasets is embedded once.
+    vectors_by_text: Dict[str, List[float]] = {}
+    vector_target = vector_store_service.target_of(payload.vector_store, pinecone=payload.pinecone, chroma=payload.chroma)
 
     for dataset in payload.datasets:
+        if dataset.handle and not dataset.chunks:
+            try:
+                staged_chunks = await asyncio.to_thread(staging.load, dataset.handle)
+            except ChunkStagingError as exc:
+                errors.append(EmbeddingError(dataset_id=dataset.id, label=dataset.label, message=str(exc)))
+                continue
+            dataset = dataset.model_copy(update={"chunks": staged_chunks})
+
         valid_chunks = [chunk for chunk in dataset.chunks if chunk.text and chunk.text.strip()]
         if not valid_chunks:
             errors.append(
@@ -38,25 +92,74 @@ async def embed_datasets(
             )
             continue
 
-        trimmed_dataset = dataset.model_copy(update={"chunks": valid_chunks})
-
         try:
-            texts = [chunk.text for chunk in valid_chunks]
-            embeddings = await embedding_service.generate(
-                payload.embedding_model,
-                texts,
-                dimensions=payload.dimension,
-            )
-
-            if len(embeddings) != len(valid_chunks):
-                raise EmbeddingServiceError("Embedding count does not match chunk count")
-
-            vectors_written = await vector_store_service.upsert(
-                payload.vector_store,
-                trimmed_dataset,
-                embeddings,
+            digest = content_hash(chunk.text for chunk in valid_chunks)
+            previous = None if payload.reembed else await asyncio.to_thread(registry.get, dataset.id)
+            if previous is not None and previous.same_embedding(
+                digest, payload.embedding_model, payload.dimension, payload.vector_store, vector_target
+            ):
+                # The store already holds these exact vectors; embedding again would only rewrite them.
+                results.append(
+                    EmbeddedDatasetSummary(
+                        dataset_id=dataset.id,
+                        label=dataset.label,
+                        vector_store=payload.vector_store,
+                        embedding_model=payload.embedding_model,
+                        chunks_processed=len(dataset.chunks),
+                        chunks_embedded=0,
+                        unchanged=True,
+                        embeddings_saved=len(valid_chunks),
+                    )
+                )
+                continue
+
+            dedup = DedupResult(chunks=valid_chunks)
+            if settings.chunk_dedup_enabled:
+                dedup = await asyncio.to_thread(
+                    deduplicate_chunks,
+                    valid_chunks,
+                    threshold=settings.chunk_near_duplicate_threshold,
+                )
+            trimmed_dataset = dataset.model_copy(update={"chunks": dedup.chunks})
+
+            texts = [chunk.text for chunk in dedup.chunks]
+            missing = [text for text in dict.fromkeys(texts) if text not in vectors_by_text]
+            if missing:
+                generated = await embedding_service.generate(
+                    payload.embedding_model,
+                    missing,
+                    dimensions=payload.dimension,
+                )
+                if len(generated) != len(missing):
+                    raise EmbeddingServiceError("Embedding count does not match chunk count")
+                vectors_by_text.update(zip(missing, generated))
+            embeddings = [vectors_by_text[text] for text in texts]
+
+            try:
+                vectors_written = await vector_store_service.upsert(
+                    payload.vector_store,
+                    trimmed_dataset,
+                    embeddings,
+                    embedding_model=payload.embedding_model,
+                    pinecone=payload.pinecone,
+                    chroma=payload.chroma,
+                )
+            except Exception:
+                # The old vectors may already be gone, so the next run must not be skipped.
+                await asyncio.to_thread(registry.forget, dataset.id)
+                raise
+
+            await asyncio.to_thread(
+                registry.record_embedding,
+                dataset_id=dataset.id,
+                dataset_type=dataset.dataset_type,
+                label=dataset.label,
+                chunk_count=len(valid_chunks),
+                digest=digest,
                 embedding_model=payload.embedding_model,
-                pinecone=payload.pinecone,
+                embedding_dimension=payload.dimension,
+                vector_store=payload.vector_store,
+                vector_target=vector_target,
             )
 
             results.append(
@@ -67,6 +170,9 @@ async def embed_datasets(
                     embedding_model=payload.embedding_model,
                     chunks_processed=len(dataset.chunks),
                     chunks_embedded=vectors_written,
+                    exact_duplicates=dedup.exact_duplicates,
+                    near_duplicates=dedup.near_duplicates,
+                    embeddings_saved=len(valid_chunks) - len(missing),
                 )
             )
         except (EmbeddingServiceError, VectorStoreServiceError) as exc:
@@ -95,4 +201,20 @@ async def embed_datasets(
                 )
             )
 
+    # A staged file is no longer needed once every dataset naming it is stored; keep it for retries otherwise.
+    handles = {dataset.id: dataset.handle for dataset in payload.datasets if dataset.handle}
+    failed = {handles[error.dataset_id] for error in errors if error.dataset_id in handles}
+    for handle in {handles[summary.dataset_id] for summary in results if summary.dataset_id in handles} - failed:
+        await asyncio.to_thread(staging.discard, handle)
+
+    saved = sum(summary.embeddings_saved for summary in results)
+    if saved:
+        logger.info("Skipped embedding duplicate chunks", extra={"embeddings_saved": saved, "datasets": len(results)})
+
+    # Answers cached against previous contents of these datasets are now stale.
+    changed = [summary.dataset_id for summary in results if not summary.unchanged]
+    answer_cache.invalidate_datasets(changed)
+    # ...in this worker and, through the shared generations, in every other one.
+    await bump_dataset_generations(shared_cache, changed)
+
     return EmbeddingResponse(results=results, errors=errors)
@@ -10,9 +10,10 @@ from ...schemas import (
     LLMModelsResponse,
 )
 from ...schemas.embedding import PineconeConfig
-from ...services import LLMService, LLMServiceError
+from ...services import LLMService, LLMServiceError, SemanticAnswerCache
 from ...utils import get_logger
-from ..dependencies import get_llm_service
+from ..dependencies import get_answer_cache, get_llm_service
+from ..wire_format import FastJSONResponse
 
 
 logger = get_logger(__name__)
@@ -31,6 +32,13 @@ async def list_llm_models(llm_service: LLMService = Depends(get_llm_service)) ->
         raise HTTPException(status_code=exc.status_code, detail=str(exc)) from exc
 
 
+@router.get("/llm/cache/stats")
+async def answer_cache_stats(answer_cache: SemanticAnswerCache = Depends(get_answer_cache)) -> dict:
+    """Return semantic answer cache hit metrics."""
+
+    return answer_cache.stats()
+
+
 @router.post("/llm/test")
 async def test_llm_configuration(
     request: dict,
@@ -133,6 +141,10 @@ async def playground_chat(
             top_k=request.get("top_k", 30),
             question=request.get("question", ""),
             pinecone=pinecone_config,
+            chroma=request.get("chroma"),
+            context_token_budget=request.get("context_token_budget"),
+            mmr=request.get("mmr", False),
+            mmr_lambda=request.get("mmr_lambda"),
         )
         return result
     except ValidationError as exc:
@@ -186,7 +198,8 @@ async def evaluate_llm_configuration(
             pinecone=pinecone_config,
             original_filename=request.get("originalFilename"),
         )
-        return result
+        # Every row carries its context snippets; render them without jsonable_encoder.
+        return FastJSONResponse(result)
     except ValidationError as exc:
         logger.error("Invalid Pinecone configuration: %s", exc)
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=exc.errors()) from exc
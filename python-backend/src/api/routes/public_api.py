@@ -2,20 +2,36 @@
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
 import time
-from typing import Any, Dict, Optional
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
 
 import httpx
-from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
 from ...config import Settings, get_settings
 from ...services import LLMService, LLMServiceError
-from ..dependencies import get_llm_service
+from ...services.shared_cache import SHARED_CACHE_REQUESTS, cache_key, dataset_generations
+from ...utils import get_logger, instrumented
+from ..dependencies import get_llm_service, get_shared_cache
+from ..wire_format import FastJSONResponse
 
 
+logger = get_logger(__name__)
 router = APIRouter(prefix="/v1", tags=["public"])
 
+# Last verified embedding settings per (API key, pipeline), used to start the
+# query embedding before verification returns.
+_PIPELINE_EMBEDDING_HINTS: "OrderedDict[str, Tuple[str, Optional[int]]]" = OrderedDict()
+_PIPELINE_HINT_LIMIT = 4096
+# Clients may keep answers but must revalidate them with If-None-Match.
+_ANSWER_CACHE_CONTROL = "private, no-cache"
+
 
 class ChatRequest(BaseModel):
     """Request model for chat API - accepts pipeline_name from new SDK."""
@@ -32,21 +48,78 @@ class ChatResponse(BaseModel):
     latency_ms: int
     conversation_id: Optional[str] = None
     context_snippets: Optional[list[str]] = None
+    prompt_tokens_saved: Optional[int] = None
+    cached: bool = False
+    skipped_generation: bool = False
+    rewritten_query: Optional[str] = None
+    timings: Optional[Dict[str, float]] = None
+
+
+class BatchChatQuery(BaseModel):
+    """One question within a batch chat request."""
+    query: str = Field(..., min_length=1)
+    conversation_id: Optional[str] = Field(default=None, max_length=64)
+    metadata: Optional[Dict[str, Any]] = None
+
+
+class BatchChatRequest(BaseModel):
+    """Request model for answering several questions against one pipeline."""
+    pipeline_name: str = Field(..., min_length=4, description="The name/ID of the RAG pipeline to use")
+    queries: List[BatchChatQuery] = Field(..., min_length=1)
+
+
+class BatchChatResult(BaseModel):
+    """Outcome of one batch query; ``error`` is set instead of ``answer`` on failure."""
+    index: int
+    answer: Optional[str] = None
+    conversation_id: Optional[str] = None
+    context_snippets: Optional[list[str]] = None
+    cached: bool = False
+    skipped_generation: bool = False
+    latency_ms: int = 0
+    error: Optional[str] = None
+    status_code: int = status.HTTP_200_OK
+
+
+class BatchChatResponse(BaseModel):
+    """Response model for the batch chat API, results ordered as the queries."""
+    pipeline_name: str
+    results: List[BatchChatResult]
+    succeeded: int
+    failed: int
+    latency_ms: int
+    timings: Optional[Dict[str, float]] = None
 
 
+@instrumented("api", "verify_api_key")
 async def _verify_api_key(
     *,
     api_key: str,
     pipeline_name: str,
     settings: Settings,
+    requests: int = 1,
 ) -> Dict[str, Any]:
-    """Verify API key with the Node.js backend."""
+    """Verify API key with the Node.js backend.
+
+    ``requests`` is how many questions the call will answer; the backend
+    charges all of them against the key's rate limit and refuses with 402
+    when the owner's plan cannot cover them, before anything is generated.
+    """
     if not settings.service_api_secret:
         raise HTTPException(status_code=500, detail="SERVICE_API_SECRET is not configured")
 
+    shared_key: Optional[str] = None
+    # Batches always reach the backend so their size is checked against the limits.
+    if settings.verify_cache_ttl_seconds and requests == 1:
+        shared_key = cache_key("verify", api_key, pipeline_name)
+        cached = await get_shared_cache().get_async(shared_key)
+        SHARED_CACHE_REQUESTS.inc(cache="verify", result="hit" if cached is not None else "miss")
+        if cached is not None:
+            return json.loads(cached)
+
     verify_url = settings.api_verification_url.rstrip("/")
     # Forward pipeline_name to Node.js backend
-    payload = {"apiKey": api_key, "pipelineName": pipeline_name}
+    payload = {"apiKey": api_key, "pipelineName": pipeline_name, "requests": requests}
 
     async with httpx.AsyncClient(timeout=10.0) as client:
         try:
@@ -59,6 +132,8 @@ async def _verify_api_key(
             raise HTTPException(status_code=502, detail="Unable to verify API key") from exc
 
     if response.status_code == status.HTTP_200_OK:
+        if shared_key is not None:
+            await get_shared_cache().set_async(shared_key, response.content, settings.verify_cache_ttl_seconds)
         return response.json()
 
     detail = response.json().get("message") if response.headers.get("content-type") == "application/json" else response.text
@@ -71,6 +146,7 @@ async def _track_usage(
     pipeline_name: str,
     settings: Settings,
     tokens: int = 0,
+    requests: int = 1,
 ) -> None:
     """Track usage for SDK API calls."""
     if not settings.service_api_secret:
@@ -80,7 +156,7 @@ async def _track_usage(
     base_url = settings.api_verification_url.rsplit("/", 1)[0]
     track_url = f"{base_url}/track-usage"
     
-    payload = {"apiKey": api_key, "pipelineName": pipeline_name, "tokens": tokens}
+    payload = {"apiKey": api_key, "pipelineName": pipeline_name, "tokens": tokens, "requests": requests}
 
     async with httpx.AsyncClient(timeout=10.0) as client:
         try:
@@ -98,6 +174,155 @@ async def _track_usage(
             pass
 
 
+def _hint_key(api_key: str, pipeline_name: str) -> str:
+    return hashlib.sha256(f"{api_key}\x1f{pipeline_name}".encode("utf-8")).hexdigest()
+
+
+def _conversation_key(api_key: str, pipeline_name: str, conversation_id: Optional[str]) -> Optional[str]:
+    """Scope a client-chosen conversation id to the API key and pipeline."""
+
+    if not conversation_id:
+        return None
+    return hashlib.sha256(f"{api_key}\x1f{pipeline_name}\x1f{conversation_id}".encode("utf-8")).hexdigest()
+
+
+def _remember_embedding_hint(key: str, embedding_config: Dict[str, Any]) -> None:
+    model = embedding_config.get("model")
+    if not model:
+        _PIPELINE_EMBEDDING_HINTS.pop(key, None)
+        return
+    _PIPELINE_EMBEDDING_HINTS[key] = (str(model), embedding_config.get("dimension"))
+    _PIPELINE_EMBEDDING_HINTS.move_to_end(key)
+    while len(_PIPELINE_EMBEDDING_HINTS) > _PIPELINE_HINT_LIMIT:
+        _PIPELINE_EMBEDDING_HINTS.popitem(last=False)
+
+
+async def _verify_pipeline(
+    *,
+    api_key: str,
+    pipeline_name: str,
+    settings: Settings,
+    requests: int = 1,
+) -> Dict[str, Any]:
+    """Verify the API key and refresh the pipeline's embedding hint.
+
+    A rejected key also loses its hint, so repeated calls with it stop
+    paying for speculative query embeddings.
+    """
+
+    key = _hint_key(api_key, pipeline_name)
+    try:
+        verification = await _verify_api_key(
+            api_key=api_key, pipeline_name=pipeline_name, settings=settings, requests=requests
+        )
+    except HTTPException:
+        _PIPELINE_EMBEDDING_HINTS.pop(key, None)
+        raise
+    pipeline_config = verification.get("pipeline") or verification.get("bot") or {}
+    _remember_embedding_hint(key, pipeline_config.get("embedding") or {})
+    return verification
+
+
+async def _timed(coroutine: Any, timings: Dict[str, float], key: str) -> Any:
+    started = time.perf_counter()
+    result = await coroutine
+    timings[key] = round((time.perf_counter() - started) * 1000, 2)
+    return result
+
+
+def _pipeline_configs(verification: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Return the ``(llm, embedding)`` sections of a verified pipeline."""
+
+    # Support both new 'pipeline' and legacy 'bot' response structures
+    pipeline_config = verification.get("pipeline") or verification.get("bot") or {}
+    llm_config = pipeline_config.get("llm") or {}
+    embedding_config = pipeline_config.get("embedding") or {}
+    if not llm_config:
+        raise HTTPException(status_code=400, detail="Pipeline is not configured with an LLM")
+    return llm_config, embedding_config
+
+
+def _pipeline_id(verification: Dict[str, Any], pipeline_name: str) -> str:
+    """Return the verified pipeline's id, which names it however the client referred to it."""
+
+    pipeline_config = verification.get("pipeline") or verification.get("bot") or {}
+    return str(pipeline_config.get("id") or pipeline_name)
+
+
+def _public_chat_options(
+    pipeline_id: str,
+    llm_config: Dict[str, Any],
+    embedding_config: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Map the verified pipeline configuration onto ``LLMService.public_chat`` arguments.
+
+    Answers are cached under ``pipeline_id``, not the name the client sent:
+    names are only unique per owner, and one pipeline answers to its name,
+    slug and id.
+    """
+
+    return {
+        "provider": llm_config.get("provider"),
+        "model_id": llm_config.get("model"),
+        "system_prompt": llm_config.get("systemPrompt"),
+        "vector_store": embedding_config.get("vectorStore"),
+        "embedding_model": embedding_config.get("model"),
+        "embedding_dimension": embedding_config.get("dimension"),
+        "dataset_ids": embedding_config.get("datasetIds") or [],
+        "top_k": llm_config.get("topK", 30),
+        "pinecone": embedding_config.get("pineconeConfig"),
+        "chroma": embedding_config.get("chromaConfig"),
+        "context_token_budget": llm_config.get("contextTokenBudget"),
+        "mmr": llm_config.get("mmr", False),
+        "mmr_lambda": llm_config.get("mmrLambda"),
+        "cache_namespace": pipeline_id if llm_config.get("semanticCache", True) else None,
+        "cache_threshold": llm_config.get("semanticCacheThreshold"),
+        "min_score": llm_config.get("minScore"),
+        "sources": embedding_config.get("sources"),
+    }
+
+
+async def _answer_etag(pipeline_config: Dict[str, Any], query: str) -> str:
+    """Return the validator for answers to ``query`` under this pipeline version.
+
+    It changes whenever the pipeline is edited (``updatedAt``), its LLM or
+    embedding settings differ, or one of its datasets is re-embedded, so a
+    client holding an answer with a matching ETag can keep using it without
+    the question being answered again.
+    """
+
+    embedding_config = pipeline_config.get("embedding") or {}
+    dataset_ids = [
+        str(dataset_id)
+        for source in [embedding_config, *(embedding_config.get("sources") or [])]
+        if isinstance(source, dict)
+        for dataset_id in source.get("datasetIds") or []
+    ]
+    generations = await dataset_generations(get_shared_cache(), list(dict.fromkeys(dataset_ids)))
+    version = json.dumps(
+        {
+            **{key: pipeline_config.get(key) for key in ("id", "updatedAt", "llm", "embedding")},
+            "generations": generations,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    normalized = " ".join(query.split()).casefold()
+    return '"%s"' % hashlib.sha256(f"{version}\x1f{normalized}".encode("utf-8")).hexdigest()[:32]
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    # "*" is ignored: it would answer 304 to a client that holds no answer for this query.
+    candidates = {value.strip().removeprefix("W/") for value in if_none_match.split(",")}
+    return etag in candidates
+
+
+def _ndjson(event: Dict[str, Any]) -> bytes:
+    return (json.dumps(event, default=str) + "\n").encode("utf-8")
+
+
 def _extract_bearer_token(authorization: str | None) -> str:
     if not authorization:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing Authorization header")
@@ -110,35 +335,70 @@ def _extract_bearer_token(authorization: str | None) -> str:
 @router.post("/chat", response_model=ChatResponse)
 async def chat_with_pipeline(
     payload: ChatRequest,
+    response: Response,
     authorization: str | None = Header(default=None),
+    if_none_match: str | None = Header(default=None),
     llm_service: LLMService = Depends(get_llm_service),
     settings: Settings = Depends(get_settings),
-) -> ChatResponse:
-    """Chat with a RAG pipeline using the Krira Augment SDK."""
+) -> Union[ChatResponse, Response]:
+    """Chat with a RAG pipeline using the Krira Augment SDK.
+
+    The query is embedded speculatively with the pipeline's last known
+    embedding settings while the API key is verified; the speculative work is
+    cancelled if verification fails and discarded if the settings changed.
+
+    Answers outside a conversation carry an ``ETag``. A request whose
+    ``If-None-Match`` still matches gets ``304 Not Modified`` right after
+    verification, without retrieval, generation or usage being charged.
+    """
+    request_started = time.perf_counter()
     api_key = _extract_bearer_token(authorization)
-    verification = await _verify_api_key(api_key=api_key, pipeline_name=payload.pipeline_name, settings=settings)
+    timings: Dict[str, float] = {}
 
-    # Support both new 'pipeline' and legacy 'bot' response structures
-    pipeline_config = verification.get("pipeline") or verification.get("bot") or {}
-    llm_config = pipeline_config.get("llm") or {}
-    embedding_config = pipeline_config.get("embedding") or {}
+    hint_key = _hint_key(api_key, payload.pipeline_name)
+    hint = _PIPELINE_EMBEDDING_HINTS.get(hint_key)
+    embed_task: Optional[asyncio.Task[List[float]]] = None
+    if hint is not None:
+        embed_task = asyncio.create_task(
+            _timed(llm_service.embed_query(hint[0], payload.query, dimension=hint[1]), timings, "embedding_ms")
+        )
+        # Speculative failures are ignored; retrieve them so asyncio does not warn.
+        embed_task.add_done_callback(lambda task: task.cancelled() or task.exception())
 
-    if not llm_config:
-        raise HTTPException(status_code=400, detail="Pipeline is not configured with an LLM")
+    query_vector: Optional[List[float]] = None
+    try:
+        verification = await _timed(
+            _verify_pipeline(api_key=api_key, pipeline_name=payload.pipeline_name, settings=settings),
+            timings,
+            "verify_ms",
+        )
+
+        pipeline_config = verification.get("pipeline") or verification.get("bot") or {}
+        llm_config, embedding_config = _pipeline_configs(verification)
+
+        etag = None if payload.conversation_id else await _answer_etag(pipeline_config, payload.query)
+        if etag and _etag_matches(if_none_match, etag):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": etag, "Cache-Control": _ANSWER_CACHE_CONTROL},
+            )
+
+        if embed_task is not None and hint == _PIPELINE_EMBEDDING_HINTS.get(hint_key):
+            try:
+                query_vector = await embed_task
+            except Exception:  # noqa: BLE001 - public_chat embeds again on its own
+                query_vector = None
+    finally:
+        if embed_task is not None and not embed_task.done():
+            embed_task.cancel()
 
     start = time.perf_counter()
     try:
         chat_result = await llm_service.public_chat(
-            provider=llm_config.get("provider"),
-            model_id=llm_config.get("model"),
-            system_prompt=llm_config.get("systemPrompt"),
-            vector_store=embedding_config.get("vectorStore"),
-            embedding_model=embedding_config.get("model"),
-            embedding_dimension=embedding_config.get("dimension"),
-            dataset_ids=embedding_config.get("datasetIds") or [],
-            top_k=llm_config.get("topK", 30),
+            **_public_chat_options(_pipeline_id(verification, payload.pipeline_name), llm_config, embedding_config),
             question=payload.query,
-            pinecone=embedding_config.get("pineconeConfig"),
+            query_vector=query_vector,
+            conversation_key=_conversation_key(api_key, payload.pipeline_name, payload.conversation_id),
         )
     except LLMServiceError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
@@ -152,11 +412,249 @@ async def chat_with_pipeline(
         settings=settings,
         tokens=0,  # TODO: Get actual token count from chat_result if available
     )
-    
+
+    if etag:
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = _ANSWER_CACHE_CONTROL
     return ChatResponse(
         pipeline_name=payload.pipeline_name,
         answer=chat_result["answer"],
         latency_ms=latency_ms,
         conversation_id=payload.conversation_id,
         context_snippets=chat_result.get("context_snippets"),
+        prompt_tokens_saved=chat_result.get("prompt_tokens_saved"),
+        cached=bool(chat_result.get("cached")),
+        skipped_generation=bool(chat_result.get("skipped_generation")),
+        rewritten_query=chat_result.get("rewritten_query"),
+        timings={
+            **timings,
+            **(chat_result.get("timings") or {}),
+            "total_ms": round((time.perf_counter() - request_started) * 1000, 2),
+        },
+    )
+
+
+@router.post("/chat/stream")
+async def chat_stream_with_pipeline(
+    payload: ChatRequest,
+    authorization: str | None = Header(default=None),
+    if_none_match: str | None = Header(default=None),
+    llm_service: LLMService = Depends(get_llm_service),
+    settings: Settings = Depends(get_settings),
+) -> Response:
+    """Stream an answer as newline-delimited JSON events.
+
+    ``{"type": "delta", "text": ...}`` lines arrive while the model generates,
+    followed by one ``{"type": "done", ...}`` line carrying the
+    :class:`ChatResponse` fields. Failures after the stream has started are
+    reported as ``{"type": "error", "message": ..., "status_code": ...}``.
+    ETag revalidation works as for ``/chat``.
+    """
+    request_started = time.perf_counter()
+    api_key = _extract_bearer_token(authorization)
+    timings: Dict[str, float] = {}
+    verification = await _timed(
+        _verify_pipeline(api_key=api_key, pipeline_name=payload.pipeline_name, settings=settings),
+        timings,
+        "verify_ms",
+    )
+    pipeline_config = verification.get("pipeline") or verification.get("bot") or {}
+    llm_config, embedding_config = _pipeline_configs(verification)
+
+    headers = {"Cache-Control": _ANSWER_CACHE_CONTROL}
+    etag = None if payload.conversation_id else await _answer_etag(pipeline_config, payload.query)
+    if etag:
+        headers["ETag"] = etag
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    async def events() -> AsyncIterator[bytes]:
+        tokens: "asyncio.Queue[Optional[str]]" = asyncio.Queue()
+
+        async def on_token(text: str) -> None:
+            await tokens.put(text)
+
+        start = time.perf_counter()
+        chat_task = asyncio.create_task(
+            llm_service.public_chat(
+                **_public_chat_options(_pipeline_id(verification, payload.pipeline_name), llm_config, embedding_config),
+                question=payload.query,
+                on_token=on_token,
+                conversation_key=_conversation_key(api_key, payload.pipeline_name, payload.conversation_id),
+            )
+        )
+        chat_task.add_done_callback(lambda _: tokens.put_nowait(None))
+        streamed = False
+        try:
+            while (text := await tokens.get()) is not None:
+                streamed = True
+                yield _ndjson({"type": "delta", "text": text})
+            chat_result = await chat_task
+        except LLMServiceError as exc:
+            yield _ndjson({"type": "error", "message": str(exc), "status_code": status.HTTP_400_BAD_REQUEST})
+            return
+        except Exception:  # noqa: BLE001 - the status line has already been sent
+            logger.exception("Streaming chat failed", extra={"pipeline": payload.pipeline_name})
+            yield _ndjson(
+                {
+                    "type": "error",
+                    "message": "Internal error while answering the query",
+                    "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                }
+            )
+            return
+        finally:
+            # Stop generating if the client went away mid-stream.
+            if not chat_task.done():
+                chat_task.cancel()
+
+        if not streamed:
+            # Cached and skipped answers are produced whole.
+            yield _ndjson({"type": "delta", "text": chat_result["answer"]})
+
+        try:
+            await _track_usage(api_key=api_key, pipeline_name=payload.pipeline_name, settings=settings, tokens=0)
+        except HTTPException as exc:
+            yield _ndjson({"type": "error", "message": str(exc.detail), "status_code": exc.status_code})
+            return
+
+        done = ChatResponse(
+            pipeline_name=payload.pipeline_name,
+            answer=chat_result["answer"],
+            latency_ms=int((time.perf_counter() - start) * 1000),
+            conversation_id=payload.conversation_id,
+            context_snippets=chat_result.get("context_snippets"),
+            prompt_tokens_saved=chat_result.get("prompt_tokens_saved"),
+            cached=bool(chat_result.get("cached")),
+            skipped_generation=bool(chat_result.get("skipped_generation")),
+            rewritten_query=chat_result.get("rewritten_query"),
+            timings={
+                **timings,
+                **(chat_result.get("timings") or {}),
+                "total_ms": round((time.perf_counter() - request_started) * 1000, 2),
+            },
+        )
+        yield _ndjson({"type": "done", **done.model_dump(mode="json")})
+
+    return StreamingResponse(events(), media_type="application/x-ndjson", headers=headers)
+
+
+@router.post("/chat/batch", response_model=BatchChatResponse)
+async def chat_batch_with_pipeline(
+    payload: BatchChatRequest,
+    authorization: str | None = Header(default=None),
+    llm_service: LLMService = Depends(get_llm_service),
+    settings: Settings = Depends(get_settings),
+) -> Response:
+    """Answer several questions against one pipeline in a single call.
+
+    The API key is verified once for every query, so the rate limit and the
+    plan's remaining requests cover the whole batch before anything is
+    generated. Every query is embedded in one upstream request, and
+    generations run concurrently up to ``CHAT_BATCH_CONCURRENCY``. A failing
+    query is reported in its own result instead of failing the batch.
+    """
+    request_started = time.perf_counter()
+    if len(payload.queries) > settings.chat_batch_max_queries:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A batch may contain at most {settings.chat_batch_max_queries} queries",
+        )
+
+    api_key = _extract_bearer_token(authorization)
+    timings: Dict[str, float] = {}
+    verification = await _timed(
+        _verify_pipeline(
+            api_key=api_key,
+            pipeline_name=payload.pipeline_name,
+            settings=settings,
+            requests=len(payload.queries),
+        ),
+        timings,
+        "verify_ms",
+    )
+    llm_config, embedding_config = _pipeline_configs(verification)
+    options = _public_chat_options(_pipeline_id(verification, payload.pipeline_name), llm_config, embedding_config)
+
+    # Blank queries are skipped by the embedder, so only embed the ones that produce a vector.
+    query_vectors: List[Optional[List[float]]] = [None] * len(payload.queries)
+    embeddable = [index for index, item in enumerate(payload.queries) if item.query.strip()]
+    if embeddable and options["embedding_model"]:
+        try:
+            vectors = await _timed(
+                llm_service.embed_queries(
+                    options["embedding_model"],
+                    [payload.queries[index].query for index in embeddable],
+                    dimension=options["embedding_dimension"],
+                ),
+                timings,
+                "embedding_ms",
+            )
+        except Exception as exc:  # noqa: BLE001 - public_chat embeds again and reports per query
+            logger.warning("Batch query embedding failed", extra={"pipeline": payload.pipeline_name, "error": str(exc)})
+        else:
+            if len(vectors) == len(embeddable):
+                for index, vector in zip(embeddable, vectors):
+                    query_vectors[index] = vector
+
+    semaphore = asyncio.Semaphore(settings.chat_batch_concurrency)
+
+    async def answer(index: int, item: BatchChatQuery) -> BatchChatResult:
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                chat_result = await llm_service.public_chat(
+                    **options,
+                    question=item.query,
+                    query_vector=query_vectors[index],
+                    conversation_key=_conversation_key(api_key, payload.pipeline_name, item.conversation_id),
+                )
+            except LLMServiceError as exc:
+                error, status_code = str(exc), status.HTTP_400_BAD_REQUEST
+            except Exception:  # noqa: BLE001 - one failing query must not fail the batch
+                logger.exception("Batch query failed", extra={"pipeline": payload.pipeline_name, "index": index})
+                error, status_code = "Internal error while answering the query", status.HTTP_500_INTERNAL_SERVER_ERROR
+            else:
+                return BatchChatResult(
+                    index=index,
+                    answer=chat_result["answer"],
+                    conversation_id=item.conversation_id,
+                    context_snippets=chat_result.get("context_snippets"),
+                    cached=bool(chat_result.get("cached")),
+                    skipped_generation=bool(chat_result.get("skipped_generation")),
+                    latency_ms=int((time.perf_counter() - start) * 1000),
+                )
+            return BatchChatResult(
+                index=index,
+                conversation_id=item.conversation_id,
+                latency_ms=int((time.perf_counter() - start) * 1000),
+                error=error,
+                status_code=status_code,
+            )
+
+    generation_started = time.perf_counter()
+    results = await asyncio.gather(*(answer(index, item) for index, item in enumerate(payload.queries)))
+    timings["generation_ms"] = round((time.perf_counter() - generation_started) * 1000, 2)
+    succeeded = sum(1 for result in results if result.error is None)
+
+    if succeeded:
+        await _track_usage(
+            api_key=api_key,
+            pipeline_name=payload.pipeline_name,
+            settings=settings,
+            tokens=0,
+            requests=succeeded,
+        )
+
+    latency_ms = int((time.perf_counter() - request_started) * 1000)
+    timings["total_ms"] = round((time.perf_counter() - request_started) * 1000, 2)
+    return FastJSONResponse(
+        BatchChatResponse(
+            pipeline_name=payload.pipeline_name,
+            results=list(results),
+            succeeded=succeeded,
+            failed=len(results) - succeeded,
+            latency_ms=latency_ms,
+            timings=timings,
+        )
     )
@@ -2,27 +2,47 @@
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
 
 from ...schemas import DatasetChunksResponse, UploadDatasetRequest
 from ...services import (
+    ChunkStaging,
     ChunkingOptions,
     DatasetLoader,
     DatasetNotFoundError,
+    DatasetRegistry,
     UnsupportedDatasetError,
+    content_hash,
 )
-from ..dependencies import get_dataset_loader
+from ...utils import get_logger
+from ..dependencies import get_chunk_staging, get_dataset_loader, get_dataset_registry
+from ..wire_format import encode_document, response_format
 
 router = APIRouter(tags=["dataset"])
+logger = get_logger(__name__)
 
 
 @router.post("/uploaddataset", response_model=DatasetChunksResponse)
 async def upload_dataset(
     payload: UploadDatasetRequest,
     loader: DatasetLoader = Depends(get_dataset_loader),
-) -> DatasetChunksResponse:
-    """Process dataset according to user-selected options and return generated chunks."""
-    print(f"[Python] Received upload_dataset request: type={payload.dataset_type}, size={payload.chunk_size}")
+    registry: DatasetRegistry = Depends(get_dataset_registry),
+    staging: ChunkStaging = Depends(get_chunk_staging),
+    accept: Optional[str] = Header(default=None),
+) -> Response:
+    """Process dataset according to user-selected options and return generated chunks.
+
+    ``Accept: application/msgpack`` or ``application/x-ndjson`` selects a
+    compact body (see :mod:`..wire_format`); JSON stays the default. With
+    ``stage`` the chunks stay on disk and only their ``handle`` is returned.
+    """
+    logger.info(
+        "Received upload_dataset request",
+        extra={"dataset_type": payload.dataset_type, "chunk_size": payload.chunk_size},
+    )
 
     try:
         options = ChunkingOptions(
@@ -58,10 +78,10 @@ async def upload_dataset(
                 os.close(fd)
                 
                 file_path_to_use = temp_file_path
-                print(f"[Python] Saved base64 content to temp file: {temp_file_path} ({len(file_bytes)} bytes)")
+                logger.debug("Saved base64 content to temp file", extra={"path": temp_file_path, "bytes": len(file_bytes)})
                 
             except Exception as e:
-                print(f"[Python] Failed to decode/save file content: {e}")
+                logger.warning("Failed to decode/save file content", extra={"error": str(e)})
                 raise ValueError(f"Failed to process file content: {str(e)}")
 
         chunks = await loader.load_and_chunk(
@@ -76,26 +96,44 @@ async def upload_dataset(
             try:
                 import os
                 os.unlink(temp_file_path)
-                print(f"[Python] Cleaned up temp file: {temp_file_path}")
+                logger.debug("Cleaned up temp file", extra={"path": temp_file_path})
             except Exception as e:
-                print(f"[Python] Warning: Failed to cleanup temp file: {e}")
+                logger.warning("Failed to clean up temp file", extra={"path": temp_file_path, "error": str(e)})
                 
     except DatasetNotFoundError as exc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
     except UnsupportedDatasetError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
     except PermissionError as exc:
-        print(f"[Python] Permission denied: {exc}")
+        logger.warning("Permission denied for dataset path", extra={"error": str(exc)})
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=f"File access denied: {str(exc)}") from exc
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)) from exc
     except Exception as exc:  # noqa: BLE001
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to process dataset") from exc
 
-    return DatasetChunksResponse(
-        dataset_type=payload.dataset_type,
-        chunk_size=options.chunk_size,
-        chunk_overlap=options.chunk_overlap,
-        total_chunks=len(chunks),
-        chunks=chunks,
-    )
+    digest = content_hash(str(chunk["text"]) for chunk in chunks)
+    duplicates = await asyncio.to_thread(registry.find_by_content, digest)
+    document = {
+        "dataset_type": payload.dataset_type,
+        "chunk_size": options.chunk_size,
+        "chunk_overlap": options.chunk_overlap,
+        "total_chunks": len(chunks),
+        "chunks": chunks,
+        "content_hash": digest,
+        "duplicate_of": [record.dataset_id for record in duplicates],
+        "handle": None,
+    }
+    if payload.stage:
+        staged = await asyncio.to_thread(
+            staging.stage,
+            chunks,
+            dataset_type=payload.dataset_type,
+            chunk_size=options.chunk_size,
+            chunk_overlap=options.chunk_overlap,
+            content_hash=digest,
+        )
+        document.update(chunks=[], handle=staged.handle)
+
+    # The loader's chunk dicts are encoded as they are, skipping per-chunk models.
+    return encode_document(document, response_format(accept), list_field="chunks")
@@ -0,0 +1,221 @@
+"""Compact request and response bodies for the bulk dataset endpoints.
+
+``/uploaddataset`` and ``/embed`` move every chunk of a dataset, so besides
+JSON they speak two denser formats, selected with ``Accept`` for responses
+and ``Content-Type`` for requests:
+
+``application/msgpack``
+    The same document as the JSON body, MessagePack-encoded with ``msgspec``.
+
+``application/x-ndjson``
+    The document without its list field on the first line, then one list
+    item per line (chunks for ``/uploaddataset``, datasets for ``/embed``).
+    Responses are streamed, so large chunk lists are never held as one
+    serialized body.
+
+JSON request bodies are parsed by pydantic-core directly from bytes, and
+:class:`FastJSONResponse`, the application's default response class,
+renders JSON without going through the standard library encoder.
+``msgspec`` and ``orjson`` are imported on first use; in an environment
+installed without them the compact formats are refused and JSON keeps working.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Callable, Dict, Iterator, List, Optional, Type, TypeVar
+
+from fastapi import HTTPException, Request, status
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, ValidationError
+
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+NDJSON = "application/x-ndjson"
+_MEDIA_TYPE_ALIASES = {
+    "application/json": JSON,
+    "application/msgpack": MSGPACK,
+    "application/x-msgpack": MSGPACK,
+    "application/vnd.msgpack": MSGPACK,
+    "application/x-ndjson": NDJSON,
+    "application/ndjson": NDJSON,
+    "application/jsonlines": NDJSON,
+}
+# NDJSON lines written per chunk of a streamed response.
+_NDJSON_LINES_PER_WRITE = 1000
+_SCHEMA_REF_TEMPLATE = "#/components/schemas/{model}"
+# Models read by ``parse_body``; FastAPI cannot see them, so ``add_body_schemas`` publishes them.
+_BODY_MODELS: Dict[str, Type[BaseModel]] = {}
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+def _msgpack() -> Any:
+    try:
+        import msgspec
+    except ImportError as exc:  # pragma: no cover - optional dependency
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="MessagePack bodies require the 'msgspec' package on the server",
+        ) from exc
+    return msgspec.msgpack
+
+
+def _json_dumps() -> Callable[[Any], bytes]:
+    try:
+        import orjson
+    except ImportError:  # pragma: no cover - optional dependency
+        return lambda value: json.dumps(value, separators=(",", ":"), default=str).encode("utf-8")
+    options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    return lambda value: orjson.dumps(value, default=str, option=options)
+
+
+def _json_loads() -> Callable[[bytes], Any]:
+    try:
+        import orjson
+    except ImportError:  # pragma: no cover - optional dependency
+        return json.loads
+    return orjson.loads
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered by pydantic-core for models and orjson for everything else.
+
+    Routes returning large payloads build this response themselves, which
+    also skips FastAPI re-validating ``response_model`` and walking plain
+    dicts with ``jsonable_encoder`` before rendering.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.model_dump_json(by_alias=True).encode("utf-8")
+        return _json_dumps()(content)
+
+
+def response_format(accept: Optional[str]) -> str:
+    """Return the first compact media type listed in ``Accept``, else JSON."""
+
+    for part in (accept or "").split(","):
+        media_type, *parameters = part.split(";")
+        if any(_is_refused(parameter) for parameter in parameters):
+            continue
+        resolved = _MEDIA_TYPE_ALIASES.get(media_type.strip().lower())
+        if resolved is not None and resolved != JSON:
+            return resolved
+    return JSON
+
+
+def _is_refused(parameter: str) -> bool:
+    name, _, value = parameter.partition("=")
+    if name.strip().lower() != "q":
+        return False
+    try:
+        return float(value) <= 0
+    except ValueError:
+        return False
+
+
+def request_format(content_type: Optional[str]) -> str:
+    media_type = (content_type or JSON).partition(";")[0].strip().lower()
+    resolved = _MEDIA_TYPE_ALIASES.get(media_type)
+    if resolved is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Unsupported Content-Type '{media_type}'; use {JSON}, {MSGPACK} or {NDJSON}",
+        )
+    return resolved
+
+
+async def parse_body(request: Request, model: Type[ModelT], *, list_field: str) -> ModelT:
+    """Validate the request body as ``model`` whatever its wire format.
+
+    Validation failures raise the same 422 error FastAPI produces for JSON.
+    """
+
+    body = await request.body()
+    media_type = request_format(request.headers.get("content-type"))
+    try:
+        if media_type == JSON:
+            return model.model_validate_json(body)
+        if media_type == MSGPACK:
+            msgpack = _msgpack()
+            try:
+                document = msgpack.decode(body)
+            except Exception as exc:  # noqa: BLE001 - msgspec.DecodeError
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Malformed MessagePack body") from exc
+        else:
+            document = _ndjson_document(body, list_field)
+        return model.model_validate(document)
+    except ValidationError as exc:
+        raise RequestValidationError(
+            [{**error, "loc": ("body", *error["loc"])} for error in exc.errors(include_url=False)]
+        ) from exc
+
+
+def body_openapi(model: Type[BaseModel], *, list_field: str) -> Dict[str, Any]:
+    """Return the ``openapi_extra`` documenting a body read with :func:`parse_body`."""
+
+    _BODY_MODELS[model.__name__] = model
+    reference = {"$ref": _SCHEMA_REF_TEMPLATE.format(model=model.__name__)}
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                JSON: {"schema": reference},
+                MSGPACK: {"schema": reference},
+                NDJSON: {
+                    "schema": {
+                        "type": "string",
+                        "description": f"The request fields on the first line, then one '{list_field}' item per line",
+                    }
+                },
+            },
+        }
+    }
+
+
+def add_body_schemas(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Add the models documented by :func:`body_openapi` to ``schema``'s components."""
+
+    components = schema.setdefault("components", {}).setdefault("schemas", {})
+    for name, model in _BODY_MODELS.items():
+        model_schema = model.model_json_schema(ref_template=_SCHEMA_REF_TEMPLATE)
+        for definition_name, definition in model_schema.pop("$defs", {}).items():
+            components.setdefault(definition_name, definition)
+        components.setdefault(name, model_schema)
+    return schema
+
+
+def encode_document(document: Dict[str, Any], media_type: str, *, list_field: str) -> Response:
+    """Serialize a plain ``document`` in ``media_type``."""
+
+    if media_type == MSGPACK:
+        return Response(content=_msgpack().encode(document), media_type=MSGPACK)
+    if media_type == NDJSON:
+        return StreamingResponse(_ndjson_lines(document, list_field), media_type=NDJSON)
+    return FastJSONResponse(document)
+
+
+def _ndjson_document(body: bytes, list_field: str) -> Dict[str, Any]:
+    loads = _json_loads()
+    lines = [line for line in body.splitlines() if line.strip()]
+    if not lines:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Empty NDJSON body")
+    try:
+        header = loads(lines[0])
+        items: List[Any] = [loads(line) for line in lines[1:]]
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Malformed NDJSON body") from exc
+    if not isinstance(header, dict):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="The first NDJSON line must be an object")
+    return {**header, list_field: items}
+
+
+def _ndjson_lines(document: Dict[str, Any], list_field: str) -> Iterator[bytes]:
+    dumps = _json_dumps()
+    yield dumps({key: value for key, value in document.items() if key != list_field}) + b"\n"
+    items = document.get(list_field) or []
+    for start in range(0, len(items), _NDJSON_LINES_PER_WRITE):
+        yield b"".join(dumps(item) + b"\n" for item in items[start:start + _NDJSON_LINES_PER_WRITE])
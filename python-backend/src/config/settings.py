@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Literal, Optional
 
 from dotenv import load_dotenv
 from pydantic import Field
@@ -25,20 +25,98 @@ class Settings(BaseSettings):
     """Application settings sourced from environment variables."""
 
     environment: str = Field("development", validation_alias="ENVIRONMENT")
+    log_format: Literal["json", "text"] = Field("json", validation_alias="LOG_FORMAT")
+    # e.g. "src.services.vectorstores=0.1,src.api=0.5"; applies to DEBUG/INFO only.
+    log_sample_rates: str = Field("", validation_alias="LOG_SAMPLE_RATES")
+    log_queue_size: int = Field(10_000, ge=1, validation_alias="LOG_QUEUE_SIZE")
     uploads_directory: Optional[Path] = Field(None, validation_alias="UPLOADS_DIRECTORY")
     openai_api_key: Optional[str] = Field(None, validation_alias="OPENAI_API_KEY")
     pinecone_api_key: Optional[str] = Field(None, validation_alias="PINECONE_API_KEY")
     pinecone_environment: Optional[str] = Field(None, validation_alias="PINECONE_ENVIRONMENT")
     chroma_directory: Path = Field(Path("vector_store/chroma"), validation_alias="CHROMA_DIRECTORY")
+    chunk_dedup_enabled: bool = Field(True, validation_alias="CHUNK_DEDUP_ENABLED")
+    # Shingle similarity from which chunks count as near duplicates; 1 keeps exact deduplication only.
+    chunk_near_duplicate_threshold: float = Field(
+        0.9,
+        gt=0.0,
+        le=1.0,
+        validation_alias="CHUNK_NEAR_DUPLICATE_THRESHOLD",
+    )
+    chunk_staging_directory: Path = Field(Path("vector_store/staging"), validation_alias="CHUNK_STAGING_DIRECTORY")
+    chunk_staging_ttl_seconds: float = Field(86_400.0, gt=0, validation_alias="CHUNK_STAGING_TTL_SECONDS")
+    chunk_staging_sweep_seconds: float = Field(3_600.0, gt=0, validation_alias="CHUNK_STAGING_SWEEP_SECONDS")
+    dataset_registry_path: Path = Field(Path("vector_store/datasets.sqlite3"), validation_alias="DATASET_REGISTRY_PATH")
+    # Comma-separated vector stores this server accepts. "local" and "chroma" keep their
+    # state in process memory, so scripts/serve.py runs one worker while either is enabled.
+    vector_stores: str = Field("pinecone,chroma,local", validation_alias="VECTOR_STORES")
+    vector_layout: Literal["shared", "partitioned"] = Field("shared", validation_alias="VECTOR_LAYOUT")
+    federated_source_timeout_seconds: float = Field(
+        2.0,
+        gt=0,
+        validation_alias="FEDERATED_SOURCE_TIMEOUT_SECONDS",
+    )
+    # ONNX export + tokenizer.json for the "huggingface" option; scripts/fetch_local_embedding_model.py fills it.
+    local_embedding_model_dir: Path = Field(
+        Path("models/all-MiniLM-L6-v2"),
+        validation_alias="LOCAL_EMBEDDING_MODEL_DIR",
+    )
+    local_embedding_max_memory_mb: int = Field(512, ge=64, validation_alias="LOCAL_EMBEDDING_MAX_MEMORY_MB")
+    local_embedding_batch_size: int = Field(32, ge=1, le=512, validation_alias="LOCAL_EMBEDDING_BATCH_SIZE")
+    local_embedding_workers: int = Field(2, ge=1, le=32, validation_alias="LOCAL_EMBEDDING_WORKERS")
+    local_vector_directory: Path = Field(Path("vector_store/local"), validation_alias="LOCAL_VECTOR_DIRECTORY")
+    # int8 holds a quarter of the RAM but scans no faster than float32 on NumPy (see bench_quantization).
+    local_vector_quantization: Literal["none", "int8", "binary"] = Field(
+        "none",
+        validation_alias="LOCAL_VECTOR_QUANTIZATION",
+    )
+    local_vector_rescore_multiplier: int = Field(4, ge=1, le=64, validation_alias="LOCAL_VECTOR_RESCORE_MULTIPLIER")
+    local_ann_min_rows: int = Field(50_000, ge=1, validation_alias="LOCAL_ANN_MIN_ROWS")
+    local_ann_nprobe: int = Field(16, ge=1, le=1024, validation_alias="LOCAL_ANN_NPROBE")
+    local_compaction_ratio: float = Field(0.2, gt=0.0, le=1.0, validation_alias="LOCAL_COMPACTION_RATIO")
     fastrouter_api_key: Optional[str] = Field(None, validation_alias="FASTROUTER_API_KEY")
     fastrouter_base_url: str = Field("https://go.fastrouter.ai/api/v1", validation_alias="FASTROUTER_BASE_URL")
+    fastrouter_embeddings_base_url: str = Field(
+        "https://go.fastrouter.ai/v1",
+        validation_alias="FASTROUTER_EMBEDDINGS_BASE_URL",
+    )
     llm_max_tokens: int = Field(validation_alias="LLM_MAX_TOKENS")
+    context_token_budget: int = Field(6000, ge=256, validation_alias="CONTEXT_TOKEN_BUDGET")
+    semantic_cache_enabled: bool = Field(True, validation_alias="SEMANTIC_CACHE_ENABLED")
+    semantic_cache_threshold: float = Field(0.95, gt=0, le=1, validation_alias="SEMANTIC_CACHE_THRESHOLD")
+    semantic_cache_ttl_seconds: float = Field(3600.0, gt=0, validation_alias="SEMANTIC_CACHE_TTL_SECONDS")
+    semantic_cache_max_entries: int = Field(512, ge=1, validation_alias="SEMANTIC_CACHE_MAX_ENTRIES")
+    semantic_cache_max_pipelines: int = Field(1024, ge=1, validation_alias="SEMANTIC_CACHE_MAX_PIPELINES")
+    # "memory" is per process; use "sqlite" (one file per host) or "redis" with several workers.
+    shared_cache_backend: Literal["memory", "sqlite", "redis"] = Field("memory", validation_alias="SHARED_CACHE_BACKEND")
+    shared_cache_path: Path = Field(Path("vector_store/shared_cache.sqlite3"), validation_alias="SHARED_CACHE_PATH")
+    shared_cache_max_entries: int = Field(50_000, ge=1, validation_alias="SHARED_CACHE_MAX_ENTRIES")
+    redis_url: Optional[str] = Field(None, validation_alias="REDIS_URL")
+    # TTLs for the shared caches; 0 disables a cache.
+    embedding_cache_ttl_seconds: float = Field(86_400.0, ge=0, validation_alias="EMBEDDING_CACHE_TTL_SECONDS")
+    retrieval_cache_ttl_seconds: float = Field(300.0, ge=0, validation_alias="RETRIEVAL_CACHE_TTL_SECONDS")
+    # Off by default: cached verifications skip the Node backend's per-minute rate limit.
+    verify_cache_ttl_seconds: float = Field(0.0, ge=0, validation_alias="VERIFY_CACHE_TTL_SECONDS")
+    conversation_memory_enabled: bool = Field(True, validation_alias="CONVERSATION_MEMORY_ENABLED")
+    conversation_history_token_budget: int = Field(
+        1500,
+        ge=128,
+        validation_alias="CONVERSATION_HISTORY_TOKEN_BUDGET",
+    )
+    conversation_max_active: int = Field(10_000, ge=1, validation_alias="CONVERSATION_MAX_ACTIVE")
+    conversation_ttl_seconds: float = Field(86_400.0, gt=0, validation_alias="CONVERSATION_TTL_SECONDS")
+    # SQLite file that receives conversations evicted from memory; unset keeps memory only.
+    conversation_sqlite_path: Optional[Path] = Field(None, validation_alias="CONVERSATION_SQLITE_PATH")
     evaluation_concurrency: int = Field(3, ge=1, le=16, validation_alias="EVALUATION_CONCURRENCY")
     api_verification_url: str = Field(
         "http://localhost:5000/api/keys/verify",
         validation_alias="API_VERIFICATION_URL",
     )
     service_api_secret: Optional[str] = Field(None, validation_alias="SERVICE_API_SECRET")
+    chat_batch_max_queries: int = Field(50, ge=1, le=1000, validation_alias="CHAT_BATCH_MAX_QUERIES")
+    chat_batch_concurrency: int = Field(8, ge=1, le=64, validation_alias="CHAT_BATCH_CONCURRENCY")
+    # Comma-separated warm-up targets (pinecone, chroma, llm, web, pdf, onnx, or "all")
+    # imported in the background after startup; empty keeps every import lazy.
+    warmup_imports: str = Field("", validation_alias="WARMUP_IMPORTS")
 
     model_config = {"env_file": ".env", "extra": "ignore"}
 
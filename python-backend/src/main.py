@@ -2,23 +2,73 @@
 
 from __future__ import annotations
 
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 
+from .api.dependencies import get_chunk_staging, get_conversation_store, get_shared_cache
 from .api.routes import embedding_router, llm_router, public_router, upload_router
+from .api.wire_format import FastJSONResponse, add_body_schemas
 from .config import get_settings
-from .utils import get_logger
+from .services.warmup import parse_warmup_targets, warm_up
+from .utils import configure_logging, get_logger, parse_sample_rates, render_metrics
+from .utils.metrics import PROMETHEUS_CONTENT_TYPE
 
 settings = get_settings()
+configure_logging(
+    log_format=settings.log_format,
+    sample_rates=parse_sample_rates(settings.log_sample_rates),
+    queue_size=settings.log_queue_size,
+)
 logger = get_logger(__name__)
 
 
+async def _sweep_chunk_staging(interval: float) -> None:
+    """Delete expired staged datasets every ``interval`` seconds."""
+
+    staging = get_chunk_staging()
+    while True:
+        try:
+            await asyncio.to_thread(staging.purge_expired)
+        except OSError:
+            logger.exception("Chunk staging sweep failed")
+        await asyncio.sleep(interval)
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    """Start configured warm-up imports without delaying the first health check.
+
+    Expired staged datasets are swept in the background while the app runs.
+    On shutdown, in-memory conversations are spilled to SQLite when configured
+    and this worker's shared cache connection is closed.
+    """
+
+    targets = parse_warmup_targets(settings.warmup_imports)
+    warmup = asyncio.get_running_loop().run_in_executor(None, warm_up, targets) if targets else None
+    sweeper = asyncio.create_task(_sweep_chunk_staging(settings.chunk_staging_sweep_seconds))
+    yield
+    sweeper.cancel()
+    if warmup is not None and not warmup.done():
+        warmup.cancel()
+    if get_conversation_store.cache_info().currsize:
+        get_conversation_store().close()
+    if get_shared_cache.cache_info().currsize:
+        get_shared_cache().close()
+
+
 def create_app() -> FastAPI:
     """Instantiate and configure the FastAPI application."""
 
     application = FastAPI(
         title="Krira AI RAG Backend",
         version="1.0.0",
+        lifespan=lifespan,
+        default_response_class=FastJSONResponse,
     )
     application.add_middleware(
         CORSMiddleware,
@@ -31,6 +81,10 @@ def create_app() -> FastAPI:
     application.include_router(embedding_router)
     application.include_router(llm_router, prefix="/api")
     application.include_router(public_router)
+
+    default_openapi = application.openapi
+    # Bodies parsed by ``parse_body`` are not FastAPI parameters, so their models are added here.
+    application.openapi = lambda: add_body_schemas(default_openapi())  # type: ignore[method-assign]
     return application
 
 
@@ -44,3 +98,10 @@ async def health_check() -> dict[str, str]:
     logger.info("Health check invoked", extra={"environment": settings.environment})
     return {"status": "ok", "environment": settings.environment}
 
+
+
+@app.get("/metrics", tags=["health"], include_in_schema=False)
+async def metrics() -> Response:
+    """Expose per-stage latency histograms in Prometheus text format."""
+
+    return Response(content=render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -21,6 +21,10 @@ class UploadDatasetRequest(BaseModel):
     file_content: Optional[str] = Field(None, description="Base64 encoded file content (alternative to file_path)")
     urls: Optional[List[str]] = Field(None, description="List of website URLs to ingest")
     file_name: Optional[str] = Field(None, description="Original name of the uploaded file")
+    stage: bool = Field(
+        False,
+        description="Keep the chunks server-side and return a handle for /embed instead of the chunks",
+    )
 
     @validator("chunk_overlap")
     def validate_overlap(cls, value: int | None, values: dict[str, object]) -> int | None:
@@ -85,4 +89,10 @@ class DatasetChunksResponse(BaseModel):
     chunk_size: int = Field(..., description="Chunk size used")
     chunk_overlap: int = Field(..., description="Chunk overlap used")
     total_chunks: int = Field(..., ge=0, description="Total number of generated chunks")
-    chunks: List[ChunkItem] = Field(..., description="Ordered list of chunks")
+    chunks: List[ChunkItem] = Field(..., description="Ordered list of chunks; empty when staged")
+    handle: Optional[str] = Field(None, description="Staging handle to pass to /embed instead of the chunks")
+    content_hash: Optional[str] = Field(None, description="Digest of the chunk texts in order")
+    duplicate_of: List[str] = Field(
+        default_factory=list,
+        description="Already embedded datasets whose chunks are identical to these",
+    )
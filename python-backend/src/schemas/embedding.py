@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from typing import List, Literal, Optional
 
-from pydantic import BaseModel, Field, model_validator
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field, model_validator
 
 
 EmbeddingModel = Literal[
@@ -14,7 +14,7 @@ EmbeddingModel = Literal[
     "text-embedding-3-large",
     "huggingface",
 ]
-VectorStore = Literal["pinecone", "chroma"]
+VectorStore = Literal["pinecone", "chroma", "local"]
 
 
 class ChunkPayload(BaseModel):
@@ -22,6 +22,10 @@ class ChunkPayload(BaseModel):
 
     order: int = Field(..., ge=0, description="Sequential position of the chunk")
     text: str = Field(..., min_length=1, description="Content of the chunk")
+    duplicate_orders: List[int] = Field(
+        default_factory=list,
+        description="Orders of identical or near-identical chunks folded into this one",
+    )
 
 
 class DatasetEmbeddingPayload(BaseModel):
@@ -32,7 +36,17 @@ class DatasetEmbeddingPayload(BaseModel):
     dataset_type: Literal["csv", "json", "website", "pdf"] = Field(..., description="Dataset origin")
     chunk_size: int = Field(..., gt=0, description="Chunk size used during preprocessing")
     chunk_overlap: int = Field(..., ge=0, description="Chunk overlap used during preprocessing")
-    chunks: List[ChunkPayload] = Field(..., min_length=1, description="Chunks to embed")
+    chunks: List[ChunkPayload] = Field(default_factory=list, description="Chunks to embed")
+    handle: Optional[str] = Field(
+        None,
+        description="Handle returned by /uploaddataset with stage=true; used instead of chunks",
+    )
+
+    @model_validator(mode="after")
+    def validate_source(self) -> "DatasetEmbeddingPayload":
+        if not self.chunks and not self.handle:
+            raise ValueError("Either chunks or handle is required")
+        return self
 
 
 class PineconeConfig(BaseModel):
@@ -43,6 +57,33 @@ class PineconeConfig(BaseModel):
     namespace: Optional[str] = Field(None, description="Optional namespace for multi-tenancy")
 
 
+class ChromaIndexConfig(BaseModel):
+    """HNSW profile applied to Chroma collections.
+
+    The whole profile is fixed when a collection is first created; collections
+    are shared across pipelines, so later requests cannot retune them.
+    """
+
+    model_config = ConfigDict(populate_by_name=True)
+
+    space: Literal["cosine", "l2", "ip"] = Field("cosine", description="Distance metric")
+    m: int = Field(16, ge=2, le=128, validation_alias=AliasChoices("m", "M"), description="Graph out-degree")
+    ef_construction: int = Field(
+        100,
+        ge=8,
+        le=2000,
+        validation_alias=AliasChoices("ef_construction", "efConstruction"),
+        description="Candidate list size while building the graph",
+    )
+    ef_search: int = Field(
+        100,
+        ge=1,
+        le=2000,
+        validation_alias=AliasChoices("ef_search", "efSearch"),
+        description="Candidate list size while querying",
+    )
+
+
 class EmbeddingRequest(BaseModel):
     """Request body for embedding datasets."""
 
@@ -55,6 +96,11 @@ class EmbeddingRequest(BaseModel):
     vector_store: VectorStore = Field(..., description="Vector database target")
     datasets: List[DatasetEmbeddingPayload] = Field(..., min_length=1, description="Datasets queued for embedding")
     pinecone: Optional[PineconeConfig] = Field(None, description="Pinecone credentials when applicable")
+    chroma: Optional[ChromaIndexConfig] = Field(None, description="HNSW profile for new Chroma collections")
+    reembed: bool = Field(
+        False,
+        description="Embed every dataset even when its chunks and settings match the previous run, e.g. after the store was wiped",
+    )
 
     @model_validator(mode="after")
     def validate_vector_store(self) -> "EmbeddingRequest":  # noqa: D401
@@ -74,6 +120,17 @@ class EmbeddedDatasetSummary(BaseModel):
     embedding_model: EmbeddingModel = Field(..., description="Embedding model used")
     chunks_processed: int = Field(..., ge=0, description="Total chunks processed")
     chunks_embedded: int = Field(..., ge=0, description="Chunks successfully embedded")
+    unchanged: bool = Field(
+        False,
+        description="Chunks and settings match the previous embedding, so nothing was re-embedded and cached answers were kept",
+    )
+    exact_duplicates: int = Field(0, ge=0, description="Chunks dropped as exact duplicates of another chunk")
+    near_duplicates: int = Field(0, ge=0, description="Chunks dropped as near duplicates of another chunk")
+    embeddings_saved: int = Field(
+        0,
+        ge=0,
+        description="Chunks that needed no embedding call: duplicates plus texts reused from other datasets",
+    )
 
 
 class EmbeddingError(BaseModel):
@@ -1,20 +1,43 @@
 """Service layer exports for Krira AI dataset processing."""
 
+from .answer_cache import CachedAnswer, SemanticAnswerCache
+from .chunk_staging import ChunkStaging, ChunkStagingError, StagedDataset
+from .context_window import ContextAssembler, ContextWindow
+from .conversation_store import Conversation, ConversationStore, ConversationTurn
 from .embedding_models import EmbeddingModelService, EmbeddingServiceError
 from .loaders import ChunkingOptions, DatasetLoader, DatasetNotFoundError, UnsupportedDatasetError
 from .llm import LLMService, LLMServiceError
-from .vectorstores import RetrievedContext, VectorStoreService, VectorStoreServiceError
+from .shared_cache import SharedCache, SharedCacheError, create_shared_cache
+from .summary_store import DatasetRecord, DatasetRegistry, content_hash
+from .vectorstores import RetrievalSource, RetrievedContext, VectorStoreService, VectorStoreServiceError
 
 __all__ = [
+    "CachedAnswer",
+    "SemanticAnswerCache",
+    "ChunkStaging",
+    "ChunkStagingError",
+    "StagedDataset",
+    "ContextAssembler",
+    "ContextWindow",
+    "Conversation",
+    "ConversationStore",
+    "ConversationTurn",
     "ChunkingOptions",
     "DatasetLoader",
+    "DatasetRecord",
+    "DatasetRegistry",
+    "content_hash",
     "DatasetNotFoundError",
     "UnsupportedDatasetError",
     "EmbeddingModelService",
     "EmbeddingServiceError",
     "LLMService",
     "LLMServiceError",
+    "SharedCache",
+    "SharedCacheError",
+    "create_shared_cache",
     "VectorStoreService",
     "VectorStoreServiceError",
+    "RetrievalSource",
     "RetrievedContext",
 ]
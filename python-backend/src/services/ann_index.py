@@ -0,0 +1,169 @@
+"""Inverted-file (IVF) approximate nearest-neighbour index for local collections."""
+
+from __future__ import annotations
+
+import math
+import os
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+
+CENTROIDS_FILENAME = "ivf_centroids.f32"
+ASSIGNMENTS_FILENAME = "ivf_assign.i32"
+
+KMEANS_ITERATIONS = 12
+# Training sample size per list; more samples buy little once lists are populated.
+KMEANS_SAMPLES_PER_LIST = 64
+MAX_LISTS = 8192
+ASSIGN_BLOCK_ROWS = 65536
+
+
+def suggested_list_count(rows: int) -> int:
+    """Return the usual IVF list count of ~4·sqrt(N), bounded to a sane range."""
+
+    return int(max(16, min(MAX_LISTS, 4 * math.sqrt(max(rows, 1)))))
+
+
+def _spherical_kmeans(sample: np.ndarray, lists: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centroids = sample[rng.choice(len(sample), size=lists, replace=False)].copy()
+    for _ in range(KMEANS_ITERATIONS):
+        labels = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, sample)
+        counts = np.bincount(labels, minlength=lists)
+        empty = counts == 0
+        if empty.any():
+            # Re-seed empty lists from random points so every list stays useful.
+            sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()), replace=False)]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centroids = (sums / norms).astype(np.float32)
+    return centroids
+
+
+def train_centroids(vectors: np.ndarray, *, lists: Optional[int] = None, seed: int = 0) -> np.ndarray:
+    """Fit unit-norm centroids on a sample of ``vectors`` with spherical k-means."""
+
+    lists = min(lists or suggested_list_count(len(vectors)), len(vectors))
+    sample_size = min(len(vectors), lists * KMEANS_SAMPLES_PER_LIST)
+    rng = np.random.default_rng(seed)
+    rows = np.sort(rng.choice(len(vectors), size=sample_size, replace=False))
+    return _spherical_kmeans(np.asarray(vectors[rows], dtype=np.float32), lists, seed)
+
+
+def assign_lists(centroids: np.ndarray, vectors: np.ndarray) -> np.ndarray:
+    """Return the index of the closest centroid for each row of ``vectors``."""
+
+    labels = [
+        np.argmax(np.asarray(vectors[start : start + ASSIGN_BLOCK_ROWS], dtype=np.float32) @ centroids.T, axis=1)
+        for start in range(0, len(vectors), ASSIGN_BLOCK_ROWS)
+    ]
+    return np.concatenate(labels).astype(np.int32) if labels else np.empty(0, dtype=np.int32)
+
+
+class IVFIndex:
+    """Coarse quantizer mapping every row of a collection to its nearest centroid.
+
+    Centroids and row assignments are plain files memory-mapped on load, and
+    new rows are assigned incrementally as they are appended. The inverted
+    lists themselves are derived from the assignments and rebuilt lazily.
+    """
+
+    def __init__(self, path: Path, dimension: int) -> None:
+        self._path = Path(path)
+        self._dimension = dimension
+        self._centroids: Optional[np.ndarray] = None
+        self._assignments: np.ndarray = np.empty(0, dtype=np.int32)
+        self._order: Optional[np.ndarray] = None
+        self._offsets: Optional[np.ndarray] = None
+        self._load()
+
+    @property
+    def trained(self) -> bool:
+        return self._centroids is not None
+
+    @property
+    def list_count(self) -> int:
+        return 0 if self._centroids is None else len(self._centroids)
+
+    @property
+    def rows(self) -> int:
+        return len(self._assignments)
+
+    def _load(self) -> None:
+        centroids_path = self._path / CENTROIDS_FILENAME
+        if not centroids_path.exists():
+            return
+        centroids = np.memmap(centroids_path, dtype=np.float32, mode="r")
+        self._centroids = np.asarray(centroids).reshape(-1, self._dimension)
+        assignments_path = self._path / ASSIGNMENTS_FILENAME
+        if assignments_path.exists() and assignments_path.stat().st_size:
+            self._assignments = np.memmap(assignments_path, dtype=np.int32, mode="r")
+
+    def install(self, centroids: np.ndarray, assignments: np.ndarray) -> None:
+        """Persist freshly trained ``centroids`` with the assignments of existing rows."""
+
+        self._write(CENTROIDS_FILENAME, np.asarray(centroids, dtype=np.float32).tobytes())
+        self._write(ASSIGNMENTS_FILENAME, np.asarray(assignments, dtype=np.int32).tobytes())
+        self._centroids = np.asarray(centroids, dtype=np.float32)
+        self._assignments = np.asarray(assignments, dtype=np.int32)
+        self._order = None
+
+    def append(self, vectors: np.ndarray) -> None:
+        """Assign newly appended rows to their nearest lists and persist them."""
+
+        if self._centroids is None or not len(vectors):
+            return
+        labels = self.assign(vectors)
+        with (self._path / ASSIGNMENTS_FILENAME).open("ab") as handle:
+            handle.write(labels.tobytes())
+        self._assignments = np.concatenate([np.asarray(self._assignments), labels])
+        self._order = None
+
+    def assign(self, vectors: np.ndarray) -> np.ndarray:
+        """Return the nearest list for each row of ``vectors``."""
+
+        assert self._centroids is not None
+        return assign_lists(self._centroids, vectors)
+
+    def keep(self, mask: np.ndarray) -> None:
+        """Drop the assignments of rows removed by compaction."""
+
+        if self._centroids is None:
+            return
+        kept = np.asarray(self._assignments)[mask]
+        self._write(ASSIGNMENTS_FILENAME, kept.tobytes())
+        self._assignments = kept
+        self._order = None
+
+    def reset(self) -> None:
+        """Forget the trained centroids so the index can be retrained."""
+
+        for filename in (CENTROIDS_FILENAME, ASSIGNMENTS_FILENAME):
+            (self._path / filename).unlink(missing_ok=True)
+        self._centroids = None
+        self._assignments = np.empty(0, dtype=np.int32)
+        self._order = None
+
+    def candidates(self, query: np.ndarray, nprobe: int) -> np.ndarray:
+        """Return row indices stored in the ``nprobe`` lists closest to ``query``."""
+
+        assert self._centroids is not None
+        if self._order is None or self._offsets is None:
+            assignments = np.asarray(self._assignments)
+            self._order = np.argsort(assignments, kind="stable")
+            self._offsets = np.searchsorted(assignments[self._order], np.arange(self.list_count + 1))
+
+        nprobe = max(1, min(nprobe, self.list_count))
+        closeness = self._centroids @ query
+        probes = np.argpartition(-closeness, nprobe - 1)[:nprobe]
+        spans = [self._order[self._offsets[probe] : self._offsets[probe + 1]] for probe in probes]
+        return np.sort(np.concatenate(spans)) if spans else np.empty(0, dtype=np.int64)
+
+    def _write(self, filename: str, payload: bytes) -> None:
+        temp_path = self._path / f"{filename}.tmp"
+        temp_path.write_bytes(payload)
+        os.replace(temp_path, self._path / filename)
@@ -0,0 +1,275 @@
+"""Semantic cache of generated answers keyed by query embedding."""
+
+from __future__ import annotations
+
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from ..utils import get_logger
+
+
+logger = get_logger(__name__)
+
+
+@dataclass(slots=True)
+class CachedAnswer:
+    """Answer previously generated for a semantically similar query."""
+
+    answer: str
+    context_snippets: List[str]
+    similarity: float
+    created_at: float
+
+
+@dataclass(slots=True)
+class AnswerCacheStats:
+    """Counters describing cache effectiveness."""
+
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+@dataclass(slots=True)
+class _PipelineBucket:
+    fingerprint: str
+    dataset_ids: FrozenSet[str]
+    vectors: List[np.ndarray] = field(default_factory=list)
+    answers: List[str] = field(default_factory=list)
+    snippets: List[List[str]] = field(default_factory=list)
+    created: List[float] = field(default_factory=list)
+    # When each entry was last stored or served; the least recent is evicted first.
+    used: List[float] = field(default_factory=list)
+    _matrix: Optional[np.ndarray] = None
+
+    def matrix(self) -> np.ndarray:
+        if self._matrix is None:
+            self._matrix = np.vstack(self.vectors) if self.vectors else np.empty((0, 0), dtype=np.float32)
+        return self._matrix
+
+    def remove(self, indices: Iterable[int]) -> None:
+        doomed = set(indices)
+        if not doomed:
+            return
+        keep = [index for index in range(len(self.vectors)) if index not in doomed]
+        self.vectors = [self.vectors[index] for index in keep]
+        self.answers = [self.answers[index] for index in keep]
+        self.snippets = [self.snippets[index] for index in keep]
+        self.created = [self.created[index] for index in keep]
+        self.used = [self.used[index] for index in keep]
+        self._matrix = None
+
+    def least_recently_used(self, count: int) -> List[int]:
+        return sorted(range(len(self.used)), key=self.used.__getitem__)[:count]
+
+
+def _normalize(vector: Sequence[float]) -> Optional[np.ndarray]:
+    array = np.asarray(vector, dtype=np.float32)
+    norm = float(np.linalg.norm(array))
+    if array.ndim != 1 or not norm:
+        return None
+    return array / norm
+
+
+class SemanticAnswerCache:
+    """Per-pipeline LRU of answers retrievable by cosine similarity of queries.
+
+    Entries are scoped by a fingerprint of everything that shapes the answer
+    (model, prompt, embedding settings and datasets) so configuration changes
+    never serve stale answers, and re-embedding a dataset drops every pipeline
+    bucket that reads from it.
+    """
+
+    def __init__(
+        self,
+        *,
+        threshold: float = 0.95,
+        ttl_seconds: float = 3600.0,
+        max_entries_per_pipeline: int = 512,
+        max_pipelines: int = 1024,
+    ) -> None:
+        self._threshold = threshold
+        self._ttl = ttl_seconds
+        self._max_entries = max(1, max_entries_per_pipeline)
+        self._max_pipelines = max(1, max_pipelines)
+        self._buckets: "OrderedDict[str, _PipelineBucket]" = OrderedDict()
+        self._stats = AnswerCacheStats()
+        self._lock = Lock()
+
+    @staticmethod
+    def fingerprint(
+        *,
+        model_id: str,
+        system_prompt: str,
+        embedding_model: str,
+        embedding_dimension: Optional[int],
+        dataset_ids: Sequence[str],
+        top_k: int,
+        vector_store: Optional[str] = None,
+        mmr: bool = False,
+        mmr_lambda: Optional[float] = None,
+        min_score: Optional[float] = None,
+        context_token_budget: Optional[int] = None,
+        sources: Sequence[str] = (),
+    ) -> str:
+        """Return a stable digest of the pipeline settings that shape an answer.
+
+        ``dataset_ids`` should carry the datasets' generations and ``sources``
+        one description per federated retrieval source.
+        """
+
+        parts = [
+            model_id,
+            system_prompt,
+            embedding_model,
+            str(embedding_dimension or ""),
+            ",".join(sorted(dataset_ids)),
+            str(top_k),
+            vector_store or "",
+            str(mmr),
+            str(mmr_lambda),
+            str(min_score),
+            str(context_token_budget),
+            ";".join(sources),
+        ]
+        return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+    def lookup(
+        self,
+        pipeline: str,
+        fingerprint: str,
+        query_vector: Sequence[float],
+        *,
+        threshold: Optional[float] = None,
+    ) -> Optional[CachedAnswer]:
+        """Return the closest cached answer above the similarity threshold."""
+
+        query = _normalize(query_vector)
+        if query is None:
+            return None
+
+        minimum = self._threshold if threshold is None else threshold
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(pipeline)
+            if bucket is None or bucket.fingerprint != fingerprint or not bucket.vectors:
+                self._stats.misses += 1
+                return None
+
+            expired = [index for index, created in enumerate(bucket.created) if now - created > self._ttl]
+            if expired:
+                bucket.remove(expired)
+                self._stats.expirations += len(expired)
+                if not bucket.vectors:
+                    self._stats.misses += 1
+                    return None
+
+            matrix = bucket.matrix()
+            if matrix.shape[1] != query.shape[0]:
+                self._stats.misses += 1
+                return None
+
+            similarities = matrix @ query
+            best = int(np.argmax(similarities))
+            similarity = float(similarities[best])
+            if similarity < minimum:
+                self._stats.misses += 1
+                return None
+
+            self._buckets.move_to_end(pipeline)
+            bucket.used[best] = now
+            self._stats.hits += 1
+            return CachedAnswer(
+                answer=bucket.answers[best],
+                context_snippets=list(bucket.snippets[best]),
+                similarity=similarity,
+                created_at=bucket.created[best],
+            )
+
+    def store(
+        self,
+        pipeline: str,
+        fingerprint: str,
+        query_vector: Sequence[float],
+        *,
+        answer: str,
+        context_snippets: Sequence[str],
+        dataset_ids: Sequence[str],
+    ) -> None:
+        """Remember ``answer`` for ``query_vector`` within the pipeline bucket."""
+
+        query = _normalize(query_vector)
+        if query is None or not answer:
+            return
+
+        with self._lock:
+            bucket = self._buckets.get(pipeline)
+            if bucket is None or bucket.fingerprint != fingerprint:
+                bucket = _PipelineBucket(fingerprint=fingerprint, dataset_ids=frozenset(dataset_ids))
+                self._buckets[pipeline] = bucket
+            self._buckets.move_to_end(pipeline)
+
+            if bucket.vectors and bucket.vectors[0].shape != query.shape:
+                bucket.remove(range(len(bucket.vectors)))
+
+            if len(bucket.vectors) >= self._max_entries:
+                bucket.remove(bucket.least_recently_used(len(bucket.vectors) - self._max_entries + 1))
+                self._stats.evictions += 1
+
+            bucket.vectors.append(query)
+            bucket.answers.append(answer)
+            bucket.snippets.append(list(context_snippets))
+            now = time.monotonic()
+            bucket.created.append(now)
+            bucket.used.append(now)
+            bucket._matrix = None
+            self._stats.stores += 1
+
+            while len(self._buckets) > self._max_pipelines:
+                self._buckets.popitem(last=False)
+                self._stats.evictions += 1
+
+    def invalidate_datasets(self, dataset_ids: Iterable[str]) -> int:
+        """Drop every pipeline bucket that reads from any of ``dataset_ids``."""
+
+        targets = {str(dataset_id) for dataset_id in dataset_ids}
+        if not targets:
+            return 0
+        with self._lock:
+            doomed = [name for name, bucket in self._buckets.items() if bucket.dataset_ids & targets]
+            for name in doomed:
+                del self._buckets[name]
+            self._stats.invalidations += len(doomed)
+        if doomed:
+            logger.info("Invalidated semantic answer cache", extra={"pipelines": len(doomed)})
+        return len(doomed)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current occupancy."""
+
+        with self._lock:
+            payload = self._stats.as_dict()
+            payload["pipelines"] = len(self._buckets)
+            payload["entries"] = sum(len(bucket.vectors) for bucket in self._buckets.values())
+        return payload
@@ -0,0 +1,151 @@
+"""Drop repeated chunks before they are embedded.
+
+Exact duplicates are found by hashing whitespace- and case-normalized text.
+Near duplicates (a repeated header with another page number, a re-crawled
+page with a changed date) are found with MinHash signatures of word
+shingles: two chunks whose estimated Jaccard similarity reaches
+``threshold`` are treated as the same. Signatures are split into bands and
+only chunks colliding in a band are compared, so the cost stays close to
+linear in the number of chunks.
+
+The first occurrence of each chunk is kept and remembers the orders of the
+chunks folded into it, so retrieval can still point at every source.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..schemas.embedding import ChunkPayload
+
+
+_TOKEN_PATTERN = re.compile(r"\w+", flags=re.UNICODE)
+# Shorter chunks (CSV rows, titles) differ in too few shingles to compare reliably.
+_MIN_NEAR_DUPLICATE_TOKENS = 20
+_SIGNATURE_SIZE = 64
+_BAND_ROWS = 4
+_RNG = np.random.default_rng(0x6B726972)
+# Odd multipliers and offsets of the hash functions behind each signature row.
+_PERMUTATION_A = _RNG.integers(1, 2**63, size=_SIGNATURE_SIZE, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+_PERMUTATION_B = _RNG.integers(0, 2**63, size=_SIGNATURE_SIZE, dtype=np.uint64)
+_SHINGLE_MULTIPLIERS = np.array(
+    [0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93],
+    dtype=np.uint64,
+)
+
+
+@dataclass(slots=True)
+class DedupResult:
+    """Chunks left after deduplication and what was folded into them."""
+
+    chunks: List[ChunkPayload]
+    exact_duplicates: int = 0
+    near_duplicates: int = 0
+    # Order of a kept chunk -> orders of the chunks folded into it.
+    folded: Dict[int, List[int]] = field(default_factory=dict)
+
+    @property
+    def removed(self) -> int:
+        return self.exact_duplicates + self.near_duplicates
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.split()).casefold()
+
+
+def text_key(text: str) -> str:
+    """Return the key under which identical chunk texts collide."""
+
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def minhash(text: str, *, shingle_size: int = 4) -> Optional[np.ndarray]:
+    """Return the MinHash signature of ``text``'s word shingles, or ``None`` if it is too short."""
+
+    tokens = _TOKEN_PATTERN.findall(text.casefold())
+    if len(tokens) < max(_MIN_NEAR_DUPLICATE_TOKENS, shingle_size):
+        return None
+
+    token_hashes = np.array(
+        [int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little") for token in tokens],
+        dtype=np.uint64,
+    )
+    width = min(shingle_size, len(_SHINGLE_MULTIPLIERS))
+    count = len(token_hashes) - width + 1
+    shingles = np.zeros(count, dtype=np.uint64)
+    for position in range(width):
+        # uint64 arithmetic wraps, which is exactly the mixing wanted here.
+        shingles ^= token_hashes[position:position + count] * _SHINGLE_MULTIPLIERS[position]
+    shingles = np.unique(shingles)
+    return (np.outer(shingles, _PERMUTATION_A) + _PERMUTATION_B).min(axis=0)
+
+
+def _bands(signature: np.ndarray) -> List[Tuple[int, bytes]]:
+    return [
+        (start, signature[start:start + _BAND_ROWS].tobytes())
+        for start in range(0, _SIGNATURE_SIZE, _BAND_ROWS)
+    ]
+
+
+def deduplicate_chunks(
+    chunks: Sequence[ChunkPayload],
+    *,
+    threshold: float = 0.9,
+    shingle_size: int = 4,
+) -> DedupResult:
+    """Return ``chunks`` without exact and near duplicates, keeping first occurrences.
+
+    ``threshold`` is the estimated Jaccard similarity of word shingles from
+    which two chunks count as near duplicates; ``1`` or more disables
+    near-duplicate detection.
+    """
+
+    result = DedupResult(chunks=[])
+    kept_by_text: Dict[str, ChunkPayload] = {}
+    kept_signatures: List[Tuple[np.ndarray, ChunkPayload]] = []
+    band_index: Dict[Tuple[int, bytes], List[int]] = {}
+
+    for chunk in chunks:
+        key = text_key(chunk.text)
+        original = kept_by_text.get(key)
+        if original is not None:
+            result.exact_duplicates += 1
+            result.folded.setdefault(original.order, []).append(chunk.order)
+            continue
+
+        signature = minhash(chunk.text, shingle_size=shingle_size) if threshold < 1 else None
+        if signature is not None:
+            bands = _bands(signature)
+            candidates = dict.fromkeys(position for band in bands for position in band_index.get(band, ()))
+            match = next(
+                (
+                    kept_signatures[position][1]
+                    for position in candidates
+                    if np.count_nonzero(kept_signatures[position][0] == signature) >= threshold * _SIGNATURE_SIZE
+                ),
+                None,
+            )
+            if match is not None:
+                result.near_duplicates += 1
+                result.folded.setdefault(match.order, []).append(chunk.order)
+                continue
+            for band in bands:
+                band_index.setdefault(band, []).append(len(kept_signatures))
+            kept_signatures.append((signature, chunk))
+
+        kept_by_text[key] = chunk
+        result.chunks.append(chunk)
+
+    if result.folded:
+        result.chunks = [
+            chunk.model_copy(update={"duplicate_orders": [*chunk.duplicate_orders, *result.folded[chunk.order]]})
+            if chunk.order in result.folded
+            else chunk
+            for chunk in result.chunks
+        ]
+    return result
@@ -0,0 +1,211 @@
+"""On-disk staging area for chunked datasets awaiting embedding.
+
+``/uploaddataset`` can keep its chunks here and hand back an opaque handle
+instead of the chunks themselves; ``/embed`` then reads them from disk, so
+they never travel through the Node backend or get validated again.
+
+Each staged dataset is one columnar file: a small JSON header, the chunk
+orders as ``int64``, the ``uint64`` end offsets of every chunk, and all
+chunk texts concatenated as UTF-8. Reading takes one ``read`` call and
+slices texts out of the blob without parsing anything per chunk.
+
+``/embed`` discards a file once its chunks are stored; anything left behind
+(abandoned uploads, failed embeds, interrupted writes) is removed by
+``purge_expired`` after ``ttl_seconds``, which the application runs
+periodically.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import secrets
+import struct
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+from ..schemas.embedding import ChunkPayload
+from ..utils import get_logger
+
+
+logger = get_logger(__name__)
+
+_MAGIC = b"KRCHUNK1"
+_HEADER_LENGTH = struct.Struct("<I")
+_HANDLE_PATTERN = re.compile(r"^[A-Za-z0-9_-]{16,64}$")
+_SUFFIX = ".chunks"
+
+
+class ChunkStagingError(Exception):
+    """Raised when a staged dataset is missing, expired or unreadable."""
+
+
+@dataclass(slots=True, frozen=True)
+class StagedDataset:
+    """Header of a staged dataset."""
+
+    handle: str
+    dataset_type: str
+    chunk_size: int
+    chunk_overlap: int
+    content_hash: str
+    count: int
+    created_at: float
+
+
+class ChunkStaging:
+    """Store chunk lists on local disk under random handles for ``ttl_seconds``."""
+
+    def __init__(self, directory: Path, *, ttl_seconds: float = 86_400.0) -> None:
+        self._directory = Path(directory)
+        self._ttl = ttl_seconds
+
+    def stage(
+        self,
+        chunks: Sequence[Mapping[str, Any]],
+        *,
+        dataset_type: str,
+        chunk_size: int,
+        chunk_overlap: int,
+        content_hash: str,
+    ) -> StagedDataset:
+        """Write ``chunks`` (``order``/``text`` mappings) and return their handle."""
+
+        self._directory.mkdir(parents=True, exist_ok=True)
+
+        texts = [str(chunk["text"]).encode("utf-8") for chunk in chunks]
+        orders = np.fromiter((int(chunk["order"]) for chunk in chunks), dtype="<i8", count=len(chunks))
+        offsets = np.cumsum([len(text) for text in texts], dtype="<u8") if texts else np.zeros(0, dtype="<u8")
+        staged = StagedDataset(
+            handle=secrets.token_urlsafe(18),
+            dataset_type=dataset_type,
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            content_hash=content_hash,
+            count=len(chunks),
+            created_at=time.time(),
+        )
+        header = json.dumps(
+            {
+                "dataset_type": staged.dataset_type,
+                "chunk_size": staged.chunk_size,
+                "chunk_overlap": staged.chunk_overlap,
+                "content_hash": staged.content_hash,
+                "count": staged.count,
+                "created_at": staged.created_at,
+            }
+        ).encode("utf-8")
+
+        descriptor, temporary = tempfile.mkstemp(dir=self._directory, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as handle:
+                handle.write(_MAGIC)
+                handle.write(_HEADER_LENGTH.pack(len(header)))
+                handle.write(header)
+                handle.write(orders.tobytes())
+                handle.write(offsets.astype("<u8", copy=False).tobytes())
+                handle.writelines(texts)
+            os.replace(temporary, self._path(staged.handle))
+        except BaseException:
+            try:
+                os.unlink(temporary)
+            except FileNotFoundError:
+                pass
+            raise
+
+        logger.info(
+            "Staged dataset chunks",
+            extra={"handle": staged.handle, "chunks": staged.count, "bytes": int(offsets[-1]) if texts else 0},
+        )
+        return staged
+
+    def load(self, handle: str) -> List[ChunkPayload]:
+        """Return the staged chunks, built without re-validating them."""
+
+        _, orders, offsets, blob = self._read(handle)
+        chunks: List[ChunkPayload] = []
+        start = 0
+        for order, end in zip(orders.tolist(), offsets.tolist()):
+            chunks.append(ChunkPayload.model_construct(order=order, text=blob[start:end].decode("utf-8")))
+            start = end
+        return chunks
+
+    def discard(self, handle: str) -> None:
+        """Delete a staged dataset; unknown handles are ignored."""
+
+        try:
+            self._path(handle).unlink()
+        except FileNotFoundError:
+            pass
+
+    def purge_expired(self) -> int:
+        """Delete staged files and leftover temporaries older than the TTL; return how many."""
+
+        if not self._directory.is_dir():
+            return 0
+        cutoff = time.time() - self._ttl
+        removed = 0
+        for path in self._directory.iterdir():
+            if path.suffix not in (_SUFFIX, ".tmp"):
+                continue
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        if removed:
+            logger.info("Purged expired staged datasets", extra={"files": removed})
+        return removed
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _path(self, handle: str) -> Path:
+        if not _HANDLE_PATTERN.match(handle or ""):
+            raise ChunkStagingError("Invalid chunk handle")
+        return self._directory / f"{handle}{_SUFFIX}"
+
+    def _read(self, handle: str) -> Tuple[StagedDataset, np.ndarray, np.ndarray, bytes]:
+        """Return the header, orders, end offsets and text blob of a staged file."""
+
+        try:
+            data = self._path(handle).read_bytes()
+        except FileNotFoundError as exc:
+            raise ChunkStagingError(f"Unknown or expired chunk handle '{handle}'") from exc
+
+        try:
+            if not data.startswith(_MAGIC):
+                raise ValueError("bad magic")
+            position = len(_MAGIC)
+            (header_length,) = _HEADER_LENGTH.unpack_from(data, position)
+            position += _HEADER_LENGTH.size
+            header = json.loads(data[position:position + header_length])
+            position += header_length
+            count = int(header["count"])
+            orders = np.frombuffer(data, dtype="<i8", count=count, offset=position)
+            offsets = np.frombuffer(data, dtype="<u8", count=count, offset=position + 8 * count)
+            blob = data[position + 16 * count:]
+            if count and int(offsets[-1]) != len(blob):
+                raise ValueError("truncated text section")
+            staged = StagedDataset(
+                handle=handle,
+                dataset_type=str(header["dataset_type"]),
+                chunk_size=int(header["chunk_size"]),
+                chunk_overlap=int(header["chunk_overlap"]),
+                content_hash=str(header["content_hash"]),
+                count=count,
+                created_at=float(header["created_at"]),
+            )
+        except (ValueError, KeyError, TypeError, struct.error) as exc:
+            raise ChunkStagingError(f"Chunk handle '{handle}' points to an unreadable file") from exc
+
+        if time.time() - staged.created_at > self._ttl:
+            raise ChunkStagingError(f"Unknown or expired chunk handle '{handle}'")
+        return staged, orders, offsets, blob
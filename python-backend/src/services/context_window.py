@@ -0,0 +1,237 @@
+"""Token-budgeted context window assembly for retrieval-augmented prompts."""
+
+from __future__ import annotations
+
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence
+
+from ..utils import get_logger
+from .vectorstores import RetrievedContext
+
+
+logger = get_logger(__name__)
+
+
+NO_CONTEXT_PLACEHOLDER = "No external docs available."
+CHUNK_SEPARATOR = "\n\n"
+
+# Characters per BPE token for English prose; used to split long words.
+_CHARS_PER_TOKEN = 4
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]", flags=re.UNICODE)
+_WORD_PATTERN = re.compile(r"\w+", flags=re.UNICODE)
+
+SHINGLE_SIZE = 3
+SHINGLE_DUPLICATE_THRESHOLD = 0.8
+EMBEDDING_DUPLICATE_THRESHOLD = 0.97
+
+# Context budgets (in tokens) keyed by model identifier prefix. Models not
+# listed here fall back to ``Settings.context_token_budget``.
+MODEL_CONTEXT_BUDGETS: Dict[str, int] = {
+    "perplexity/": 4000,
+    "x-ai/grok-3-mini": 4000,
+    "openai/gpt-oss": 6000,
+    "google/gemini-2.5-flash": 8000,
+}
+# Largest context window (in tokens) of each model family, keyed by identifier
+# prefix; a pipeline override is clamped to it.
+MODEL_CONTEXT_WINDOWS: Dict[str, int] = {
+    "openai/gpt-5": 400_000,
+    "openai/gpt-4.1": 1_047_576,
+    "openai/gpt-oss": 131_072,
+    "anthropic/": 200_000,
+    "google/gemini-2.5": 1_048_576,
+    "perplexity/": 128_000,
+    "x-ai/grok-4": 256_000,
+    "x-ai/grok-3-mini": 131_072,
+    "deepseek/": 163_840,
+    "z-ai/glm-4.6": 202_752,
+    "z-ai/glm-4.5": 131_072,
+}
+DEFAULT_CONTEXT_WINDOW = 128_000
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate the BPE token count of ``text`` without a tokenizer download.
+
+    Punctuation counts as one token and words count as one token per four
+    characters, which tracks cl100k/o200k counts within ~10% on prose.
+    """
+
+    if not text:
+        return 0
+    total = 0
+    for piece in _TOKEN_PATTERN.findall(text):
+        total += max(1, math.ceil(len(piece) / _CHARS_PER_TOKEN))
+    return total
+
+
+def _for_model(table: Dict[str, int], model_id: Optional[str]) -> Optional[int]:
+    candidate = (model_id or "").strip().lower()
+    for prefix, value in table.items():
+        if candidate.startswith(prefix):
+            return value
+    return None
+
+
+def resolve_token_budget(model_id: Optional[str], default_budget: int, override: Any = None) -> int:
+    """Return the context token budget for a model, honouring a pipeline override.
+
+    Overrides come from stored pipeline configuration and may be strings such
+    as ``"4000"``; values that are not positive integers are ignored, and
+    larger ones are clamped to the model's context window.
+    """
+
+    if override is not None:
+        try:
+            requested = int(override)
+        except (TypeError, ValueError):
+            logger.warning("Ignoring invalid context token budget override", extra={"override": str(override)})
+            requested = 0
+        if requested > 0:
+            return min(requested, _for_model(MODEL_CONTEXT_WINDOWS, model_id) or DEFAULT_CONTEXT_WINDOW)
+    budget = _for_model(MODEL_CONTEXT_BUDGETS, model_id)
+    return budget if budget is not None else default_budget
+
+
+def _shingles(text: str) -> FrozenSet[str]:
+    words = [word.lower() for word in _WORD_PATTERN.findall(text)]
+    if len(words) < SHINGLE_SIZE:
+        return frozenset(words)
+    return frozenset(" ".join(words[index : index + SHINGLE_SIZE]) for index in range(len(words) - SHINGLE_SIZE + 1))
+
+
+def _jaccard(left: FrozenSet[str], right: FrozenSet[str]) -> float:
+    if not left or not right:
+        return 0.0
+    intersection = len(left & right)
+    if not intersection:
+        return 0.0
+    return intersection / len(left | right)
+
+
+def _cosine(left: Sequence[float], right: Sequence[float]) -> float:
+    if len(left) != len(right) or not left:
+        return 0.0
+    dot = sum(a * b for a, b in zip(left, right))
+    norm = math.sqrt(sum(a * a for a in left)) * math.sqrt(sum(b * b for b in right))
+    return dot / norm if norm else 0.0
+
+
+@dataclass(slots=True)
+class ContextWindow:
+    """Assembled prompt context plus accounting for the tokens it avoided."""
+
+    text: str
+    chunks: List[RetrievedContext] = field(default_factory=list)
+    tokens_used: int = 0
+    tokens_saved: int = 0
+    token_budget: int = 0
+    duplicates_dropped: int = 0
+    truncated: int = 0
+
+
+class ContextAssembler:
+    """Select retrieved chunks best-first until the token budget is exhausted."""
+
+    def __init__(
+        self,
+        *,
+        shingle_threshold: float = SHINGLE_DUPLICATE_THRESHOLD,
+        embedding_threshold: float = EMBEDDING_DUPLICATE_THRESHOLD,
+    ) -> None:
+        self._shingle_threshold = shingle_threshold
+        self._embedding_threshold = embedding_threshold
+
+    def assemble(self, chunks: Sequence[RetrievedContext], token_budget: int) -> ContextWindow:
+        """Build the context window for ``chunks`` within ``token_budget`` tokens.
+
+        Chunks are ranked by normalised similarity when the store reports it;
+        otherwise their incoming order is kept.
+        """
+
+        candidates = [chunk for chunk in chunks if chunk.text and chunk.text.strip()]
+        # Stable sort: unscored chunks keep their relative order after scored ones.
+        candidates.sort(key=lambda chunk: float("inf") if chunk.similarity is None else -chunk.similarity)
+        if not candidates:
+            return ContextWindow(text=NO_CONTEXT_PLACEHOLDER, token_budget=token_budget)
+
+        separator_tokens = estimate_tokens(CHUNK_SEPARATOR) or 0
+        naive_tokens = sum(estimate_tokens(chunk.text.strip()) for chunk in candidates)
+        naive_tokens += separator_tokens * max(0, len(candidates) - 1)
+
+        selected: List[RetrievedContext] = []
+        selected_texts: List[str] = []
+        selected_shingles: List[FrozenSet[str]] = []
+        seen_exact: set[str] = set()
+        tokens_used = 0
+        duplicates = 0
+        truncated = 0
+
+        for chunk in candidates:
+            text = chunk.text.strip()
+            if text in seen_exact:
+                duplicates += 1
+                continue
+
+            shingles = _shingles(text)
+            if self._is_near_duplicate(chunk, shingles, selected, selected_shingles):
+                duplicates += 1
+                continue
+
+            cost = estimate_tokens(text) + (separator_tokens if selected_texts else 0)
+            if tokens_used + cost > token_budget:
+                truncated += 1
+                continue
+
+            seen_exact.add(text)
+            selected.append(chunk)
+            selected_texts.append(text)
+            selected_shingles.append(shingles)
+            tokens_used += cost
+
+        if not selected_texts:
+            return ContextWindow(
+                text=NO_CONTEXT_PLACEHOLDER,
+                tokens_saved=naive_tokens,
+                token_budget=token_budget,
+                duplicates_dropped=duplicates,
+                truncated=truncated,
+            )
+
+        window = ContextWindow(
+            text=CHUNK_SEPARATOR.join(selected_texts),
+            chunks=selected,
+            tokens_used=tokens_used,
+            tokens_saved=max(0, naive_tokens - tokens_used),
+            token_budget=token_budget,
+            duplicates_dropped=duplicates,
+            truncated=truncated,
+        )
+        logger.debug(
+            "Assembled context window",
+            extra={
+                "selected": len(selected),
+                "candidates": len(candidates),
+                "tokens_used": window.tokens_used,
+                "tokens_saved": window.tokens_saved,
+            },
+        )
+        return window
+
+    def _is_near_duplicate(
+        self,
+        chunk: RetrievedContext,
+        shingles: FrozenSet[str],
+        selected: Sequence[RetrievedContext],
+        selected_shingles: Sequence[FrozenSet[str]],
+    ) -> bool:
+        for other, other_shingles in zip(selected, selected_shingles):
+            if chunk.embedding and other.embedding:
+                if _cosine(chunk.embedding, other.embedding) >= self._embedding_threshold:
+                    return True
+                continue
+            if _jaccard(shingles, other_shingles) >= self._shingle_threshold:
+                return True
+        return False
@@ -0,0 +1,381 @@
+"""Per-conversation chat memory with a token-budgeted history window."""
+
+from __future__ import annotations
+
+import json
+import re
+import sqlite3
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional
+
+from ..utils import get_logger
+from .context_window import estimate_tokens
+from .shared_cache import KEY_PREFIX, SharedCache
+
+
+logger = get_logger(__name__)
+
+
+# Hard cap on verbatim turns kept per conversation, in case summarization keeps failing.
+MAX_TURNS_PER_CONVERSATION = 50
+# Share of the history budget reserved for the running summary of older turns.
+SUMMARY_BUDGET_SHARE = 1 / 3
+# How long a compaction claim holds; a worker that dies mid-summary frees it after this.
+COMPACTION_CLAIM_TTL_SECONDS = 120.0
+
+_WORD_PATTERN = re.compile(r"\w+", flags=re.UNICODE)
+# Pronouns that refer back to an earlier turn when they open a question.
+_FOLLOW_UP_PRONOUNS = frozenset(
+    {"it", "its", "they", "them", "their", "this", "that", "these", "those", "he", "him", "his", "she", "her"}
+)
+# Only the first few words count: "How does it work?" refers back, "Why is the sky blue when it rains?" does not.
+_FOLLOW_UP_WINDOW = 3
+_FOLLOW_UP_OPENERS = ("and ", "also ", "but ", "what about ", "how about ")
+
+
+@dataclass(slots=True)
+class ConversationTurn:
+    """One answered question."""
+
+    question: str
+    answer: str
+    created_at: float
+
+    def render(self) -> str:
+        return f"User: {self.question}\nAssistant: {self.answer}"
+
+
+@dataclass(slots=True)
+class Conversation:
+    """Running summary of older turns plus the most recent turns verbatim."""
+
+    summary: str = ""
+    turns: List[ConversationTurn] = field(default_factory=list)
+    updated_at: float = field(default_factory=time.time)
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.summary and not self.turns
+
+    def copy(self) -> "Conversation":
+        return Conversation(summary=self.summary, turns=list(self.turns), updated_at=self.updated_at)
+
+
+def needs_standalone_rewrite(question: str, *, has_history: bool) -> bool:
+    """Return True when ``question`` likely depends on earlier turns to make sense.
+
+    That takes a conversation to refer back to and a question that opens with
+    a follow-up ("And for Pinecone?") or with a pronoun in its first words.
+    """
+
+    if not has_history:
+        return False
+    normalized = question.strip().lower()
+    if normalized.startswith(_FOLLOW_UP_OPENERS):
+        return True
+    return any(word in _FOLLOW_UP_PRONOUNS for word in _WORD_PATTERN.findall(normalized)[:_FOLLOW_UP_WINDOW])
+
+
+def _encode(conversation: Conversation) -> str:
+    return json.dumps(
+        {
+            "summary": conversation.summary,
+            "turns": [[turn.question, turn.answer, turn.created_at] for turn in conversation.turns],
+            "updated_at": conversation.updated_at,
+        }
+    )
+
+
+def _decode(payload: str, updated_at: Optional[float] = None) -> Optional[Conversation]:
+    try:
+        data = json.loads(payload)
+        turns = [
+            ConversationTurn(question=str(question), answer=str(answer), created_at=float(created_at))
+            for question, answer, created_at in data.get("turns", [])
+        ]
+        return Conversation(
+            summary=str(data.get("summary") or ""),
+            turns=turns,
+            updated_at=float(updated_at if updated_at is not None else data["updated_at"]),
+        )
+    except (ValueError, TypeError, KeyError) as exc:
+        logger.warning("Discarding unreadable stored conversation", extra={"error": str(exc)})
+        return None
+
+
+class ConversationStore:
+    """In-process LRU of conversations, optionally spilling evicted ones to SQLite.
+
+    Keys are opaque strings; callers scope them to the API key and pipeline
+    so conversation ids cannot collide across tenants. Conversations idle for
+    longer than ``ttl_seconds`` are forgotten.
+
+    With a ``shared_cache`` (multi-worker deployments) conversations live in
+    that cache instead, so consecutive turns may be served by any worker;
+    updates are compare-and-set there, so concurrent workers never drop turns.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_conversations: int = 10_000,
+        ttl_seconds: float = 86_400.0,
+        sqlite_path: Optional[Path] = None,
+        shared_cache: Optional[SharedCache] = None,
+    ) -> None:
+        self._max_conversations = max(1, max_conversations)
+        self._ttl = ttl_seconds
+        self._conversations: "OrderedDict[str, Conversation]" = OrderedDict()
+        self._compacting: set[str] = set()
+        self._lock = Lock()
+        self._shared = shared_cache
+        self._db: Optional[sqlite3.Connection] = None
+        if sqlite_path is not None and shared_cache is None:
+            self._db = self._open_database(Path(sqlite_path))
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+    def get(self, key: str) -> Optional[Conversation]:
+        """Return a snapshot of the conversation, or ``None`` when unknown or expired."""
+
+        with self._lock:
+            conversation = self._load(key)
+            return conversation.copy() if conversation is not None else None
+
+    def append(self, key: str, question: str, answer: str) -> Conversation:
+        """Record an answered turn and return a snapshot of the conversation."""
+
+        now = time.time()
+        turn = ConversationTurn(question=question, answer=answer, created_at=now)
+
+        def add_turn(conversation: Optional[Conversation]) -> Conversation:
+            conversation = conversation or Conversation()
+            conversation.turns.append(turn)
+            del conversation.turns[:-MAX_TURNS_PER_CONVERSATION]
+            conversation.updated_at = now
+            return conversation
+
+        conversation = self._update(key, add_turn)
+        assert conversation is not None
+        return conversation.copy()
+
+    def fold(self, key: str, summary: str, folded: List[ConversationTurn]) -> None:
+        """Replace ``folded`` turns with ``summary``, keeping turns added meanwhile."""
+
+        if not folded:
+            return
+        newest_folded = folded[-1].created_at
+
+        def replace_folded(conversation: Optional[Conversation]) -> Optional[Conversation]:
+            if conversation is None:
+                return None
+            conversation.summary = summary
+            conversation.turns = [turn for turn in conversation.turns if turn.created_at > newest_folded]
+            return conversation
+
+        self._update(key, replace_folded)
+
+    def clear(self, key: str) -> None:
+        with self._lock:
+            self._conversations.pop(key, None)
+            if self._shared is not None:
+                self._shared.delete(self._shared_key(key))
+            if self._db is not None:
+                self._db.execute("DELETE FROM conversations WHERE key = ?", (key,))
+                self._db.commit()
+
+    def claim_compaction(self, key: str) -> bool:
+        """Mark ``key`` as being summarized; False if another task or worker already is."""
+
+        with self._lock:
+            if key in self._compacting:
+                return False
+            if self._shared is not None and not self._shared.add(
+                self._compaction_key(key), b"1", COMPACTION_CLAIM_TTL_SECONDS
+            ):
+                return False
+            self._compacting.add(key)
+            return True
+
+    def release_compaction(self, key: str) -> None:
+        with self._lock:
+            self._compacting.discard(key)
+            if self._shared is not None:
+                self._shared.delete(self._compaction_key(key))
+
+    def close(self) -> None:
+        """Spill every in-memory conversation to SQLite (when configured) and close it."""
+
+        with self._lock:
+            if self._db is None:
+                return
+            for key, conversation in self._conversations.items():
+                self._spill(key, conversation)
+            self._db.commit()
+            self._db.close()
+            self._db = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            spilled = 0
+            if self._db is not None:
+                spilled = int(self._db.execute("SELECT COUNT(*) FROM conversations").fetchone()[0])
+            return {"active": len(self._conversations), "spilled": spilled, "compacting": len(self._compacting)}
+
+    # ------------------------------------------------------------------
+    # History window
+    # ------------------------------------------------------------------
+    @staticmethod
+    def render(conversation: Conversation, token_budget: int) -> str:
+        """Return the summary and the newest turns that fit within ``token_budget``."""
+
+        remaining = token_budget
+        sections: List[str] = []
+        if conversation.summary:
+            sections.append(f"Summary of earlier conversation: {conversation.summary}")
+            remaining -= estimate_tokens(sections[0])
+
+        recent: List[str] = []
+        for turn in reversed(conversation.turns):
+            text = turn.render()
+            cost = estimate_tokens(text)
+            if cost > remaining:
+                break
+            recent.append(text)
+            remaining -= cost
+        sections.extend(reversed(recent))
+        return "\n\n".join(sections)
+
+    @staticmethod
+    def turns_to_fold(conversation: Conversation, token_budget: int) -> List[ConversationTurn]:
+        """Return the oldest turns to merge into the summary, or ``[]`` if all still fit.
+
+        Once the verbatim turns outgrow their share of the budget, enough of
+        the oldest ones are folded to bring them back under half of it, so a
+        summarization call happens every few turns rather than on every turn.
+        """
+
+        turn_budget = token_budget - int(token_budget * SUMMARY_BUDGET_SHARE)
+        costs = [estimate_tokens(turn.render()) for turn in conversation.turns]
+        total = sum(costs)
+        if total <= turn_budget or len(conversation.turns) < 2:
+            return []
+
+        folded = 0
+        target = turn_budget // 2
+        # Always keep the newest turn verbatim; it is what follow-ups refer to.
+        while folded < len(costs) - 1 and total > target:
+            total -= costs[folded]
+            folded += 1
+        return conversation.turns[:folded]
+
+    @staticmethod
+    def summary_budget(token_budget: int) -> int:
+        return max(32, int(token_budget * SUMMARY_BUDGET_SHARE))
+
+    def _update(
+        self, key: str, change: Callable[[Optional[Conversation]], Optional[Conversation]]
+    ) -> Optional[Conversation]:
+        """Apply ``change`` to the stored conversation and save what it returns (``None``: leave it).
+
+        In the shared cache the write is a compare-and-set against the value
+        ``change`` saw, retried on conflict, so turns appended or folded by
+        another worker in between are never overwritten.
+        """
+
+        if self._shared is None:
+            with self._lock:
+                conversation = change(self._load(key))
+                if conversation is not None:
+                    self._save(key, conversation)
+                return conversation
+
+        shared_key = self._shared_key(key)
+        while True:
+            payload = self._shared.get(shared_key)
+            conversation = change(_decode(payload.decode("utf-8")) if payload is not None else None)
+            if conversation is None:
+                return None
+            encoded = _encode(conversation).encode("utf-8")
+            if self._shared.compare_and_set(shared_key, payload, encoded, self._ttl):
+                return conversation
+
+    # ------------------------------------------------------------------
+    # Internal helpers (callers hold ``self._lock``)
+    # ------------------------------------------------------------------
+    def _shared_key(self, key: str) -> str:
+        return f"{KEY_PREFIX}conversation:{key}"
+
+    def _compaction_key(self, key: str) -> str:
+        return f"{KEY_PREFIX}conversation-compaction:{key}"
+
+    def _save(self, key: str, conversation: Conversation) -> None:
+        self._conversations[key] = conversation
+        self._conversations.move_to_end(key)
+        self._evict()
+
+    def _load(self, key: str) -> Optional[Conversation]:
+        if self._shared is not None:
+            payload = self._shared.get(self._shared_key(key))
+            return _decode(payload.decode("utf-8")) if payload is not None else None
+        conversation = self._conversations.get(key)
+        if conversation is None and self._db is not None:
+            conversation = self._restore(key)
+            if conversation is not None:
+                self._conversations[key] = conversation
+                self._evict()
+        if conversation is None:
+            return None
+        if time.time() - conversation.updated_at > self._ttl:
+            self._conversations.pop(key, None)
+            return None
+        self._conversations.move_to_end(key)
+        return conversation
+
+    def _evict(self) -> None:
+        spilled = False
+        while len(self._conversations) > self._max_conversations:
+            key, conversation = self._conversations.popitem(last=False)
+            if self._db is not None:
+                self._spill(key, conversation)
+                spilled = True
+        if spilled and self._db is not None:
+            self._db.commit()
+
+    def _open_database(self, path: Path) -> sqlite3.Connection:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS conversations ("
+            "key TEXT PRIMARY KEY, payload TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        expired = connection.execute(
+            "DELETE FROM conversations WHERE updated_at < ?",
+            (time.time() - self._ttl,),
+        ).rowcount
+        connection.commit()
+        logger.info("Conversation spill store opened", extra={"path": str(path), "expired": expired})
+        return connection
+
+    def _spill(self, key: str, conversation: Conversation) -> None:
+        assert self._db is not None
+        self._db.execute(
+            "INSERT OR REPLACE INTO conversations (key, payload, updated_at) VALUES (?, ?, ?)",
+            (key, _encode(conversation), conversation.updated_at),
+        )
+
+    def _restore(self, key: str) -> Optional[Conversation]:
+        assert self._db is not None
+        row = self._db.execute("SELECT payload, updated_at FROM conversations WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        self._db.execute("DELETE FROM conversations WHERE key = ?", (key,))
+        self._db.commit()
+        return _decode(row[0], float(row[1]))
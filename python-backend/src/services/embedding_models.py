@@ -8,7 +8,8 @@ from typing import Iterable, List, Optional
 
 from ..config import get_settings
 from ..schemas.embedding import EmbeddingModel
-from ..utils import get_logger
+from ..utils import get_logger, instrumented
+from .local_embeddings import LocalEmbeddingEngine, LocalEmbeddingError
 
 
 logger = get_logger(__name__)
@@ -44,9 +45,10 @@ class EmbeddingModelService:
     def __init__(self) -> None:
         self._settings = get_settings()
         self._openai_client = None
-        self._hf_model = None
-        self._hf_lock = threading.Lock()
+        self._local_engine: Optional[LocalEmbeddingEngine] = None
+        self._local_lock = threading.Lock()
 
+    @instrumented("embedding")
     async def generate(
         self,
         model: EmbeddingModel,
@@ -62,22 +64,18 @@ class EmbeddingModelService:
 
         if model in OPENAI_MODEL_ALIASES:
             return await asyncio.to_thread(self._generate_openai, model, payload, dimensions)
-        # NOTE: HuggingFace local embeddings disabled due to memory constraints on Render free tier
-        # if model == "huggingface":
-        #     if dimensions is not None and dimensions != HUGGINGFACE_DIMENSION:
-        #         raise EmbeddingServiceError(
-        #             f"Hugging Face embeddings use a fixed dimension of {HUGGINGFACE_DIMENSION}"
-        #         )
-        #     return await asyncio.to_thread(self._generate_huggingface, payload)
         if model == "huggingface":
-            raise EmbeddingServiceError(
-                "HuggingFace local embeddings are currently disabled. Please use OpenAI embeddings instead."
-            )
+            if dimensions is not None and dimensions != HUGGINGFACE_DIMENSION:
+                raise EmbeddingServiceError(
+                    f"Hugging Face embeddings use a fixed dimension of {HUGGINGFACE_DIMENSION}"
+                )
+            return await self._generate_local(payload)
         raise EmbeddingServiceError(f"Unsupported embedding model '{model}'")
 
     # ---------------------------------------------------------------------
     # Provider-specific handlers
     # ---------------------------------------------------------------------
+    @instrumented("embedding", "openai")
     def _generate_openai(
         self,
         model: EmbeddingModel,
@@ -100,7 +98,7 @@ class EmbeddingModelService:
         if self._openai_client is None:
             # Use FastRouter base URL for OpenAI embeddings
             self._openai_client = OpenAI(
-                base_url="https://go.fastrouter.ai/v1",
+                base_url=self._settings.fastrouter_embeddings_base_url,
                 api_key=api_key
             )
 
@@ -119,36 +117,27 @@ class EmbeddingModelService:
 
         return embeddings
 
-    # NOTE: HuggingFace local embeddings disabled due to memory constraints on Render free tier
-    # def _generate_huggingface(self, payload: list[str]) -> List[List[float]]:
-    #     """Generate embeddings using HuggingFace SentenceTransformers."""
-    #
-    #     try:
-    #         from sentence_transformers import SentenceTransformer
-    #     except ImportError as exc:  # pragma: no cover - import-time failure
-    #         raise EmbeddingServiceError(
-    #             "sentence-transformers package is required for Hugging Face embeddings"
-    #         ) from exc
-    #
-    #     with self._hf_lock:
-    #         if self._hf_model is None:
-    #             logger.debug("Loading Hugging Face embedding model", extra={"model": "all-MiniLM-L6-v2"})
-    #             self._hf_model = SentenceTransformer(
-    #                 "sentence-transformers/all-MiniLM-L6-v2",
-    #                 device="cpu",
-    #             )
-    #         model: SentenceTransformer = self._hf_model
-    #
-    #     vectors = model.encode(
-    #         payload,
-    #         batch_size=32,
-    #         convert_to_numpy=True,
-    #         normalize_embeddings=True,
-    #         show_progress_bar=False,
-    #     )
-    #     if hasattr(vectors, "tolist"):
-    #         return vectors.tolist()
-    #     return [vector.tolist() if hasattr(vector, "tolist") else list(vector) for vector in vectors]
+    @instrumented("embedding", "local")
+    async def _generate_local(self, payload: list[str]) -> List[List[float]]:
+        """Generate embeddings with the on-host ONNX encoder."""
+
+        engine = self._get_local_engine()
+        try:
+            return await engine.encode_async(payload)
+        except LocalEmbeddingError as exc:
+            raise EmbeddingServiceError(str(exc)) from exc
+
+    def _get_local_engine(self) -> LocalEmbeddingEngine:
+        if self._local_engine is None:
+            with self._local_lock:
+                if self._local_engine is None:
+                    self._local_engine = LocalEmbeddingEngine(
+                        self._settings.local_embedding_model_dir,
+                        max_memory_mb=self._settings.local_embedding_max_memory_mb,
+                        batch_size=self._settings.local_embedding_batch_size,
+                        workers=self._settings.local_embedding_workers,
+                    )
+        return self._local_engine
 
     def _resolve_openai_model_name(self, model: EmbeddingModel) -> str:
         canonical = OPENAI_MODEL_ALIASES.get(model)
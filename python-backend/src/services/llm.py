@@ -6,22 +6,22 @@ import asyncio
 import base64
 import binascii
 import csv
+import hashlib
 import inspect
 import json
 import math
 import os
 import tempfile
 import threading
+import time
+from collections import OrderedDict
 from contextlib import contextmanager
 from dataclasses import dataclass
 from pathlib import Path
 from statistics import fmean
-from typing import Any, Dict, List, Optional, Sequence, Tuple, Union, cast, get_args
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set, Tuple, Union, cast, get_args
 
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
-from langchain_openai.chat_models.base import BaseChatOpenAI
-from openai import OpenAI
+from pydantic import TypeAdapter, ValidationError
 
 from ..config import get_settings
 from ..schemas import (
@@ -30,14 +30,31 @@ from ..schemas import (
     LLMProviderOption,
     ProviderLiteral,
 )
-from ..schemas.embedding import EmbeddingModel, PineconeConfig, VectorStore
-from ..utils import get_logger
+from ..schemas.embedding import ChromaIndexConfig, EmbeddingModel, PineconeConfig, VectorStore
+from ..utils import get_logger, instrumented, timer
+from .answer_cache import SemanticAnswerCache
+from .context_window import ContextAssembler, ContextWindow, resolve_token_budget
+from .conversation_store import ConversationStore, needs_standalone_rewrite
 from .embedding_models import EmbeddingModelService, EmbeddingServiceError
-from .vectorstores import RetrievedContext, VectorStoreService, VectorStoreServiceError
+from .shared_cache import (
+    SHARED_CACHE_REQUESTS,
+    SharedCache,
+    cache_key,
+    dataset_generations,
+    decode_vector,
+    encode_vector,
+)
+from .vectorstores import RetrievalSource, RetrievedContext, VectorStoreService, VectorStoreServiceError
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from openai import OpenAI
 
 
 logger = get_logger(__name__)
 
+# Pydantic's lax bool parsing: accepts true/false, yes/no, on/off and 1/0, rejects anything else.
+_BOOL_ADAPTER = TypeAdapter(bool)
+
 
 _TOKEN_USAGE_KEYS = (
     "prompt_tokens",
@@ -233,8 +250,21 @@ MODEL_TIERS: Dict[str, str] = {
 }
 
 DEFAULT_SYSTEM_PROMPT = "You are a helpful assistant that uses retrieved enterprise knowledge to answer questions accurately."
+NO_RELEVANT_CONTEXT_ANSWER = "I couldn't find anything relevant to that question in the connected knowledge base."
+FOLLOW_UP_REWRITE_PROMPT = (
+    "Rewrite the user's follow-up question as a single standalone question that can be understood "
+    "without the conversation, resolving pronouns and references from it. "
+    "If it is already standalone, return it unchanged. Return only the question."
+)
+CONVERSATION_SUMMARY_PROMPT = (
+    "You maintain a running summary of a conversation between a user and an assistant. "
+    "Merge the new turns into the existing summary, keeping names, numbers, decisions and open questions. "
+    "Use at most {max_words} words. Return only the summary."
+)
 
 MAX_CONTEXT_PREVIEW = 5
+# Distinct (model, prompt) chains kept alive between chat requests.
+CHAIN_CACHE_SIZE = 64
 PROJECT_ROOT = Path(__file__).resolve().parents[3]
 TEST_DIRECTORY = PROJECT_ROOT / "test"
 
@@ -472,6 +502,127 @@ def _round_percentage(value: Optional[float]) -> Optional[float]:
     return round(value, 1)
 
 
+def _coerce_pinecone_config(value: Any) -> Optional[PineconeConfig]:
+    """Build a PineconeConfig from the camelCase payload sent by the Node backend."""
+
+    if value is None or isinstance(value, PineconeConfig):
+        return value
+    if not isinstance(value, dict):
+        return None
+    try:
+        return PineconeConfig(
+            api_key=value.get("apiKey") or value.get("api_key"),
+            index_name=value.get("indexName") or value.get("index_name"),
+            namespace=value.get("namespace"),
+        )
+    except Exception as exc:
+        logger.warning(f"Failed to convert Pinecone config: {exc}")
+        return None
+
+
+def _coerce_chroma_config(value: Any) -> Optional[ChromaIndexConfig]:
+    if value is None or isinstance(value, ChromaIndexConfig):
+        return value
+    try:
+        return ChromaIndexConfig.model_validate(value)
+    except Exception as exc:
+        logger.warning(f"Failed to convert Chroma config: {exc}")
+        return None
+
+
+def _coerce_flag(value: Any, name: str, default: bool = False) -> bool:
+    """Parse a boolean pipeline setting; stored configs may hold "false" or "0" as strings."""
+
+    if value is None:
+        return default
+    try:
+        return _BOOL_ADAPTER.validate_python(value)
+    except ValidationError:
+        logger.warning(f"Ignoring invalid {name} setting {value!r}; using {default}")
+        return default
+
+
+def _pinecone_cache_part(config: Optional[PineconeConfig]) -> str:
+    if config is None:
+        return ""
+    # Keys are hashed, but never put the Pinecone secret itself into a cache key.
+    secret = hashlib.sha256(config.api_key.encode("utf-8")).hexdigest()[:16]
+    return f"{config.index_name}/{config.namespace or ''}/{secret}"
+
+
+def _chroma_cache_part(config: Optional[ChromaIndexConfig]) -> str:
+    return config.model_dump_json() if config is not None else ""
+
+
+def _encode_contexts(contexts: Sequence[RetrievedContext]) -> bytes:
+    return json.dumps(
+        [
+            {
+                "text": context.text,
+                "score": context.score,
+                "metadata": context.metadata,
+                "similarity": context.similarity,
+                "embedding": base64.b64encode(encode_vector(context.embedding)).decode("ascii")
+                if context.embedding is not None
+                else None,
+            }
+            for context in contexts
+        ],
+        default=str,
+    ).encode("utf-8")
+
+
+def _decode_contexts(payload: bytes) -> Optional[List[RetrievedContext]]:
+    try:
+        return [
+            RetrievedContext(
+                text=entry["text"],
+                score=entry.get("score"),
+                metadata=entry.get("metadata") or {},
+                similarity=entry.get("similarity"),
+                embedding=decode_vector(base64.b64decode(entry["embedding"])) if entry.get("embedding") else None,
+            )
+            for entry in json.loads(payload)
+        ]
+    except (ValueError, TypeError, KeyError, binascii.Error):
+        return None
+
+
+def _parse_retrieval_sources(raw_sources: Sequence[Any]) -> List[RetrievalSource]:
+    """Convert federated ``sources`` entries from the pipeline config into RetrievalSource objects."""
+
+    sources: List[RetrievalSource] = []
+    for entry in raw_sources:
+        if isinstance(entry, RetrievalSource):
+            sources.append(entry)
+            continue
+        if not isinstance(entry, dict):
+            raise LLMServiceError("Each retrieval source must be an object")
+
+        vector_store = str(entry.get("vectorStore") or entry.get("vector_store") or "").strip()
+        if vector_store not in get_args(VectorStore):
+            raise LLMServiceError(f"Unsupported vector store '{vector_store}' in retrieval sources")
+        dataset_ids = [
+            str(dataset_id).strip()
+            for dataset_id in entry.get("datasetIds") or entry.get("dataset_ids") or []
+            if str(dataset_id).strip()
+        ]
+        if not dataset_ids:
+            continue
+
+        timeout_ms = entry.get("timeoutMs")
+        sources.append(
+            RetrievalSource(
+                vector_store=cast(VectorStore, vector_store),
+                dataset_ids=dataset_ids,
+                pinecone=_coerce_pinecone_config(entry.get("pineconeConfig") or entry.get("pinecone")),
+                chroma=_coerce_chroma_config(entry.get("chromaConfig") or entry.get("chroma")),
+                timeout_seconds=float(timeout_ms) / 1000 if isinstance(timeout_ms, (int, float)) and timeout_ms > 0 else None,
+            )
+        )
+    return sources
+
+
 class LLMServiceError(Exception):
     """Raised when the LLM service is unable to complete a request."""
 
@@ -487,10 +638,19 @@ class LLMService:
         self,
         embedding_service: EmbeddingModelService,
         vector_store_service: VectorStoreService,
+        *,
+        answer_cache: Optional[SemanticAnswerCache] = None,
+        conversation_store: Optional[ConversationStore] = None,
+        shared_cache: Optional[SharedCache] = None,
     ) -> None:
         self._settings = get_settings()
         self._embedding_service = embedding_service
         self._vector_store_service = vector_store_service
+        self._answer_cache = answer_cache
+        self._conversations = conversation_store
+        self._shared = shared_cache
+        # Strong references to fire-and-forget summarization tasks.
+        self._background_tasks: Set["asyncio.Task[None]"] = set()
         self._fastrouter_client: Optional[OpenAI] = None
         self._fastrouter_model = (
             os.getenv("FASTROUTER_OPENAI_MODEL_1")
@@ -498,6 +658,9 @@ class LLMService:
             or "openai/gpt-5"
         )
         self._evaluation_roots = self._build_evaluation_roots()
+        self._context_assembler = ContextAssembler()
+        self._chain_cache: "OrderedDict[Tuple[str, str, str], Any]" = OrderedDict()
+        self._chain_lock = threading.Lock()
 
     # ------------------------------------------------------------------
     # Model listing
@@ -555,6 +718,11 @@ class LLMService:
     # Internal helpers
     # ------------------------------------------------------------------
     def _build_chain(self, *, model: str, api_key: str, base_url: str, system_prompt: str):
+        # LangChain is imported here rather than at module load; it is the
+        # slowest import in the service and only chat paths need it.
+        from langchain_core.prompts import ChatPromptTemplate
+        from langchain_openai import ChatOpenAI
+
         # Claude models with :thinking suffix require temperature=1
         is_thinking_model = ":thinking" in model.lower()
         
@@ -616,15 +784,32 @@ class LLMService:
         ),
         (
             "user",
-            "Question: {question}"
+            "{history}Question: {question}"
             + "\n\nContext:\n{context}"
             + "\n\nIMPORTANT: Answer using ONLY information explicitly stated in the context above. If the question asks for one item, provide one. If it asks for multiple, provide multiple only if they exist in context. Do not add any information not present in the context. Verify each fact against the context before responding.",
         ),
     ]
-)
+).partial(history="")
 
         return prompt | llm
 
+    def _get_chain(self, *, model: str, api_key: str, base_url: str, system_prompt: str):
+        """Return a cached chain for the model and prompt, building it on first use."""
+
+        key = (model, base_url, system_prompt)
+        with self._chain_lock:
+            chain = self._chain_cache.get(key)
+            if chain is not None:
+                self._chain_cache.move_to_end(key)
+                return chain
+
+        chain = self._build_chain(model=model, api_key=api_key, base_url=base_url, system_prompt=system_prompt)
+        with self._chain_lock:
+            self._chain_cache[key] = chain
+            while len(self._chain_cache) > CHAIN_CACHE_SIZE:
+                self._chain_cache.popitem(last=False)
+        return chain
+
     def _get_fastrouter_client(self) -> OpenAI:
         api_key = self._settings.fastrouter_api_key
         base_url = self._settings.fastrouter_base_url
@@ -636,6 +821,8 @@ class LLMService:
             raise LLMServiceError("FastRouter base URL is not configured")
 
         if self._fastrouter_client is None:
+            from openai import OpenAI
+
             self._fastrouter_client = OpenAI(api_key=api_key, base_url=base_url)
 
         return self._fastrouter_client
@@ -734,6 +921,7 @@ class LLMService:
 
         return temp_path
 
+    @instrumented("llm", "judge")
     async def _score_answer_with_fastrouter(
         self,
         *,
@@ -794,6 +982,112 @@ class LLMService:
 
         return cast(Dict[str, Any], parsed)
 
+    @instrumented("llm", "embed_query")
+    async def embed_query(
+        self,
+        embedding_model: str,
+        question: str,
+        *,
+        dimension: Optional[int] = None,
+    ) -> List[float]:
+        """Embed a single chat question with the pipeline's embedding model."""
+
+        vectors = await self.embed_queries(embedding_model, [question], dimension=dimension)
+        return vectors[0] if vectors else []
+
+    @instrumented("llm", "embed_queries")
+    async def embed_queries(
+        self,
+        embedding_model: str,
+        questions: Sequence[str],
+        *,
+        dimension: Optional[int] = None,
+    ) -> List[List[float]]:
+        """Embed several chat questions in one call to the embedding backend."""
+
+        candidate = (embedding_model or "").strip()
+        if candidate not in get_args(EmbeddingModel):
+            raise LLMServiceError(f"Unsupported embedding model '{embedding_model}'")
+        if not questions:
+            return []
+        return await self._generate_embeddings(cast(EmbeddingModel, candidate), questions, dimension)
+
+    async def _generate_embeddings(
+        self,
+        embedding_model: EmbeddingModel,
+        texts: Sequence[str],
+        dimension: Optional[int],
+    ) -> List[List[float]]:
+        """Embed ``texts``, reusing vectors any worker already computed for them."""
+
+        ttl = self._settings.embedding_cache_ttl_seconds
+        if self._shared is None or not ttl:
+            return await self._embedding_service.generate(embedding_model, list(texts), dimensions=dimension)
+
+        keys = [cache_key("embedding", embedding_model, dimension, text) for text in texts]
+        found = await self._shared.get_many_async(keys)
+        SHARED_CACHE_REQUESTS.inc(len(found), cache="embedding", result="hit")
+        missing = [index for index, key in enumerate(keys) if key not in found]
+        vectors: List[Optional[List[float]]] = [decode_vector(found[key]) if key in found else None for key in keys]
+        if missing:
+            SHARED_CACHE_REQUESTS.inc(len(missing), cache="embedding", result="miss")
+            generated = await self._embedding_service.generate(
+                embedding_model,
+                [texts[index] for index in missing],
+                dimensions=dimension,
+            )
+            if len(generated) != len(missing):
+                raise LLMServiceError("Embedding backend returned an unexpected number of vectors", status_code=502)
+            for index, vector in zip(missing, generated):
+                vectors[index] = vector
+            await self._shared.set_many_async(
+                ((keys[index], encode_vector(vector)) for index, vector in zip(missing, generated)), ttl
+            )
+        return cast(List[List[float]], vectors)
+
+    async def _retrieval_cache_key(
+        self,
+        vector_store: VectorStore,
+        embedding_model: EmbeddingModel,
+        query_vector: Sequence[float],
+        *,
+        top_k: int,
+        dataset_ids: Optional[List[str]],
+        pinecone: Optional[PineconeConfig],
+        chroma: Optional[ChromaIndexConfig],
+        mmr: bool,
+        mmr_lambda: Optional[float],
+        sources: Optional[Sequence[RetrievalSource]],
+    ) -> str:
+        assert self._shared is not None
+        all_ids = list(dataset_ids or []) + [dataset_id for source in sources or [] for dataset_id in source.dataset_ids]
+        # Re-embedding a dataset bumps its generation, which retires every key derived from it.
+        generations = await dataset_generations(self._shared, list(dict.fromkeys(all_ids)))
+
+        def tagged(ids: Sequence[str]) -> str:
+            return ",".join(f"{dataset_id}#{generations[dataset_id]}" for dataset_id in ids)
+
+        source_parts = [
+            f"{source.vector_store}|{tagged(source.dataset_ids)}|{_pinecone_cache_part(source.pinecone)}|"
+            f"{_chroma_cache_part(source.chroma)}"
+            for source in sources or []
+        ]
+        return cache_key(
+            "retrieval",
+            vector_store,
+            embedding_model,
+            hashlib.sha256(encode_vector(query_vector)).hexdigest(),
+            top_k,
+            tagged(dataset_ids or []),
+            _pinecone_cache_part(pinecone),
+            _chroma_cache_part(chroma),
+            ";".join(source_parts),
+            mmr,
+            mmr_lambda,
+            self._settings.vector_layout,
+        )
+
+    @instrumented("llm", "retrieval")
     async def _retrieve_context(
         self,
         vector_store: VectorStore,
@@ -803,33 +1097,95 @@ class LLMService:
         top_k: int,
         dataset_ids: Optional[List[str]],
         pinecone: Optional[PineconeConfig],
+        chroma: Optional[ChromaIndexConfig] = None,
+        mmr: bool = False,
+        mmr_lambda: Optional[float] = None,
+        sources: Optional[Sequence[RetrievalSource]] = None,
+    ) -> List[RetrievedContext]:
+        ttl = self._settings.retrieval_cache_ttl_seconds
+        key: Optional[str] = None
+        if self._shared is not None and ttl:
+            key = await self._retrieval_cache_key(
+                vector_store,
+                embedding_model,
+                query_vector,
+                top_k=top_k,
+                dataset_ids=dataset_ids,
+                pinecone=pinecone,
+                chroma=chroma,
+                mmr=mmr,
+                mmr_lambda=mmr_lambda,
+                sources=sources,
+            )
+            payload = await self._shared.get_async(key)
+            cached = _decode_contexts(payload) if payload is not None else None
+            SHARED_CACHE_REQUESTS.inc(cache="retrieval", result="hit" if cached is not None else "miss")
+            if cached is not None:
+                return cached
+
+        contexts = await self._query_vector_store(
+            vector_store,
+            embedding_model,
+            query_vector,
+            top_k=top_k,
+            dataset_ids=dataset_ids,
+            pinecone=pinecone,
+            chroma=chroma,
+            mmr=mmr,
+            mmr_lambda=mmr_lambda,
+            sources=sources,
+        )
+        if key is not None:
+            await self._shared.set_async(key, _encode_contexts(contexts), ttl)
+        return contexts
+
+    async def _query_vector_store(
+        self,
+        vector_store: VectorStore,
+        embedding_model: EmbeddingModel,
+        query_vector: List[float],
+        *,
+        top_k: int,
+        dataset_ids: Optional[List[str]],
+        pinecone: Optional[PineconeConfig],
+        chroma: Optional[ChromaIndexConfig],
+        mmr: bool,
+        mmr_lambda: Optional[float],
+        sources: Optional[Sequence[RetrievalSource]],
     ) -> List[RetrievedContext]:
         try:
+            if sources:
+                return await self._vector_store_service.query_many(
+                    sources,
+                    query_vector,
+                    embedding_model=embedding_model,
+                    top_k=top_k,
+                    mmr=mmr,
+                    mmr_lambda=mmr_lambda,
+                )
             return await self._vector_store_service.query(
                 vector_store,
                 query_vector,
                 embedding_model=embedding_model,
                 top_k=top_k,
                 pinecone=pinecone,
+                chroma=chroma,
                 dataset_ids=dataset_ids,
+                mmr=mmr,
+                mmr_lambda=mmr_lambda,
             )
         except VectorStoreServiceError as exc:
             raise LLMServiceError(str(exc), status_code=502) from exc
 
-    def _build_context_window(self, chunks: List[RetrievedContext]) -> str:
-        if not chunks:
-            return "No external docs available."
-
-        seen: set[str] = set()
-        ordered: List[str] = []
-        for chunk in chunks:
-            text = chunk.text.strip()
-            if not text or text in seen:
-                continue
-            seen.add(text)
-            ordered.append(text)
-
-        return "\n\n".join(ordered) if ordered else "No external docs available."
+    def _build_context_window(
+        self,
+        chunks: List[RetrievedContext],
+        *,
+        model_id: Optional[str] = None,
+        token_budget: Optional[int] = None,
+    ) -> ContextWindow:
+        budget = resolve_token_budget(model_id, self._settings.context_token_budget, token_budget)
+        return self._context_assembler.assemble(chunks, budget)
 
     def _format_model_label(self, model_id: str) -> str:
         candidate = model_id.split("/")[-1] if model_id else model_id
@@ -837,6 +1193,7 @@ class LLMService:
         formatted = " ".join(word.upper() if word in {"gpt", "llama", "oss", "xai"} else word.capitalize() for word in candidate.split())
         return formatted or model_id
 
+    @instrumented("llm")
     async def test_configuration(
         self,
         provider: ProviderLiteral,
@@ -887,11 +1244,12 @@ class LLMService:
             )
             
             # Generate answer using the LLM
-            context_text = self._build_context_window(context_chunks)
-            llm_response = await test_chain.ainvoke({
-                "question": test_question,
-                "context": context_text
-            })
+            context_window = self._build_context_window(context_chunks, model_id=model_id)
+            with timer("llm", "generation"):
+                llm_response = await test_chain.ainvoke({
+                    "question": test_question,
+                    "context": context_window.text
+                })
             
             generated_answer = llm_response.content if hasattr(llm_response, 'content') else str(llm_response)
             
@@ -899,10 +1257,12 @@ class LLMService:
                 "question": test_question,
                 "answer": generated_answer,
                 "context_chunks_found": len(context_chunks),
+                "context_chunks_used": len(context_window.chunks),
+                "prompt_tokens_saved": context_window.tokens_saved,
                 "model_used": model_id,
                 "provider": provider,
                 "context": [
-                    {"text": chunk.text, "score": chunk.score, "metadata": {}} 
+                    {"text": chunk.text, "score": chunk.score, "similarity": chunk.similarity, "metadata": {}}
                     for chunk in context_chunks[:5]
                 ]
             }
@@ -912,6 +1272,7 @@ class LLMService:
             raise LLMServiceError(f"Configuration test failed: {str(e)}")
 
 
+    @instrumented("llm")
     async def public_chat(
         self,
         *,
@@ -925,7 +1286,41 @@ class LLMService:
         top_k: int,
         question: str,
         pinecone: Optional[PineconeConfig],
+        chroma: Optional[Union[ChromaIndexConfig, Dict[str, Any]]] = None,
+        context_token_budget: Optional[int] = None,
+        mmr: Union[bool, str] = False,
+        mmr_lambda: Optional[float] = None,
+        cache_namespace: Optional[str] = None,
+        cache_threshold: Optional[float] = None,
+        min_score: Optional[float] = None,
+        sources: Optional[Sequence[Any]] = None,
+        query_vector: Optional[Sequence[float]] = None,
+        on_token: Optional[Callable[[str], Awaitable[None]]] = None,
+        conversation_key: Optional[str] = None,
     ) -> Dict[str, Any]:
+        """Answer ``question`` using the pipeline's retrieval and LLM settings.
+
+        When ``cache_namespace`` is provided, semantically equivalent questions
+        for the same pipeline configuration are served from the answer cache.
+        With ``min_score`` set, chunks below that similarity are discarded and,
+        if none remain, a fixed "not in context" answer is returned without
+        calling the LLM. ``sources`` switches to federated retrieval across
+        several stores and dataset groups queried concurrently.
+
+        ``query_vector`` may carry an embedding computed ahead of time. The
+        chain is looked up on a worker thread while retrieval is in flight,
+        and per-stage timings are returned under ``timings``.
+
+        ``on_token`` switches generation to streaming and is awaited with each
+        piece of the answer as the model produces it. Cached and skipped
+        answers are returned whole without calling it.
+
+        ``conversation_key`` enables conversation memory: the summary and the
+        recent turns that fit the history budget are added to the prompt, a
+        follow-up that leans on earlier turns is rewritten into a standalone
+        retrieval query, and the answered turn is recorded afterwards.
+        """
+
         provider_candidate = (provider or "").strip().lower()
         if provider_candidate not in PROVIDER_METADATA:
             raise LLMServiceError(f"Unsupported provider '{provider}'")
@@ -934,17 +1329,29 @@ class LLMService:
         if not model_id or not model_id.strip():
             raise LLMServiceError("Model identifier is required for chat")
 
+        if min_score is not None:
+            try:
+                min_score = float(min_score)
+            except (TypeError, ValueError) as exc:
+                raise LLMServiceError("minScore must be a number between -1 and 1") from exc
+
         dataset_id_list = [str(entry).strip() for entry in (dataset_ids or []) if str(entry).strip()]
+        retrieval_sources = _parse_retrieval_sources(sources or [])
+        if retrieval_sources:
+            # Federated pipelines read every source's datasets; keep them for cache scoping.
+            dataset_id_list = list(
+                dict.fromkeys(dataset_id for source in retrieval_sources for dataset_id in source.dataset_ids)
+            )
 
         embedding_literal: Optional[EmbeddingModel] = None
         vector_literal: Optional[VectorStore] = None
-        if dataset_id_list and embedding_model and vector_store:
+        if dataset_id_list and embedding_model and (vector_store or retrieval_sources):
             embedding_candidate = embedding_model.strip()
             if embedding_candidate not in get_args(EmbeddingModel):
                 raise LLMServiceError(f"Unsupported embedding model '{embedding_model}'")
             embedding_literal = cast(EmbeddingModel, embedding_candidate)
 
-            vector_candidate = vector_store.strip()
+            vector_candidate = (vector_store or retrieval_sources[0].vector_store).strip()
             if vector_candidate not in get_args(VectorStore):
                 raise LLMServiceError(f"Unsupported vector store '{vector_store}'")
             vector_literal = cast(VectorStore, vector_candidate)
@@ -955,64 +1362,294 @@ class LLMService:
             raise LLMServiceError("FastRouter API key is not configured")
 
         resolved_prompt = (system_prompt or "").strip() or DEFAULT_SYSTEM_PROMPT
-        answer_chain = self._build_chain(
-            model=model_id,
-            api_key=api_key,
-            base_url=base_url,
-            system_prompt=resolved_prompt,
-        )
+        safe_top_k = max(1, int(top_k) if isinstance(top_k, (int, float)) else 30)
 
         context_snippets: List[str] = []
         context_text = ""
         contexts: List[RetrievedContext] = []
+        prompt_tokens_saved = 0
+        cache_fingerprint: Optional[str] = None
+        cacheable_vector: Optional[List[float]] = None
 
-        # Convert Pinecone config if it's a dict (from Node backend)
-        if isinstance(pinecone, dict):
-            try:
-                # Map camelCase to snake_case
-                pinecone_data = {
-                    "api_key": pinecone.get("apiKey") or pinecone.get("api_key"),
-                    "index_name": pinecone.get("indexName") or pinecone.get("index_name"),
-                    "namespace": pinecone.get("namespace"),
-                }
-                pinecone = PineconeConfig(**pinecone_data)
-            except Exception as exc:
-                logger.warning(f"Failed to convert Pinecone config: {exc}")
+        timings: Dict[str, float] = {}
+
+        # Convert Pinecone and Chroma configs if they are dicts (from Node backend)
+        pinecone = _coerce_pinecone_config(pinecone)
+        chroma = _coerce_chroma_config(chroma)
+        mmr = _coerce_flag(mmr, "mmr")
+
+        chain_task = asyncio.create_task(
+            asyncio.to_thread(
+                self._get_chain,
+                model=model_id,
+                api_key=api_key,
+                base_url=base_url,
+                system_prompt=resolved_prompt,
+            )
+        )
+
+        history_text = ""
+        retrieval_question = question
+        conversation = (
+            # The store may sit on the SQLite or Redis shared cache.
+            await asyncio.to_thread(self._conversations.get, conversation_key)
+            if conversation_key and self._conversations is not None
+            else None
+        )
+        if conversation is not None and not conversation.is_empty:
+            history_text = self._conversations.render(conversation, self._settings.conversation_history_token_budget)
+            # Answers now depend on the conversation, so they must not be shared.
+            cache_namespace = None
+            if needs_standalone_rewrite(question, has_history=bool(history_text)):
+                stage_started = time.perf_counter()
+                retrieval_question = await self._rewrite_follow_up(model_id, history_text, question)
+                timings["rewrite_ms"] = _elapsed_ms(stage_started)
+                if retrieval_question != question:
+                    query_vector = None
 
         if embedding_literal and vector_literal and dataset_id_list:
             try:
-                question_vector = await self._embedding_service.generate(
-                    embedding_literal,
-                    [question],
-                    dimensions=embedding_dimension,
-                )
-                
+                stage_started = time.perf_counter()
+                if query_vector:
+                    question_vector = [list(query_vector)]
+                else:
+                    question_vector = await self._generate_embeddings(
+                        embedding_literal,
+                        [retrieval_question],
+                        embedding_dimension,
+                    )
+                    timings["embedding_ms"] = _elapsed_ms(stage_started)
+
+                if cache_namespace and self._answer_cache is not None:
+                    fingerprint_ids = dataset_id_list
+                    if self._shared is not None:
+                        # Other workers' re-embeds cannot reach this process's answer cache directly.
+                        generations = await dataset_generations(self._shared, dataset_id_list)
+                        fingerprint_ids = [f"{dataset_id}#{generations[dataset_id]}" for dataset_id in dataset_id_list]
+                    cache_fingerprint = self._answer_cache.fingerprint(
+                        model_id=model_id,
+                        system_prompt=resolved_prompt,
+                        embedding_model=embedding_literal,
+                        embedding_dimension=embedding_dimension,
+                        dataset_ids=fingerprint_ids,
+                        top_k=safe_top_k,
+                        vector_store=(
+                            f"{vector_literal}|{_pinecone_cache_part(pinecone)}|{_chroma_cache_part(chroma)}"
+                        ),
+                        mmr=mmr,
+                        mmr_lambda=mmr_lambda,
+                        min_score=min_score,
+                        context_token_budget=context_token_budget,
+                        sources=[
+                            f"{source.vector_store}|{','.join(source.dataset_ids)}|"
+                            f"{_pinecone_cache_part(source.pinecone)}|{_chroma_cache_part(source.chroma)}"
+                            for source in retrieval_sources
+                        ],
+                    )
+                    stage_started = time.perf_counter()
+                    cached = self._answer_cache.lookup(
+                        cache_namespace,
+                        cache_fingerprint,
+                        question_vector[0],
+                        threshold=cache_threshold,
+                    )
+                    timings["cache_lookup_ms"] = _elapsed_ms(stage_started)
+                    if cached is not None:
+                        chain_task.cancel()
+                        await self._remember_turn(conversation_key, question, cached.answer, model_id)
+                        return {
+                            "answer": cached.answer,
+                            "provider": provider_literal,
+                            "model": model_id,
+                            "context_snippets": cached.context_snippets,
+                            "context": [],
+                            "prompt_tokens_saved": 0,
+                            "cached": True,
+                            "skipped_generation": False,
+                            "timings": timings,
+                        }
+
+                stage_started = time.perf_counter()
                 contexts = await self._retrieve_context(
                     vector_literal,
                     embedding_literal,
                     question_vector[0],
-                    top_k=max(1, int(top_k) if isinstance(top_k, (int, float)) else 30),
+                    top_k=safe_top_k,
                     dataset_ids=dataset_id_list,
                     pinecone=pinecone,
+                    chroma=chroma,
+                    mmr=mmr,
+                    mmr_lambda=mmr_lambda,
+                    sources=retrieval_sources,
                 )
-
-                context_snippets = _prepare_context_snippets(contexts)
-                context_text = self._build_context_window(contexts)
+                timings["retrieval_ms"] = _elapsed_ms(stage_started)
+
+                if min_score is not None:
+                    contexts = [
+                        context
+                        for context in contexts
+                        if context.similarity is None or context.similarity >= min_score
+                    ]
+                    if not contexts:
+                        chain_task.cancel()
+                        await self._remember_turn(conversation_key, question, NO_RELEVANT_CONTEXT_ANSWER, model_id)
+                        return {
+                            "answer": NO_RELEVANT_CONTEXT_ANSWER,
+                            "provider": provider_literal,
+                            "model": model_id,
+                            "context_snippets": [],
+                            "context": [],
+                            "prompt_tokens_saved": 0,
+                            "cached": False,
+                            "skipped_generation": True,
+                            "timings": timings,
+                        }
+
+                stage_started = time.perf_counter()
+                context_window = self._build_context_window(
+                    contexts,
+                    model_id=model_id,
+                    token_budget=context_token_budget,
+                )
+                context_snippets = _prepare_context_snippets(context_window.chunks)
+                context_text = context_window.text
+                prompt_tokens_saved = context_window.tokens_saved
+                cacheable_vector = question_vector[0]
+                timings["context_ms"] = _elapsed_ms(stage_started)
             except Exception as exc:  # pragma: no cover - defensive guard
                 logger.warning("Context retrieval failed for public chat: %s", exc)
 
-        llm_response = await answer_chain.ainvoke({"question": question, "context": context_text})
-        model_answer = getattr(llm_response, "content", None) or str(llm_response)
+        # Usually already resolved: the lookup overlapped with embedding and retrieval.
+        stage_started = time.perf_counter()
+        answer_chain = await chain_task
+        timings["chain_wait_ms"] = _elapsed_ms(stage_started)
+
+        stage_started = time.perf_counter()
+        chain_input = {
+            "question": question,
+            "context": context_text,
+            "history": f"Conversation so far:\n{history_text}\n\n" if history_text else "",
+        }
+        with timer("llm", "generation"):
+            if on_token is None:
+                llm_response = await answer_chain.ainvoke(chain_input)
+                model_answer = (getattr(llm_response, "content", None) or str(llm_response)).strip()
+            else:
+                pieces: List[str] = []
+                async for chunk in answer_chain.astream(chain_input):
+                    piece = getattr(chunk, "content", None) or ""
+                    if isinstance(piece, str) and piece:
+                        pieces.append(piece)
+                        await on_token(piece)
+                model_answer = "".join(pieces).strip()
+        timings["generation_ms"] = _elapsed_ms(stage_started)
+
+        # Only answers grounded in a successful retrieval are worth reusing.
+        if cache_namespace and cache_fingerprint and cacheable_vector is not None and self._answer_cache is not None:
+            self._answer_cache.store(
+                cache_namespace,
+                cache_fingerprint,
+                cacheable_vector,
+                answer=model_answer,
+                context_snippets=context_snippets,
+                dataset_ids=dataset_id_list,
+            )
+        await self._remember_turn(conversation_key, question, model_answer, model_id)
 
         return {
-            "answer": model_answer.strip(),
+            "answer": model_answer,
             "provider": provider_literal,
             "model": model_id,
             "context_snippets": context_snippets,
             "context": contexts,
+            "prompt_tokens_saved": prompt_tokens_saved,
+            "cached": False,
+            "skipped_generation": False,
+            "rewritten_query": retrieval_question if retrieval_question != question else None,
+            "timings": timings,
         }
 
+    # ------------------------------------------------------------------
+    # Conversation memory
+    # ------------------------------------------------------------------
+    async def _complete(self, model_id: str, system: str, user: str, *, max_tokens: int) -> str:
+        """Run a short, non-streaming completion for memory housekeeping."""
 
+        client = self._get_fastrouter_client()
+        response = await asyncio.to_thread(
+            client.chat.completions.create,
+            model=model_id,
+            messages=[{"role": "system", "content": system}, {"role": "user", "content": user}],
+            # Claude models with :thinking suffix require temperature=1
+            temperature=1.0 if ":thinking" in model_id.lower() else 0.0,
+            max_tokens=max_tokens,
+        )
+        content = response.choices[0].message.content if response.choices else ""
+        return (content or "").strip()
+
+    @instrumented("llm", "rewrite_follow_up")
+    async def _rewrite_follow_up(self, model_id: str, history_text: str, question: str) -> str:
+        """Turn a follow-up into a standalone retrieval query; fall back to ``question``."""
+
+        try:
+            rewritten = await self._complete(
+                model_id,
+                FOLLOW_UP_REWRITE_PROMPT,
+                f"Conversation:\n{history_text}\n\nFollow-up question: {question}",
+                max_tokens=96,
+            )
+        except Exception as exc:  # noqa: BLE001 - retrieval still works with the raw question
+            logger.warning("Follow-up rewrite failed: %s", exc)
+            return question
+        rewritten = rewritten.strip().strip('"').strip()
+        return rewritten if rewritten and len(rewritten) <= 4 * len(question) + 200 else question
+
+    async def _remember_turn(self, conversation_key: Optional[str], question: str, answer: str, model_id: str) -> None:
+        """Record the turn and, when the history outgrew its budget, summarize in the background."""
+
+        if not conversation_key or self._conversations is None:
+            return
+        budget = self._settings.conversation_history_token_budget
+        conversation = await asyncio.to_thread(self._conversations.append, conversation_key, question, answer)
+        if not self._conversations.turns_to_fold(conversation, budget):
+            return
+        # Claims go through the shared cache when there is one, so only one worker summarizes.
+        if not await asyncio.to_thread(self._conversations.claim_compaction, conversation_key):
+            return
+        task = asyncio.create_task(self._compact_conversation(conversation_key, model_id))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    @instrumented("llm", "summarize_conversation")
+    async def _compact_conversation(self, conversation_key: str, model_id: str) -> None:
+        """Fold the oldest turns into the conversation's running summary."""
+
+        assert self._conversations is not None
+        budget = self._settings.conversation_history_token_budget
+        try:
+            conversation = await asyncio.to_thread(self._conversations.get, conversation_key)
+            if conversation is None:
+                return
+            folded = self._conversations.turns_to_fold(conversation, budget)
+            if not folded:
+                return
+            summary_budget = self._conversations.summary_budget(budget)
+            transcript = "\n\n".join(turn.render() for turn in folded)
+            summary = await self._complete(
+                model_id,
+                CONVERSATION_SUMMARY_PROMPT.format(max_words=int(summary_budget * 0.75)),
+                f"Existing summary:\n{conversation.summary or '(none)'}\n\nNew turns:\n{transcript}",
+                max_tokens=summary_budget,
+            )
+            if summary:
+                await asyncio.to_thread(self._conversations.fold, conversation_key, summary, folded)
+        except Exception as exc:  # noqa: BLE001 - the verbatim turns are kept for the next attempt
+            logger.warning("Conversation summarization failed: %s", exc)
+        finally:
+            await asyncio.to_thread(self._conversations.release_compaction, conversation_key)
+
+
+    @instrumented("llm")
     async def evaluate_from_csv(
         self,
         *,
@@ -1130,15 +1767,16 @@ class LLMService:
                 pinecone=pinecone,
             )
 
-            context_snippets = _prepare_context_snippets(contexts)
-            context_text = self._build_context_window(contexts)
+            context_window = self._build_context_window(contexts, model_id=model_id)
+            context_snippets = _prepare_context_snippets(context_window.chunks)
 
-            llm_response = await answer_chain.ainvoke(
-                {
-                    "question": row.question,
-                    "context": context_text,
-                }
-            )
+            with timer("llm", "generation"):
+                llm_response = await answer_chain.ainvoke(
+                    {
+                        "question": row.question,
+                        "context": context_window.text,
+                    }
+                )
             model_answer = getattr(llm_response, "content", None) or str(llm_response)
 
             evaluation_payload = await self._score_answer_with_fastrouter(
@@ -1262,6 +1900,10 @@ class LLMService:
             },
         }
 
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 2)
+
+
 def _safe_float(value: Any) -> float:
     try:
         numeric = float(value)
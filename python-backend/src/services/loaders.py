@@ -9,9 +9,8 @@ from pathlib import Path
 from typing import Iterable
 
 import httpx
-from bs4 import BeautifulSoup
 
-from ..utils import clean_text, get_logger
+from ..utils import clean_text, get_logger, instrumented
 
 logger = get_logger(__name__)
 
@@ -87,6 +86,7 @@ class DatasetLoader:
         except Exception as e:
             logger.warning(f"Startup cleanup failed: {e}")
 
+    @instrumented("loader")
     async def load_and_chunk(
         self,
         dataset_type: str,
@@ -125,6 +125,7 @@ class DatasetLoader:
             raise UnsupportedDatasetError(f"Unsupported dataset type: {dataset_type}")
 
         return self._chunk_text(text, options)
+    @instrumented("loader", "pdf_parse")
     def _load_pdf(self, path: Path) -> str:
         """Extract text from PDF file."""
 
@@ -165,9 +166,12 @@ class DatasetLoader:
             raise DatasetNotFoundError(f"Dataset file not found at {resolved}")
         return resolved
 
+    @instrumented("loader", "web_fetch")
     async def _load_from_urls(self, urls: Iterable[str]) -> str:
         """Fetch and aggregate textual content from the provided URLs."""
 
+        from bs4 import BeautifulSoup
+
         contents: list[str] = []
         failures: list[str] = []
         default_headers = {
@@ -232,6 +236,7 @@ class DatasetLoader:
 
         return "\n\n".join(contents)
 
+    @instrumented("loader", "csv_parse")
     def _load_csv(self, path: Path) -> list[str]:
         """Load CSV file and convert each record into a structured text row."""
 
@@ -295,6 +300,7 @@ class DatasetLoader:
 
         return chunks
 
+    @instrumented("loader", "json_parse")
     def _load_json(self, path: Path) -> str:
         """Flatten JSON file into key-value text representation."""
 
@@ -322,6 +328,7 @@ class DatasetLoader:
         else:
             yield f"{prefix}: {payload}"
 
+    @instrumented("loader", "chunk")
     def _chunk_text(self, text: str, options: ChunkingOptions) -> list[dict[str, str | int]]:
         """Chunk the provided text using sliding window strategy."""
 
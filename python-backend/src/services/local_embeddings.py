@@ -0,0 +1,193 @@
+"""CPU-only ONNX embedding engine backing the ``huggingface`` model option.
+
+The engine expects a sentence-transformers model exported to ONNX, laid out as
+``<model_dir>/model_quantized.onnx`` (or ``model.onnx``) plus
+``<model_dir>/tokenizer.json`` — for example the ``onnx/`` export of
+``sentence-transformers/all-MiniLM-L6-v2``. Nothing is downloaded at runtime:
+``python -m scripts.fetch_local_embedding_model`` fetches it into
+``LOCAL_EMBEDDING_MODEL_DIR`` ahead of time.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, List, Optional, Sequence
+
+import numpy as np
+
+from ..utils import get_logger
+
+
+logger = get_logger(__name__)
+
+
+MODEL_FILENAMES = ("model_quantized.onnx", "model_int8.onnx", "model.onnx")
+TOKENIZER_FILENAME = "tokenizer.json"
+# Rough activation footprint per token across a MiniLM-sized encoder (float32).
+_ACTIVATION_BYTES_PER_TOKEN = 384 * 4 * 24
+
+
+class LocalEmbeddingError(RuntimeError):
+    """Raised when the local embedding engine cannot load or run the model."""
+
+
+class LocalEmbeddingEngine:
+    """Lazily loaded ONNX sentence encoder with batched, pooled inference."""
+
+    def __init__(
+        self,
+        model_dir: Path,
+        *,
+        max_memory_mb: int = 512,
+        batch_size: int = 32,
+        workers: int = 2,
+        max_length: int = 256,
+    ) -> None:
+        self._model_dir = Path(model_dir).expanduser()
+        self._max_memory_bytes = max(64, max_memory_mb) * 1024 * 1024
+        self._batch_size = max(1, batch_size)
+        self._workers = max(1, workers)
+        self._max_length = max(8, max_length)
+        self._session: Any = None
+        self._tokenizer: Any = None
+        self._input_names: tuple[str, ...] = ()
+        self._model_bytes = 0
+        self._load_lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._session is not None
+
+    def encode(self, texts: Sequence[str]) -> List[List[float]]:
+        """Embed ``texts`` synchronously and return unit-normalised vectors."""
+
+        if not texts:
+            return []
+        self._ensure_loaded()
+        batch_size = self._effective_batch_size()
+        vectors: List[np.ndarray] = []
+        for start in range(0, len(texts), batch_size):
+            vectors.append(self._run_batch(texts[start : start + batch_size]))
+        return np.vstack(vectors).tolist()
+
+    async def encode_async(self, texts: Sequence[str]) -> List[List[float]]:
+        """Embed ``texts`` on the engine's thread pool, running batches in parallel."""
+
+        if not texts:
+            return []
+        loop = asyncio.get_running_loop()
+        executor = self._ensure_executor()
+        await loop.run_in_executor(executor, self._ensure_loaded)
+
+        batch_size = self._effective_batch_size()
+        batches = [texts[start : start + batch_size] for start in range(0, len(texts), batch_size)]
+        results = await asyncio.gather(
+            *(loop.run_in_executor(executor, self._run_batch, batch) for batch in batches)
+        )
+        return np.vstack(results).tolist()
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+    def _ensure_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._load_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self._workers,
+                        thread_name_prefix="local-embed",
+                    )
+        return self._executor
+
+    def _ensure_loaded(self) -> None:
+        if self._session is not None:
+            return
+        with self._load_lock:
+            if self._session is not None:
+                return
+            self._load()
+
+    def _load(self) -> None:
+        try:
+            import onnxruntime as ort
+            from tokenizers import Tokenizer
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise LocalEmbeddingError(
+                "onnxruntime and tokenizers are required for local embeddings. "
+                "Install them with `pip install onnxruntime tokenizers`."
+            ) from exc
+
+        model_path = next(
+            (self._model_dir / name for name in MODEL_FILENAMES if (self._model_dir / name).is_file()),
+            None,
+        )
+        tokenizer_path = self._model_dir / TOKENIZER_FILENAME
+        if model_path is None or not tokenizer_path.is_file():
+            raise LocalEmbeddingError(
+                f"Local embedding model not found in {self._model_dir}; expected one of "
+                f"{', '.join(MODEL_FILENAMES)} and {TOKENIZER_FILENAME}; "
+                "run `python -m scripts.fetch_local_embedding_model` or set LOCAL_EMBEDDING_MODEL_DIR"
+            )
+
+        self._model_bytes = model_path.stat().st_size
+        if self._model_bytes * 2 > self._max_memory_bytes:
+            raise LocalEmbeddingError(
+                f"Local embedding model {model_path.name} ({self._model_bytes // (1024 * 1024)} MB) "
+                f"exceeds the configured memory ceiling"
+            )
+
+        options = ort.SessionOptions()
+        # Arena pre-allocation is what pushes small encoders past the Render memory limit.
+        options.enable_cpu_mem_arena = False
+        options.enable_mem_pattern = False
+        options.intra_op_num_threads = max(1, (os.cpu_count() or 1) // self._workers)
+        options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        session = ort.InferenceSession(str(model_path), sess_options=options, providers=["CPUExecutionProvider"])
+
+        tokenizer = Tokenizer.from_file(str(tokenizer_path))
+        tokenizer.enable_truncation(max_length=self._max_length)
+        tokenizer.enable_padding()
+
+        self._input_names = tuple(node.name for node in session.get_inputs())
+        self._tokenizer = tokenizer
+        self._session = session
+        logger.info(
+            "Loaded local embedding model",
+            extra={"model": str(model_path), "size_mb": self._model_bytes // (1024 * 1024)},
+        )
+
+    # ------------------------------------------------------------------
+    # Inference
+    # ------------------------------------------------------------------
+    def _effective_batch_size(self) -> int:
+        budget = self._max_memory_bytes - self._model_bytes * 2
+        per_sequence = self._max_length * _ACTIVATION_BYTES_PER_TOKEN
+        return max(1, min(self._batch_size, budget // per_sequence if budget > 0 else 1))
+
+    def _run_batch(self, texts: Sequence[str]) -> np.ndarray:
+        encodings = self._tokenizer.encode_batch(list(texts))
+        input_ids = np.asarray([encoding.ids for encoding in encodings], dtype=np.int64)
+        attention_mask = np.asarray([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._input_names:
+            feeds["token_type_ids"] = np.asarray([encoding.type_ids for encoding in encodings], dtype=np.int64)
+        feeds = {name: value for name, value in feeds.items() if name in self._input_names}
+
+        token_embeddings = self._session.run(None, feeds)[0]
+
+        # Mean pooling over non-padding tokens, then L2 normalisation.
+        mask = attention_mask[..., np.newaxis].astype(np.float32)
+        summed = (token_embeddings * mask).sum(axis=1)
+        counts = np.clip(mask.sum(axis=1), 1e-9, None)
+        pooled = summed / counts
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (pooled / norms).astype(np.float32)
@@ -0,0 +1,698 @@
+"""Self-hosted vector store backed by memory-mapped NumPy files.
+
+Each collection directory holds full-precision vectors (``vectors.f32``,
+memory-mapped and only paged in for re-scoring), compact coarse codes that are
+kept in RAM and scanned for every query (``codes.i8`` + ``scales.f32`` or
+``codes.bits``), and the chunk records (``records.jsonl``).
+
+Deletes only flip a per-row byte in ``tombstones.u8``; a background thread
+compacts the files once enough rows are dead. Collections past
+``ann_min_rows`` also get an IVF index (see :mod:`.ann_index`) so queries
+scan a few inverted lists instead of every row.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from threading import Lock, RLock, Thread
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..utils import get_logger
+from .ann_index import IVFIndex, assign_lists, suggested_list_count, train_centroids
+from .quantization import (
+    QuantizationMode,
+    binarize,
+    bytes_per_vector,
+    hamming_scores,
+    int8_scores,
+    normalize,
+    quantize_int8,
+)
+
+
+logger = get_logger(__name__)
+
+
+META_FILENAME = "meta.json"
+VECTORS_FILENAME = "vectors.f32"
+RECORDS_FILENAME = "records.jsonl"
+INT8_CODES_FILENAME = "codes.i8"
+INT8_SCALES_FILENAME = "scales.f32"
+BINARY_CODES_FILENAME = "codes.bits"
+TOMBSTONES_FILENAME = "tombstones.u8"
+
+# Rows scored per block while scanning coarse codes, bounding temporary memory.
+SCAN_BLOCK_ROWS = 65536
+# Sign bits discard more information than int8, so they need a wider shortlist.
+BINARY_SHORTLIST_FACTOR = 4
+DEFAULT_ANN_MIN_ROWS = 50_000
+DEFAULT_ANN_NPROBE = 16
+# Fraction of dead rows that triggers a background compaction.
+DEFAULT_COMPACTION_RATIO = 0.2
+# Rows copied per block by a compaction, bounding how much of vectors.f32 is paged in at once.
+COMPACTION_BLOCK_ROWS = 8192
+
+
+class LocalVectorStoreError(RuntimeError):
+    """Raised when the local vector store cannot read or write a collection."""
+
+
+@dataclass(slots=True)
+class LocalRecord:
+    """Chunk payload stored alongside a vector."""
+
+    id: str
+    dataset_id: str
+    text: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class LocalMatch:
+    """Search hit with cosine similarity and, optionally, its float vector."""
+
+    record: LocalRecord
+    similarity: float
+    embedding: Optional[List[float]] = None
+
+
+class LocalVectorCollection:
+    """Append-only collection of unit-normalised vectors for one model and dimension.
+
+    Deleted rows stay on disk behind tombstones until a compaction rewrites the
+    files; searches mask them out in the meantime.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        dimension: int,
+        quantization: QuantizationMode = "int8",
+        *,
+        ann_min_rows: int = DEFAULT_ANN_MIN_ROWS,
+        ann_nprobe: int = DEFAULT_ANN_NPROBE,
+        compaction_ratio: float = DEFAULT_COMPACTION_RATIO,
+    ) -> None:
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._ann_min_rows = max(1, ann_min_rows)
+        self._ann_nprobe = max(1, ann_nprobe)
+        self._compaction_ratio = compaction_ratio
+        self._lock = RLock()
+        # Serialises compactions, which do their copying outside ``_lock``.
+        self._compaction_lock = Lock()
+        self._maintenance: Optional[Thread] = None
+        # Bumped by every compaction; row positions from an older epoch are meaningless.
+        self._epoch = 0
+        self._load_or_initialise(dimension, quantization)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def _load_or_initialise(self, dimension: int, quantization: QuantizationMode) -> None:
+        meta_path = self.path / META_FILENAME
+        if meta_path.exists():
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            self.dimension = int(meta["dimension"])
+            self.quantization: QuantizationMode = meta.get("quantization", "none")
+        else:
+            self.dimension = dimension
+            self.quantization = quantization
+            meta_path.write_text(
+                json.dumps({"dimension": dimension, "quantization": quantization}),
+                encoding="utf-8",
+            )
+
+        self._records: List[LocalRecord] = []
+        records_path = self.path / RECORDS_FILENAME
+        if records_path.exists():
+            with records_path.open("r", encoding="utf-8") as handle:
+                for line in handle:
+                    if line.strip():
+                        payload = json.loads(line)
+                        self._records.append(LocalRecord(**payload))
+
+        self._dataset_lookup: Dict[str, int] = {}
+        self._row_datasets = np.asarray(
+            [self._dataset_code(record.dataset_id) for record in self._records],
+            dtype=np.int32,
+        )
+        self._codes, self._scales = self._read_codes()
+        self._vectors: Optional[np.memmap] = None
+
+        if len(self._codes) != len(self._records):
+            raise LocalVectorStoreError(f"Local collection at {self.path} is inconsistent; rebuild it")
+
+        tombstones_path = self.path / TOMBSTONES_FILENAME
+        if tombstones_path.exists():
+            self._live = np.fromfile(tombstones_path, dtype=np.uint8) == 0
+        else:
+            self._live = np.ones(len(self._records), dtype=bool)
+            tombstones_path.write_bytes(bytes(len(self._records)))
+        if len(self._live) != len(self._records):
+            raise LocalVectorStoreError(f"Local collection at {self.path} has stale tombstones; rebuild it")
+        self._dead_rows = int((~self._live).sum())
+
+        self._ivf = IVFIndex(self.path, self.dimension)
+        if self._ivf.trained and self._ivf.rows != len(self._records):
+            logger.warning("Discarding out-of-date IVF index", extra={"collection": str(self.path)})
+            self._ivf.reset()
+        if self._needs_maintenance():
+            self._schedule_maintenance()
+
+    def _read_codes(self) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        if self.quantization == "int8":
+            codes_path = self.path / INT8_CODES_FILENAME
+            scales_path = self.path / INT8_SCALES_FILENAME
+            if not codes_path.exists():
+                return np.empty((0, self.dimension), dtype=np.int8), np.empty(0, dtype=np.float32)
+            codes = np.fromfile(codes_path, dtype=np.int8).reshape(-1, self.dimension)
+            return codes, np.fromfile(scales_path, dtype=np.float32)
+        if self.quantization == "binary":
+            width = (self.dimension + 7) // 8
+            codes_path = self.path / BINARY_CODES_FILENAME
+            if not codes_path.exists():
+                return np.empty((0, width), dtype=np.uint8), None
+            return np.fromfile(codes_path, dtype=np.uint8).reshape(-1, width), None
+        # Without quantization the float vectors themselves are scanned in RAM.
+        vectors_path = self.path / VECTORS_FILENAME
+        if not vectors_path.exists():
+            return np.empty((0, self.dimension), dtype=np.float32), None
+        return np.fromfile(vectors_path, dtype=np.float32).reshape(-1, self.dimension), None
+
+    def _float_vectors(self) -> np.ndarray:
+        if self.quantization == "none":
+            return self._codes
+        if self._vectors is None or len(self._vectors) != len(self._records):
+            vectors_path = self.path / VECTORS_FILENAME
+            if not vectors_path.exists() or not self._records:
+                return np.empty((0, self.dimension), dtype=np.float32)
+            self._vectors = np.memmap(vectors_path, dtype=np.float32, mode="r", shape=(len(self._records), self.dimension))
+        return self._vectors
+
+    def _dataset_code(self, dataset_id: str) -> int:
+        code = self._dataset_lookup.get(dataset_id)
+        if code is None:
+            code = len(self._dataset_lookup)
+            self._dataset_lookup[dataset_id] = code
+        return code
+
+    def _encode(self, vectors: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        if self.quantization == "int8":
+            return quantize_int8(vectors)
+        if self.quantization == "binary":
+            return binarize(vectors), None
+        return vectors, None
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+    def add(self, vectors: Sequence[Sequence[float]], records: Sequence[LocalRecord]) -> int:
+        """Append ``vectors`` with their ``records`` and return the number written."""
+
+        if len(vectors) != len(records):
+            raise LocalVectorStoreError("Vector count does not match record count")
+        if not records:
+            return 0
+
+        matrix = normalize(np.asarray(vectors, dtype=np.float32))
+        if matrix.ndim != 2 or matrix.shape[1] != self.dimension:
+            raise LocalVectorStoreError(
+                f"Vector dimension {matrix.shape[-1]} does not match collection dimension {self.dimension}"
+            )
+        codes, scales = self._encode(matrix)
+
+        with self._lock:
+            with (self.path / VECTORS_FILENAME).open("ab") as handle:
+                handle.write(matrix.tobytes())
+            if self.quantization == "int8":
+                with (self.path / INT8_CODES_FILENAME).open("ab") as handle:
+                    handle.write(codes.tobytes())
+                with (self.path / INT8_SCALES_FILENAME).open("ab") as handle:
+                    handle.write(scales.tobytes())  # type: ignore[union-attr]
+            elif self.quantization == "binary":
+                with (self.path / BINARY_CODES_FILENAME).open("ab") as handle:
+                    handle.write(codes.tobytes())
+            with (self.path / RECORDS_FILENAME).open("a", encoding="utf-8") as handle:
+                for record in records:
+                    handle.write(json.dumps(_record_payload(record), ensure_ascii=False) + "\n")
+            with (self.path / TOMBSTONES_FILENAME).open("ab") as handle:
+                handle.write(bytes(len(records)))
+            if self._ivf.trained:
+                self._ivf.append(matrix)
+
+            self._codes = np.concatenate([self._codes, codes])
+            if scales is not None and self._scales is not None:
+                self._scales = np.concatenate([self._scales, scales])
+            self._records.extend(records)
+            self._row_datasets = np.concatenate(
+                [self._row_datasets, np.asarray([self._dataset_code(r.dataset_id) for r in records], dtype=np.int32)]
+            )
+            self._live = np.concatenate([self._live, np.ones(len(records), dtype=bool)])
+            if self._needs_maintenance():
+                self._schedule_maintenance()
+        return len(records)
+
+    def delete_dataset(self, dataset_id: str) -> int:
+        """Tombstone every live row of ``dataset_id``; compaction happens in the background."""
+
+        with self._lock:
+            code = self._dataset_lookup.get(dataset_id)
+            if code is None:
+                return 0
+            rows = np.flatnonzero((self._row_datasets == code) & self._live)
+            if not rows.size:
+                return 0
+            marks = np.memmap(self.path / TOMBSTONES_FILENAME, dtype=np.uint8, mode="r+")
+            marks[rows] = 1
+            marks.flush()
+            del marks
+            self._live[rows] = False
+            self._dead_rows += int(rows.size)
+            if self._needs_maintenance():
+                self._schedule_maintenance()
+        return int(rows.size)
+
+    def compact(self) -> int:
+        """Rewrite the collection without tombstoned rows and return how many were dropped.
+
+        The surviving rows are streamed to temporary files outside the lock, so
+        searches and writes carry on meanwhile; rows appended or tombstoned
+        during the copy are replayed when the new files are swapped in.
+        """
+
+        with self._compaction_lock:
+            with self._lock:
+                if not self._dead_rows:
+                    return 0
+                snapshot_rows = len(self._records)
+                keep = self._live.copy()
+                records = self._records[:snapshot_rows]
+                codes, scales = self._codes, self._scales
+                vectors = self._float_vectors()
+
+            kept_rows = np.flatnonzero(keep)
+            kept_codes = codes[kept_rows]
+            kept_scales = scales[kept_rows] if scales is not None else None
+            staged = self._stage_files(kept_rows, records, vectors, kept_codes, kept_scales)
+            try:
+                with self._lock:
+                    self._swap_in(staged, snapshot_rows, keep, kept_rows, records, kept_codes, kept_scales)
+            finally:
+                for temp_path in staged.values():
+                    temp_path.unlink(missing_ok=True)
+
+        removed = snapshot_rows - len(kept_rows)
+        logger.info("Compacted local collection", extra={"collection": str(self.path), "removed": removed})
+        return removed
+
+    def build_index(self) -> None:
+        """Train the IVF index on current rows; rows appended meanwhile are assigned afterwards."""
+
+        with self._lock:
+            snapshot_rows = len(self._records)
+            snapshot_epoch = self._epoch
+            vectors = self._float_vectors()
+        if not snapshot_rows:
+            return
+        centroids = train_centroids(vectors[:snapshot_rows])
+        assignments = assign_lists(centroids, vectors[:snapshot_rows])
+
+        with self._lock:
+            if self._epoch != snapshot_epoch:
+                # A compaction reordered the rows meanwhile; the next maintenance pass retrains.
+                return
+            pending = self._float_vectors()[snapshot_rows:]
+            if len(pending):
+                assignments = np.concatenate([assignments, assign_lists(centroids, pending)])
+            self._ivf.install(centroids, assignments)
+        logger.info(
+            "Built IVF index for local collection",
+            extra={"collection": str(self.path), "rows": snapshot_rows, "lists": len(centroids)},
+        )
+
+    # ------------------------------------------------------------------
+    # Background maintenance
+    # ------------------------------------------------------------------
+    def _needs_compaction(self) -> bool:
+        return bool(self._records) and self._dead_rows / len(self._records) >= self._compaction_ratio
+
+    def _needs_index(self) -> bool:
+        live_rows = len(self._records) - self._dead_rows
+        if live_rows < self._ann_min_rows:
+            return False
+        # Retrain once the collection has outgrown its list count several times over.
+        return not self._ivf.trained or suggested_list_count(live_rows) > 2 * self._ivf.list_count
+
+    def _needs_maintenance(self) -> bool:
+        return self._needs_compaction() or self._needs_index()
+
+    def _schedule_maintenance(self) -> None:
+        if self._maintenance is not None and self._maintenance.is_alive():
+            return
+        self._maintenance = Thread(target=self._maintain, name=f"local-store-{self.path.name}", daemon=True)
+        self._maintenance.start()
+
+    def _maintain(self) -> None:
+        try:
+            if self._needs_compaction():
+                self.compact()
+            if self._needs_index():
+                self.build_index()
+        except Exception as exc:  # pragma: no cover - background best effort
+            logger.error("Local collection maintenance failed", extra={"collection": str(self.path), "error": str(exc)})
+
+    def wait_for_maintenance(self, timeout: Optional[float] = None) -> None:
+        """Block until any running compaction or index build has finished."""
+
+        worker = self._maintenance
+        if worker is not None:
+            worker.join(timeout)
+
+    def _stage_files(
+        self,
+        rows: np.ndarray,
+        records: Sequence[LocalRecord],
+        vectors: np.ndarray,
+        codes: np.ndarray,
+        scales: Optional[np.ndarray],
+    ) -> Dict[str, Path]:
+        """Write the given rows to ``*.tmp`` files and return them by final filename."""
+
+        staged = {VECTORS_FILENAME: self.path / f"{VECTORS_FILENAME}.tmp"}
+        if self.quantization == "int8":
+            staged[INT8_CODES_FILENAME] = self.path / f"{INT8_CODES_FILENAME}.tmp"
+            staged[INT8_SCALES_FILENAME] = self.path / f"{INT8_SCALES_FILENAME}.tmp"
+        elif self.quantization == "binary":
+            staged[BINARY_CODES_FILENAME] = self.path / f"{BINARY_CODES_FILENAME}.tmp"
+        staged[RECORDS_FILENAME] = self.path / f"{RECORDS_FILENAME}.tmp"
+        try:
+            with staged[VECTORS_FILENAME].open("wb") as handle:
+                for start in range(0, len(rows), COMPACTION_BLOCK_ROWS):
+                    block = rows[start : start + COMPACTION_BLOCK_ROWS]
+                    handle.write(np.asarray(vectors[block], dtype=np.float32).tobytes())
+            if self.quantization == "int8":
+                staged[INT8_CODES_FILENAME].write_bytes(codes.tobytes())
+                staged[INT8_SCALES_FILENAME].write_bytes(scales.tobytes())  # type: ignore[union-attr]
+            elif self.quantization == "binary":
+                staged[BINARY_CODES_FILENAME].write_bytes(codes.tobytes())
+            with staged[RECORDS_FILENAME].open("w", encoding="utf-8") as handle:
+                for row in rows:
+                    handle.write(json.dumps(_record_payload(records[int(row)]), ensure_ascii=False) + "\n")
+        except BaseException:
+            for temp_path in staged.values():
+                temp_path.unlink(missing_ok=True)
+            raise
+        return staged
+
+    def _swap_in(
+        self,
+        staged: Dict[str, Path],
+        snapshot_rows: int,
+        keep: np.ndarray,
+        kept_rows: np.ndarray,
+        records: Sequence[LocalRecord],
+        codes: np.ndarray,
+        scales: Optional[np.ndarray],
+    ) -> None:
+        """Replay changes made since the snapshot onto the staged files and install them.
+
+        Called with ``_lock`` held; only rows appended during the copy are
+        written here.
+        """
+
+        appended = self._records[snapshot_rows:]
+        if appended:
+            appended_codes = self._codes[snapshot_rows:]
+            with staged[VECTORS_FILENAME].open("ab") as handle:
+                handle.write(np.asarray(self._float_vectors()[snapshot_rows:], dtype=np.float32).tobytes())
+            if self.quantization == "int8":
+                with staged[INT8_CODES_FILENAME].open("ab") as handle:
+                    handle.write(appended_codes.tobytes())
+                with staged[INT8_SCALES_FILENAME].open("ab") as handle:
+                    handle.write(self._scales[snapshot_rows:].tobytes())  # type: ignore[index]
+            elif self.quantization == "binary":
+                with staged[BINARY_CODES_FILENAME].open("ab") as handle:
+                    handle.write(appended_codes.tobytes())
+            with staged[RECORDS_FILENAME].open("a", encoding="utf-8") as handle:
+                for record in appended:
+                    handle.write(json.dumps(_record_payload(record), ensure_ascii=False) + "\n")
+
+        # Tombstones set during the copy apply to rows that survived the snapshot.
+        live = np.concatenate([self._live[:snapshot_rows][keep], self._live[snapshot_rows:]])
+        tombstones_temp = self.path / f"{TOMBSTONES_FILENAME}.tmp"
+        tombstones_temp.write_bytes((~live).astype(np.uint8).tobytes())
+        staged[TOMBSTONES_FILENAME] = tombstones_temp
+        for filename, temp_path in staged.items():
+            os.replace(temp_path, self.path / filename)
+        staged.clear()
+
+        self._ivf.keep(np.concatenate([keep, np.ones(len(appended), dtype=bool)]))
+        self._records = [records[int(row)] for row in kept_rows] + appended
+        self._codes = np.concatenate([codes, self._codes[snapshot_rows:]])
+        if scales is not None and self._scales is not None:
+            self._scales = np.concatenate([scales, self._scales[snapshot_rows:]])
+        self._row_datasets = np.concatenate([self._row_datasets[:snapshot_rows][keep], self._row_datasets[snapshot_rows:]])
+        self._live = live
+        self._dead_rows = int((~live).sum())
+        self._vectors = None
+        self._epoch += 1
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    def search(
+        self,
+        query_vector: Sequence[float],
+        k: int,
+        *,
+        dataset_ids: Optional[Iterable[str]] = None,
+        rescore_multiplier: int = 4,
+        include_embeddings: bool = False,
+        nprobe: Optional[int] = None,
+        approximate: bool = True,
+    ) -> List[LocalMatch]:
+        """Scan coarse codes, then re-score a shortlist against float32 vectors.
+
+        When the IVF index is built (and ``approximate`` is left on) only the
+        rows of the ``nprobe`` closest lists are scanned.
+        """
+
+        query = normalize(np.asarray(query_vector, dtype=np.float32).reshape(1, -1))[0]
+        if query.shape[0] != self.dimension:
+            raise LocalVectorStoreError(
+                f"Query dimension {query.shape[0]} does not match collection dimension {self.dimension}"
+            )
+
+        with self._lock:
+            total = len(self._records)
+            if not total or k <= 0:
+                return []
+            codes, scales, row_datasets = self._codes, self._scales, self._row_datasets
+            records = self._records
+            # Taken with the rest: a compaction may swap in shorter files once the lock is released.
+            vectors = self._float_vectors()
+            mask = self._live_mask(self._dataset_mask(dataset_ids, row_datasets))
+            probed: Optional[np.ndarray] = None
+            if approximate and self._ivf.trained and self._ivf.rows == total:
+                probed = self._ivf.candidates(query, nprobe or self._ann_nprobe)
+
+        shortlist_size = k
+        if self.quantization != "none":
+            shortlist_size = k * max(1, rescore_multiplier)
+            if self.quantization == "binary":
+                shortlist_size *= BINARY_SHORTLIST_FACTOR
+
+        if probed is not None and mask is not None:
+            probed = probed[mask[probed]]
+        if probed is not None and len(probed) >= shortlist_size:
+            subset_scales = scales[probed] if scales is not None else None
+            candidates = probed[self._coarse_scan(query, codes[probed], subset_scales, None, shortlist_size)]
+        else:
+            # Small or heavily filtered result sets fall back to the flat scan.
+            candidates = self._coarse_scan(query, codes, scales, mask, shortlist_size)
+        if not candidates.size:
+            return []
+
+        candidate_vectors = np.asarray(vectors[candidates], dtype=np.float32)
+        exact = candidate_vectors @ query
+        order = np.argsort(-exact)[:k]
+
+        return [
+            LocalMatch(
+                record=records[int(candidates[position])],
+                similarity=float(exact[position]),
+                embedding=candidate_vectors[position].tolist() if include_embeddings else None,
+            )
+            for position in order
+        ]
+
+    def exact_search(
+        self,
+        query_vector: Sequence[float],
+        k: int,
+        *,
+        dataset_ids: Optional[Iterable[str]] = None,
+    ) -> List[int]:
+        """Return row indices of the exact top-``k`` by brute force over float32 vectors."""
+
+        query = normalize(np.asarray(query_vector, dtype=np.float32).reshape(1, -1))[0]
+        with self._lock:
+            mask = self._live_mask(self._dataset_mask(dataset_ids, self._row_datasets))
+            vectors = self._float_vectors()
+        scores = np.asarray(vectors, dtype=np.float32) @ query
+        if mask is not None:
+            scores[~mask] = -np.inf
+        k = min(k, int(np.isfinite(scores).sum()))
+        top = np.argpartition(-scores, k - 1)[:k] if k else np.empty(0, dtype=np.int64)
+        return [int(index) for index in top[np.argsort(-scores[top])]]
+
+    def iter_rows(self, batch_size: int = 4096) -> Iterator[Tuple[np.ndarray, List[LocalRecord]]]:
+        """Yield live float32 vectors with their records, in row order."""
+
+        with self._lock:
+            total = len(self._records)
+            records = self._records
+            live = self._live.copy()
+            vectors = self._float_vectors()
+        for start in range(0, total, batch_size):
+            stop = min(start + batch_size, total)
+            rows = np.flatnonzero(live[start:stop]) + start
+            if rows.size:
+                yield np.asarray(vectors[rows], dtype=np.float32), [records[int(row)] for row in rows]
+
+    def row_ids(self, matches: Sequence[LocalMatch]) -> List[int]:
+        """Map matches back to row indices, for recall measurements."""
+
+        positions = {id(record): index for index, record in enumerate(self._records)}
+        return [positions[id(match.record)] for match in matches]
+
+    def _dataset_mask(self, dataset_ids: Optional[Iterable[str]], row_datasets: np.ndarray) -> Optional[np.ndarray]:
+        if not dataset_ids:
+            return None
+        codes = [self._dataset_lookup[dataset_id] for dataset_id in dataset_ids if dataset_id in self._dataset_lookup]
+        return np.isin(row_datasets, np.asarray(codes, dtype=np.int32))
+
+    def _live_mask(self, mask: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        if not self._dead_rows:
+            return mask
+        return self._live if mask is None else mask & self._live
+
+    def _coarse_scan(
+        self,
+        query: np.ndarray,
+        codes: np.ndarray,
+        scales: Optional[np.ndarray],
+        mask: Optional[np.ndarray],
+        shortlist_size: int,
+    ) -> np.ndarray:
+        if self.quantization == "binary":
+            query_bits = binarize(query.reshape(1, -1))[0]
+
+        best_rows: List[np.ndarray] = []
+        best_scores: List[np.ndarray] = []
+        for start in range(0, len(codes), SCAN_BLOCK_ROWS):
+            stop = min(start + SCAN_BLOCK_ROWS, len(codes))
+            block = codes[start:stop]
+            if self.quantization == "int8":
+                scores = int8_scores(block, scales[start:stop], query)  # type: ignore[index]
+            elif self.quantization == "binary":
+                scores = hamming_scores(block, query_bits).astype(np.float32)
+            else:
+                scores = block @ query
+            if mask is not None:
+                scores = np.where(mask[start:stop], scores, -np.inf)
+
+            keep = min(shortlist_size, len(scores))
+            top = np.argpartition(-scores, keep - 1)[:keep]
+            best_rows.append(top + start)
+            best_scores.append(scores[top])
+
+        rows = np.concatenate(best_rows)
+        scores = np.concatenate(best_scores)
+        finite = np.isfinite(scores)
+        rows, scores = rows[finite], scores[finite]
+        if len(rows) > shortlist_size:
+            top = np.argpartition(-scores, shortlist_size - 1)[:shortlist_size]
+            rows = rows[top]
+        return np.sort(rows)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return row count and the memory held by coarse codes versus float32."""
+
+        rows = len(self._records)
+        coarse = rows * bytes_per_vector(self.dimension, self.quantization)
+        full = rows * self.dimension * 4
+        return {
+            "rows": rows,
+            "tombstones": self._dead_rows,
+            "ann_lists": self._ivf.list_count,
+            "dimension": self.dimension,
+            "quantization": self.quantization,
+            "coarse_bytes": coarse,
+            "float32_bytes": full,
+            "compression": round(full / coarse, 2) if coarse else 0.0,
+        }
+
+
+class LocalVectorStore:
+    """Directory of local collections, opened lazily and cached per name."""
+
+    def __init__(
+        self,
+        root: Path,
+        quantization: QuantizationMode = "int8",
+        *,
+        ann_min_rows: int = DEFAULT_ANN_MIN_ROWS,
+        ann_nprobe: int = DEFAULT_ANN_NPROBE,
+        compaction_ratio: float = DEFAULT_COMPACTION_RATIO,
+    ) -> None:
+        self._root = Path(root)
+        self._quantization = quantization
+        self._collection_options: Dict[str, Any] = {
+            "ann_min_rows": ann_min_rows,
+            "ann_nprobe": ann_nprobe,
+            "compaction_ratio": compaction_ratio,
+        }
+        self._collections: Dict[str, LocalVectorCollection] = {}
+        self._lock = RLock()
+
+    def names(self) -> List[str]:
+        """Return the names of collections present on disk."""
+
+        if not self._root.exists():
+            return []
+        return sorted(path.name for path in self._root.iterdir() if (path / META_FILENAME).exists())
+
+    def dimension_of(self, name: str) -> Optional[int]:
+        """Read the vector dimension of an on-disk collection without opening it."""
+
+        meta_path = self._root / name / META_FILENAME
+        if not meta_path.exists():
+            return None
+        return int(json.loads(meta_path.read_text(encoding="utf-8"))["dimension"])
+
+    def collection(self, name: str, dimension: int, *, create: bool = True) -> Optional[LocalVectorCollection]:
+        """Return the collection ``name``, creating it when ``create`` is set."""
+
+        handle = self._collections.get(name)
+        if handle is not None:
+            return handle
+        with self._lock:
+            handle = self._collections.get(name)
+            if handle is None:
+                path = self._root / name
+                if not create and not (path / META_FILENAME).exists():
+                    return None
+                handle = LocalVectorCollection(path, dimension, self._quantization, **self._collection_options)
+                self._collections[name] = handle
+        return handle
+
+
+def _record_payload(record: LocalRecord) -> Dict[str, Any]:
+    return {"id": record.id, "dataset_id": record.dataset_id, "text": record.text, "metadata": record.metadata}
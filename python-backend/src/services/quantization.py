@@ -0,0 +1,91 @@
+"""Vector quantization primitives for the local vector store."""
+
+from __future__ import annotations
+
+from typing import Literal, Sequence, Tuple
+
+import numpy as np
+
+
+QuantizationMode = Literal["none", "int8", "binary"]
+
+_INT8_LEVELS = 127.0
+# Rows widened to float32 per step by ``int8_scores``; ~1.5 MB at 1536 dimensions stays in L2.
+_INT8_BLOCK_ROWS = 256
+# Number of set bits for every byte value, used for Hamming distances.
+_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, np.newaxis], axis=1).sum(axis=1).astype(np.int32)
+
+
+def normalize(matrix: np.ndarray) -> np.ndarray:
+    """Return ``matrix`` with unit-length rows as float32."""
+
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def quantize_int8(matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-vector int8 quantization; returns (codes, scales)."""
+
+    matrix = np.asarray(matrix, dtype=np.float32)
+    scales = np.abs(matrix).max(axis=1) / _INT8_LEVELS
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(matrix / scales[:, np.newaxis]), -_INT8_LEVELS, _INT8_LEVELS).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def int8_scores(codes: np.ndarray, scales: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """Approximate inner products between ``query`` and int8-coded rows.
+
+    Codes are widened a cache-sized block at a time into one reused float32
+    buffer; widening the whole matrix at once writes four bytes per code to
+    memory and makes the scan slower than scoring float32 vectors directly.
+    """
+
+    query = np.asarray(query, dtype=np.float32)
+    scores = np.empty(len(codes), dtype=np.float32)
+    buffer = np.empty((min(_INT8_BLOCK_ROWS, len(codes)), codes.shape[1]), dtype=np.float32)
+    for start in range(0, len(codes), _INT8_BLOCK_ROWS):
+        block = codes[start : start + _INT8_BLOCK_ROWS]
+        widened = buffer[: len(block)]
+        np.copyto(widened, block, casting="unsafe")
+        np.matmul(widened, query, out=scores[start : start + len(block)])
+    scores *= scales
+    return scores
+
+
+def binarize(matrix: np.ndarray) -> np.ndarray:
+    """Sign-bit codes packed eight dimensions per byte."""
+
+    return np.packbits(np.asarray(matrix) > 0, axis=1)
+
+
+def hamming_scores(codes: np.ndarray, query_bits: np.ndarray) -> np.ndarray:
+    """Similarity from packed sign bits; higher means fewer differing bits."""
+
+    return -_POPCOUNT[np.bitwise_xor(codes, query_bits)].sum(axis=1)
+
+
+def bytes_per_vector(dimension: int, mode: QuantizationMode) -> int:
+    """Bytes held per vector by the coarse (scanned) representation."""
+
+    if mode == "int8":
+        return dimension + 4
+    if mode == "binary":
+        return (dimension + 7) // 8
+    return dimension * 4
+
+
+def recall_at_k(exact: Sequence[Sequence[int]], approximate: Sequence[Sequence[int]], k: int) -> float:
+    """Mean fraction of the exact top-``k`` recovered by the approximate search."""
+
+    if not exact:
+        return 0.0
+    total = 0.0
+    for truth, found in zip(exact, approximate):
+        truth_set = set(list(truth)[:k])
+        if not truth_set:
+            continue
+        total += len(truth_set & set(list(found)[:k])) / len(truth_set)
+    return total / len(exact)
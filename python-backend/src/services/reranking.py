@@ -0,0 +1,84 @@
+"""Diversity re-ranking for retrieved contexts."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, List, Sequence
+
+import numpy as np
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from .vectorstores import RetrievedContext
+
+
+DEFAULT_MMR_LAMBDA = 0.5
+# Candidate pool size relative to the requested top_k when MMR is enabled.
+DEFAULT_MMR_FETCH_MULTIPLIER = 4
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def maximal_marginal_relevance(
+    query_vector: Sequence[float],
+    candidate_vectors: Sequence[Sequence[float]],
+    *,
+    k: int,
+    lambda_mult: float = DEFAULT_MMR_LAMBDA,
+) -> List[int]:
+    """Return indices of ``k`` candidates balancing query relevance and diversity.
+
+    ``lambda_mult`` of 1.0 ranks purely by relevance; 0.0 purely by diversity.
+    """
+
+    if k <= 0 or not candidate_vectors:
+        return []
+
+    candidates = _normalize_rows(np.asarray(candidate_vectors, dtype=np.float32))
+    query = _normalize_rows(np.asarray(query_vector, dtype=np.float32).reshape(1, -1))[0]
+    if candidates.ndim != 2 or candidates.shape[1] != query.shape[0]:
+        raise ValueError("Candidate embeddings do not match the query dimension")
+
+    total = candidates.shape[0]
+    k = min(k, total)
+    relevance = candidates @ query
+
+    selected: List[int] = [int(np.argmax(relevance))]
+    available = np.ones(total, dtype=bool)
+    available[selected[0]] = False
+    # Highest similarity of every candidate to anything already selected.
+    redundancy = candidates @ candidates[selected[0]]
+
+    while len(selected) < k:
+        scores = lambda_mult * relevance - (1.0 - lambda_mult) * redundancy
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        np.maximum(redundancy, candidates @ candidates[best], out=redundancy)
+
+    return selected
+
+
+def mmr_rerank(
+    query_vector: Sequence[float],
+    contexts: Sequence[RetrievedContext],
+    *,
+    k: int,
+    lambda_mult: float = DEFAULT_MMR_LAMBDA,
+) -> List[RetrievedContext]:
+    """Re-rank contexts with MMR; contexts lacking embeddings keep store order."""
+
+    with_vectors = [context for context in contexts if context.embedding]
+    if len(with_vectors) != len(contexts) or not query_vector:
+        return list(contexts[:k])
+
+    indices = maximal_marginal_relevance(
+        query_vector,
+        [context.embedding for context in with_vectors],  # type: ignore[misc]
+        k=k,
+        lambda_mult=lambda_mult,
+    )
+    return [with_vectors[index] for index in indices]
@@ -0,0 +1,467 @@
+"""Key/value cache shared by every worker process of the API.
+
+``memory`` keeps entries in the current process only (single-worker
+deployments). ``sqlite`` stores them in one WAL-mode database file that every
+worker on the host opens, so an entry written by one worker is a hit in all
+the others. ``redis`` does the same across hosts when the optional ``redis``
+package is installed.
+
+Values are raw bytes with an optional TTL. Integer counters (:meth:`incr`)
+back the dataset generations used to invalidate derived caches after a
+dataset is re-embedded; they never expire and are never evicted.
+
+Every method is synchronous. Async code uses the ``*_async`` variants, which
+run the ``sqlite`` and ``redis`` backends on a worker thread so their I/O
+never blocks the event loop.
+"""
+
+from __future__ import annotations
+
+import abc
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, TypeVar
+
+import numpy as np
+
+from ..utils import get_logger
+from ..utils.metrics import REGISTRY
+
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+KEY_PREFIX = "krira:"
+# Expired SQLite rows are purged once every this many writes.
+_SQLITE_PRUNE_INTERVAL = 1000
+# Runs server-side so the comparison and the write cannot interleave with another client.
+_REDIS_COMPARE_AND_SET = """
+local current = redis.call('GET', KEYS[1])
+if ARGV[1] == '1' then
+    if current then return 0 end
+elseif current ~= ARGV[2] then
+    return 0
+end
+if tonumber(ARGV[4]) > 0 then
+    redis.call('SET', KEYS[1], ARGV[3], 'PX', ARGV[4])
+else
+    redis.call('SET', KEYS[1], ARGV[3])
+end
+return 1
+"""
+
+SHARED_CACHE_REQUESTS = REGISTRY.counter(
+    "krira_shared_cache_requests_total",
+    "Shared cache lookups by cache and result (hit or miss).",
+    ("cache", "result"),
+)
+
+
+class SharedCacheError(Exception):
+    """Raised when the configured shared cache backend cannot be used."""
+
+
+class SharedCache(abc.ABC):
+    """Interface implemented by every shared cache backend."""
+
+    backend = "base"
+    # Whether calls do I/O; the async variants then run them on a worker thread.
+    blocking = True
+
+    @abc.abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the value stored at ``key``, or ``None`` when absent or expired."""
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, bytes]:
+        found: Dict[str, bytes] = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                found[key] = value
+        return found
+
+    @abc.abstractmethod
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        """Store ``value`` at ``key``, expiring after ``ttl`` seconds when given."""
+
+    def set_many(self, items: Iterable[Tuple[str, bytes]], ttl: Optional[float] = None) -> None:
+        for key, value in items:
+            self.set(key, value, ttl)
+
+    @abc.abstractmethod
+    def add(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        """Store ``value`` only if ``key`` is absent or expired; True when it was stored."""
+
+    @abc.abstractmethod
+    def compare_and_set(self, key: str, expected: Optional[bytes], value: bytes, ttl: Optional[float] = None) -> bool:
+        """Store ``value`` only if ``key`` still holds ``expected`` (``None``: absent or expired).
+
+        Returns True when it was stored; read-modify-write callers retry on False.
+        """
+
+    @abc.abstractmethod
+    def incr(self, key: str) -> int:
+        """Atomically increment the integer stored at ``key`` and return it."""
+
+    @abc.abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove ``key`` (a value or a counter) if present."""
+
+    def close(self) -> None:
+        """Release connections held by this process."""
+
+    # ------------------------------------------------------------------
+    # Async variants
+    # ------------------------------------------------------------------
+    async def get_async(self, key: str) -> Optional[bytes]:
+        return await self._call(self.get, key)
+
+    async def get_many_async(self, keys: Sequence[str]) -> Dict[str, bytes]:
+        return await self._call(self.get_many, keys)
+
+    async def set_async(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        await self._call(self.set, key, value, ttl)
+
+    async def set_many_async(self, items: Iterable[Tuple[str, bytes]], ttl: Optional[float] = None) -> None:
+        await self._call(self.set_many, list(items), ttl)
+
+    async def add_async(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        return await self._call(self.add, key, value, ttl)
+
+    async def compare_and_set_async(
+        self, key: str, expected: Optional[bytes], value: bytes, ttl: Optional[float] = None
+    ) -> bool:
+        return await self._call(self.compare_and_set, key, expected, value, ttl)
+
+    async def incr_async(self, key: str) -> int:
+        return await self._call(self.incr, key)
+
+    async def delete_async(self, key: str) -> None:
+        await self._call(self.delete, key)
+
+    async def _call(self, function: Callable[..., T], *args: Any) -> T:
+        if not self.blocking:
+            return function(*args)
+        return await asyncio.to_thread(function, *args)
+
+
+class MemorySharedCache(SharedCache):
+    """Process-local LRU; the default for single-worker deployments.
+
+    Counters are kept apart from the LRU so that value traffic cannot evict
+    a dataset generation and silently revive entries it had retired.
+    """
+
+    backend = "memory"
+    blocking = False
+
+    def __init__(self, *, max_entries: int = 50_000) -> None:
+        self._max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[str, Tuple[bytes, Optional[float]]]" = OrderedDict()
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            counter = self._counters.get(key)
+            if counter is not None:
+                return str(counter).encode()
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._store(key, value, expires_at)
+
+    def add(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry[1] is None or entry[1] > now):
+                return False
+            self._store(key, value, now + ttl if ttl else None)
+            return True
+
+    def compare_and_set(self, key: str, expected: Optional[bytes], value: bytes, ttl: Optional[float] = None) -> bool:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            current = entry[0] if entry is not None and (entry[1] is None or entry[1] > now) else None
+            if current != expected:
+                return False
+            self._store(key, value, now + ttl if ttl else None)
+            return True
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            counter = self._counters.get(key, 0) + 1
+            self._counters[key] = counter
+            return counter
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            self._counters.pop(key, None)
+
+    def _store(self, key: str, value: bytes, expires_at: Optional[float]) -> None:
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+
+class SQLiteSharedCache(SharedCache):
+    """Host-wide cache in a SQLite database shared by every worker process.
+
+    Each process opens its own connection on first use (connections must not
+    cross ``fork``), and WAL mode lets readers proceed while a worker writes.
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, path: Path, *, max_entries: int = 50_000) -> None:
+        self._path = Path(path)
+        self._max_entries = max(1, max_entries)
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._writes = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, bytes]:
+        if not keys:
+            return {}
+        placeholders = ",".join("?" for _ in keys)
+        with self._lock:
+            rows = self._connect().execute(
+                f"SELECT key, value FROM cache WHERE key IN ({placeholders}) "
+                "AND (expires_at IS NULL OR expires_at > ?)",
+                (*keys, time.time()),
+            ).fetchall()
+        return {key: value if isinstance(value, bytes) else str(value).encode() for key, value in rows}
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        self.set_many([(key, value)], ttl)
+
+    def set_many(self, items: Iterable[Tuple[str, bytes]], ttl: Optional[float] = None) -> None:
+        expires_at = time.time() + ttl if ttl else None
+        rows = [(key, value, expires_at) for key, value in items]
+        if not rows:
+            return
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                    rows,
+                )
+            self._writes += len(rows)
+            if self._writes >= _SQLITE_PRUNE_INTERVAL:
+                self._writes = 0
+                self._prune(connection)
+
+    def add(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                stored = connection.execute(
+                    "INSERT INTO cache (key, value, expires_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at "
+                    "WHERE cache.expires_at IS NOT NULL AND cache.expires_at <= ?",
+                    (key, value, now + ttl if ttl else None, now),
+                ).rowcount
+        return stored == 1
+
+    def compare_and_set(self, key: str, expected: Optional[bytes], value: bytes, ttl: Optional[float] = None) -> bool:
+        if expected is None:
+            return self.add(key, value, ttl)
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                stored = connection.execute(
+                    "UPDATE cache SET value = ?, expires_at = ? "
+                    "WHERE key = ? AND value = ? AND (expires_at IS NULL OR expires_at > ?)",
+                    (value, now + ttl if ttl else None, key, expected, now),
+                ).rowcount
+        return stored == 1
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.execute(
+                    "INSERT INTO cache (key, value, expires_at) VALUES (?, 1, NULL) "
+                    "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1",
+                    (key,),
+                )
+                row = connection.execute("SELECT value FROM cache WHERE key = ?", (key,)).fetchone()
+        return int(row[0])
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None and self._pid == os.getpid():
+                self._connection.close()
+            self._connection = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is not None and self._pid == os.getpid():
+            return self._connection
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self._path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS cache_expires_at ON cache (expires_at)")
+        # ``with connection`` below relies on implicit transactions.
+        connection.isolation_level = ""
+        self._connection, self._pid = connection, os.getpid()
+        return connection
+
+    def _prune(self, connection: sqlite3.Connection) -> None:
+        with connection:
+            connection.execute("DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+            excess = connection.execute("SELECT COUNT(*) FROM cache").fetchone()[0] - self._max_entries
+            if excess > 0:
+                # Counters never expire; drop the entries closest to expiry first.
+                connection.execute(
+                    "DELETE FROM cache WHERE key IN ("
+                    "SELECT key FROM cache WHERE expires_at IS NOT NULL ORDER BY expires_at LIMIT ?)",
+                    (excess,),
+                )
+
+
+class RedisSharedCache(SharedCache):
+    """Cache stored in Redis; requires the optional ``redis`` package."""
+
+    backend = "redis"
+
+    def __init__(self, url: str) -> None:
+        try:
+            import redis
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise SharedCacheError("SHARED_CACHE_BACKEND=redis requires the 'redis' package") from exc
+        self._client = redis.Redis.from_url(url)
+        self._compare_and_set = self._client.register_script(_REDIS_COMPARE_AND_SET)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._client.get(key)
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, bytes]:
+        if not keys:
+            return {}
+        return {key: value for key, value in zip(keys, self._client.mget(list(keys))) if value is not None}
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        self._client.set(key, value, px=int(ttl * 1000) if ttl else None)
+
+    def set_many(self, items: Iterable[Tuple[str, bytes]], ttl: Optional[float] = None) -> None:
+        pipeline = self._client.pipeline(transaction=False)
+        for key, value in items:
+            pipeline.set(key, value, px=int(ttl * 1000) if ttl else None)
+        pipeline.execute()
+
+    def add(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        return bool(self._client.set(key, value, px=int(ttl * 1000) if ttl else None, nx=True))
+
+    def compare_and_set(self, key: str, expected: Optional[bytes], value: bytes, ttl: Optional[float] = None) -> bool:
+        arguments = [b"1" if expected is None else b"0", expected or b"", value, int(ttl * 1000) if ttl else 0]
+        return bool(self._compare_and_set(keys=[key], args=arguments))
+
+    def incr(self, key: str) -> int:
+        return int(self._client.incr(key))
+
+    def delete(self, key: str) -> None:
+        self._client.delete(key)
+
+    def close(self) -> None:
+        self._client.close()
+
+
+def create_shared_cache(
+    backend: str,
+    *,
+    path: Optional[Path] = None,
+    redis_url: Optional[str] = None,
+    max_entries: int = 50_000,
+) -> SharedCache:
+    """Instantiate the backend named by ``SHARED_CACHE_BACKEND``."""
+
+    if backend == "memory":
+        return MemorySharedCache(max_entries=max_entries)
+    if backend == "sqlite":
+        if path is None:
+            raise SharedCacheError("SHARED_CACHE_PATH is required for the sqlite shared cache")
+        return SQLiteSharedCache(path, max_entries=max_entries)
+    if backend == "redis":
+        if not redis_url:
+            raise SharedCacheError("REDIS_URL is required for the redis shared cache")
+        return RedisSharedCache(redis_url)
+    raise SharedCacheError(f"Unsupported shared cache backend '{backend}'")
+
+
+# ----------------------------------------------------------------------
+# Key and value helpers
+# ----------------------------------------------------------------------
+
+
+def cache_key(namespace: str, *parts: Any) -> str:
+    """Build a namespaced key from a hash of ``parts``."""
+
+    digest = hashlib.sha256("\x1f".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f"{KEY_PREFIX}{namespace}:{digest}"
+
+
+def encode_vector(vector: Sequence[float]) -> bytes:
+    return np.asarray(vector, dtype=np.float32).tobytes()
+
+
+def decode_vector(payload: bytes) -> List[float]:
+    return np.frombuffer(payload, dtype=np.float32).tolist()
+
+
+def _generation_key(dataset_id: str) -> str:
+    return f"{KEY_PREFIX}dataset-generation:{dataset_id}"
+
+
+async def dataset_generations(cache: SharedCache, dataset_ids: Sequence[str]) -> Dict[str, int]:
+    """Return how many times each dataset has been re-embedded (0 if never)."""
+
+    keys = {dataset_id: _generation_key(dataset_id) for dataset_id in dataset_ids}
+    if not keys:
+        return {}
+    found = await cache.get_many_async(list(keys.values()))
+    return {dataset_id: int(found[key]) if key in found else 0 for dataset_id, key in keys.items()}
+
+
+async def bump_dataset_generations(cache: SharedCache, dataset_ids: Iterable[str]) -> None:
+    """Invalidate every cached result derived from ``dataset_ids``, in every worker."""
+
+    for dataset_id in dict.fromkeys(str(dataset_id) for dataset_id in dataset_ids):
+        await cache.incr_async(_generation_key(dataset_id))
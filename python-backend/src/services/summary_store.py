@@ -1,41 +1,228 @@
-"""In-memory dataset summary store."""
+"""Persistent registry of uploaded and embedded datasets.
+
+Metadata lives in an indexed SQLite database (WAL mode), so it survives
+restarts and every worker process on the host sees the same records. Reads
+use a per-thread connection and never wait on a Python lock; WAL lets them
+proceed while another thread or worker writes. Every call blocks on SQLite,
+so async routes run them in a worker thread.
+"""
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-from threading import Lock
-from typing import Dict, Set
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List, Optional, Union
+
+from ..utils import get_logger
+
+
+logger = get_logger(__name__)
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS datasets ("
+    "dataset_id TEXT PRIMARY KEY, dataset_type TEXT NOT NULL, label TEXT NOT NULL, "
+    "chunk_count INTEGER NOT NULL, content_hash TEXT NOT NULL, "
+    "embedding_model TEXT, embedding_dimension INTEGER, vector_store TEXT, vector_target TEXT, "
+    "embedded_at REAL, updated_at REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS datasets_by_content ON datasets (content_hash)",
+)
+_DATASET_COLUMNS = (
+    "dataset_id, dataset_type, label, chunk_count, content_hash, "
+    "embedding_model, embedding_dimension, vector_store, vector_target, embedded_at, updated_at"
+)
+
+
+def content_hash(texts: Iterable[str]) -> str:
+    """Return a digest of chunk texts in order; identical chunking gives identical hashes."""
+
+    digest = hashlib.sha256()
+    for text in texts:
+        encoded = text.encode("utf-8")
+        digest.update(len(encoded).to_bytes(8, "little"))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
+@dataclass(slots=True, frozen=True)
+class DatasetRecord:
+    """What the registry knows about one dataset."""
+
+    dataset_id: str
+    dataset_type: str
+    label: str
+    chunk_count: int
+    content_hash: str
+    embedding_model: Optional[str] = None
+    embedding_dimension: Optional[int] = None
+    vector_store: Optional[str] = None
+    # Where the vectors were written: index and namespace, or directory, plus the layout.
+    vector_target: Optional[str] = None
+    embedded_at: Optional[float] = None
+    updated_at: float = 0.0
+
+    def same_embedding(
+        self,
+        other_hash: str,
+        embedding_model: str,
+        embedding_dimension: Optional[int],
+        vector_store: str,
+        vector_target: str,
+    ) -> bool:
+        """Return True when re-embedding with these settings would write the same vectors to the same place."""
+
+        return (
+            self.embedded_at is not None
+            and self.content_hash == other_hash
+            and self.embedding_model == embedding_model
+            and self.embedding_dimension == embedding_dimension
+            and self.vector_store == vector_store
+            and self.vector_target == vector_target
+        )
 
 
-@dataclass
 class DatasetRegistry:
-    """Thread-safe registry for uploaded dataset names."""
+    """SQLite-backed registry of dataset contents and embedding metadata."""
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self._path = Path(path)
+        self._write_lock = threading.Lock()
+        self._local = threading.local()
+        self._initialized_pid: Optional[int] = None
+
+    # ------------------------------------------------------------------
+    # Dataset records
+    # ------------------------------------------------------------------
+    def get(self, dataset_id: str) -> Optional[DatasetRecord]:
+        row = self._reader().execute(
+            f"SELECT {_DATASET_COLUMNS} FROM datasets WHERE dataset_id = ?",
+            (dataset_id,),
+        ).fetchone()
+        return DatasetRecord(*row) if row is not None else None
+
+    def find_by_content(self, digest: str) -> List[DatasetRecord]:
+        """Return datasets whose chunks hash to ``digest``, most recently updated first."""
+
+        rows = self._reader().execute(
+            f"SELECT {_DATASET_COLUMNS} FROM datasets WHERE content_hash = ? ORDER BY updated_at DESC",
+            (digest,),
+        ).fetchall()
+        return [DatasetRecord(*row) for row in rows]
+
+    def record_embedding(
+        self,
+        *,
+        dataset_id: str,
+        dataset_type: str,
+        label: str,
+        chunk_count: int,
+        digest: str,
+        embedding_model: str,
+        embedding_dimension: Optional[int],
+        vector_store: str,
+        vector_target: str,
+    ) -> DatasetRecord:
+        """Store the outcome of a successful embedding run and return the new record."""
+
+        now = time.time()
+        record = DatasetRecord(
+            dataset_id=dataset_id,
+            dataset_type=dataset_type,
+            label=label,
+            chunk_count=chunk_count,
+            content_hash=digest,
+            embedding_model=embedding_model,
+            embedding_dimension=embedding_dimension,
+            vector_store=vector_store,
+            vector_target=vector_target,
+            embedded_at=now,
+            updated_at=now,
+        )
+        with self._write() as connection:
+            connection.execute(
+                f"INSERT OR REPLACE INTO datasets ({_DATASET_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    record.dataset_id,
+                    record.dataset_type,
+                    record.label,
+                    record.chunk_count,
+                    record.content_hash,
+                    record.embedding_model,
+                    record.embedding_dimension,
+                    record.vector_store,
+                    record.vector_target,
+                    record.embedded_at,
+                    record.updated_at,
+                ),
+            )
+        return record
+
+    def forget(self, dataset_id: str) -> None:
+        """Drop what is known about ``dataset_id``, so its next embedding is never skipped."""
+
+        with self._write() as connection:
+            connection.execute("DELETE FROM datasets WHERE dataset_id = ?", (dataset_id,))
+
+    def close(self) -> None:
+        """Close this thread's connection; other threads' close when they exit."""
+
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
 
-    _datasets: Dict[str, Set[str]] = field(default_factory=dict)
-    _lock: Lock = field(default_factory=Lock)
+    # ------------------------------------------------------------------
+    # Connections
+    # ------------------------------------------------------------------
+    def _reader(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None or getattr(self._local, "pid", None) != os.getpid():
+            connection = self._connect()
+            self._local.connection, self._local.pid = connection, os.getpid()
+        return connection
 
-    def register(self, dataset_type: str, name: str) -> bool:
-        """Register dataset; return False if already present."""
+    def _write(self) -> "_WriteTransaction":
+        return _WriteTransaction(self._write_lock, self._reader())
 
-        normalized = name.strip().lower()
-        if not normalized:
-            return True
+    def _connect(self) -> sqlite3.Connection:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self._path, timeout=5.0, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        if self._initialized_pid != os.getpid():
+            columns = [row[1] for row in connection.execute("PRAGMA table_info(datasets)")]
+            if columns and ", ".join(columns) != _DATASET_COLUMNS:
+                # Records only save work, so a table from an older layout is simply rebuilt.
+                connection.execute("DROP TABLE datasets")
+            for statement in _SCHEMA:
+                connection.execute(statement)
+            self._initialized_pid = os.getpid()
+            logger.info("Dataset registry opened", extra={"path": str(self._path)})
+        return connection
 
-        with self._lock:
-            catalog = self._datasets.setdefault(dataset_type, set())
-            if normalized in catalog:
-                return False
-            catalog.add(normalized)
-        return True
 
-    def has(self, dataset_type: str, name: str) -> bool:
-        """Check if dataset already registered."""
+class _WriteTransaction:
+    """Serialize this process's writers and wrap them in one immediate transaction."""
 
-        normalized = name.strip().lower()
-        if not normalized:
-            return False
-        with self._lock:
-            return normalized in self._datasets.get(dataset_type, set())
+    def __init__(self, lock: threading.Lock, connection: sqlite3.Connection) -> None:
+        self._lock = lock
+        self._connection = connection
 
+    def __enter__(self) -> sqlite3.Connection:
+        self._lock.acquire()
+        try:
+            self._connection.execute("BEGIN IMMEDIATE")
+        except BaseException:
+            self._lock.release()
+            raise
+        return self._connection
 
-registry = DatasetRegistry()
+    def __exit__(self, exc_type: object, *_: object) -> None:
+        try:
+            self._connection.execute("ROLLBACK" if exc_type is not None else "COMMIT")
+        finally:
+            self._lock.release()
@@ -3,65 +3,147 @@
 from __future__ import annotations
 
 import asyncio
+import heapq
+import re
 import sys
+import time
 from importlib import import_module
 from pathlib import Path
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Sequence
-
-try:  # Pinecone v7 SDK import (fails fast if missing)
-    from pinecone import Pinecone, ServerlessSpec  # noqa: F401
-    try:
-        from pinecone.exceptions import PineconeApiException
-    except ImportError:
-        from pinecone.core.client.exceptions import PineconeApiException  # type: ignore[assignment]
-except ImportError as exc:  # pragma: no cover - import-time failure
-    Pinecone = None  # type: ignore[assignment]
-    ServerlessSpec = None  # type: ignore[assignment]
-    PineconeApiException = Exception  # type: ignore[assignment]
-    _pinecone_import_error: Optional[Exception] = exc
-else:
-    _pinecone_import_error = None
-
-try:
-    import chromadb
-    try:
-        from chromadb.config import Settings as ChromaConfigSettings
-    except ImportError:  # pragma: no cover - compatibility shim
-        ChromaConfigSettings = None  # type: ignore[assignment]
-    ChromaSettingsType = ChromaConfigSettings or getattr(chromadb, "Settings", None)
-except ImportError as exc:  # pragma: no cover - import-time failure
-    raise ImportError("The chromadb package is required. Install with `pip install chromadb`.") from exc
+from threading import Lock
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
 
 from ..config import get_settings
-from ..schemas.embedding import DatasetEmbeddingPayload, EmbeddingModel, PineconeConfig, VectorStore
-from ..utils import get_logger
+from ..schemas.embedding import (
+    ChromaIndexConfig,
+    ChunkPayload,
+    DatasetEmbeddingPayload,
+    EmbeddingModel,
+    PineconeConfig,
+    VectorStore,
+)
+from ..utils import get_logger, instrumented
+from .local_store import LocalRecord, LocalVectorStore, LocalVectorStoreError
+from .reranking import DEFAULT_MMR_FETCH_MULTIPLIER, DEFAULT_MMR_LAMBDA, mmr_rerank
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from pinecone import Pinecone as PineconeClient
 
 
 logger = get_logger(__name__)
 
+# The vendor SDKs dominate cold-start time (chromadb alone pulls in most of its
+# server stack) and a deployment usually talks to one of them, so both are
+# imported on first use by ``_load_pinecone`` and ``_load_chromadb``.
+Pinecone: Any = None
+PineconeApiException: Any = Exception
+_chromadb: Any = None
+
+# How long a Chroma collection found missing is assumed to still be missing.
+CHROMA_MISSING_TTL_SECONDS = 5.0
+
+
+def enabled_vector_stores(value: str) -> frozenset[str]:
+    """Parse the ``VECTOR_STORES`` setting."""
+
+    return frozenset(part.strip().lower() for part in value.split(",") if part.strip())
+
 
 @dataclass(slots=True)
 class RetrievedContext:
-    """Represents a chunk retrieved from the vector store."""
+    """Represents a chunk retrieved from the vector store.
+
+    ``score`` is the raw value reported by the backend (a distance for Chroma,
+    the index metric for Pinecone); ``similarity`` is the cosine similarity
+    derived from it, comparable across backends and higher for better matches.
+    """
 
     text: str
     score: Optional[float] = None
     metadata: Dict[str, Any] = field(default_factory=dict)
+    embedding: Optional[List[float]] = None
+    similarity: Optional[float] = None
+
+
+@dataclass(slots=True)
+class RetrievalSource:
+    """One store and dataset group taking part in a federated query."""
+
+    vector_store: VectorStore
+    dataset_ids: List[str]
+    pinecone: Optional[PineconeConfig] = None
+    chroma: Optional[ChromaIndexConfig] = None
+    timeout_seconds: Optional[float] = None
 
 
 class VectorStoreServiceError(Exception):
     """Raised when vector store persistence fails."""
 
 
+def _duplicate_metadata(chunk: ChunkPayload) -> Dict[str, Any]:
+    # Joined into a string: Chroma metadata values must be scalars.
+    if not chunk.duplicate_orders:
+        return {}
+    return {"duplicate_orders": ",".join(str(order) for order in chunk.duplicate_orders)}
+
+
+def _load_pinecone() -> Any:
+    """Import the Pinecone v7 SDK on first use and return its client class."""
+
+    global Pinecone, PineconeApiException
+    if Pinecone is None:
+        try:
+            module = import_module("pinecone")
+        except ImportError as exc:
+            raise VectorStoreServiceError(
+                "Pinecone SDK is not available. Install it with `pip install pinecone`."
+                f" (Python executable: {sys.executable}) | {exc}"
+            ) from exc
+        for exceptions_module in ("pinecone.exceptions", "pinecone.core.client.exceptions"):
+            try:
+                PineconeApiException = import_module(exceptions_module).PineconeApiException
+                break
+            except (ImportError, AttributeError):
+                continue
+        Pinecone = module.Pinecone
+    return Pinecone
+
+
+def _load_chromadb() -> Any:
+    """Import ``chromadb`` on first use."""
+
+    global _chromadb
+    if _chromadb is None:
+        try:
+            _chromadb = import_module("chromadb")
+        except ImportError as exc:
+            raise VectorStoreServiceError("The chromadb package is required. Install with `pip install chromadb`.") from exc
+    return _chromadb
+
+
 class VectorStoreService:
     """Persist embeddings into the configured vector database."""
 
     def __init__(self) -> None:
         self._settings = get_settings()
-        self._pinecone_clients: Dict[str, Pinecone] = {}
+        self._enabled = enabled_vector_stores(self._settings.vector_stores)
+        self._pinecone_clients: Dict[str, PineconeClient] = {}
+        self._pinecone_metrics: Dict[tuple[str, str], str] = {}
         self._chroma_client = None
+        self._chroma_collections: Dict[str, _ChromaHandle] = {}
+        # Collection name -> monotonic time it was last found missing.
+        self._chroma_missing: Dict[str, float] = {}
+        self._chroma_lock = Lock()
+        self._local_store = LocalVectorStore(
+            self._settings.local_vector_directory,
+            quantization=self._settings.local_vector_quantization,
+            ann_min_rows=self._settings.local_ann_min_rows,
+            ann_nprobe=self._settings.local_ann_nprobe,
+            compaction_ratio=self._settings.local_compaction_ratio,
+        )
 
+    @instrumented("vector_store")
     async def upsert(
         self,
         vector_store: VectorStore,
@@ -70,6 +152,7 @@ class VectorStoreService:
         *,
         embedding_model: EmbeddingModel,
         pinecone: Optional[PineconeConfig] = None,
+        chroma: Optional[ChromaIndexConfig] = None,
         dataset_ids: Optional[Sequence[str]] = None,
     ) -> int:
         """Persist embeddings and return the number of vectors stored."""
@@ -77,6 +160,7 @@ class VectorStoreService:
         if not embeddings:
             return 0
 
+        self._ensure_enabled(vector_store)
         if vector_store == "pinecone":
             if not pinecone:
                 raise VectorStoreServiceError("Pinecone configuration missing")
@@ -94,10 +178,39 @@ class VectorStoreService:
                 dataset,
                 embeddings,
                 embedding_model,
+                chroma,
+            )
+
+        if vector_store == "local":
+            return await asyncio.to_thread(
+                self._upsert_local,
+                dataset,
+                embeddings,
+                embedding_model,
             )
 
         raise VectorStoreServiceError(f"Unsupported vector store '{vector_store}'")
 
+    def target_of(
+        self,
+        vector_store: VectorStore,
+        *,
+        pinecone: Optional[PineconeConfig] = None,
+        chroma: Optional[ChromaIndexConfig] = None,
+    ) -> str:
+        """Describe where ``upsert`` writes for these settings, so a moved or re-pointed store can be detected."""
+
+        layout = self._settings.vector_layout
+        if vector_store == "pinecone":
+            index_name = pinecone.index_name if pinecone else ""
+            namespace = (pinecone.namespace or "") if pinecone else ""
+            return f"pinecone|{index_name}|{namespace}|{layout}"
+        if vector_store == "chroma":
+            space = (chroma or ChromaIndexConfig()).space
+            return f"chroma|{Path(self._settings.chroma_directory).resolve()}|{space}|{layout}"
+        return f"{vector_store}|{Path(self._settings.local_vector_directory).resolve()}|{layout}"
+
+    @instrumented("vector_store")
     async def query(
         self,
         vector_store: VectorStore,
@@ -106,77 +219,180 @@ class VectorStoreService:
         embedding_model: EmbeddingModel,
         top_k: int = 3,
         pinecone: Optional[PineconeConfig] = None,
+        chroma: Optional[ChromaIndexConfig] = None,
         dataset_ids: Optional[Sequence[str]] = None,
+        mmr: bool = False,
+        mmr_lambda: Optional[float] = None,
+        fetch_k: Optional[int] = None,
     ) -> List[RetrievedContext]:
-        """Retrieve the most relevant chunks for the given query vector."""
+        """Retrieve the most relevant chunks for the given query vector.
+
+        With ``mmr`` enabled a larger candidate pool is fetched together with
+        its embeddings and re-ranked for diversity down to ``top_k``.
+        """
 
         if not query_vector:
             return []
 
         limit = max(1, min(top_k, 200))
+        fetch_limit = limit
+        if mmr:
+            fetch_limit = max(limit, min(fetch_k or limit * DEFAULT_MMR_FETCH_MULTIPLIER, 200))
+
+        results = await self._fetch_candidates(
+            vector_store,
+            list(query_vector),
+            embedding_model=embedding_model,
+            limit=fetch_limit,
+            pinecone=pinecone,
+            chroma=chroma,
+            dataset_ids=dataset_ids,
+            include_embeddings=mmr,
+        )
+        return await self._finalise(query_vector, results, limit=limit, mmr=mmr, mmr_lambda=mmr_lambda)
 
-        if vector_store == "pinecone":
-            if not pinecone:
-                raise VectorStoreServiceError("Pinecone configuration missing for retrieval")
-            return await asyncio.to_thread(
-                self._query_pinecone,
-                pinecone,
-                list(query_vector),
-                limit,
-                dataset_ids,
-            )
+    @instrumented("vector_store")
+    async def query_many(
+        self,
+        sources: Sequence[RetrievalSource],
+        query_vector: Sequence[float],
+        *,
+        embedding_model: EmbeddingModel,
+        top_k: int = 3,
+        mmr: bool = False,
+        mmr_lambda: Optional[float] = None,
+        fetch_k: Optional[int] = None,
+    ) -> List[RetrievedContext]:
+        """Query several stores concurrently and merge their results by similarity.
 
-        if vector_store == "chroma":
-            return await asyncio.to_thread(
-                self._query_chroma,
-                embedding_model,
-                list(query_vector),
-                limit,
-                dataset_ids,
+        Each source gets its own timeout; sources that time out or fail are
+        dropped with a warning, and an error is raised only if all of them fail.
+        """
+
+        if not query_vector or not sources:
+            return []
+
+        limit = max(1, min(top_k, 200))
+        fetch_limit = limit
+        if mmr:
+            fetch_limit = max(limit, min(fetch_k or limit * DEFAULT_MMR_FETCH_MULTIPLIER, 200))
+        vector = list(query_vector)
+
+        async def fetch(source: RetrievalSource) -> List[RetrievedContext]:
+            timeout = source.timeout_seconds or self._settings.federated_source_timeout_seconds
+            results = await asyncio.wait_for(
+                self._fetch_candidates(
+                    source.vector_store,
+                    vector,
+                    embedding_model=embedding_model,
+                    limit=fetch_limit,
+                    pinecone=source.pinecone,
+                    chroma=source.chroma,
+                    dataset_ids=source.dataset_ids,
+                    include_embeddings=mmr,
+                ),
+                timeout=timeout,
             )
+            return sorted(results, key=_similarity_key)
 
-        raise VectorStoreServiceError(f"Unsupported vector store '{vector_store}'")
+        outcomes = await asyncio.gather(*(fetch(source) for source in sources), return_exceptions=True)
+
+        ranked: List[List[RetrievedContext]] = []
+        failures: List[str] = []
+        for source, outcome in zip(sources, outcomes, strict=True):
+            if isinstance(outcome, BaseException):
+                reason = "timed out" if isinstance(outcome, asyncio.TimeoutError) else str(outcome)
+                failures.append(f"{source.vector_store}: {reason}")
+                logger.warning(
+                    "Dropping retrieval source",
+                    extra={"vector_store": source.vector_store, "datasets": len(source.dataset_ids), "reason": reason},
+                )
+                continue
+            ranked.append(outcome)
+
+        if not ranked:
+            raise VectorStoreServiceError(f"All retrieval sources failed ({'; '.join(failures)})")
+
+        results = _merge_ranked(ranked, fetch_limit)
+        return await self._finalise(query_vector, results, limit=limit, mmr=mmr, mmr_lambda=mmr_lambda)
+
+    async def _fetch_candidates(
+        self,
+        vector_store: VectorStore,
+        vector: List[float],
+        *,
+        embedding_model: EmbeddingModel,
+        limit: int,
+        pinecone: Optional[PineconeConfig],
+        chroma: Optional[ChromaIndexConfig],
+        dataset_ids: Optional[Sequence[str]],
+        include_embeddings: bool,
+    ) -> List[RetrievedContext]:
+        if vector_store == "pinecone" and not pinecone:
+            raise VectorStoreServiceError("Pinecone configuration missing for retrieval")
+        if vector_store not in ("pinecone", "chroma", "local"):
+            raise VectorStoreServiceError(f"Unsupported vector store '{vector_store}'")
+        self._ensure_enabled(vector_store)
+
+        def search(filters: Optional[Sequence[str]], partition: Optional[str] = None) -> List[RetrievedContext]:
+            if vector_store == "pinecone":
+                assert pinecone is not None
+                return self._query_pinecone(pinecone, vector, limit, filters, include_embeddings, partition=partition)
+            if vector_store == "chroma":
+                return self._query_chroma(
+                    embedding_model, vector, limit, filters, include_embeddings, chroma, partition=partition
+                )
+            return self._query_local(embedding_model, vector, limit, filters, include_embeddings, partition=partition)
+
+        partitions = self._partitions(dataset_ids)
+        if partitions:
+            # One partition per dataset: no metadata filter, and partitions are searched concurrently.
+            ranked = await asyncio.gather(*(asyncio.to_thread(search, None, partition) for partition in partitions))
+            return _merge_ranked(ranked, limit)
+        return await asyncio.to_thread(search, dataset_ids)
+
+    async def _finalise(
+        self,
+        query_vector: Sequence[float],
+        results: List[RetrievedContext],
+        *,
+        limit: int,
+        mmr: bool,
+        mmr_lambda: Optional[float],
+    ) -> List[RetrievedContext]:
+        if not mmr:
+            return results[:limit]
+
+        lambda_mult = DEFAULT_MMR_LAMBDA if mmr_lambda is None else max(0.0, min(float(mmr_lambda), 1.0))
+        return await asyncio.to_thread(mmr_rerank, query_vector, results, k=limit, lambda_mult=lambda_mult)
+
+    def _ensure_enabled(self, vector_store: str) -> None:
+        if vector_store not in self._enabled:
+            raise VectorStoreServiceError(f"Vector store '{vector_store}' is not enabled on this server (VECTOR_STORES)")
+
+    def _partitions(self, dataset_ids: Optional[Sequence[str]]) -> List[str]:
+        """Return the dataset partitions to fan out over, or nothing for the shared layout."""
+
+        if self._settings.vector_layout != "partitioned" or not dataset_ids:
+            return []
+        return list(dict.fromkeys(str(dataset_id).strip() for dataset_id in dataset_ids if str(dataset_id).strip()))
 
     # ------------------------------------------------------------------
     # Pinecone
     # ------------------------------------------------------------------
-    def _ensure_pinecone_client(self, api_key: str) -> Pinecone:
+    def _ensure_pinecone_client(self, api_key: str) -> PineconeClient:
         api_key = api_key.strip()
         if not api_key:
             raise VectorStoreServiceError("Pinecone API key cannot be empty")
 
         client = self._pinecone_clients.get(api_key)
-        if Pinecone is None:  # pragma: no cover - defensive guard
-            try:
-                module = import_module("pinecone")
-                globals()["Pinecone"] = getattr(module, "Pinecone")
-                globals()["ServerlessSpec"] = getattr(module, "ServerlessSpec", None)
-                try:
-                    exc_module = import_module("pinecone.exceptions")
-                    globals()["PineconeApiException"] = getattr(exc_module, "PineconeApiException")
-                except ImportError:
-                    try:
-                        exc_module = import_module("pinecone.core.client.exceptions")
-                        globals()["PineconeApiException"] = getattr(exc_module, "PineconeApiException")
-                    except ImportError:
-                        globals()["PineconeApiException"] = Exception
-                global _pinecone_import_error
-                _pinecone_import_error = None
-            except ImportError as exc:
-                detail = str(exc)
-                if _pinecone_import_error is not None:
-                    detail = f"{detail} | initial error: {_pinecone_import_error}"
-                raise VectorStoreServiceError(
-                    "Pinecone SDK is not available. Install it with `pip install pinecone`."
-                    f" (Python executable: {sys.executable}) | {detail}"
-                ) from exc
-
         if client is None:
             logger.debug("Creating Pinecone client", extra={"api_key_prefix": api_key[:4] + "***"})
-            client = Pinecone(api_key=api_key)  # type: ignore[call-arg]
+            client = _load_pinecone()(api_key=api_key)
             self._pinecone_clients[api_key] = client
         return client
 
+    @instrumented("vector_store", "pinecone_upsert")
     def _upsert_pinecone(
         self,
         config: PineconeConfig,
@@ -234,6 +450,7 @@ class VectorStoreService:
                 "chunk_order": chunk.order,
                 "embedding_model": embedding_model,
                 "chunk_text": chunk.text[:4096],
+                **_duplicate_metadata(chunk),
             }
             vectors.append({"id": vector_id, "values": embedding, "metadata": metadata})
 
@@ -256,6 +473,13 @@ class VectorStoreService:
         )
 
         namespace = config.namespace or None
+        if self._settings.vector_layout == "partitioned":
+            namespace = _pinecone_partition_namespace(config.namespace, dataset.id)
+            try:
+                # Re-embedding replaces the whole partition, including chunks that no longer exist.
+                index.delete(delete_all=True, namespace=namespace)
+            except Exception:  # noqa: BLE001 - the namespace does not exist yet
+                pass
         initial_batch_size = 100
         total_batches = max(1, (len(vectors) + initial_batch_size - 1) // initial_batch_size)
 
@@ -304,7 +528,7 @@ class VectorStoreService:
 
             send_batch(batch)
 
-            logger.info(
+            logger.debug(
                 "Pinecone batch upsert complete",
                 extra={
                     "batch_number": batch_number,
@@ -314,27 +538,39 @@ class VectorStoreService:
                 },
             )
 
+        logger.info(
+            "Pinecone upsert complete",
+            extra={"index": config.index_name, "dataset": dataset.id, "count": len(vectors), "batches": total_batches},
+        )
         return len(vectors)
 
+    @instrumented("vector_store", "pinecone_query")
     def _query_pinecone(
         self,
         config: PineconeConfig,
         query_vector: Sequence[float],
         top_k: int,
         dataset_ids: Optional[Sequence[str]] = None,
+        include_embeddings: bool = False,
+        *,
+        partition: Optional[str] = None,
     ) -> List[RetrievedContext]:
         client = self._ensure_pinecone_client(config.api_key)
         index = client.Index(config.index_name)
+        metric = self._pinecone_metric(client, config)
 
         kwargs = {
             "vector": list(query_vector),
             "top_k": top_k,
             "include_metadata": True,
+            "include_values": include_embeddings,
         }
-        if config.namespace:
+        if partition:
+            kwargs["namespace"] = _pinecone_partition_namespace(config.namespace, partition)
+        elif config.namespace:
             kwargs["namespace"] = config.namespace
 
-        if dataset_ids:
+        if dataset_ids and not partition:
             filters = [str(dataset_id).strip() for dataset_id in dataset_ids if str(dataset_id).strip()]
             if filters:
                 kwargs["filter"] = {"dataset_id": {"$in": filters}}
@@ -368,16 +604,44 @@ class VectorStoreService:
             except (TypeError, ValueError):  # pragma: no cover - defensive
                 parsed_score = None
 
+            values = None
+            if include_embeddings:
+                values = getattr(match, "values", None)
+                if values is None and isinstance(match, dict):
+                    values = match.get("values")
+
             results.append(
                 RetrievedContext(
                     text=str(text or ""),
                     score=parsed_score,
                     metadata=metadata,
+                    embedding=[float(value) for value in values] if values else None,
+                    similarity=_pinecone_similarity(parsed_score, metric),
                 )
             )
 
+        if partition and not results:
+            # Datasets embedded before the partitioned layout still live in the shared namespace.
+            return self._query_pinecone(config, query_vector, top_k, [partition], include_embeddings)
         return results
 
+    def _pinecone_metric(self, client: PineconeClient, config: PineconeConfig) -> str:
+        """Return the distance metric of the index, cached per API key and index."""
+
+        key = (config.api_key, config.index_name)
+        metric = self._pinecone_metrics.get(key)
+        if metric is None:
+            try:
+                description = client.describe_index(config.index_name)
+                metric = getattr(description, "metric", None)
+                if metric is None and isinstance(description, dict):
+                    metric = description.get("metric")
+            except Exception:  # pragma: no cover - descriptive call best effort
+                metric = None
+            metric = str(metric or "cosine").lower()
+            self._pinecone_metrics[key] = metric
+        return metric
+
     # ------------------------------------------------------------------
     # Chroma
     # ------------------------------------------------------------------
@@ -385,6 +649,7 @@ class VectorStoreService:
         if self._chroma_client is None:
             storage_dir = self._settings.chroma_directory
             Path(storage_dir).mkdir(parents=True, exist_ok=True)
+            chromadb = _load_chromadb()
             try:
                 self._chroma_client = chromadb.PersistentClient(path=str(storage_dir))
             except Exception as exc:
@@ -400,9 +665,12 @@ class VectorStoreService:
                     "chroma_api_impl": "chromadb.api.local.LocalAPI",
                 }
                 fallback_settings = None
-                if ChromaSettingsType is not None:
+                settings_type = getattr(import_module("chromadb.config"), "Settings", None) or getattr(
+                    chromadb, "Settings", None
+                )
+                if settings_type is not None:
                     try:
-                        fallback_settings = ChromaSettingsType(**settings_kwargs)  # type: ignore[arg-type]
+                        fallback_settings = settings_type(**settings_kwargs)  # type: ignore[arg-type]
                     except TypeError:
                         # Some versions expect positional arguments; fall back to default init
                         pass
@@ -414,15 +682,72 @@ class VectorStoreService:
 
         return self._chroma_client
 
+    def _chroma_collection(
+        self,
+        name: str,
+        *,
+        create: bool,
+        index_config: Optional[ChromaIndexConfig] = None,
+    ) -> Optional[_ChromaHandle]:
+        """Return a cached collection handle, creating the collection if asked.
+
+        Misses are cached for a few seconds too, so queries against a model
+        nobody embedded with do not take the lock and ask Chroma every time;
+        the window bounds how long a collection created by another worker
+        stays invisible here.
+        """
+
+        handle = self._chroma_collections.get(name)
+        if handle is None and not create:
+            missing_since = self._chroma_missing.get(name)
+            if missing_since is not None and time.monotonic() - missing_since < CHROMA_MISSING_TTL_SECONDS:
+                return None
+        if handle is None:
+            with self._chroma_lock:
+                handle = self._chroma_collections.get(name)
+                if handle is None:
+                    client = self._ensure_chroma_client()
+                    try:
+                        collection = client.get_collection(name)
+                    except Exception:  # noqa: BLE001 - collection does not exist
+                        if not create:
+                            self._chroma_missing[name] = time.monotonic()
+                            return None
+                        # The HNSW profile only applies when the collection is first created.
+                        profile = index_config or ChromaIndexConfig()
+                        collection = client.get_or_create_collection(
+                            name,
+                            configuration={
+                                "hnsw": {
+                                    "space": profile.space,
+                                    "max_neighbors": profile.m,
+                                    "ef_construction": profile.ef_construction,
+                                    "ef_search": profile.ef_search,
+                                }
+                            },
+                        )
+                    handle = _ChromaHandle(collection=collection, space=_read_hnsw_space(collection))
+                    self._chroma_collections[name] = handle
+                    self._chroma_missing.pop(name, None)
+        return handle
+
+    @instrumented("vector_store", "chroma_upsert")
     def _upsert_chroma(
         self,
         dataset: DatasetEmbeddingPayload,
         embeddings: List[List[float]],
         embedding_model: EmbeddingModel,
+        index_config: Optional[ChromaIndexConfig] = None,
     ) -> int:
-        client = self._ensure_chroma_client()
-        collection_name = f"krira__{embedding_model}".replace("-", "_")
-        collection = client.get_or_create_collection(collection_name)
+        dimension = len(embeddings[0])
+        shared_name = _chroma_collection_name(embedding_model, dimension)
+        partitioned = self._settings.vector_layout == "partitioned"
+        collection_name = _partition_name(shared_name, dataset.id) if partitioned else shared_name
+        if partitioned:
+            self._drop_chroma_collection(collection_name)
+        handle = self._chroma_collection(collection_name, create=True, index_config=index_config)
+        assert handle is not None
+        collection = handle.collection
 
         ids = [f"{dataset.id}::{chunk.order}" for chunk in dataset.chunks]
         metadatas = [
@@ -432,6 +757,7 @@ class VectorStoreService:
                 "dataset_type": dataset.dataset_type,
                 "chunk_order": chunk.order,
                 "embedding_model": embedding_model,
+                **_duplicate_metadata(chunk),
             }
             for chunk in dataset.chunks
         ]
@@ -442,20 +768,66 @@ class VectorStoreService:
             extra={"collection": collection_name, "dataset": dataset.id, "count": len(ids)},
         )
 
-        collection.delete(where={"dataset_id": dataset.id})
+        if not partitioned:
+            collection.delete(where={"dataset_id": dataset.id})
         collection.add(ids=ids, embeddings=embeddings, metadatas=metadatas, documents=documents)
+
+        # Re-embedded datasets move out of the shared collections they were written to before.
+        stale_names = [_chroma_collection_name(embedding_model)]
+        if partitioned:
+            stale_names.append(shared_name)
+        for stale_name in stale_names:
+            stale = self._chroma_collection(stale_name, create=False)
+            if stale is not None:
+                stale.collection.delete(where={"dataset_id": dataset.id})
         return len(ids)
 
+    def _drop_chroma_collection(self, name: str) -> None:
+        with self._chroma_lock:
+            self._chroma_collections.pop(name, None)
+            self._chroma_missing[name] = time.monotonic()
+            try:
+                self._ensure_chroma_client().delete_collection(name)
+            except Exception:  # noqa: BLE001 - the collection does not exist
+                pass
+
+    @instrumented("vector_store", "chroma_query")
     def _query_chroma(
         self,
         embedding_model: EmbeddingModel,
         query_vector: Sequence[float],
         top_k: int,
         dataset_ids: Optional[Sequence[str]] = None,
+        include_embeddings: bool = False,
+        index_config: Optional[ChromaIndexConfig] = None,
+        *,
+        partition: Optional[str] = None,
     ) -> List[RetrievedContext]:
-        client = self._ensure_chroma_client()
-        collection_name = f"krira__{embedding_model}".replace("-", "_")
-        collection = client.get_or_create_collection(collection_name)
+        include = ["documents", "metadatas", "distances"]
+        if include_embeddings:
+            include.append("embeddings")
+
+        if partition:
+            shared_name = _chroma_collection_name(embedding_model, len(query_vector))
+            handle = self._chroma_collection(
+                _partition_name(shared_name, partition),
+                create=False,
+                index_config=index_config,
+            )
+            if handle is None:
+                # Not migrated yet: fall back to the shared collections filtered to this dataset.
+                return self._query_chroma(
+                    embedding_model, query_vector, top_k, [partition], include_embeddings, index_config
+                )
+            try:
+                result = handle.collection.query(
+                    query_embeddings=[list(query_vector)],
+                    n_results=top_k,
+                    include=include,
+                )
+            except Exception as exc:  # pragma: no cover - defensive
+                raise VectorStoreServiceError("Chroma query failed") from exc
+            return _parse_chroma_result(result, handle.space)
 
         where_filter = None
         if dataset_ids:
@@ -463,38 +835,388 @@ class VectorStoreService:
             if filters:
                 where_filter = {"dataset_id": {"$in": filters}}
 
+        handles = [
+            self._chroma_collection(
+                _chroma_collection_name(embedding_model, len(query_vector)),
+                create=False,
+                index_config=index_config,
+            ),
+            self._chroma_collection(_chroma_collection_name(embedding_model), create=False),
+        ]
+
+        results: List[RetrievedContext] = []
+        queried = 0
+        for handle in handles:
+            if handle is None:
+                continue
+            try:
+                result = handle.collection.query(
+                    query_embeddings=[list(query_vector)],
+                    n_results=top_k,
+                    where=where_filter,
+                    include=include,
+                )
+            except Exception as exc:  # pragma: no cover - defensive
+                if handle is handles[0] or handles[0] is None:
+                    raise VectorStoreServiceError("Chroma query failed") from exc
+                # The legacy collection may hold vectors of another dimension.
+                logger.debug("Skipping legacy Chroma collection", extra={"error": str(exc)})
+                continue
+            queried += 1
+            results.extend(_parse_chroma_result(result, handle.space))
+
+        if queried > 1:
+            results.sort(key=_similarity_key)
+        return results[:top_k]
+
+    # ------------------------------------------------------------------
+    # Local
+    # ------------------------------------------------------------------
+    @instrumented("vector_store", "local_upsert")
+    def _upsert_local(
+        self,
+        dataset: DatasetEmbeddingPayload,
+        embeddings: List[List[float]],
+        embedding_model: EmbeddingModel,
+    ) -> int:
+        dimension = len(embeddings[0])
+        shared_name = _chroma_collection_name(embedding_model, dimension)
+        collection_name = shared_name
+        if self._settings.vector_layout == "partitioned":
+            collection_name = _partition_name(shared_name, dataset.id)
+            shared = self._local_store.collection(shared_name, dimension, create=False)
+            if shared is not None:
+                shared.delete_dataset(dataset.id)
         try:
-            result = collection.query(
-                query_embeddings=[list(query_vector)],
-                n_results=top_k,
-                where=where_filter,
-                include=["documents", "metadatas", "distances"],
+            collection = self._local_store.collection(collection_name, dimension)
+            assert collection is not None
+            collection.delete_dataset(dataset.id)
+            records = [
+                LocalRecord(
+                    id=f"{dataset.id}::{chunk.order}",
+                    dataset_id=dataset.id,
+                    text=chunk.text,
+                    metadata={
+                        "dataset_id": dataset.id,
+                        "dataset_label": dataset.label,
+                        "dataset_type": dataset.dataset_type,
+                        "chunk_order": chunk.order,
+                        "embedding_model": embedding_model,
+                        **_duplicate_metadata(chunk),
+                    },
+                )
+                for chunk in dataset.chunks
+            ]
+            logger.info(
+                "Persisting vectors to local store",
+                extra={"collection": collection_name, "dataset": dataset.id, "count": len(records)},
             )
-        except Exception as exc:  # pragma: no cover - defensive
-            raise VectorStoreServiceError("Chroma query failed") from exc
+            return collection.add(embeddings, records)
+        except LocalVectorStoreError as exc:
+            raise VectorStoreServiceError(f"Local vector store upsert failed: {exc}") from exc
 
-        documents = (result.get("documents") if isinstance(result, dict) else getattr(result, "documents", None)) or [[]]
-        metadatas = (result.get("metadatas") if isinstance(result, dict) else getattr(result, "metadatas", None)) or [[]]
-        distances = (result.get("distances") if isinstance(result, dict) else getattr(result, "distances", None)) or [[]]
+    @instrumented("vector_store", "local_query")
+    def _query_local(
+        self,
+        embedding_model: EmbeddingModel,
+        query_vector: Sequence[float],
+        top_k: int,
+        dataset_ids: Optional[Sequence[str]] = None,
+        include_embeddings: bool = False,
+        *,
+        partition: Optional[str] = None,
+    ) -> List[RetrievedContext]:
+        dimension = len(query_vector)
+        shared_name = _chroma_collection_name(embedding_model, dimension)
+        if partition:
+            collection = self._local_store.collection(_partition_name(shared_name, partition), dimension, create=False)
+            if collection is None:
+                return self._query_local(embedding_model, query_vector, top_k, [partition], include_embeddings)
+            filters: List[str] = []
+        else:
+            collection = self._local_store.collection(shared_name, dimension, create=False)
+            if collection is None:
+                return []
+            filters = [str(dataset_id).strip() for dataset_id in dataset_ids or [] if str(dataset_id).strip()]
+        try:
+            matches = collection.search(
+                query_vector,
+                top_k,
+                dataset_ids=filters or None,
+                rescore_multiplier=self._settings.local_vector_rescore_multiplier,
+                include_embeddings=include_embeddings,
+            )
+        except LocalVectorStoreError as exc:
+            raise VectorStoreServiceError(f"Local vector store query failed: {exc}") from exc
+
+        return [
+            RetrievedContext(
+                text=match.record.text,
+                score=match.similarity,
+                metadata=dict(match.record.metadata),
+                embedding=match.embedding,
+                similarity=match.similarity,
+            )
+            for match in matches
+        ]
 
-        docs = documents[0] if documents else []
-        metas = metadatas[0] if metadatas else []
-        dists = distances[0] if distances else []
+    # ------------------------------------------------------------------
+    # Layout migration
+    # ------------------------------------------------------------------
+    def migrate_to_partitions(
+        self,
+        vector_store: VectorStore,
+        *,
+        pinecone: Optional[PineconeConfig] = None,
+        delete_source: bool = False,
+        batch_size: int = 500,
+    ) -> Dict[str, int]:
+        """Copy vectors from the shared layout into per-dataset partitions.
 
-        results: List[RetrievedContext] = []
-        for text, metadata, distance in zip(docs, metas, dists, strict=False):
-            try:
-                score = float(distance) if distance is not None else None
-            except (TypeError, ValueError):  # pragma: no cover - defensive
-                score = None
+        Returns the number of vectors copied per dataset. The shared copies are
+        kept unless ``delete_source`` is set; partitioned queries only read them
+        for datasets that have no partition yet.
+        """
 
-            metadata_dict: Dict[str, Any] = dict(metadata or {})
-            results.append(
-                RetrievedContext(
-                    text=str(text or ""),
-                    score=score,
-                    metadata=metadata_dict,
+        self._ensure_enabled(vector_store)
+        if vector_store == "pinecone":
+            if not pinecone:
+                raise VectorStoreServiceError("Pinecone configuration missing for migration")
+            return self._migrate_pinecone(pinecone, delete_source, batch_size)
+        if vector_store == "chroma":
+            return self._migrate_chroma(delete_source, batch_size)
+        if vector_store == "local":
+            return self._migrate_local(delete_source, batch_size)
+        raise VectorStoreServiceError(f"Unsupported vector store '{vector_store}'")
+
+    def _migrate_pinecone(self, config: PineconeConfig, delete_source: bool, batch_size: int) -> Dict[str, int]:
+        client = self._ensure_pinecone_client(config.api_key)
+        index = client.Index(config.index_name)
+        namespace = config.namespace or ""
+
+        copied: Dict[str, int] = {}
+        # Deleting while ``index.list`` paginates would shift its pages and skip vectors,
+        # so the source copies are removed only once listing has finished.
+        moved: List[str] = []
+        for page in index.list(namespace=namespace, limit=min(batch_size, 100)):
+            ids = list(page or [])
+            if not ids:
+                continue
+            response = index.fetch(ids=ids, namespace=namespace)
+            fetched = getattr(response, "vectors", None)
+            if fetched is None and isinstance(response, dict):
+                fetched = response.get("vectors", {})
+
+            groups: Dict[str, List[dict]] = {}
+            for vector_id, record in (fetched or {}).items():
+                values = getattr(record, "values", None)
+                metadata_obj = getattr(record, "metadata", None)
+                if isinstance(record, dict):
+                    values = record.get("values")
+                    metadata_obj = record.get("metadata")
+                metadata = dict(metadata_obj or {})
+                dataset_id = str(metadata.get("dataset_id") or "")
+                if not dataset_id or not values:
+                    continue
+                groups.setdefault(dataset_id, []).append(
+                    {"id": vector_id, "values": [float(value) for value in values], "metadata": metadata}
                 )
+
+            for dataset_id, vectors in groups.items():
+                index.upsert(vectors=vectors, namespace=_pinecone_partition_namespace(config.namespace, dataset_id))
+                copied[dataset_id] = copied.get(dataset_id, 0) + len(vectors)
+                moved.extend(vector["id"] for vector in vectors)
+
+        if delete_source:
+            step = min(batch_size, 1000)
+            for start in range(0, len(moved), step):
+                index.delete(ids=moved[start:start + step], namespace=namespace)
+        return copied
+
+    def _migrate_chroma(self, delete_source: bool, batch_size: int) -> Dict[str, int]:
+        client = self._ensure_chroma_client()
+        copied: Dict[str, int] = {}
+        for entry in client.list_collections():
+            name = entry if isinstance(entry, str) else str(getattr(entry, "name", ""))
+            if not name.startswith("krira__") or "__ds_" in name:
+                continue
+            source = self._chroma_collection(name, create=False)
+            if source is None:
+                continue
+            profile = ChromaIndexConfig(space=source.space) if source.space in ("cosine", "l2", "ip") else None
+
+            seen: set[str] = set()
+            offset = 0
+            while True:
+                page = source.collection.get(
+                    include=["embeddings", "documents", "metadatas"],
+                    limit=batch_size,
+                    offset=offset,
+                )
+                ids = list(page.get("ids") or [])
+                if not ids:
+                    break
+                offset += len(ids)
+
+                groups: Dict[str, Dict[str, list]] = {}
+                for vector_id, embedding, document, metadata in zip(
+                    ids, page["embeddings"], page["documents"], page["metadatas"], strict=False
+                ):
+                    dataset_id = str((metadata or {}).get("dataset_id") or "")
+                    if not dataset_id or embedding is None:
+                        continue
+                    group = groups.setdefault(dataset_id, {"ids": [], "embeddings": [], "documents": [], "metadatas": []})
+                    group["ids"].append(vector_id)
+                    group["embeddings"].append([float(value) for value in embedding])
+                    group["documents"].append(document)
+                    group["metadatas"].append(metadata)
+
+                for dataset_id, group in groups.items():
+                    dimension = len(group["embeddings"][0])
+                    # Pre-dimension collections are split by the width of their vectors.
+                    shared_name = name if re.search(r"__\d+$", name) else f"{name}__{dimension}"
+                    target = self._chroma_collection(
+                        _partition_name(shared_name, dataset_id),
+                        create=True,
+                        index_config=profile,
+                    )
+                    assert target is not None
+                    target.collection.upsert(**group)
+                    copied[dataset_id] = copied.get(dataset_id, 0) + len(group["ids"])
+                    seen.add(dataset_id)
+
+            if delete_source:
+                for dataset_id in seen:
+                    source.collection.delete(where={"dataset_id": dataset_id})
+            logger.info("Partitioned Chroma collection", extra={"collection": name, "datasets": len(seen)})
+        return copied
+
+    def _migrate_local(self, delete_source: bool, batch_size: int) -> Dict[str, int]:
+        copied: Dict[str, int] = {}
+        try:
+            for name in self._local_store.names():
+                dimension = self._local_store.dimension_of(name)
+                if "__ds_" in name or dimension is None:
+                    continue
+                source = self._local_store.collection(name, dimension, create=False)
+                if source is None:
+                    continue
+
+                seen: set[str] = set()
+                for vectors, records in source.iter_rows(batch_size):
+                    groups: Dict[str, List[int]] = {}
+                    for position, record in enumerate(records):
+                        groups.setdefault(record.dataset_id, []).append(position)
+                    for dataset_id, positions in groups.items():
+                        target = self._local_store.collection(_partition_name(name, dataset_id), dimension)
+                        assert target is not None
+                        if dataset_id not in seen:
+                            # Makes re-running the migration idempotent.
+                            target.delete_dataset(dataset_id)
+                            seen.add(dataset_id)
+                        target.add(vectors[positions], [records[position] for position in positions])
+                        copied[dataset_id] = copied.get(dataset_id, 0) + len(positions)
+
+                if delete_source:
+                    for dataset_id in seen:
+                        source.delete_dataset(dataset_id)
+                logger.info("Partitioned local collection", extra={"collection": name, "datasets": len(seen)})
+        except LocalVectorStoreError as exc:
+            raise VectorStoreServiceError(f"Local vector store migration failed: {exc}") from exc
+        return copied
+
+
+@dataclass(slots=True)
+class _ChromaHandle:
+    collection: Any
+    space: str
+
+
+def _chroma_collection_name(embedding_model: EmbeddingModel, dimension: Optional[int] = None) -> str:
+    base = f"krira__{embedding_model}".replace("-", "_")
+    return f"{base}__{dimension}" if dimension else base
+
+
+def _partition_name(collection_name: str, dataset_id: str) -> str:
+    # Chroma collection names only allow letters, digits, '.', '_' and '-'.
+    return f"{collection_name}__ds_{re.sub(r'[^A-Za-z0-9_-]', '_', dataset_id)}"
+
+
+def _pinecone_partition_namespace(namespace: Optional[str], dataset_id: str) -> str:
+    return f"{namespace}__{dataset_id}" if namespace else f"ds__{dataset_id}"
+
+
+def _similarity_key(context: RetrievedContext) -> float:
+    # Sort key placing the most similar contexts first and unscored ones last.
+    return float("inf") if context.similarity is None else -context.similarity
+
+
+def _merge_ranked(ranked: Sequence[List[RetrievedContext]], limit: int) -> List[RetrievedContext]:
+    """K-way merge of per-partition results that are each already sorted by similarity."""
+
+    return list(islice(heapq.merge(*ranked, key=_similarity_key), limit))
+
+
+def _read_hnsw_space(collection: Any) -> str:
+    space: Optional[str] = None
+    configuration = getattr(collection, "configuration", None) or getattr(collection, "configuration_json", None)
+    hnsw = configuration.get("hnsw") if isinstance(configuration, dict) else None
+    if isinstance(hnsw, dict):
+        space = hnsw.get("space")
+    metadata = getattr(collection, "metadata", None) or {}
+    return str(space or metadata.get("hnsw:space") or "l2")
+
+
+def _chroma_similarity(distance: Optional[float], space: str) -> Optional[float]:
+    """Convert a Chroma distance into cosine similarity for unit-normalised embeddings."""
+
+    if distance is None:
+        return None
+    # Squared L2 between unit vectors is twice the cosine distance; ``ip`` and
+    # ``cosine`` spaces both report ``1 - dot``.
+    if space == "l2":
+        return 1.0 - distance / 2.0
+    return 1.0 - distance
+
+
+def _pinecone_similarity(score: Optional[float], metric: str) -> Optional[float]:
+    """Convert a Pinecone match score into cosine similarity for unit-normalised embeddings."""
+
+    if score is None:
+        return None
+    if metric == "euclidean":
+        # Pinecone reports squared Euclidean distance for this metric.
+        return 1.0 - score / 2.0
+    return score
+
+
+def _parse_chroma_result(result: Any, space: str) -> List[RetrievedContext]:
+    documents = (result.get("documents") if isinstance(result, dict) else getattr(result, "documents", None)) or [[]]
+    metadatas = (result.get("metadatas") if isinstance(result, dict) else getattr(result, "metadatas", None)) or [[]]
+    distances = (result.get("distances") if isinstance(result, dict) else getattr(result, "distances", None)) or [[]]
+    vectors = result.get("embeddings") if isinstance(result, dict) else getattr(result, "embeddings", None)
+
+    docs = documents[0] if documents else []
+    metas = metadatas[0] if metadatas else []
+    dists = distances[0] if distances else []
+    embeds = list(vectors[0]) if vectors is not None and len(vectors) else [None] * len(docs)
+
+    results: List[RetrievedContext] = []
+    for text, metadata, distance, embedding in zip(docs, metas, dists, embeds, strict=False):
+        try:
+            score = float(distance) if distance is not None else None
+        except (TypeError, ValueError):  # pragma: no cover - defensive
+            score = None
+
+        metadata_dict: Dict[str, Any] = dict(metadata or {})
+        results.append(
+            RetrievedContext(
+                text=str(text or ""),
+                score=score,
+                metadata=metadata_dict,
+                embedding=[float(value) for value in embedding] if embedding is not None else None,
+                similarity=_chroma_similarity(score, space),
             )
+        )
 
-        return results
+    return results
@@ -0,0 +1,54 @@
+"""Background warm-up of the heavy optional dependencies imported on first use."""
+
+from __future__ import annotations
+
+import time
+from importlib import import_module
+from typing import Dict, Iterable, List, Tuple
+
+from ..utils import get_logger
+
+
+logger = get_logger(__name__)
+
+
+WARMUP_TARGETS: Dict[str, Tuple[str, ...]] = {
+    "pinecone": ("pinecone",),
+    "chroma": ("chromadb",),
+    "llm": ("langchain_core.prompts", "langchain_openai", "openai"),
+    "web": ("bs4",),
+    "pdf": ("pdfplumber",),
+    "onnx": ("onnxruntime", "tokenizers"),
+}
+
+
+def parse_warmup_targets(value: str) -> List[str]:
+    """Return the known targets named in a comma-separated ``WARMUP_IMPORTS`` value."""
+
+    names = [entry.strip().lower() for entry in (value or "").split(",") if entry.strip()]
+    if "all" in names:
+        return list(WARMUP_TARGETS)
+    unknown = [name for name in names if name not in WARMUP_TARGETS]
+    if unknown:
+        logger.warning("Ignoring unknown warm-up targets", extra={"targets": unknown})
+    return [name for name in dict.fromkeys(names) if name in WARMUP_TARGETS]
+
+
+def warm_up(targets: Iterable[str]) -> Dict[str, float]:
+    """Import the modules behind each target and return the seconds spent per target.
+
+    Missing optional packages are logged and skipped; the code paths that need
+    them raise their usual service errors on first use.
+    """
+
+    timings: Dict[str, float] = {}
+    for target in targets:
+        started = time.perf_counter()
+        for module in WARMUP_TARGETS.get(target, ()):
+            try:
+                import_module(module)
+            except ImportError as exc:
+                logger.warning("Warm-up import failed", extra={"target": target, "module": module, "error": str(exc)})
+        timings[target] = round(time.perf_counter() - started, 3)
+    logger.info("Warm-up imports complete", extra={"timings": timings})
+    return timings
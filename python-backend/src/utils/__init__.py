@@ -1,6 +1,15 @@
 """Utility helpers for the Krira AI dataset processing pipeline."""
 
 from .file_cleaner import clean_text
-from .logger import get_logger
+from .logger import configure_logging, get_logger, parse_sample_rates
+from .metrics import instrumented, render_metrics, timer
 
-__all__ = ["clean_text", "get_logger"]
+__all__ = [
+    "clean_text",
+    "configure_logging",
+    "get_logger",
+    "instrumented",
+    "parse_sample_rates",
+    "render_metrics",
+    "timer",
+]
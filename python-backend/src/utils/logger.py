@@ -1,23 +1,218 @@
-"""Logging utilities for Krira AI services."""
+"""Logging utilities for Krira AI services.
+
+Every service logger hands records to one bounded in-memory queue and a single
+listener thread writes them to stderr, so request handlers never block on log
+I/O. When the queue is full, records are dropped and counted; they never
+block. DEBUG and INFO records can be sampled per module. Warnings and errors
+are always kept.
+"""
 
 from __future__ import annotations
 
+import atexit
+import copy
+import json
 import logging
+import os
+import queue
+import random
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
 
+from .metrics import REGISTRY
+
+
+DEFAULT_QUEUE_SIZE = 10_000
+TEXT_FORMAT = "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
+TEXT_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+LOG_RECORDS_DROPPED = REGISTRY.counter(
+    "krira_log_records_dropped_total",
+    "Log records discarded because the logging queue was full.",
+    ("level",),
+)
+LOG_RECORDS_SAMPLED_OUT = REGISTRY.counter(
+    "krira_log_records_sampled_out_total",
+    "DEBUG/INFO log records skipped by per-module sampling.",
+    ("logger",),
+)
+
+# Attributes every LogRecord carries; anything else was passed via ``extra``.
+_RESERVED_ATTRIBUTES = frozenset(logging.makeLogRecord({}).__dict__) | {"message", "asctime", "taskName"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Render a record as one JSON object per line, including ``extra`` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRIBUTES and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exc_info"] = record.exc_text
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+def parse_sample_rates(value: Optional[str]) -> Dict[str, float]:
+    """Parse ``"src.services.vectorstores=0.1,src.api=0.5"`` into logger-prefix rates."""
+
+    rates: Dict[str, float] = {}
+    for entry in (value or "").split(","):
+        prefix, _, rate = entry.partition("=")
+        if not prefix.strip() or not rate.strip():
+            continue
+        try:
+            rates[prefix.strip()] = max(0.0, min(float(rate), 1.0))
+        except ValueError:
+            continue
+    return rates
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a configured fraction of DEBUG/INFO records per logger-name prefix.
+
+    The longest matching prefix wins; loggers without a match keep everything.
+    """
+
+    def __init__(self, rates: Optional[Dict[str, float]] = None) -> None:
+        super().__init__()
+        self.configure(rates or {})
+
+    def configure(self, rates: Dict[str, float]) -> None:
+        self._rates = dict(rates)
+        self._resolved: Dict[str, float] = {}
+
+    def _rate(self, name: str) -> float:
+        rate = self._resolved.get(name)
+        if rate is None:
+            matches = [prefix for prefix in self._rates if name == prefix or name.startswith(f"{prefix}.")]
+            rate = self._rates[max(matches, key=len)] if matches else 1.0
+            self._resolved[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO or not self._rates:
+            return True
+        rate = self._rate(record.name)
+        if rate >= 1.0 or random.random() < rate:
+            return True
+        LOG_RECORDS_SAMPLED_OUT.inc(logger=record.name)
+        return False
 
-def get_logger(name: str, level: int = logging.INFO) -> logging.Logger:
-    """Return a configured logger with structured formatting."""
 
-    formatter = logging.Formatter(
-        fmt="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
-    )
-    handler = logging.StreamHandler()
-    handler.setFormatter(formatter)
+class NonBlockingQueueHandler(QueueHandler):
+    """Queue handler that drops (and counts) records instead of blocking when full.
+
+    Formatting is left to the listener thread; the caller only merges the
+    message arguments so later mutation of the arguments cannot change the log.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc(level=record.levelname)
+
+
+class _LoggingPipeline:
+    """The shared queue, handler, and writer thread behind every service logger."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.stream_handler = logging.StreamHandler()
+        self.sampler = SamplingFilter()
+        self.handler = NonBlockingQueueHandler(queue.Queue(DEFAULT_QUEUE_SIZE))
+        self.handler.addFilter(self.sampler)
+        self.listener: Optional[QueueListener] = None
+        atexit.register(self.stop)
+        self.configure(
+            log_format=os.environ.get("LOG_FORMAT", "json"),
+            sample_rates=parse_sample_rates(os.environ.get("LOG_SAMPLE_RATES")),
+            queue_size=int(os.environ.get("LOG_QUEUE_SIZE") or DEFAULT_QUEUE_SIZE),
+        )
+
+    def start(self) -> None:
+        with self._lock:
+            if self.listener is None:
+                self.listener = QueueListener(self.handler.queue, self.stream_handler, respect_handler_level=True)
+                self.listener.start()
+
+    def stop(self) -> None:
+        """Flush queued records and stop the writer thread."""
+
+        with self._lock:
+            listener, self.listener = self.listener, None
+        if listener is not None:
+            listener.stop()
+
+    def configure(
+        self,
+        *,
+        log_format: Optional[str] = None,
+        sample_rates: Optional[Dict[str, float]] = None,
+        queue_size: Optional[int] = None,
+    ) -> None:
+        if log_format is not None:
+            formatter = (
+                logging.Formatter(fmt=TEXT_FORMAT, datefmt=TEXT_DATE_FORMAT)
+                if log_format.lower() == "text"
+                else JsonFormatter()
+            )
+            self.stream_handler.setFormatter(formatter)
+        if sample_rates is not None:
+            self.sampler.configure(sample_rates)
+        if queue_size is not None and queue_size != self.handler.queue.maxsize:
+            restart = self.listener is not None
+            self.stop()
+            self.handler.queue = queue.Queue(max(1, queue_size))
+            if restart:
+                self.start()
+
+
+_PIPELINE = _LoggingPipeline()
+
+
+def configure_logging(
+    *,
+    log_format: Optional[str] = None,
+    sample_rates: Optional[Dict[str, float]] = None,
+    queue_size: Optional[int] = None,
+) -> None:
+    """Apply application settings to the shared logging pipeline.
+
+    ``log_format`` is ``"json"`` or ``"text"``; ``sample_rates`` maps logger
+    name prefixes to the fraction of DEBUG/INFO records kept.
+    """
+
+    _PIPELINE.configure(log_format=log_format, sample_rates=sample_rates, queue_size=queue_size)
+
+
+def get_logger(name: str, level: int = logging.INFO) -> logging.Logger:
+    """Return a logger that writes through the shared non-blocking queue."""
 
+    _PIPELINE.start()
     logger = logging.getLogger(name)
     logger.setLevel(level)
-    if not logger.handlers:
-        logger.addHandler(handler)
+    if _PIPELINE.handler not in logger.handlers:
+        logger.addHandler(_PIPELINE.handler)
     logger.propagate = False
     return logger
@@ -0,0 +1,19 @@
+"""Shared fixtures for the python-backend test suite."""
+
+from __future__ import annotations
+
+from typing import Callable
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def unit_vectors() -> Callable[..., np.ndarray]:
+    """Return a factory of reproducible random unit vectors."""
+
+    def build(count: int, dimension: int, seed: int = 0) -> np.ndarray:
+        matrix = np.random.default_rng(seed).standard_normal((count, dimension)).astype(np.float32)
+        return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+    return build
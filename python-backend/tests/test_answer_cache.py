@@ -0,0 +1,123 @@
+"""Semantic answer cache hits, scoping and invalidation."""
+
+from __future__ import annotations
+
+from typing import Any, Dict
+
+import numpy as np
+import pytest
+
+from src.services import SemanticAnswerCache
+
+SETTINGS: Dict[str, Any] = {
+    "model_id": "openai/gpt-5",
+    "system_prompt": "Answer from the context.",
+    "embedding_model": "openai-small",
+    "embedding_dimension": 1536,
+    "dataset_ids": ["d1:0", "d2:3"],
+    "top_k": 5,
+}
+
+
+def _store(cache: SemanticAnswerCache, fingerprint: str, vector: np.ndarray, answer: str = "cached") -> None:
+    cache.store("pipeline", fingerprint, vector.tolist(), answer=answer, context_snippets=["c"], dataset_ids=["d1", "d2"])
+
+
+def test_similar_query_hits(unit_vectors) -> None:
+    cache = SemanticAnswerCache(threshold=0.95)
+    fingerprint = SemanticAnswerCache.fingerprint(**SETTINGS)
+    query = unit_vectors(1, 32)[0]
+    _store(cache, fingerprint, query)
+
+    nearby = query + 0.01 * unit_vectors(1, 32, seed=1)[0]
+    hit = cache.lookup("pipeline", fingerprint, nearby.tolist())
+
+    assert hit is not None
+    assert hit.answer == "cached"
+    assert hit.context_snippets == ["c"]
+    assert cache.lookup("pipeline", fingerprint, unit_vectors(1, 32, seed=2)[0].tolist()) is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_other_settings_miss(unit_vectors) -> None:
+    cache = SemanticAnswerCache()
+    query = unit_vectors(1, 16)[0]
+    _store(cache, SemanticAnswerCache.fingerprint(**SETTINGS), query)
+
+    changed = SemanticAnswerCache.fingerprint(**{**SETTINGS, "top_k": 6})
+
+    assert cache.lookup("pipeline", changed, query.tolist()) is None
+    assert cache.lookup("other-pipeline", SemanticAnswerCache.fingerprint(**SETTINGS), query.tolist()) is None
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        {"vector_store": "local"},
+        {"mmr": True},
+        {"mmr_lambda": 0.3},
+        {"min_score": 0.5},
+        {"context_token_budget": 2000},
+        {"sources": ["pinecone|d3"]},
+        {"dataset_ids": ["d1:1", "d2:3"]},
+    ],
+)
+def test_fingerprint_covers_retrieval_settings(change: Dict[str, Any]) -> None:
+    assert SemanticAnswerCache.fingerprint(**SETTINGS) != SemanticAnswerCache.fingerprint(**{**SETTINGS, **change})
+
+
+def test_fingerprint_ignores_dataset_order() -> None:
+    reordered = {**SETTINGS, "dataset_ids": list(reversed(SETTINGS["dataset_ids"]))}
+
+    assert SemanticAnswerCache.fingerprint(**SETTINGS) == SemanticAnswerCache.fingerprint(**reordered)
+
+
+def test_reembedding_a_dataset_invalidates_its_pipelines(unit_vectors) -> None:
+    cache = SemanticAnswerCache()
+    fingerprint = SemanticAnswerCache.fingerprint(**SETTINGS)
+    query = unit_vectors(1, 16)[0]
+    _store(cache, fingerprint, query)
+
+    assert cache.invalidate_datasets(["unrelated"]) == 0
+    assert cache.lookup("pipeline", fingerprint, query.tolist()) is not None
+    assert cache.invalidate_datasets(["d2"]) == 1
+    assert cache.lookup("pipeline", fingerprint, query.tolist()) is None
+
+
+def test_expired_entries_miss(unit_vectors) -> None:
+    cache = SemanticAnswerCache(ttl_seconds=-1.0)
+    fingerprint = SemanticAnswerCache.fingerprint(**SETTINGS)
+    query = unit_vectors(1, 16)[0]
+    _store(cache, fingerprint, query)
+
+    assert cache.lookup("pipeline", fingerprint, query.tolist()) is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_eviction_spares_recently_served_entries(unit_vectors) -> None:
+    cache = SemanticAnswerCache(max_entries_per_pipeline=3)
+    fingerprint = SemanticAnswerCache.fingerprint(**SETTINGS)
+    vectors = unit_vectors(4, 32)
+    for index in range(3):
+        _store(cache, fingerprint, vectors[index], answer=f"answer {index}")
+
+    assert cache.lookup("pipeline", fingerprint, vectors[0].tolist()) is not None
+    _store(cache, fingerprint, vectors[3], answer="answer 3")
+
+    assert cache.lookup("pipeline", fingerprint, vectors[0].tolist()) is not None
+    assert cache.lookup("pipeline", fingerprint, vectors[1].tolist()) is None
+    assert cache.lookup("pipeline", fingerprint, vectors[3].tolist()) is not None
+
+
+def test_eviction_spares_recently_served_pipelines(unit_vectors) -> None:
+    cache = SemanticAnswerCache(max_pipelines=2)
+    fingerprint = SemanticAnswerCache.fingerprint(**SETTINGS)
+    query = unit_vectors(1, 16)[0].tolist()
+    for pipeline in ("a", "b"):
+        cache.store(pipeline, fingerprint, query, answer=pipeline, context_snippets=[], dataset_ids=["d1"])
+
+    assert cache.lookup("a", fingerprint, query) is not None
+    cache.store("c", fingerprint, query, answer="c", context_snippets=[], dataset_ids=["d1"])
+
+    assert cache.lookup("a", fingerprint, query) is not None
+    assert cache.lookup("b", fingerprint, query) is None
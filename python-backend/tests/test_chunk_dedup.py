@@ -0,0 +1,56 @@
+"""Exact and MinHash near-duplicate removal before embedding."""
+
+from __future__ import annotations
+
+from src.schemas.embedding import ChunkPayload
+from src.services.chunk_dedup import deduplicate_chunks, minhash
+
+PAGE = (
+    "Krira lets you upload datasets, split them into chunks and embed every chunk into the vector "
+    "store of your choice so that pipelines can retrieve the most relevant passages for each question "
+    "asked through the public chat API. Page {page} of the handbook."
+)
+
+
+def _chunks(*texts: str) -> list[ChunkPayload]:
+    return [ChunkPayload(order=order, text=text) for order, text in enumerate(texts)]
+
+
+def test_exact_duplicates_ignore_case_and_whitespace() -> None:
+    result = deduplicate_chunks(_chunks("Hello  world", "hello world", "Something else"))
+
+    assert [chunk.order for chunk in result.chunks] == [0, 2]
+    assert result.exact_duplicates == 1
+    assert result.chunks[0].duplicate_orders == [1]
+
+
+def test_near_duplicates_are_folded_into_the_first_occurrence() -> None:
+    result = deduplicate_chunks(_chunks(PAGE.format(page=1), PAGE.format(page=2), "An unrelated chunk."))
+
+    assert [chunk.order for chunk in result.chunks] == [0, 2]
+    assert result.near_duplicates == 1
+    assert result.folded == {0: [1]}
+    assert result.removed == 1
+
+
+def test_threshold_of_one_disables_near_duplicates() -> None:
+    result = deduplicate_chunks(_chunks(PAGE.format(page=1), PAGE.format(page=2)), threshold=1.0)
+
+    assert len(result.chunks) == 2
+    assert result.near_duplicates == 0
+
+
+def test_distinct_chunks_are_kept() -> None:
+    texts = [f"Row {index}: " + " ".join(f"word{index}_{position}" for position in range(30)) for index in range(50)]
+
+    result = deduplicate_chunks(_chunks(*texts))
+
+    assert len(result.chunks) == 50
+    assert result.removed == 0
+
+
+def test_minhash_skips_short_texts_and_is_deterministic() -> None:
+    assert minhash("too short to compare") is None
+    first, second = minhash(PAGE.format(page=1)), minhash(PAGE.format(page=1))
+    assert first is not None and second is not None
+    assert (first == second).all()
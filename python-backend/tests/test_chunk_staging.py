@@ -0,0 +1,90 @@
+"""Round-trips through the on-disk chunk staging area."""
+
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from src.services import ChunkStaging, ChunkStagingError
+
+CHUNKS = [
+    {"order": 0, "text": "First chunk"},
+    {"order": 3, "text": "Ünïcødé — 日本語 text"},
+    {"order": 7, "text": ""},
+    {"order": 9, "text": "Last chunk\nwith a newline"},
+]
+
+
+def _stage(staging: ChunkStaging, chunks=CHUNKS) -> str:
+    return staging.stage(chunks, dataset_type="csv", chunk_size=500, chunk_overlap=50, content_hash="abc").handle
+
+
+def test_round_trip_preserves_order_and_text(tmp_path: Path) -> None:
+    staging = ChunkStaging(tmp_path)
+    handle = _stage(staging)
+
+    loaded = staging.load(handle)
+
+    assert [(chunk.order, chunk.text) for chunk in loaded] == [(chunk["order"], chunk["text"]) for chunk in CHUNKS]
+
+
+def test_empty_dataset_round_trips(tmp_path: Path) -> None:
+    staging = ChunkStaging(tmp_path)
+
+    assert staging.load(_stage(staging, [])) == []
+
+
+@pytest.mark.parametrize("handle", ["", "../../etc/passwd", "short"])
+def test_invalid_handles_are_rejected(tmp_path: Path, handle: str) -> None:
+    with pytest.raises(ChunkStagingError, match="Invalid"):
+        ChunkStaging(tmp_path).load(handle)
+
+
+def test_unknown_and_discarded_handles(tmp_path: Path) -> None:
+    staging = ChunkStaging(tmp_path)
+    handle = _stage(staging)
+
+    staging.discard(handle)
+    staging.discard(handle)
+
+    with pytest.raises(ChunkStagingError, match="Unknown or expired"):
+        staging.load(handle)
+    with pytest.raises(ChunkStagingError, match="Unknown or expired"):
+        staging.load("A" * 24)
+
+
+def test_expired_handles_are_refused_and_purged(tmp_path: Path) -> None:
+    staging = ChunkStaging(tmp_path, ttl_seconds=60)
+    handle = _stage(staging)
+    fresh = _stage(staging)
+    (tmp_path / "interrupted.tmp").write_bytes(b"partial")
+    old = time.time() - 120
+    os.utime(tmp_path / f"{handle}.chunks", (old, old))
+    os.utime(tmp_path / "interrupted.tmp", (old, old))
+
+    assert staging.purge_expired() == 2
+    assert sorted(path.name for path in tmp_path.iterdir()) == [f"{fresh}.chunks"]
+    with pytest.raises(ChunkStagingError):
+        staging.load(handle)
+
+
+def test_handles_past_their_ttl_are_refused(tmp_path: Path) -> None:
+    staging = ChunkStaging(tmp_path, ttl_seconds=0.01)
+    handle = _stage(staging)
+    time.sleep(0.02)
+
+    with pytest.raises(ChunkStagingError, match="Unknown or expired"):
+        staging.load(handle)
+
+
+def test_corrupt_files_are_reported(tmp_path: Path) -> None:
+    staging = ChunkStaging(tmp_path)
+    handle = _stage(staging)
+    path = tmp_path / f"{handle}.chunks"
+    path.write_bytes(path.read_bytes()[:-5])
+
+    with pytest.raises(ChunkStagingError, match="unreadable"):
+        staging.load(handle)
@@ -0,0 +1,76 @@
+"""Token budgets and context window assembly."""
+
+from __future__ import annotations
+
+import pytest
+
+from src.services import RetrievedContext
+from src.services.context_window import (
+    DEFAULT_CONTEXT_WINDOW,
+    NO_CONTEXT_PLACEHOLDER,
+    ContextAssembler,
+    estimate_tokens,
+    resolve_token_budget,
+)
+
+
+def test_estimate_tokens_counts_punctuation_and_long_words() -> None:
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("a, b.") == 4
+    # Eight characters are two tokens at four characters per token.
+    assert estimate_tokens("abcdefgh") == 2
+
+
+@pytest.mark.parametrize(
+    ("model_id", "override", "expected"),
+    [
+        ("perplexity/sonar-pro", None, 4000),
+        ("google/gemini-2.5-flash", None, 8000),
+        ("unknown/model", None, 6000),
+        ("unknown/model", 3000, 3000),
+        ("unknown/model", "4000", 4000),
+        ("unknown/model", "lots", 6000),
+        ("unknown/model", 0, 6000),
+        ("unknown/model", -5, 6000),
+        ("anthropic/claude-opus-4.1", 10_000_000, 200_000),
+        ("unknown/model", 10_000_000, DEFAULT_CONTEXT_WINDOW),
+    ],
+)
+def test_resolve_token_budget(model_id: str, override: object, expected: int) -> None:
+    assert resolve_token_budget(model_id, 6000, override) == expected
+
+
+def test_assembler_ranks_by_similarity_and_stays_within_budget() -> None:
+    chunks = [
+        RetrievedContext(text="low relevance " * 20, similarity=0.2),
+        RetrievedContext(text="best match about vector stores", similarity=0.9),
+        RetrievedContext(text="second match about embeddings", similarity=0.7),
+    ]
+
+    window = ContextAssembler().assemble(chunks, token_budget=20)
+
+    assert [chunk.similarity for chunk in window.chunks] == [0.9, 0.7]
+    assert window.tokens_used <= 20
+    assert window.truncated == 1
+    assert window.tokens_saved > 0
+
+
+def test_assembler_drops_duplicates() -> None:
+    text = "Chunks repeated across datasets should only be sent to the model once."
+    chunks = [
+        RetrievedContext(text=text, similarity=0.9),
+        RetrievedContext(text=f"  {text} ", similarity=0.8),
+        RetrievedContext(text=text.replace("once", "once."), similarity=0.7),
+    ]
+
+    window = ContextAssembler().assemble(chunks, token_budget=1000)
+
+    assert len(window.chunks) == 1
+    assert window.duplicates_dropped == 2
+
+
+def test_assembler_without_chunks_uses_placeholder() -> None:
+    window = ContextAssembler().assemble([RetrievedContext(text="   ")], token_budget=100)
+
+    assert window.text == NO_CONTEXT_PLACEHOLDER
+    assert window.chunks == []
@@ -0,0 +1,56 @@
+"""Conversation updates against the shared cache from several workers at once."""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from src.services import ConversationStore
+from src.services.shared_cache import MemorySharedCache, SharedCache, SQLiteSharedCache
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def shared(request: pytest.FixtureRequest, tmp_path: Path) -> SharedCache:
+    if request.param == "memory":
+        return MemorySharedCache()
+    return SQLiteSharedCache(tmp_path / "shared.sqlite3")
+
+
+def test_compare_and_set_only_replaces_the_expected_value(shared: SharedCache) -> None:
+    assert shared.compare_and_set("k", None, b"one", 60)
+    assert not shared.compare_and_set("k", None, b"two", 60)
+    assert not shared.compare_and_set("k", b"stale", b"two", 60)
+    assert shared.compare_and_set("k", b"one", b"two", 60)
+    assert shared.get("k") == b"two"
+
+
+def test_concurrent_appends_from_several_workers_keep_every_turn(shared: SharedCache) -> None:
+    # Each store stands in for one worker process; they only share the cache.
+    workers = [ConversationStore(shared_cache=shared) for _ in range(4)]
+
+    def answer(index: int) -> None:
+        workers[index % len(workers)].append("conversation", f"question {index}", f"answer {index}")
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(answer, range(40)))
+
+    conversation = workers[0].get("conversation")
+    assert conversation is not None
+    assert sorted(turn.question for turn in conversation.turns) == sorted(f"question {index}" for index in range(40))
+
+
+def test_fold_keeps_turns_appended_by_another_worker(shared: SharedCache) -> None:
+    first, second = ConversationStore(shared_cache=shared), ConversationStore(shared_cache=shared)
+    for index in range(3):
+        first.append("conversation", f"question {index}", f"answer {index}")
+    folded = first.get("conversation").turns[:2]  # type: ignore[union-attr]
+
+    second.append("conversation", "question 3", "answer 3")
+    first.fold("conversation", "Asked about 0 and 1.", folded)
+
+    conversation = second.get("conversation")
+    assert conversation is not None
+    assert conversation.summary == "Asked about 0 and 1."
+    assert [turn.question for turn in conversation.turns] == ["question 2", "question 3"]
@@ -0,0 +1,161 @@
+"""Quantized search, tombstones, compaction and the IVF index of the local vector store."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import List
+
+import numpy as np
+import pytest
+
+from src.services import local_store
+from src.services.local_store import LocalRecord, LocalVectorCollection, LocalVectorStoreError
+
+
+def _records(count: int, dataset_id: str = "d1", start: int = 0) -> List[LocalRecord]:
+    return [LocalRecord(id=f"{dataset_id}-{index}", dataset_id=dataset_id, text=f"chunk {index}") for index in range(start, start + count)]
+
+
+@pytest.mark.parametrize("quantization", ["none", "int8", "binary"])
+def test_quantized_search_finds_stored_vectors(tmp_path: Path, unit_vectors, quantization: str) -> None:
+    vectors = unit_vectors(300, 64)
+    collection = LocalVectorCollection(tmp_path, 64, quantization)
+    collection.add(vectors.tolist(), _records(300))
+
+    for row in (0, 123, 299):
+        matches = collection.search(vectors[row], 3, include_embeddings=True)
+        assert matches[0].record.id == f"d1-{row}"
+        assert matches[0].similarity == pytest.approx(1.0, abs=1e-5)
+        assert matches[0].embedding == pytest.approx(vectors[row].tolist(), abs=1e-6)
+        assert [match.similarity for match in matches] == sorted((match.similarity for match in matches), reverse=True)
+
+
+def test_search_filters_by_dataset(tmp_path: Path, unit_vectors) -> None:
+    vectors = unit_vectors(40, 16)
+    collection = LocalVectorCollection(tmp_path, 16)
+    collection.add(vectors[:20].tolist(), _records(20, "d1"))
+    collection.add(vectors[20:].tolist(), _records(20, "d2"))
+
+    matches = collection.search(vectors[5], 10, dataset_ids=["d2"])
+
+    assert matches
+    assert {match.record.dataset_id for match in matches} == {"d2"}
+
+
+def test_dimension_mismatch_is_rejected(tmp_path: Path) -> None:
+    collection = LocalVectorCollection(tmp_path, 8)
+
+    with pytest.raises(LocalVectorStoreError):
+        collection.add([[1.0, 0.0]], _records(1))
+    with pytest.raises(LocalVectorStoreError):
+        collection.search([1.0, 0.0], 1)
+
+
+def test_deleted_rows_are_hidden_then_compacted(tmp_path: Path, unit_vectors) -> None:
+    vectors = unit_vectors(60, 16)
+    collection = LocalVectorCollection(tmp_path, 16, compaction_ratio=1.0)
+    collection.add(vectors[:30].tolist(), _records(30, "d1"))
+    collection.add(vectors[30:].tolist(), _records(30, "d2"))
+
+    assert collection.delete_dataset("d1") == 30
+    assert all(match.record.dataset_id == "d2" for match in collection.search(vectors[3], 10))
+    assert collection.stats()["tombstones"] == 30
+
+    assert collection.compact() == 30
+    assert collection.stats()["rows"] == 30
+    assert collection.stats()["tombstones"] == 0
+    assert collection.search(vectors[40], 1)[0].record.id == "d2-10"
+
+    reopened = LocalVectorCollection(tmp_path, 16)
+    assert reopened.stats()["rows"] == 30
+    assert reopened.search(vectors[40], 1)[0].record.id == "d2-10"
+
+
+@pytest.mark.parametrize("quantization", ["none", "int8"])
+def test_writes_during_compaction_are_replayed(
+    tmp_path: Path, unit_vectors, monkeypatch: pytest.MonkeyPatch, quantization: str
+) -> None:
+    vectors = unit_vectors(70, 16)
+    collection = LocalVectorCollection(tmp_path, 16, quantization, compaction_ratio=1.0)
+    collection.add(vectors[:60].tolist(), _records(20, "d1") + _records(20, "d2") + _records(20, "d3"))
+    collection.delete_dataset("d1")
+    stage = LocalVectorCollection._stage_files
+
+    def stage_while_writing(self, *args):
+        staged = stage(self, *args)
+        # The copy runs outside the lock, so these land between snapshot and swap.
+        collection.delete_dataset("d2")
+        collection.add(vectors[60:].tolist(), _records(10, "d4"))
+        return staged
+
+    monkeypatch.setattr(LocalVectorCollection, "_stage_files", stage_while_writing)
+    assert collection.compact() == 20
+
+    assert not list(tmp_path.glob("*.tmp"))
+    assert collection.stats()["rows"] == 50
+    assert collection.stats()["tombstones"] == 20
+    assert collection.search(vectors[65], 1)[0].record.id == "d4-5"
+    assert {match.record.dataset_id for match in collection.search(vectors[25], 50)} == {"d3", "d4"}
+
+    reopened = LocalVectorCollection(tmp_path, 16)
+    assert reopened.stats()["tombstones"] == 20
+    assert reopened.search(vectors[45], 1)[0].record.id == "d3-5"
+    assert reopened.search(vectors[65], 1)[0].record.id == "d4-5"
+
+
+def test_background_compaction_after_enough_deletes(tmp_path: Path, unit_vectors) -> None:
+    collection = LocalVectorCollection(tmp_path, 16, compaction_ratio=0.2)
+    collection.add(unit_vectors(50, 16).tolist(), _records(40, "d1") + _records(10, "d2"))
+
+    collection.delete_dataset("d2")
+    collection.wait_for_maintenance(timeout=10)
+
+    assert collection.stats()["rows"] == 40
+    assert collection.stats()["tombstones"] == 0
+
+
+def test_ivf_index_is_built_and_keeps_recall(tmp_path: Path, unit_vectors) -> None:
+    # Embeddings cluster by topic; uniformly random vectors would defeat any IVF index.
+    topics = unit_vectors(40, 32)
+    noise = unit_vectors(2000, 32, seed=1)
+    vectors = topics[np.arange(2000) % 40] + 0.3 * noise
+    collection = LocalVectorCollection(tmp_path, 32, ann_min_rows=500, ann_nprobe=8)
+    collection.add(vectors.tolist(), _records(2000))
+    collection.wait_for_maintenance(timeout=30)
+
+    lists = collection.stats()["ann_lists"]
+    assert lists > 0
+    queries = topics[:30] + 0.3 * unit_vectors(30, 32, seed=7)
+    hits = 0
+    for query in queries:
+        exact = collection.exact_search(query, 10)
+        hits += len(set(collection.row_ids(collection.search(query, 10))) & set(exact))
+        # Probing every list scans every row, so it must agree with brute force.
+        assert collection.row_ids(collection.search(query, 10, nprobe=lists)) == exact
+    assert hits / (10 * len(queries)) >= 0.8
+
+    # Rows appended after training are assigned to lists and stay searchable.
+    extra = unit_vectors(5, 32, seed=9)
+    collection.add(extra.tolist(), _records(5, "d2"))
+    assert collection.search(extra[2], 1)[0].record.id == "d2-2"
+
+
+def test_index_training_overlapping_a_compaction_is_discarded(
+    tmp_path: Path, unit_vectors, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    collection = LocalVectorCollection(tmp_path, 16, ann_min_rows=10_000, compaction_ratio=1.0)
+    collection.add(unit_vectors(200, 16).tolist(), _records(150, "d1") + _records(50, "d2"))
+    collection.delete_dataset("d2")
+    train = local_store.train_centroids
+
+    def train_during_compaction(vectors: np.ndarray) -> np.ndarray:
+        collection.compact()
+        return train(vectors)
+
+    monkeypatch.setattr(local_store, "train_centroids", train_during_compaction)
+    collection.build_index()
+
+    assert collection.stats()["ann_lists"] == 0
+    monkeypatch.setattr(local_store, "train_centroids", train)
+    collection.build_index()
+    assert collection.stats()["ann_lists"] > 0
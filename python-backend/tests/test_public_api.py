@@ -0,0 +1,129 @@
+"""Public chat API: batch quota charging and answer ETags, against fake upstreams."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator
+
+import httpx
+import pytest
+
+from benchmarks.bench_endpoints import (
+    BENCH_API_KEY,
+    BENCH_EMBEDDING_MODEL,
+    BENCH_MODEL,
+    BENCH_PIPELINE,
+    _backend_env,
+)
+from benchmarks.fakes import FakeUpstreamConfig, FakeUpstreamServer
+from src.config import get_settings
+
+HEADERS = {"Authorization": f"Bearer {BENCH_API_KEY}"}
+
+
+@pytest.fixture(scope="module")
+def upstream(tmp_path_factory: pytest.TempPathFactory) -> Iterator[FakeUpstreamConfig]:
+    config = FakeUpstreamConfig(latency_ms=1, tokens_per_second=100_000, embedding_latency_ms=1)
+    config.pipeline.update(
+        {
+            "id": "pipeline-1",
+            "updatedAt": "2026-01-01T00:00:00Z",
+            "llm": {"provider": "openai", "model": BENCH_MODEL, "topK": 5, "semanticCache": False},
+            "embedding": {"model": BENCH_EMBEDDING_MODEL, "vectorStore": "local", "datasetIds": ["d1"]},
+        }
+    )
+    workspace: Path = tmp_path_factory.mktemp("backend")
+    with FakeUpstreamServer(config) as server, pytest.MonkeyPatch.context() as patch:
+        for name, value in _backend_env(server.url, workspace).items():
+            patch.setenv(name, value)
+        patch.setenv("CHUNK_STAGING_DIRECTORY", str(workspace / "staging"))
+        patch.setenv("DATASET_REGISTRY_PATH", str(workspace / "datasets.sqlite3"))
+        get_settings.cache_clear()
+        yield config
+    get_settings.cache_clear()
+
+
+@pytest.fixture
+async def client(upstream: FakeUpstreamConfig) -> AsyncIterator[httpx.AsyncClient]:
+    from src.main import app
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test", timeout=30) as session:
+        yield session
+
+
+def _batch(count: int) -> Dict[str, Any]:
+    return {"pipeline_name": BENCH_PIPELINE, "queries": [{"query": f"Question {index}?"} for index in range(count)]}
+
+
+async def test_batch_is_refused_when_quota_cannot_cover_every_query(
+    client: httpx.AsyncClient, upstream: FakeUpstreamConfig
+) -> None:
+    upstream.request_capacity = 3
+    try:
+        refused = await client.post("/v1/chat/batch", json=_batch(5), headers=HEADERS)
+        assert refused.status_code == 402
+        assert upstream.request_capacity == 3
+
+        accepted = await client.post("/v1/chat/batch", json=_batch(3), headers=HEADERS)
+        assert accepted.status_code == 200
+        assert accepted.json()["succeeded"] == 3
+        assert upstream.request_capacity == 0
+    finally:
+        upstream.request_capacity = None
+
+
+async def test_matching_etag_returns_304(client: httpx.AsyncClient) -> None:
+    body = {"pipeline_name": BENCH_PIPELINE, "query": "What does the handbook say?"}
+
+    first = await client.post("/v1/chat", json=body, headers=HEADERS)
+    etag = first.headers["etag"]
+    repeated = await client.post("/v1/chat", json=body, headers={**HEADERS, "If-None-Match": etag})
+    other_query = await client.post("/v1/chat", json={**body, "query": "Something else?"}, headers={**HEADERS, "If-None-Match": etag})
+
+    assert first.status_code == 200
+    assert repeated.status_code == 304
+    assert repeated.headers["etag"] == etag
+    assert not repeated.content
+    assert other_query.status_code == 200
+
+
+async def test_wildcard_if_none_match_is_ignored(client: httpx.AsyncClient) -> None:
+    body = {"pipeline_name": BENCH_PIPELINE, "query": "Is a wildcard a match?"}
+
+    response = await client.post("/v1/chat", json=body, headers={**HEADERS, "If-None-Match": "*"})
+
+    assert response.status_code == 200
+    assert response.json()["answer"]
+
+
+async def test_reembedding_a_dataset_changes_the_etag(client: httpx.AsyncClient) -> None:
+    from src.api.dependencies import get_shared_cache
+    from src.services.shared_cache import bump_dataset_generations
+
+    body = {"pipeline_name": BENCH_PIPELINE, "query": "Has the dataset changed?"}
+    etag = (await client.post("/v1/chat", json=body, headers=HEADERS)).headers["etag"]
+
+    await bump_dataset_generations(get_shared_cache(), ["d1"])
+    response = await client.post("/v1/chat", json=body, headers={**HEADERS, "If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+@pytest.mark.parametrize("path", ["/v1/chat", "/v1/chat/stream"])
+async def test_refused_key_drops_the_embedding_hint(
+    client: httpx.AsyncClient, upstream: FakeUpstreamConfig, path: str
+) -> None:
+    from src.api.routes import public_api
+
+    body = {"pipeline_name": BENCH_PIPELINE, "query": "Who approves expenses?"}
+    hint_key = public_api._hint_key(BENCH_API_KEY, BENCH_PIPELINE)
+    assert (await client.post(path, json=body, headers=HEADERS)).status_code == 200
+    assert hint_key in public_api._PIPELINE_EMBEDDING_HINTS
+
+    upstream.request_capacity = 0
+    try:
+        assert (await client.post(path, json=body, headers=HEADERS)).status_code == 402
+    finally:
+        upstream.request_capacity = None
+    assert hint_key not in public_api._PIPELINE_EMBEDDING_HINTS
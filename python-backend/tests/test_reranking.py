@@ -0,0 +1,60 @@
+"""Maximal marginal relevance re-ranking."""
+
+from __future__ import annotations
+
+import pytest
+
+from src.services import RetrievedContext
+from src.services.reranking import maximal_marginal_relevance, mmr_rerank
+
+QUERY = [1.0, 0.0, 0.0]
+# Two near-identical candidates close to the query and one that covers something else.
+CANDIDATES = [
+    [0.95, 0.31, 0.0],
+    [0.94, 0.34, 0.0],
+    [0.7, 0.0, 0.71],
+]
+
+
+def test_lambda_one_ranks_by_relevance() -> None:
+    assert maximal_marginal_relevance(QUERY, CANDIDATES, k=3, lambda_mult=1.0) == [0, 1, 2]
+
+
+def test_lower_lambda_prefers_diverse_candidates() -> None:
+    assert maximal_marginal_relevance(QUERY, CANDIDATES, k=2, lambda_mult=0.5) == [0, 2]
+
+
+def test_k_is_capped_by_candidate_count() -> None:
+    assert maximal_marginal_relevance(QUERY, CANDIDATES, k=10) == [0, 2, 1]
+    assert maximal_marginal_relevance(QUERY, [], k=3) == []
+
+
+def test_dimension_mismatch_is_rejected() -> None:
+    with pytest.raises(ValueError):
+        maximal_marginal_relevance(QUERY, [[1.0, 0.0]], k=1)
+
+
+def test_rerank_keeps_store_order_without_embeddings() -> None:
+    contexts = [
+        RetrievedContext(text="a", embedding=CANDIDATES[0]),
+        RetrievedContext(text="b"),
+        RetrievedContext(text="c", embedding=CANDIDATES[2]),
+    ]
+
+    assert [context.text for context in mmr_rerank(QUERY, contexts, k=2)] == ["a", "b"]
+
+
+def test_rerank_reorders_contexts() -> None:
+    contexts = [RetrievedContext(text=str(index), embedding=vector) for index, vector in enumerate(CANDIDATES)]
+
+    assert [context.text for context in mmr_rerank(QUERY, contexts, k=2, lambda_mult=0.5)] == ["0", "2"]
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [(True, True), ("true", True), ("1", True), (False, False), ("false", False), ("0", False), (None, False), ("maybe", False)],
+)
+def test_mmr_flag_from_pipeline_config_is_parsed_strictly(value: object, expected: bool) -> None:
+    from src.services.llm import _coerce_flag
+
+    assert _coerce_flag(value, "mmr") is expected
@@ -0,0 +1,52 @@
+"""Conversion of backend scores to comparable cosine similarities."""
+
+from __future__ import annotations
+
+import pytest
+
+from src.services import RetrievedContext
+from src.services.vectorstores import _chroma_similarity, _merge_ranked, _pinecone_similarity
+
+
+@pytest.mark.parametrize(
+    ("distance", "space", "expected"),
+    [
+        (0.0, "l2", 1.0),
+        (2.0, "l2", 0.0),
+        (4.0, "l2", -1.0),
+        (0.25, "cosine", 0.75),
+        (0.25, "ip", 0.75),
+        (None, "l2", None),
+    ],
+)
+def test_chroma_distances(distance, space: str, expected) -> None:
+    assert _chroma_similarity(distance, space) == expected
+
+
+@pytest.mark.parametrize(
+    ("score", "metric", "expected"),
+    [
+        (0.8, "cosine", 0.8),
+        (0.8, "dotproduct", 0.8),
+        (0.5, "euclidean", 0.75),
+        (None, "cosine", None),
+    ],
+)
+def test_pinecone_scores(score, metric: str, expected) -> None:
+    assert _pinecone_similarity(score, metric) == expected
+
+
+def test_same_match_scores_the_same_in_every_store() -> None:
+    # Unit vectors at cosine 0.6: squared L2 distance 0.8, cosine distance 0.4.
+    assert _chroma_similarity(0.8, "l2") == pytest.approx(0.6)
+    assert _chroma_similarity(0.4, "cosine") == pytest.approx(0.6)
+    assert _pinecone_similarity(0.8, "euclidean") == pytest.approx(0.6)
+    assert _pinecone_similarity(0.6, "cosine") == pytest.approx(0.6)
+
+
+def test_merge_orders_by_similarity_with_unscored_last() -> None:
+    first = [RetrievedContext(text="a", similarity=0.9), RetrievedContext(text="b", similarity=0.4)]
+    second = [RetrievedContext(text="c", similarity=0.7), RetrievedContext(text="d")]
+
+    assert [context.text for context in _merge_ranked([first, second], 4)] == ["a", "c", "b", "d"]
+    assert [context.text for context in _merge_ranked([first, second], 2)] == ["a", "c"]
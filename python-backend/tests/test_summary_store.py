@@ -0,0 +1,62 @@
+"""Skip decisions and schema upgrades in the dataset registry."""
+
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+
+from src.services import DatasetRegistry, content_hash
+
+TARGET = "local|/data/vectors|shared"
+
+
+def _record(registry: DatasetRegistry, *, vector_target: str = TARGET):
+    return registry.record_embedding(
+        dataset_id="a",
+        dataset_type="csv",
+        label="A",
+        chunk_count=2,
+        digest=content_hash(["one", "two"]),
+        embedding_model="openai-small",
+        embedding_dimension=None,
+        vector_store="local",
+        vector_target=vector_target,
+    )
+
+
+def test_same_embedding_requires_the_same_target(tmp_path: Path) -> None:
+    registry = DatasetRegistry(tmp_path / "registry.sqlite3")
+    _record(registry)
+    stored = registry.get("a")
+    digest = content_hash(["one", "two"])
+
+    assert stored is not None
+    assert stored.same_embedding(digest, "openai-small", None, "local", TARGET)
+    assert not stored.same_embedding(digest, "openai-small", None, "local", "local|/elsewhere|shared")
+    assert not stored.same_embedding(digest, "openai-small", None, "local", "local|/data/vectors|partitioned")
+
+
+def test_forget_drops_the_record(tmp_path: Path) -> None:
+    registry = DatasetRegistry(tmp_path / "registry.sqlite3")
+    _record(registry)
+
+    registry.forget("a")
+
+    assert registry.get("a") is None
+
+
+def test_table_from_an_older_layout_is_rebuilt(tmp_path: Path) -> None:
+    path = tmp_path / "registry.sqlite3"
+    with sqlite3.connect(path) as connection:
+        connection.execute(
+            "CREATE TABLE datasets (dataset_id TEXT PRIMARY KEY, dataset_type TEXT NOT NULL, label TEXT NOT NULL, "
+            "chunk_count INTEGER NOT NULL, content_hash TEXT NOT NULL, embedding_model TEXT, "
+            "embedding_dimension INTEGER, vector_store TEXT, embedded_at REAL, updated_at REAL NOT NULL)"
+        )
+        connection.execute("INSERT INTO datasets VALUES ('a', 'csv', 'A', 2, 'x', 'openai-small', NULL, 'local', 1, 1)")
+    connection.close()
+
+    registry = DatasetRegistry(path)
+
+    assert registry.get("a") is None
+    assert _record(registry).vector_target == TARGET
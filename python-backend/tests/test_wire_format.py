@@ -0,0 +1,130 @@
+"""JSON, MessagePack and NDJSON request and response bodies."""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Dict
+
+import httpx
+import msgspec
+import pytest
+from fastapi import FastAPI, Request
+
+from src.api.wire_format import (
+    JSON,
+    MSGPACK,
+    NDJSON,
+    encode_document,
+    parse_body,
+    request_format,
+    response_format,
+)
+from src.schemas import EmbeddingRequest
+
+DOCUMENT: Dict[str, Any] = {
+    "embedding_model": "openai-small",
+    "vector_store": "local",
+    "datasets": [
+        {
+            "id": f"d{index}",
+            "label": f"Dataset {index}",
+            "dataset_type": "csv",
+            "chunk_size": 500,
+            "chunk_overlap": 50,
+            "chunks": [{"order": 0, "text": f"Chunk of dataset {index} — ünïcode"}],
+        }
+        for index in range(3)
+    ],
+}
+
+
+def _ndjson(document: Dict[str, Any], list_field: str) -> bytes:
+    header = {key: value for key, value in document.items() if key != list_field}
+    return b"".join(json.dumps(line).encode() + b"\n" for line in [header, *document[list_field]])
+
+
+@pytest.fixture
+def client() -> httpx.AsyncClient:
+    app = FastAPI()
+
+    @app.post("/echo")
+    async def echo(request: Request) -> Dict[str, Any]:
+        return (await parse_body(request, EmbeddingRequest, list_field="datasets")).model_dump(mode="json")
+
+    @app.get("/document")
+    async def document(request: Request) -> Any:
+        return encode_document(DOCUMENT, response_format(request.headers.get("accept")), list_field="datasets")
+
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+@pytest.mark.parametrize(
+    ("content_type", "body"),
+    [
+        (JSON, json.dumps(DOCUMENT).encode()),
+        (MSGPACK, msgspec.msgpack.encode(DOCUMENT)),
+        ("application/x-msgpack", msgspec.msgpack.encode(DOCUMENT)),
+        (NDJSON, _ndjson(DOCUMENT, "datasets")),
+        (f"{NDJSON}; charset=utf-8", _ndjson(DOCUMENT, "datasets")),
+    ],
+)
+async def test_every_format_parses_to_the_same_request(client: httpx.AsyncClient, content_type: str, body: bytes) -> None:
+    expected = EmbeddingRequest.model_validate(DOCUMENT).model_dump(mode="json")
+
+    response = await client.post("/echo", content=body, headers={"Content-Type": content_type})
+
+    assert response.status_code == 200
+    assert response.json() == expected
+
+
+@pytest.mark.parametrize(
+    ("content_type", "body", "status"),
+    [
+        (MSGPACK, b"\xc1not msgpack", 400),
+        (NDJSON, b"", 400),
+        (NDJSON, b"{not json}\n", 400),
+        (NDJSON, b"[1, 2]\n", 400),
+        ("text/csv", b"a,b", 415),
+    ],
+)
+async def test_malformed_bodies_are_rejected(client: httpx.AsyncClient, content_type: str, body: bytes, status: int) -> None:
+    response = await client.post("/echo", content=body, headers={"Content-Type": content_type})
+
+    assert response.status_code == status
+
+
+@pytest.mark.parametrize("content_type", [JSON, MSGPACK, NDJSON])
+async def test_validation_errors_match_fastapi(client: httpx.AsyncClient, content_type: str) -> None:
+    invalid = {**DOCUMENT, "datasets": [{**DOCUMENT["datasets"][0], "label": ""}]}
+    body = {
+        JSON: lambda: json.dumps(invalid).encode(),
+        MSGPACK: lambda: msgspec.msgpack.encode(invalid),
+        NDJSON: lambda: _ndjson(invalid, "datasets"),
+    }[content_type]()
+
+    response = await client.post("/echo", content=body, headers={"Content-Type": content_type})
+
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", "datasets", 0, "label"]
+
+
+async def test_responses_follow_accept(client: httpx.AsyncClient) -> None:
+    as_json = await client.get("/document")
+    as_msgpack = await client.get("/document", headers={"Accept": MSGPACK})
+    as_ndjson = await client.get("/document", headers={"Accept": f"{MSGPACK};q=0, {NDJSON}"})
+
+    assert as_json.headers["content-type"].startswith(JSON)
+    assert as_json.json() == DOCUMENT
+    assert as_msgpack.headers["content-type"] == MSGPACK
+    assert msgspec.msgpack.decode(as_msgpack.content) == DOCUMENT
+    assert as_ndjson.headers["content-type"].startswith(NDJSON)
+    header, *datasets = [json.loads(line) for line in as_ndjson.content.splitlines()]
+    assert {**header, "datasets": datasets} == DOCUMENT
+    assert "datasets" not in header
+
+
+def test_media_type_negotiation() -> None:
+    assert request_format(None) == JSON
+    assert request_format("application/vnd.msgpack") == MSGPACK
+    assert response_format("text/html, application/json") == JSON
+    assert response_format("application/msgpack;q=0.5") == MSGPACK